@@ -5,6 +5,7 @@ import Markdown from "./markdown";
 interface BrowserProps {
   className?: string;
   url?: string;
+  // URL or data URL of the page screenshot
   screenshot?: string;
   raw?: string;
 }
@@ -45,7 +46,7 @@ const Browser = React.memo(
         <div className="bg-black/80 h-full">
           {screenshot && (
             <img
-              src={`data:image/jpeg;base64,${screenshot}`}
+              src={screenshot}
               alt="Browser"
               className="w-full h-full object-contain object-top"
             />
@@ -6,9 +6,54 @@ import { toast } from "sonner";
 import chalk from "chalk";
 
 import { AppAction, useAppContext } from "@/context/app-context";
-import { AgentEvent, TOOL, ActionStep, Message, TAB } from "@/typings/agent";
+import {
+  AgentEvent,
+  TOOL,
+  ActionStep,
+  MediaJob,
+  Message,
+  TAB,
+} from "@/typings/agent";
 import { Terminal as XTerm } from "@xterm/xterm";
 
+type ImageBlock = {
+  type: "image";
+  source?: {
+    type: "base64" | "blob";
+    media_type?: string;
+    data?: string;
+    url?: string;
+  };
+};
+
+// Images are served from the blob store by URL; older events inline them
+const getImageSrc = (image?: ImageBlock) => {
+  const source = image?.source;
+  if (!source) return undefined;
+  if (source.type === "blob") {
+    return `${process.env.NEXT_PUBLIC_API_URL}${source.url}`;
+  }
+  return `data:${source.media_type || "image/png"};base64,${source.data}`;
+};
+
+type FileHunk = { start: number; end: number; lines: string[] };
+
+// Mirrors the line splitting of the server, which keeps the "\n" separators
+const splitLines = (text: string) => {
+  const parts = text.split("\n");
+  const lines = parts.slice(0, -1).map((line) => `${line}\n`);
+  if (parts[parts.length - 1]) lines.push(parts[parts.length - 1]);
+  return lines;
+};
+
+const applyFilePatch = (content: string, patch: FileHunk[]) => {
+  const lines = splitLines(content);
+  for (const hunk of [...patch].reverse()) {
+    lines.splice(hunk.start, hunk.end - hunk.start, ...hunk.lines);
+  }
+  return lines.join("");
+};
+
 export function useAppEvents({
   xtermRef,
 }: {
@@ -17,6 +62,10 @@ export function useAppEvents({
   const { state, dispatch } = useAppContext();
   const messagesRef = useRef(state.messages);
   const terminalUsernameRef = useRef<string>("");
+  // Latest known version of every edited file, which FILE_EDIT patches apply to
+  const fileVersionsRef = useRef<
+    Record<string, { version: number; content: string }>
+  >({});
 
   useEffect(() => {
     messagesRef.current = state.messages;
@@ -179,6 +228,30 @@ export function useAppEvents({
           break;
 
         case AgentEvent.FILE_EDIT:
+          // Edits carry the full content or a patch against the previous version
+          const editedPath = data.content.path as string;
+          let fileContent: string | undefined;
+          if (data.content.patch) {
+            const base = fileVersionsRef.current[editedPath];
+            if (base && base.version === data.content.base_version) {
+              fileContent = applyFilePatch(
+                base.content,
+                data.content.patch as FileHunk[]
+              );
+            }
+          } else {
+            fileContent = data.content.content as string;
+          }
+          if (fileContent === undefined) {
+            // Missing base version, wait for the next snapshot
+            delete fileVersionsRef.current[editedPath];
+            break;
+          }
+          fileVersionsRef.current[editedPath] = {
+            version: (data.content.version as number) || 0,
+            content: fileContent,
+          };
+
           // Get the latest messages from our ref to ensure we have the most up-to-date state
           const messages = [...messagesRef.current];
           const lastMessage = cloneDeep(messages[messages.length - 1]);
@@ -187,7 +260,7 @@ export function useAppEvents({
             lastMessage?.action &&
             lastMessage.action.type === TOOL.STR_REPLACE_EDITOR
           ) {
-            lastMessage.action.data.content = data.content.content as string;
+            lastMessage.action.data.content = fileContent;
             lastMessage.action.data.path = data.content.path as string;
             const workspace = workspacePath || state.workspaceInfo;
             const filePath = (data.content.path as string)?.includes(workspace)
@@ -198,7 +271,7 @@ export function useAppEvents({
               type: "ADD_FILE_CONTENT",
               payload: {
                 path: filePath,
-                content: data.content.content as string,
+                content: fileContent,
               },
             });
 
@@ -218,6 +291,23 @@ export function useAppEvents({
           // Commented out in original code
           break;
 
+        case AgentEvent.MEDIA_JOB:
+          // Show the progress of a generation on the call of its tool
+          const job = data.content as MediaJob;
+          const jobMessage = [...messagesRef.current]
+            .reverse()
+            .find(
+              (msg) =>
+                msg.action?.data.tool_name === job.tool_name &&
+                !msg.action?.data.isResult
+            );
+          if (jobMessage?.action) {
+            const updated = cloneDeep(jobMessage);
+            updated.action!.data.media_job = job;
+            safeDispatch({ type: "UPDATE_MESSAGE", payload: updated });
+          }
+          break;
+
         case AgentEvent.TOOL_RESULT:
           if (data.content.tool_name === TOOL.BROWSER_USE) {
             safeDispatch({
@@ -273,9 +363,11 @@ export function useAppEvents({
                   ) {
                     lastToolCallMessage.action.data.result =
                       data.content.result && Array.isArray(data.content.result)
-                        ? data.content.result.find(
-                            (item) => item.type === "image"
-                          )?.source?.data
+                        ? getImageSrc(
+                            data.content.result.find(
+                              (item) => item.type === "image"
+                            )
+                          )
                         : undefined;
                   }
                   lastToolCallMessage.action.data.isResult = true;
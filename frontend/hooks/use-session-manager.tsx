@@ -3,6 +3,10 @@ import { toast } from "sonner";
 import { AgentEvent, Message, IEvent } from "@/typings/agent";
 import { useAppContext } from "@/context/app-context";
 
+const EVENTS_PAGE_SIZE = 500;
+
+type EventPage = { events: IEvent[]; next_cursor: string | null };
+
 export function useSessionManager({
   searchParams,
   handleEvent,
@@ -40,17 +44,26 @@ export function useSessionManager({
 
     setIsLoadingSession(true);
     try {
-      const response = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/api/sessions/${id}/events`
-      );
-
-      if (!response.ok) {
-        throw new Error(
-          `Error fetching session events: ${response.statusText}`
+      // Fetch the events page by page
+      const data: { events: IEvent[] } = { events: [] };
+      let cursor: string | null = null;
+      do {
+        const params = new URLSearchParams({ limit: `${EVENTS_PAGE_SIZE}` });
+        if (cursor) params.set("cursor", cursor);
+        const response = await fetch(
+          `${process.env.NEXT_PUBLIC_API_URL}/api/sessions/${id}/events?${params.toString()}`
         );
-      }
 
-      const data = await response.json();
+        if (!response.ok) {
+          throw new Error(
+            `Error fetching session events: ${response.statusText}`
+          );
+        }
+
+        const page: EventPage = await response.json();
+        data.events.push(...page.events);
+        cursor = page.next_cursor;
+      } while (cursor);
       const workspace = data.events?.[0]?.workspace_dir;
       dispatch({ type: "SET_WORKSPACE_INFO", payload: workspace });
 
@@ -1,5 +1,5 @@
 import { AgentEvent, WebSocketConnectionState } from "@/typings/agent";
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { toast } from "sonner";
 import { useAppContext } from "@/context/app-context";
 import { useSearchParams } from "next/navigation";
@@ -23,8 +23,13 @@ export function useWebSocket(
   const searchParams = useSearchParams();
   const session_uuid = searchParams.get("id");
   const [socket, setSocket] = useState<WebSocket | null>(null);
+  // Highest event sequence number received, used to replay missed events on reconnect
+  const lastSeq = useRef(0);
   const { dispatch } = useAppContext();
 
+  // Base URL of the worker running the session, set when the server redirects us
+  const apiUrl = useRef(process.env.NEXT_PUBLIC_API_URL);
+
   const connectWebSocket = () => {
     dispatch({
       type: "SET_WS_CONNECTION_STATE",
@@ -40,10 +45,13 @@ export function useWebSocket(
     };
     if (session_uuid) {
       wsPayload["session_uuid"] = session_uuid;
+      if (lastSeq.current > 0) {
+        wsPayload["last_seq"] = lastSeq.current.toString();
+      }
     }
     const params = new URLSearchParams(wsPayload);
     const ws = new WebSocket(
-      `${process.env.NEXT_PUBLIC_API_URL}/ws?${params.toString()}`
+      `${apiUrl.current}/ws?${params.toString()}`
     );
 
     ws.onopen = () => {
@@ -63,8 +71,27 @@ export function useWebSocket(
 
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        handleEvent({ ...data, id: Date.now().toString() });
+        const parsed = JSON.parse(event.data);
+        // Bursts of events arrive batched into one frame as a JSON array
+        const batch = Array.isArray(parsed) ? parsed : [parsed];
+        const receivedAt = Date.now().toString();
+        batch.forEach((data, index) => {
+          if (typeof data.seq === "number" && data.seq > lastSeq.current) {
+            lastSeq.current = data.seq;
+          }
+          if (data.type === AgentEvent.SESSION_REDIRECT) {
+            // The session runs on another worker, reconnect there
+            apiUrl.current = data.content.url;
+            ws.onclose = null;
+            ws.close();
+            connectWebSocket();
+            return;
+          }
+          handleEvent({
+            ...data,
+            id: batch.length > 1 ? `${receivedAt}-${index}` : receivedAt,
+          });
+        });
       } catch (error) {
         console.error("Error parsing WebSocket data:", error);
       }
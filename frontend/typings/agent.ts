@@ -41,6 +41,8 @@ export enum AgentEvent {
   BROWSER_USE = "browser_use",
   FILE_EDIT = "file_edit",
   PROMPT_GENERATED = "prompt_generated",
+  SESSION_REDIRECT = "session_redirect",
+  MEDIA_JOB = "media_job",
 }
 
 export enum TOOL {
@@ -97,6 +99,19 @@ export enum TOOL {
   BROWSER_VIEW_INTERACTIVE_ELEMENTS = "browser_view_interactive_elements",
 }
 
+// State of a media generation, as sent in MEDIA_JOB events
+export type MediaJob = {
+  job_id: string;
+  kind: string;
+  tool_name: string;
+  description: string;
+  status: "pending" | "running" | "succeeded" | "failed";
+  progress?: number | null;
+  message?: string | null;
+  result?: Record<string, unknown> | null;
+  error?: string | null;
+};
+
 export type ActionStep = {
   type: TOOL;
   data: {
@@ -128,6 +143,7 @@ export type ActionStep = {
     query?: string;
     content?: string;
     path?: string;
+    media_job?: MediaJob;
   };
 };
 
@@ -1,12 +1,22 @@
 import asyncio
 import logging
+import time
 from typing import Any, Optional
-from functools import partial
 
 from typing import List
-from fastapi import WebSocket
 from ii_agent.agents.base import BaseAgent
+from ii_agent.core.agent_logging import LazyLogValue
+from ii_agent.core.checkpoint import RUN_COMPLETED, RUN_FAILED, CheckpointStore
 from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.event_stream import EventStream
+from ii_agent.core.metrics import SessionMetrics, TurnMetrics
+from ii_agent.core.storage.blobs import BlobStore, externalize_images
+from ii_agent.core.tracing import (
+    bind_attributes,
+    get_traced,
+    get_tracer,
+    use_context,
+)
 from ii_agent.llm.base import (
     LLMClient,
     TextResult,
@@ -16,10 +26,11 @@ from ii_agent.llm.base import (
 from ii_agent.llm.message_history import MessageHistory
 from ii_agent.prompts.system_prompt import SystemPromptBuilder
 from ii_agent.tools.base import ToolImplOutput, LLMTool
-from ii_agent.tools.utils import encode_image
-from ii_agent.db.manager import Events
+from ii_agent.tools.clients.http_sessions import run_with_http_sessions
+from ii_agent.db.async_manager import AsyncEvents, AsyncSessions
 from ii_agent.tools import AgentToolManager
 from ii_agent.utils.constants import COMPLETE_MESSAGE
+from ii_agent.utils.image_prep import image_spec_for, is_image_path, prepare_image
 from ii_agent.utils.workspace_manager import WorkspaceManager
 
 TOOL_RESULT_INTERRUPT_MESSAGE = "Tool execution interrupted by user."
@@ -31,6 +42,8 @@ AGENT_INTERRUPT_FAKE_MODEL_RSP = (
     "Agent interrupted by user. You can resume by providing a new instruction."
 )
 
+tracer = get_tracer()
+
 
 class FunctionCallAgent(BaseAgent):
     name = "general_agent"
@@ -50,7 +63,6 @@ try breaking down the task into smaller steps. After call this tool to update or
         },
         "required": ["instruction"],
     }
-    websocket: Optional[WebSocket]
 
     def __init__(
         self,
@@ -63,8 +75,11 @@ try breaking down the task into smaller steps. After call this tool to update or
         logger_for_agent_logs: logging.Logger,
         max_output_tokens_per_turn: int = 8192,
         max_turns: int = 200,
-        websocket: Optional[WebSocket] = None,
+        event_stream: Optional[EventStream] = None,
         interactive_mode: bool = True,
+        metrics: Optional[SessionMetrics] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        blob_store: Optional[BlobStore] = None,
     ):
         """Initialize the agent.
 
@@ -76,10 +91,15 @@ try breaking down the task into smaller steps. After call this tool to update or
             logger_for_agent_logs: Logger for agent logs
             max_output_tokens_per_turn: Maximum tokens per turn
             max_turns: Maximum number of turns
-            websocket: Optional WebSocket for real-time communication
+            event_stream: Optional stream numbering events and sending them to
+                the connections of the session
             session_id: UUID of the session this agent belongs to
             interactive_mode: Whether to use interactive mode
             init_history: Optional initial history to use
+            metrics: Optional session metrics to aggregate usage into
+            checkpoint_store: Optional store to checkpoint every completed turn in
+            blob_store: Optional store images in events are moved to, so the
+                events carry a reference instead of the base64 data
         """
         super().__init__()
         self.workspace_manager = workspace_manager
@@ -98,39 +118,65 @@ try breaking down the task into smaller steps. After call this tool to update or
         self.interrupted = False
         self.history = init_history
         self.session_id = workspace_manager.session_id
+        self.current_turn = 0
+        self.metrics = metrics or SessionMetrics(str(self.session_id))
+        self._turn_metrics: Optional[TurnMetrics] = None
+        self.checkpoint_store = checkpoint_store
+        self.blob_store = blob_store
+        # Set when a run is cancelled only because the server is stopping, in
+        # which case its checkpoint stays in flight so it can be resumed
+        self._keep_checkpoint = False
 
         # Initialize database manager
         self.message_queue = message_queue
-        self.websocket = websocket
+        self.event_stream = event_stream
 
     async def _process_messages(self):
         try:
             while True:
                 try:
-                    message: RealtimeEvent = await self.message_queue.get()
-
-                    # Save all events to database if we have a session
-                    if self.session_id is not None:
-                        Events.save_event(self.session_id, message)
-                    else:
-                        self.logger_for_agent_logs.info(
-                            f"No session ID, skipping event: {message}"
+                    message, context = await get_traced(self.message_queue)
+                    # Trace the event in the run that produced it
+                    with use_context(context):
+                        if self.event_stream is not None:
+                            self.event_stream.assign_seq(message)
+                        # Store images once and keep them out of the event payloads;
+                        # decoding, hashing and writing them is done off the loop
+                        message.content = await asyncio.to_thread(
+                            externalize_images, message.content, self.blob_store
                         )
 
-                    # Only send to websocket if this is not an event from the client and websocket exists
-                    if (
-                        message.type != EventType.USER_MESSAGE
-                        and self.websocket is not None
-                    ):
-                        try:
-                            await self.websocket.send_json(message.model_dump())
-                        except Exception as e:
-                            # If websocket send fails, just log it and continue processing
-                            self.logger_for_agent_logs.warning(
-                                f"Failed to send message to websocket: {str(e)}"
+                        # Save all events to database if we have a session
+                        if self.session_id is not None:
+                            with tracer.span(
+                                "events.persist",
+                                session_id=str(self.session_id),
+                                turn_id=self.current_turn,
+                                event_type=message.type.value,
+                            ):
+                                await AsyncEvents.save_event(self.session_id, message)
+                            if message.type == EventType.METRICS_UPDATE:
+                                await self._save_metrics()
+                        else:
+                            self.logger_for_agent_logs.info(
+                                "No session ID, skipping event: %s",
+                                LazyLogValue(message.model_dump()),
                             )
-                            # Set websocket to None to prevent further attempts
-                            self.websocket = None
+
+                        # Only send to connections if this is not an event from the client.
+                        # Send failures are handled by the stream, which drops the
+                        # connection without affecting the run.
+                        if (
+                            message.type != EventType.USER_MESSAGE
+                            and self.event_stream is not None
+                        ):
+                            with tracer.span(
+                                "websocket.send",
+                                session_id=str(self.session_id),
+                                turn_id=self.current_turn,
+                                event_type=message.type.value,
+                            ):
+                                await self.event_stream.publish(message)
 
                     self.message_queue.task_done()
                 except asyncio.CancelledError:
@@ -166,8 +212,13 @@ try breaking down the task into smaller steps. After call this tool to update or
         instruction = tool_input["instruction"]
         files = tool_input["files"]
 
-        user_input_delimiter = "-" * 45 + " USER INPUT " + "-" * 45 + "\n" + instruction
-        self.logger_for_agent_logs.info(f"\n{user_input_delimiter}\n")
+        self.logger_for_agent_logs.info(
+            "\n%s USER INPUT %s\n%s\n",
+            "-" * 45,
+            "-" * 45,
+            LazyLogValue(instruction),
+            extra={"event": "user_input", "session_id": str(self.session_id)},
+        )
 
         # Add instruction to dialog before getting model response
         image_blocks = []
@@ -180,29 +231,30 @@ try breaking down the task into smaller steps. After call this tool to update or
                 self.logger_for_agent_logs.info(f"Attached file: {relative_path}")
 
             # Then process images for image blocks
-            for file in files:
-                ext = file.split(".")[-1]
-                if ext == "jpg":
-                    ext = "jpeg"
-                if ext in ["png", "gif", "jpeg", "webp"]:
-                    base64_image = encode_image(
-                        str(self.workspace_manager.workspace_path(file))
-                    )
-                    image_blocks.append(
-                        {
-                            "source": {
-                                "type": "base64",
-                                "media_type": f"image/{ext}",
-                                "data": base64_image,
-                            }
-                        }
-                    )
+            spec = image_spec_for(getattr(self.client, "api_type", None))
+            images = [
+                str(self.workspace_manager.workspace_path(file))
+                for file in files
+                if is_image_path(file)
+            ]
+            prepared = await asyncio.gather(
+                *(prepare_image(image, spec) for image in images)
+            )
+            image_blocks = [{"source": image.to_source()} for image in prepared]
 
         self.history.add_user_prompt(instruction, image_blocks)
         self.interrupted = False
+        await self._begin_checkpoint()
+
+        return await self._run_turns(self.max_turns)
 
-        remaining_turns = self.max_turns
+    async def _run_turns(self, max_turns: int) -> ToolImplOutput:
+        """Run the agent loop for at most max_turns turns."""
+        remaining_turns = max_turns
         while remaining_turns > 0:
+            self.current_turn += 1
+            bind_attributes(turn_id=self.current_turn)
+            self._turn_metrics = self.metrics.start_turn(self.current_turn)
             self.history.truncate()
             remaining_turns -= 1
 
@@ -223,17 +275,7 @@ try breaking down the task into smaller steps. After call this tool to update or
             self.logger_for_agent_logs.info(
                 f"(Current token count: {self.history.count_tokens()})\n"
             )
-            loop = asyncio.get_event_loop()
-            model_response, _ = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.generate,
-                    messages=self.history.get_messages_for_llm(),
-                    max_tokens=self.max_output_tokens,
-                    tools=all_tool_params,
-                    system_prompt=self.system_prompt_builder.get_system_prompt(),
-                ),
-            )
+            model_response, _ = await self._generate(all_tool_params)
 
             if len(model_response) == 0:
                 model_response = [TextResult(text=COMPLETE_MESSAGE)]
@@ -261,7 +303,9 @@ try breaking down the task into smaller steps. After call this tool to update or
                 else:
                     text = text_result.text
                 self.logger_for_agent_logs.info(
-                    f"Top-level agent planning next step: {text}\n",
+                    "Top-level agent planning next step: %s\n",
+                    LazyLogValue(text),
+                    extra={"event": "agent_thinking"},
                 )
                 self.message_queue.put_nowait(
                     RealtimeEvent(
@@ -312,9 +356,16 @@ try breaking down the task into smaller steps. After call this tool to update or
                     tool_output=TOOL_RESULT_INTERRUPT_MESSAGE,
                     tool_result_message=TOOL_RESULT_INTERRUPT_MESSAGE,
                 )
+            tool_started = time.perf_counter()
             tool_result = await self.tool_manager.run_tool(tool_call, self.history)
+            self.metrics.record_tool_call(
+                tool_call.tool_name,
+                (time.perf_counter() - tool_started) * 1000,
+                turn=self._turn_metrics,
+            )
 
             self.add_tool_call_result(tool_call, tool_result)
+            self._publish_metrics()
             if self.tool_manager.should_stop():
                 # Add a fake model response, so the next turn is the user's
                 # turn in case they want to resume
@@ -323,6 +374,7 @@ try breaking down the task into smaller steps. After call this tool to update or
                     tool_output=self.tool_manager.get_final_answer(),
                     tool_result_message="Task completed",
                 )
+            await self._save_checkpoint()
 
         agent_answer = "Agent did not complete after max turns"
         self.message_queue.put_nowait(
@@ -332,6 +384,118 @@ try breaking down the task into smaller steps. After call this tool to update or
             tool_output=agent_answer, tool_result_message=agent_answer
         )
 
+    async def _generate(self, all_tool_params: list) -> tuple[list, dict[str, Any]]:
+        """Call the LLM in a worker thread, recording an llm.generate span."""
+        messages = self.history.get_messages_for_llm()
+        system_prompt = self.system_prompt_builder.get_system_prompt()
+        started_in_thread_ns = 0
+
+        def generate():
+            nonlocal started_in_thread_ns
+            started_in_thread_ns = time.time_ns()
+            return self.client.generate(
+                messages=messages,
+                max_tokens=self.max_output_tokens,
+                tools=all_tool_params,
+                system_prompt=system_prompt,
+            )
+
+        loop = asyncio.get_event_loop()
+        with tracer.span(
+            "llm.generate", model=getattr(self.client, "model_name", None)
+        ) as span:
+            model_response, metadata = await loop.run_in_executor(None, generate)
+            finished_ns = time.time_ns()
+            request_ms = (finished_ns - started_in_thread_ns) / 1e6
+            span.set_attributes(
+                **{
+                    "llm.executor_wait_ms": (started_in_thread_ns - span.start_time_ns)
+                    / 1e6,
+                    "llm.request_ms": request_ms,
+                    # Non-streaming clients receive the first token with the
+                    # full response, so TTFT falls back to the request time.
+                    "llm.time_to_first_token_ms": metadata.get(
+                        "time_to_first_token_ms", request_ms
+                    ),
+                    "llm.input_tokens": metadata.get("input_tokens"),
+                    "llm.output_tokens": metadata.get("output_tokens"),
+                    "llm.cache_read_input_tokens": metadata.get(
+                        "cache_read_input_tokens"
+                    ),
+                    "llm.cache_creation_input_tokens": metadata.get(
+                        "cache_creation_input_tokens"
+                    ),
+                }
+            )
+        self.metrics.record_llm_call(
+            metadata,
+            request_ms,
+            getattr(self.client, "model_name", None),
+            turn=self._turn_metrics,
+        )
+        return model_response, metadata
+
+    async def _save_metrics(self):
+        try:
+            await AsyncSessions.update_session_metrics(
+                self.session_id, self.metrics.to_dict()
+            )
+        except Exception as e:
+            self.logger_for_agent_logs.warning(f"Failed to save metrics: {e}")
+
+    def _publish_metrics(self):
+        """Stream the session metrics to the client.
+
+        The message processor persists them when it handles the event, so
+        the agent loop never waits on the database.
+        """
+        self.message_queue.put_nowait(
+            RealtimeEvent(
+                type=EventType.METRICS_UPDATE,
+                content={
+                    "session": self.metrics.summary(),
+                    "turn": self._turn_metrics.to_dict()
+                    if self._turn_metrics
+                    else None,
+                },
+            )
+        )
+
+    async def _begin_checkpoint(self):
+        """Record the start of a run, including the new user prompt."""
+        if self.checkpoint_store is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.checkpoint_store.begin_run,
+                self.history,
+                self.tool_manager.get_state(),
+            )
+        except Exception as e:
+            self.logger_for_agent_logs.warning(f"Failed to save checkpoint: {e}")
+
+    async def _save_checkpoint(self):
+        """Checkpoint the turn that just completed."""
+        if self.checkpoint_store is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.checkpoint_store.save_turn,
+                self.current_turn,
+                self.history,
+                self.tool_manager.get_state(),
+            )
+        except Exception as e:
+            self.logger_for_agent_logs.warning(f"Failed to save checkpoint: {e}")
+
+    def _finish_checkpoint(self, status: str):
+        if self.checkpoint_store is None or self._keep_checkpoint:
+            return
+        try:
+            self.checkpoint_store.finish_run(status)
+        except Exception as e:
+            self.logger_for_agent_logs.warning(f"Failed to finish checkpoint: {e}")
+
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
         return f"Agent started with instruction: {tool_input['instruction']}"
 
@@ -365,7 +529,69 @@ try breaking down the task into smaller steps. After call this tool to update or
         }
         if orientation_instruction:
             tool_input["orientation_instruction"] = orientation_instruction
-        return await self.run_async(tool_input, self.history)
+
+        self.current_turn = 0
+        self._keep_checkpoint = False
+        self.metrics.start_run()
+        bind_attributes(session_id=str(self.session_id))
+        status = RUN_FAILED
+        try:
+            with tracer.span("agent.run", resume=resume):
+                result = await self.run_async(tool_input, self.history)
+            status = RUN_COMPLETED
+            return result
+        finally:
+            self._finish_checkpoint(status)
+            self._publish_metrics()
+
+    def has_resumable_run(self) -> bool:
+        """Whether the checkpoint store holds a run that was still in flight."""
+        return (
+            self.checkpoint_store is not None
+            and self.checkpoint_store.load_in_flight() is not None
+        )
+
+    async def resume_run_async(self) -> Optional[str]:
+        """Continue an in-flight run from its last checkpoint.
+
+        The history and tool state are restored from the checkpoint and the
+        loop picks up at the turn after the last completed one.
+
+        Returns:
+            The result from the agent execution, or None if there was no
+            in-flight run to resume.
+        """
+        if self.checkpoint_store is None:
+            return None
+        checkpoint = self.checkpoint_store.load_in_flight()
+        if checkpoint is None:
+            return None
+
+        self.tool_manager.reset()
+        self.checkpoint_store.restore_history(checkpoint, self.history)
+        self.tool_manager.restore_state(checkpoint.tool_state)
+        self.interrupted = False
+        self._keep_checkpoint = False
+        self.current_turn = checkpoint.turn
+        self.logger_for_agent_logs.info(
+            f"Resuming run {checkpoint.run_id} after turn {checkpoint.turn}"
+        )
+
+        self.metrics.start_run()
+        bind_attributes(session_id=str(self.session_id))
+        status = RUN_FAILED
+        try:
+            with tracer.span(
+                "agent.run", resume=True, resumed_from_turn=checkpoint.turn
+            ):
+                result = await self._run_turns(
+                    max(self.max_turns - checkpoint.turn, 1)
+                )
+            status = RUN_COMPLETED
+            return result.tool_output
+        finally:
+            self._finish_checkpoint(status)
+            self._publish_metrics()
 
     def run_agent(
         self,
@@ -386,7 +612,7 @@ try breaking down the task into smaller steps. After call this tool to update or
         Returns:
             The result from the agent execution.
         """
-        return asyncio.run(
+        return run_with_http_sessions(
             self.run_agent_async(instruction, files, resume, orientation_instruction)
         )
 
@@ -397,9 +623,15 @@ try breaking down the task into smaller steps. After call this tool to update or
         self.history.clear()
         self.interrupted = False
 
-    def cancel(self):
-        """Cancel the agent execution."""
+    def cancel(self, keep_checkpoint: bool = False):
+        """Cancel the agent execution.
+
+        Args:
+            keep_checkpoint: Leave the run's checkpoint in flight so the run
+                can be resumed later, e.g. when the client reconnects.
+        """
         self.interrupted = True
+        self._keep_checkpoint = keep_checkpoint
         self.logger_for_agent_logs.info("Agent cancellation requested")
 
     def add_tool_call_result(self, tool_call: ToolCallParameters, tool_result: str):
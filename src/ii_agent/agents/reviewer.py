@@ -5,10 +5,12 @@ from typing import Any, List, Optional, Tuple
 
 from fastapi import WebSocket
 from ii_agent.agents.base import BaseAgent
+from ii_agent.core.metrics import SessionMetrics, TurnMetrics
 from ii_agent.llm.base import LLMClient, TextResult, ToolCallParameters
 from ii_agent.llm.context_manager.base import ContextManager
 from ii_agent.llm.message_history import MessageHistory
 from ii_agent.tools.base import ToolImplOutput, LLMTool
+from ii_agent.tools.clients.http_sessions import run_with_http_sessions
 from ii_agent.tools import AgentToolManager
 
 
@@ -52,6 +54,7 @@ This agent conducts thorough reviews with emphasis on:
         max_turns: int = 200,
         websocket: Optional[WebSocket] = None,
         interactive_mode: bool = True,
+        metrics: Optional[SessionMetrics] = None,
     ):
         """Initialize the reviewer agent."""
         super().__init__()
@@ -75,6 +78,10 @@ This agent conducts thorough reviews with emphasis on:
         self.message_queue = message_queue
         self.websocket = websocket
 
+        # Usage is aggregated into the session metrics shared with the main agent
+        self.metrics = metrics or SessionMetrics()
+        self._turn_metrics: Optional[TurnMetrics] = None
+
         # Cache for tool parameters to avoid repeated validation
         self._cached_tool_params = None
 
@@ -98,6 +105,12 @@ This agent conducts thorough reviews with emphasis on:
 
         elapsed = time.time() - start_time
         self.logger_for_agent_logs.debug(f"LLM generation took {elapsed:.2f}s")
+        self.metrics.record_llm_call(
+            metadata,
+            elapsed * 1000,
+            getattr(self.client, "model_name", None),
+            turn=self._turn_metrics,
+        )
 
         return model_response, metadata
 
@@ -154,6 +167,9 @@ Now your turn to review the general agent's work.
         remaining_turns = self.max_turns
         while remaining_turns > 0:
             remaining_turns -= 1
+            self._turn_metrics = self.metrics.start_turn(
+                self.max_turns - remaining_turns, agent=self.name
+            )
 
             delimiter = "-" * 45 + " REVIEWER TURN " + "-" * 45
             self.logger_for_agent_logs.info(f"\n{delimiter}\n")
@@ -224,7 +240,13 @@ Now your turn to review the general agent's work.
                         tool_result_message="Reviewer interrupted during tool execution",
                     )
 
+                tool_started = time.time()
                 tool_result = await self.tool_manager.run_tool(tool_call, self.history)
+                self.metrics.record_tool_call(
+                    tool_call.tool_name,
+                    (time.time() - tool_started) * 1000,
+                    turn=self._turn_metrics,
+                )
                 self.add_tool_call_result(tool_call, tool_result)
                 if tool_call.tool_name == "return_control_to_general_agent":
                     summarize_review = "Now based on your review, please rewrite detailed feedback to the general agent."
@@ -340,13 +362,13 @@ Now your turn to review the general agent's work.
 
             with concurrent.futures.ThreadPoolExecutor() as executor:
                 future = executor.submit(
-                    asyncio.run,
+                    run_with_http_sessions,
                     self.run_agent_async(task, result, workspace_dir, resume),
                 )
                 return future.result()
         except RuntimeError:
-            # No event loop running, safe to use asyncio.run
-            return asyncio.run(
+            # No event loop running, safe to run one
+            return run_with_http_sessions(
                 self.run_agent_async(task, result, workspace_dir, resume)
             )
 
@@ -0,0 +1,288 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional
+
+DEFAULT_MAX_FIELD_LENGTH = 4_000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+REDACTED = "[REDACTED]"
+
+# Attributes every LogRecord carries; anything else was passed through `extra`.
+_RESERVED_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime"}
+
+# One sink per log file, shared by the agent loggers of every session
+_sinks: dict[str, "_LogSink"] = {}
+_sinks_lock = threading.Lock()
+
+
+def cap_text(text: str, max_length: int = DEFAULT_MAX_FIELD_LENGTH) -> str:
+    """Truncate a string to max_length characters, noting how much was dropped."""
+    if max_length <= 0 or len(text) <= max_length:
+        return text
+    return f"{text[:max_length]}...[truncated {len(text) - max_length} chars]"
+
+
+def to_loggable(value: Any, max_length: int = DEFAULT_MAX_FIELD_LENGTH) -> Any:
+    """Build a JSON-friendly, size-capped view of a value.
+
+    Image blocks are replaced by a placeholder while walking the structure, so
+    the original object is never copied or mutated.
+    """
+    if isinstance(value, str):
+        return cap_text(value, max_length)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        if value.get("type") == "image":
+            source = value.get("source")
+            media_type = (
+                source.get("media_type", "image/unknown")
+                if isinstance(source, dict)
+                else "image/unknown"
+            )
+            return {"type": "image", "media_type": media_type, "source": REDACTED}
+        return {str(k): to_loggable(v, max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_loggable(item, max_length) for item in value]
+    return cap_text(str(value), max_length)
+
+
+class LazyLogValue:
+    """Defers rendering of a (possibly huge) value until a handler formats it.
+
+    Pass instances as %-style logging arguments; the redacted, capped string is
+    only built on the listener thread, and only if a handler emits the record.
+    Containers may still be changed by their owner before that, so they are
+    snapshotted up front as their capped, redacted view.
+    """
+
+    __slots__ = ("value", "max_length")
+
+    def __init__(self, value: Any, max_length: int = DEFAULT_MAX_FIELD_LENGTH):
+        if isinstance(value, (dict, list, tuple, set)):
+            value = to_loggable(
+                list(value) if isinstance(value, set) else value, max_length
+            )
+        self.value = value
+        self.max_length = max_length
+
+    def __str__(self) -> str:
+        loggable = to_loggable(self.value, self.max_length)
+        if isinstance(loggable, str):
+            return loggable
+        return cap_text(
+            json.dumps(loggable, ensure_ascii=False, default=str), self.max_length
+        )
+
+    __repr__ = __str__
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Formats log records as one JSON object per line with capped fields."""
+
+    def __init__(self, max_field_length: int = DEFAULT_MAX_FIELD_LENGTH):
+        super().__init__()
+        self.max_field_length = max_field_length
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": cap_text(record.getMessage(), self.max_field_length),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = to_loggable(value, self.max_field_length)
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class CappedTextFormatter(logging.Formatter):
+    """Plain-text formatter that caps the rendered message length."""
+
+    def __init__(self, max_field_length: int = DEFAULT_MAX_FIELD_LENGTH):
+        super().__init__("%(message)s")
+        self.max_field_length = max_field_length
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        return cap_text(super().formatMessage(record), self.max_field_length)
+
+
+class _FlushRequest:
+    """Marker put on the record queue; set once every earlier record is written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _AgentLogListener(QueueListener):
+    def handle(self, record) -> None:
+        if isinstance(record, _FlushRequest):
+            record.done.set()
+            return
+        super().handle(record)
+
+
+class _LogSink:
+    """Listener thread and handlers writing the records of one log file.
+
+    Sessions share the sink of a file, so a single handler rotates it and a
+    single thread writes it, however many sessions are open.
+    """
+
+    def __init__(
+        self,
+        log_path: str,
+        to_stdout: bool,
+        max_field_length: int,
+        max_bytes: int,
+        backup_count: int,
+    ):
+        file_handler = RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonLogFormatter(max_field_length))
+        self.handlers: list[logging.Handler] = [file_handler]
+        if to_stdout:
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(CappedTextFormatter(max_field_length))
+            self.handlers.append(stream_handler)
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.listener = _AgentLogListener(
+            self.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self.loggers = 0
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until the records queued so far are written."""
+        request = _FlushRequest()
+        self.queue.put(request)
+        request.done.wait(timeout)
+
+    def close(self) -> None:
+        """Write the queued records, stop the thread and close the handlers."""
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that hands the raw record to the listener thread.
+
+    The stock implementation formats the message on the calling thread, which
+    is exactly the work we want to keep off the event loop.
+    """
+
+    def __init__(self, sink: _LogSink):
+        super().__init__(sink.queue)
+        self.sink = sink
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def create_agent_logger(
+    name: str,
+    log_path: str,
+    to_stdout: bool = True,
+    max_field_length: int = DEFAULT_MAX_FIELD_LENGTH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+) -> logging.Logger:
+    """Create a logger whose records are written by a background thread.
+
+    The returned logger is not registered with the logging module, so it is
+    garbage collected once its owner drops it. Call `close_agent_logger` when
+    the owner goes away to flush its records.
+
+    Loggers writing to the same file share one handler and one writer thread,
+    created by the first of them with its settings and closed with the last.
+
+    Args:
+        name: Logger name, included in every structured record
+        log_path: Path of the rotating JSON-lines log file
+        to_stdout: Whether to also echo plain-text records to stderr
+        max_field_length: Maximum characters kept per logged field
+        max_bytes: Size at which the log file is rotated
+        backup_count: Number of rotated files to keep
+
+    Returns:
+        A logger that only enqueues records on the calling thread
+    """
+    log_path = os.path.abspath(log_path)
+    with _sinks_lock:
+        sink = _sinks.get(log_path)
+        if sink is None:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            sink = _LogSink(
+                log_path, to_stdout, max_field_length, max_bytes, backup_count
+            )
+            _sinks[log_path] = sink
+        sink.loggers += 1
+
+    agent_logger = logging.Logger(name, logging.DEBUG)
+    agent_logger.propagate = False
+    agent_logger.addHandler(DeferredQueueHandler(sink))
+    return agent_logger
+
+
+def close_agent_logger(
+    agent_logger: Optional[logging.Logger], wait: bool = True
+) -> None:
+    """Flush the pending records of an agent logger and detach it.
+
+    Args:
+        agent_logger: The logger to close, if any
+        wait: Whether to wait for the records to be written. Pass False on
+            the event loop; the records are then flushed, and the writer
+            stopped if this was its last logger, in a background thread.
+    """
+    if agent_logger is None:
+        return
+    for handler in list(agent_logger.handlers):
+        agent_logger.removeHandler(handler)
+        handler.close()
+        if isinstance(handler, DeferredQueueHandler):
+            if wait:
+                _release_sink(handler.sink)
+            else:
+                # Not a daemon, so the process writes the records before exiting
+                threading.Thread(
+                    target=_release_sink,
+                    args=(handler.sink,),
+                    name="agent-log-release",
+                ).start()
+
+
+def _release_sink(sink: _LogSink) -> None:
+    with _sinks_lock:
+        sink.loggers -= 1
+        last = sink.loggers <= 0
+        if last:
+            for path, shared in list(_sinks.items()):
+                if shared is sink:
+                    del _sinks[path]
+    if last:
+        sink.close()
+    else:
+        sink.flush()
+
+
+@atexit.register
+def _close_all_agent_loggers() -> None:
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
@@ -0,0 +1,232 @@
+import base64
+import json
+import logging
+import pickle
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from ii_agent.core.storage.files import FileStore
+from ii_agent.core.storage.locations import get_conversation_checkpoint_dir
+from ii_agent.llm.base import GeneralContentBlock
+from ii_agent.llm.message_history import MessageHistory
+
+logger = logging.getLogger(__name__)
+
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+
+# Fold the deltas into a fresh snapshot after this many turns, so resuming
+# never has to replay an unbounded number of files.
+DEFAULT_SNAPSHOT_EVERY = 50
+
+
+@dataclass
+class RunCheckpoint:
+    """Manifest of the last durable state of an agent run.
+
+    The history is stored as a full snapshot plus one delta file per completed
+    turn holding only the turns appended since the previous checkpoint. The
+    manifest is written last, so it only ever references files that exist.
+
+    Attributes:
+        run_id: Identifier of the run
+        status: RUN_RUNNING while the run is in flight, RUN_COMPLETED or
+            RUN_FAILED once it ended
+        turn: Number of agent turns completed so far
+        snapshot_id: Suffix of the snapshot file the deltas apply to
+        delta_count: Number of delta files written on top of the snapshot
+        history_length: Number of history turns covered by snapshot and deltas
+        history_revision: MessageHistory.revision when the history was saved
+        last_user_prompt_index: Index of the user prompt that started the run
+        tool_state: Tool manager state, see AgentToolManager.get_state
+    """
+
+    run_id: str
+    status: str = RUN_RUNNING
+    turn: int = 0
+    snapshot_id: int = 0
+    delta_count: int = 0
+    history_length: int = 0
+    history_revision: int = -1
+    last_user_prompt_index: Optional[int] = None
+    tool_state: dict[str, Any] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def in_flight(self) -> bool:
+        return self.status == RUN_RUNNING
+
+
+def _encode(message_lists: list[list[GeneralContentBlock]]) -> str:
+    return base64.b64encode(pickle.dumps(message_lists)).decode("utf-8")
+
+
+def _decode(encoded: str) -> list[list[GeneralContentBlock]]:
+    return pickle.loads(base64.b64decode(encoded))
+
+
+class CheckpointStore:
+    """Persists per-turn checkpoints of an agent run in the file store."""
+
+    def __init__(
+        self,
+        file_store: FileStore,
+        session_id: str,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+    ):
+        self.file_store = file_store
+        self.session_id = str(session_id)
+        self.snapshot_every = snapshot_every
+        self.base_dir = get_conversation_checkpoint_dir(self.session_id)
+        self._checkpoint: Optional[RunCheckpoint] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return f"{self.base_dir}/run.json"
+
+    def _snapshot_path(self, snapshot_id: int) -> str:
+        return f"{self.base_dir}/snapshot_{snapshot_id:06d}.pkl"
+
+    def _delta_path(self, snapshot_id: int, index: int) -> str:
+        return f"{self.base_dir}/delta_{snapshot_id:06d}_{index:06d}.pkl"
+
+    @property
+    def agent_config_path(self) -> str:
+        return f"{self.base_dir}/agent.json"
+
+    def save_agent_config(self, agent_config: dict[str, Any]) -> None:
+        """Remember how the session's agent was initialized.
+
+        This lets a run be resumed without a client, e.g. at server startup.
+        """
+        self.file_store.write(self.agent_config_path, json.dumps(agent_config))
+
+    def load_agent_config(self) -> Optional[dict[str, Any]]:
+        try:
+            return json.loads(self.file_store.read(self.agent_config_path))
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> Optional[RunCheckpoint]:
+        """Load the manifest of the latest run, if any."""
+        try:
+            data = json.loads(self.file_store.read(self.manifest_path))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint for {self.session_id}: {e}")
+            return None
+        fields = RunCheckpoint.__dataclass_fields__
+        return RunCheckpoint(**{k: v for k, v in data.items() if k in fields})
+
+    def load_in_flight(self) -> Optional[RunCheckpoint]:
+        """Load the latest run if it was still in flight when it was saved."""
+        checkpoint = self.load()
+        return checkpoint if checkpoint and checkpoint.in_flight else None
+
+    def begin_run(
+        self, history: MessageHistory, tool_state: dict[str, Any]
+    ) -> RunCheckpoint:
+        """Record the start of a run with a full snapshot of the history."""
+        previous = self.load()
+        checkpoint = RunCheckpoint(
+            run_id=uuid.uuid4().hex,
+            snapshot_id=previous.snapshot_id + 1 if previous else 0,
+            tool_state=tool_state,
+        )
+        self._write_snapshot(checkpoint, history)
+        self._commit(checkpoint, previous)
+        return checkpoint
+
+    def save_turn(
+        self, turn: int, history: MessageHistory, tool_state: dict[str, Any]
+    ) -> RunCheckpoint:
+        """Checkpoint a completed turn.
+
+        Only the turns appended since the previous checkpoint are written,
+        unless the history was rewritten (e.g. by truncation) in between or
+        enough deltas piled up, in which case a new snapshot is taken.
+        """
+        previous = self._checkpoint or self.load()
+        if previous is None:
+            raise RuntimeError("save_turn called before begin_run")
+
+        checkpoint = RunCheckpoint(**asdict(previous))
+        checkpoint.turn = turn
+        checkpoint.tool_state = tool_state
+        checkpoint.updated_at = time.time()
+
+        messages = history.get_messages_for_llm()
+        rewritten = (
+            history.revision != previous.history_revision
+            or len(messages) < previous.history_length
+        )
+        if rewritten or previous.delta_count >= self.snapshot_every:
+            checkpoint.snapshot_id += 1
+            self._write_snapshot(checkpoint, history)
+        else:
+            self.file_store.write(
+                self._delta_path(checkpoint.snapshot_id, checkpoint.delta_count),
+                _encode(messages[previous.history_length :]),
+            )
+            checkpoint.delta_count += 1
+            checkpoint.history_length = len(messages)
+        self._commit(checkpoint, previous)
+        return checkpoint
+
+    def finish_run(self, status: str = RUN_COMPLETED) -> None:
+        """Mark the latest run as ended and drop its history files."""
+        checkpoint = self._checkpoint or self.load()
+        if checkpoint is None or not checkpoint.in_flight:
+            return
+        finished = RunCheckpoint(**asdict(checkpoint))
+        finished.status = status
+        finished.updated_at = time.time()
+        self._write_manifest(finished)
+        self._delete_history_files(checkpoint)
+        self._checkpoint = finished
+
+    def restore_history(self, checkpoint: RunCheckpoint, history: MessageHistory):
+        """Rebuild the history saved by a checkpoint into history."""
+        message_lists = _decode(
+            self.file_store.read(self._snapshot_path(checkpoint.snapshot_id))
+        )
+        for index in range(checkpoint.delta_count):
+            message_lists.extend(
+                _decode(
+                    self.file_store.read(
+                        self._delta_path(checkpoint.snapshot_id, index)
+                    )
+                )
+            )
+        history.restore_message_list(message_lists, checkpoint.last_user_prompt_index)
+
+    def _write_snapshot(self, checkpoint: RunCheckpoint, history: MessageHistory):
+        messages = history.get_messages_for_llm()
+        self.file_store.write(
+            self._snapshot_path(checkpoint.snapshot_id), _encode(messages)
+        )
+        checkpoint.delta_count = 0
+        checkpoint.history_length = len(messages)
+        checkpoint.history_revision = history.revision
+        checkpoint.last_user_prompt_index = history.last_user_prompt_index
+
+    def _write_manifest(self, checkpoint: RunCheckpoint):
+        self.file_store.write(self.manifest_path, json.dumps(asdict(checkpoint)))
+
+    def _commit(self, checkpoint: RunCheckpoint, previous: Optional[RunCheckpoint]):
+        self._write_manifest(checkpoint)
+        self._checkpoint = checkpoint
+        # Files of the superseded snapshot are only removed once the new
+        # manifest no longer points at them
+        if previous and previous.snapshot_id != checkpoint.snapshot_id:
+            self._delete_history_files(previous)
+
+    def _delete_history_files(self, checkpoint: RunCheckpoint):
+        self.file_store.delete(self._snapshot_path(checkpoint.snapshot_id))
+        for index in range(checkpoint.delta_count):
+            self.file_store.delete(self._delta_path(checkpoint.snapshot_id, index))
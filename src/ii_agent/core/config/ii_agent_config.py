@@ -31,10 +31,75 @@ class IIAgentConfig(BaseSettings):
     host_workspace_path: str = Field(default="~/.ii_agent/workspace")
     use_container_workspace: WorkSpaceMode = Field(default=WorkSpaceMode.DOCKER)
     minimize_stdout_logs: bool = False
+    agent_log_max_field_length: int = 4_000
+    agent_log_max_bytes: int = 50 * 1024 * 1024
+    agent_log_backup_count: int = 5
+    trace_exporter: str = Field(default="none")
+    resume_runs_on_startup: bool = True
+    # Horizontal scale-out: "memory" for a single worker, "database" to share
+    # session ownership between workers through the session database
+    session_registry: str = Field(default="memory")
+    worker_id: Optional[str] = None
+    # Base URL clients use to reach this worker, e.g. wss://worker-1.example.com
+    worker_url: Optional[str] = None
+    session_lease_seconds: int = 30
     max_output_tokens_per_turn: int = MAX_OUTPUT_TOKENS_PER_TURN
     max_turns: int = MAX_TURNS
     token_budget: int = TOKEN_BUDGET
     database_url: Optional[str] = None
+    # Connection pool of the session database; SQLite also uses the busy
+    # timeout to wait for locks held by other connections
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_recycle: int = 1800
+    database_busy_timeout_ms: int = 5000
+    # Strings in event payloads longer than this many bytes are stored
+    # compressed outside the event table; 0 keeps everything inline
+    event_payload_offload_bytes: int = 16 * 1024
+    # Retention of sessions, applied by a background maintenance pass every
+    # maintenance_interval_seconds; each policy is disabled while set to 0
+    maintenance_interval_seconds: int = 3600
+    archive_sessions_after_days: int = 0
+    delete_archived_sessions_after_days: int = 0
+    purge_orphaned_workspaces_after_hours: int = 0
+    # Sessions a pass handles per policy, and the pause between them, so
+    # maintenance never competes with live traffic
+    maintenance_batch_size: int = 20
+    maintenance_pause_seconds: float = 0.5
+    # Cache of webpage visits and web searches shared by all sessions; 0
+    # bytes disables it
+    http_cache_max_bytes: int = 256 * 1024 * 1024
+    http_cache_visit_ttl_seconds: int = 6 * 3600
+    http_cache_search_ttl_seconds: int = 3600
+    # Keep-alive connection pools of the search and visit clients, one per
+    # host
+    http_pool_limit: int = 100
+    http_pool_limit_per_host: int = 10
+    http_keepalive_seconds: float = 30.0
+    http_dns_cache_seconds: int = 300
+    # Query every configured search provider concurrently and merge their
+    # results, waiting at most the deadline for enough of them
+    web_search_fan_out: bool = False
+    web_search_fan_out_deadline_seconds: float = 8.0
+    # Processes running CPU-bound tool work such as parsing pages; 0 runs
+    # it on threads instead
+    tool_worker_processes: int = 2
+    # Webpages fetched directly are read up to this size; larger HTML pages
+    # are cut off, larger PDFs rejected
+    visit_max_html_bytes: int = 2 * 1024 * 1024
+    visit_max_pdf_bytes: int = 20 * 1024 * 1024
+    # Text extracted from inspected files and PDFs, keyed by their content;
+    # 0 bytes disables the cache
+    conversion_cache_max_bytes: int = 256 * 1024 * 1024
+    conversion_cache_ttl_seconds: int = 7 * 24 * 3600
+    # Scenes of a long video generated at once when they do not continue
+    # from each other
+    long_video_parallel_scenes: int = 3
+    # Images sent to the model are resized to the limits of its provider and
+    # re-encoded with this quality unless they must stay lossless; larger
+    # sources are rejected
+    image_quality: int = 85
+    image_max_source_bytes: int = 20 * 1024 * 1024
 
     @model_validator(mode="after")
     def set_database_url(self) -> "IIAgentConfig":
@@ -60,6 +125,11 @@ class IIAgentConfig(BaseSettings):
     def logs_path(self) -> str:
         return os.path.join(self.file_store_path, "logs")
 
+    @computed_field
+    @property
+    def traces_path(self) -> str:
+        return os.path.join(self.file_store_path, "traces", "spans.otlp.jsonl")
+
     @property
     def code_server_port(self) -> int:
         return int(os.getenv("CODE_SERVER_PORT", 9000))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, Optional
 import enum
 
 
@@ -22,8 +22,14 @@ class EventType(str, enum.Enum):
     FILE_EDIT = "file_edit"
     USER_MESSAGE = "user_message"
     PROMPT_GENERATED = "prompt_generated"
+    METRICS_UPDATE = "metrics_update"
+    SESSION_REDIRECT = "session_redirect"
+    MEDIA_JOB = "media_job"
 
 
 class RealtimeEvent(BaseModel):
     type: EventType
     content: dict[str, Any]
+    # Monotonic per-session sequence number, set once the event is persisted.
+    # Connection-level replies that are never stored carry None.
+    seq: Optional[int] = None
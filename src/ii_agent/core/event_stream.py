@@ -0,0 +1,335 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+from ii_agent.core.event import EventType, RealtimeEvent
+
+logger = logging.getLogger(__name__)
+
+SendFn = Callable[[str], Awaitable[None]]
+LoadMissedFn = Callable[[int], list[RealtimeEvent]]
+
+# Outbound bytes a connection may fall behind by before it stops buffering
+# and catches up from the event store instead
+DEFAULT_MAX_BUFFER_BYTES = 8 * 1024 * 1024
+# How long a burst of events may accumulate before it is sent as one frame
+DEFAULT_FLUSH_INTERVAL = 0.05
+# Events that only carry the latest state, so a newer one makes an older
+# one still waiting in the buffer obsolete
+SUPERSEDED_EVENT_TYPES = frozenset({EventType.BROWSER_USE, EventType.METRICS_UPDATE})
+
+
+def encode_event(event: RealtimeEvent) -> str:
+    """Encode an event the way it is sent on the websocket."""
+    return json.dumps(event.model_dump(), separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_frame(frames: list[str]) -> str:
+    """Join encoded events into one websocket frame.
+
+    A single event is sent as a JSON object, several as a JSON array.
+    """
+    return frames[0] if len(frames) == 1 else "[" + ",".join(frames) + "]"
+
+
+class EventSubscriber:
+    """A connection receiving the events of a session.
+
+    Published events are only appended to the subscriber's outbound buffer; a
+    sender task of its own drains the buffer, sending every burst of events
+    as a single frame. A slow connection therefore never holds up the
+    publisher. When its buffer grows beyond the byte budget, the buffered
+    events are discarded and the sender catches up from the event store at
+    the pace of the connection.
+    """
+
+    def __init__(
+        self,
+        send: SendFn,
+        last_seq: int = 0,
+        load_missed: Optional[LoadMissedFn] = None,
+        max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        """Initialize the subscriber.
+
+        Args:
+            send: Coroutine function sending one text frame to the client
+            last_seq: Highest sequence number the client has received
+            load_missed: Loads the stored events numbered above a sequence
+                number; without it a subscriber that overflows is dropped
+            max_buffer_bytes: Byte budget of the outbound buffer
+            flush_interval: Seconds a burst of events accumulates before it
+                is sent
+        """
+        self.send = send
+        self.last_seq = last_seq
+        self.load_missed = load_missed
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+        self.on_failed: Optional[Callable[["EventSubscriber"], None]] = None
+        self._buffer: list[tuple[RealtimeEvent, str]] = []
+        self._buffer_bytes = 0
+        # Set when the buffer overflowed and the store has to fill the gap
+        self._lagging = False
+        self._sending = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffer_bytes
+
+    @property
+    def idle(self) -> bool:
+        """Whether everything offered so far has been sent."""
+        return not (self._buffer or self._lagging or self._sending)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            if self._buffer or self._lagging:
+                self._wakeup.set()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def offer(self, event: RealtimeEvent) -> bool:
+        """Queue an event for sending.
+
+        Returns:
+            False if the buffer overflowed and the subscriber cannot catch up,
+            in which case it should be dropped
+        """
+        if event.seq is not None and event.seq <= self.last_seq:
+            return True
+        if self._lagging:
+            # The catch-up reads the stored events, this one included
+            return True
+
+        if event.type in SUPERSEDED_EVENT_TYPES:
+            self._drop_superseded(event.type)
+        frame = encode_event(event)
+        self._buffer.append((event, frame))
+        self._buffer_bytes += len(frame)
+
+        if self._buffer_bytes > self.max_buffer_bytes:
+            self._buffer = []
+            self._buffer_bytes = 0
+            if self.load_missed is None:
+                return False
+            logger.info(
+                f"Event subscriber fell {self.max_buffer_bytes} bytes behind, "
+                "catching up from the event store"
+            )
+            self._lagging = True
+        self._wakeup.set()
+        return True
+
+    def _drop_superseded(self, event_type: EventType) -> None:
+        kept = []
+        for event, frame in self._buffer:
+            if event.type == event_type:
+                self._buffer_bytes -= len(frame)
+            else:
+                kept.append((event, frame))
+        self._buffer = kept
+
+    async def catch_up(self) -> None:
+        """Send the stored events the client has not received yet."""
+        # Events published from now on are buffered and deduplicated by seq
+        self._lagging = False
+        if self.load_missed is None:
+            return
+        events = await asyncio.to_thread(self.load_missed, self.last_seq)
+        frames: list[str] = []
+        frame_bytes = 0
+        for event in events:
+            if event.seq is not None and event.seq <= self.last_seq:
+                continue
+            frame = encode_event(event)
+            if frames and frame_bytes + len(frame) > self.max_buffer_bytes:
+                await self._send_frames(frames)
+                frames, frame_bytes = [], 0
+            frames.append(frame)
+            frame_bytes += len(frame)
+            if event.seq is not None:
+                self.last_seq = max(self.last_seq, event.seq)
+        if frames:
+            await self._send_frames(frames)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                self._sending = True
+                try:
+                    if self._lagging:
+                        await self.catch_up()
+                        self._wakeup.set()
+                        continue
+                    # Let the rest of a burst arrive so it leaves in one frame
+                    await asyncio.sleep(self.flush_interval)
+                    await self._flush()
+                finally:
+                    self._sending = False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping event subscriber after failed send: {e}")
+            self._buffer = []
+            self._buffer_bytes = 0
+            self._task = None
+            if self.on_failed is not None:
+                self.on_failed(self)
+
+    async def _flush(self) -> None:
+        batch, self._buffer, self._buffer_bytes = self._buffer, [], 0
+        frames = []
+        for event, frame in batch:
+            if event.seq is not None:
+                if event.seq <= self.last_seq:
+                    continue
+                self.last_seq = event.seq
+            frames.append(frame)
+        if frames:
+            await self._send_frames(frames)
+
+    async def _send_frames(self, frames: list[str]) -> None:
+        await self.send(encode_frame(frames))
+
+
+class EventStream:
+    """Numbers the events of a session and fans them out to its connections.
+
+    The stream is owned by the session runtime rather than by a connection,
+    so connections can come and go while the agent keeps running. A
+    connection that drops is simply unsubscribed; when the client comes back
+    it resubscribes from the last sequence number it saw and receives the
+    events it missed from the event store before the live stream resumes.
+    """
+
+    def __init__(
+        self,
+        last_seq: int = 0,
+        max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        """Initialize the stream.
+
+        Args:
+            last_seq: Highest sequence number already assigned in the session,
+                so numbering continues across runtimes and restarts
+            max_buffer_bytes: Byte budget of each connection's outbound buffer
+            flush_interval: Seconds a burst of events accumulates before it
+                is sent to a connection as one frame
+        """
+        self._last_seq = last_seq
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+        self._subscribers: list[EventSubscriber] = []
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def assign_seq(self, event: RealtimeEvent) -> int:
+        """Give the event the next sequence number of the session."""
+        self._last_seq += 1
+        event.seq = self._last_seq
+        return event.seq
+
+    def subscribe(
+        self,
+        send: SendFn,
+        last_seq: Optional[int] = None,
+        load_missed: Optional[LoadMissedFn] = None,
+    ) -> EventSubscriber:
+        """Add a connection that receives live events from now on."""
+        subscriber = self._add_subscriber(
+            send, self._last_seq if last_seq is None else last_seq, load_missed
+        )
+        subscriber.start()
+        return subscriber
+
+    async def resubscribe(
+        self, send: SendFn, last_seq: int, load_missed: LoadMissedFn
+    ) -> EventSubscriber:
+        """Add a connection and replay the stored events it has not seen.
+
+        Live events published while the replay is in progress are buffered
+        and delivered afterwards, so the client sees every event exactly once
+        and in order.
+
+        Args:
+            send: Coroutine function sending one text frame to the client
+            last_seq: Highest sequence number the client has received
+            load_missed: Loads the stored events numbered above a sequence number
+
+        Returns:
+            The new subscriber
+        """
+        subscriber = self._add_subscriber(send, last_seq, load_missed)
+        try:
+            if last_seq < self._last_seq:
+                await subscriber.catch_up()
+        except Exception as e:
+            logger.info(f"Dropping event subscriber after failed replay: {e}")
+            self.unsubscribe(subscriber)
+            return subscriber
+        subscriber.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: EventSubscriber) -> None:
+        subscriber.stop()
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    async def publish(self, event: RealtimeEvent) -> None:
+        """Queue an event for every subscribed connection.
+
+        This never waits for a connection: each one sends from its own
+        buffer, and one that fails or falls too far behind is unsubscribed
+        without the publisher noticing, so a slow or flaky client cannot
+        hold up the agent.
+        """
+        for subscriber in list(self._subscribers):
+            if not subscriber.offer(event):
+                logger.info("Dropping event subscriber after its buffer overflowed")
+                self.unsubscribe(subscriber)
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every connection has been sent its buffered events.
+
+        Returns:
+            False if the timeout expired first
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not all(subscriber.idle for subscriber in self._subscribers):
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            await asyncio.sleep(self.flush_interval)
+        return True
+
+    def _add_subscriber(
+        self, send: SendFn, last_seq: int, load_missed: Optional[LoadMissedFn]
+    ) -> EventSubscriber:
+        subscriber = EventSubscriber(
+            send,
+            last_seq,
+            load_missed,
+            max_buffer_bytes=self.max_buffer_bytes,
+            flush_interval=self.flush_interval,
+        )
+        subscriber.on_failed = self.unsubscribe
+        self._subscribers.append(subscriber)
+        return subscriber
@@ -0,0 +1,225 @@
+import difflib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from ii_agent.core.event import EventType, RealtimeEvent
+
+logger = logging.getLogger(__name__)
+
+# Send the full file again after this many patches, so a client never has to
+# replay an unbounded chain of patches to show a file
+DEFAULT_SNAPSHOT_EVERY = 20
+# Size of the file contents kept to patch against; the least recently
+# edited files are dropped beyond it and get a snapshot on their next edit
+DEFAULT_MAX_TRACKED_BYTES = 32 * 1024 * 1024
+# Changed regions longer than this many lines are replaced in one hunk, as
+# diffing them line by line takes quadratic time on repetitive files
+MAX_DIFF_LINES = 2000
+
+
+def _split_lines(text: str) -> list[str]:
+    # Only "\n" separates lines, unlike str.splitlines, so that clients can
+    # split the same way when applying patches
+    lines = text.split("\n")
+    split = [line + "\n" for line in lines[:-1]]
+    if lines[-1]:
+        split.append(lines[-1])
+    return split
+
+
+def make_file_patch(old: str, new: str) -> list[dict[str, Any]]:
+    """Compute the line ranges that turn old into new.
+
+    Returns:
+        Hunks `{"start": s, "end": e, "lines": [...]}` replacing lines
+        `[s, e)` of old by `lines`, in ascending order of start. Lines are
+        split on "\n" and keep it, so joining them restores the file exactly.
+    """
+    if old == new:
+        return []
+    old_lines = _split_lines(old)
+    new_lines = _split_lines(new)
+
+    # Only diff the region between the common leading and trailing lines,
+    # which for an edit is a few lines of a possibly large file
+    prefix = 0
+    limit = min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while (
+        suffix < limit
+        and old_lines[len(old_lines) - 1 - suffix]
+        == new_lines[len(new_lines) - 1 - suffix]
+    ):
+        suffix += 1
+    old_middle = old_lines[prefix : len(old_lines) - suffix]
+    new_middle = new_lines[prefix : len(new_lines) - suffix]
+
+    if max(len(old_middle), len(new_middle)) > MAX_DIFF_LINES:
+        return [{"start": prefix, "end": prefix + len(old_middle), "lines": new_middle}]
+    matcher = difflib.SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+    return [
+        {"start": prefix + i1, "end": prefix + i2, "lines": new_middle[j1:j2]}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_file_patch(content: str, patch: list[dict[str, Any]]) -> str:
+    """Apply hunks computed by make_file_patch to content."""
+    lines = _split_lines(content)
+    # Going backwards keeps the line numbers of the remaining hunks valid
+    for hunk in reversed(patch):
+        lines[hunk["start"] : hunk["end"]] = hunk["lines"]
+    return "".join(lines)
+
+
+class FileEditTracker:
+    """Builds the FILE_EDIT event contents of the files a tool edits.
+
+    The first event for a path and every `snapshot_every`-th one after it
+    carry the full file content. The ones in between carry a patch against
+    the previous version only, so small edits to a large file stay small.
+    Each event is numbered with the version of the file it produces:
+
+        {"path", "version", "content", "total_lines"}                 snapshot
+        {"path", "version", "base_version", "patch", "total_lines"}   patch
+
+    The tracker lives as long as the tool; a new tool starts each path with
+    a snapshot again, so its versions never have to continue an old chain.
+    Diffing can take a while on large files, so build_event_content is
+    meant to run off the event loop; it is safe to call from any thread.
+    """
+
+    def __init__(
+        self,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        max_tracked_bytes: int = DEFAULT_MAX_TRACKED_BYTES,
+    ):
+        self.snapshot_every = snapshot_every
+        self.max_tracked_bytes = max_tracked_bytes
+        self.tracked_bytes = 0
+        # path -> (version, content or None once dropped, patches since the
+        # last snapshot), least recently edited first
+        self._files: OrderedDict[str, tuple[int, Optional[str], int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build_event_content(self, path: str, content: str) -> dict[str, Any]:
+        path = str(path)
+        with self._lock:
+            event_content = self._build(path, content)
+            self._track(path, content, event_content)
+            return event_content
+
+    def _build(self, path: str, content: str) -> dict[str, Any]:
+        total_lines = len(content.splitlines())
+        previous = self._files.get(path)
+
+        if (
+            previous is not None
+            and previous[1] is not None
+            and previous[2] + 1 < self.snapshot_every
+        ):
+            version, old_content, _ = previous
+            patch = make_file_patch(old_content, content)
+            patch_size = sum(len(line) for hunk in patch for line in hunk["lines"])
+            # A rewrite of most of the file is cheaper to send whole
+            if patch_size < len(content) // 2:
+                return {
+                    "path": path,
+                    "version": version + 1,
+                    "base_version": version,
+                    "patch": patch,
+                    "total_lines": total_lines,
+                }
+
+        version = previous[0] + 1 if previous is not None else 1
+        return {
+            "path": path,
+            "version": version,
+            "content": content,
+            "total_lines": total_lines,
+        }
+
+    def _track(self, path: str, content: str, event_content: dict[str, Any]) -> None:
+        previous = self._files.pop(path, None)
+        if previous is not None and previous[1] is not None:
+            self.tracked_bytes -= len(previous[1])
+        patches = previous[2] + 1 if "patch" in event_content else 0
+        kept = content if len(content) <= self.max_tracked_bytes else None
+        self._files[path] = (event_content["version"], kept, patches)
+        if kept is not None:
+            self.tracked_bytes += len(kept)
+        # Drop the contents of the least recently edited files; their
+        # versions are kept, so their next event continues the numbering
+        for other, (version, old_content, _) in list(self._files.items()):
+            if self.tracked_bytes <= self.max_tracked_bytes:
+                break
+            if old_content is not None:
+                self._files[other] = (version, None, 0)
+                self.tracked_bytes -= len(old_content)
+
+
+@dataclass
+class FileState:
+    """Content of a file as reconstructed from its FILE_EDIT events.
+
+    Attributes:
+        path: Path of the file as the tool reported it
+        version: Version produced by the last applied event
+        content: File content at that version
+        seq: Sequence number of the last applied event, if known
+    """
+
+    path: str
+    version: int
+    content: str
+    seq: Optional[int] = None
+
+    @property
+    def total_lines(self) -> int:
+        return len(self.content.splitlines())
+
+
+def reconstruct_files(events: Iterable[RealtimeEvent]) -> dict[str, FileState]:
+    """Rebuild the latest content of every edited file from FILE_EDIT events.
+
+    Events from before patches were introduced carry the full content
+    without a version and are treated as snapshots. A patch whose base
+    version is missing, e.g. because the events in between were deleted,
+    is skipped together with the patches after it until the next snapshot.
+
+    Args:
+        events: Events of a session in the order they were emitted
+
+    Returns:
+        The state of each file, keyed by path
+    """
+    files: dict[str, FileState] = {}
+    for event in events:
+        if event.type != EventType.FILE_EDIT:
+            continue
+        content = event.content
+        path = str(content.get("path"))
+        version = content.get("version", 0)
+
+        if "patch" not in content:
+            files[path] = FileState(
+                path, version, content.get("content", ""), event.seq
+            )
+            continue
+
+        state = files.get(path)
+        if state is None or state.version != content.get("base_version"):
+            # Once a version is missing, no later patch matches until a snapshot
+            logger.debug(f"Skipping patch of {path} without its base version")
+            continue
+        state.content = apply_file_patch(state.content, content["patch"])
+        state.version = version
+        state.seq = event.seq
+    return files
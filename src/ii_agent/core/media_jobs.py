@@ -0,0 +1,202 @@
+"""Tracking of the long-running jobs of the media generation tools.
+
+Generating a video takes minutes and an image or a speech clip many
+seconds. The tools run these generations as jobs: every change of state is
+sent to the session as a MEDIA_JOB event, which the UI shows as progress
+and which is persisted with the other events, so a client that reconnects
+can rebuild the state of every job and pick up the finished results.
+
+The SDKs of the providers are blocking, so the helpers here run their calls
+on threads, wait between polls without blocking the event loop and run
+external commands such as ffmpeg as asynchronous subprocesses.
+"""
+
+import asyncio
+import subprocess
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.logger import logger
+
+T = TypeVar("T")
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class MediaJob:
+    """State of one media generation, as sent in MEDIA_JOB events."""
+
+    kind: str
+    tool_name: str
+    description: str
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = PENDING
+    # Share of the work done, from 0 to 1, if the tool can tell
+    progress: Optional[float] = None
+    message: Optional[str] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class MediaJobManager:
+    """Runs the generations of the media tools of a session as jobs.
+
+    Without a message queue, jobs are tracked in memory only.
+    """
+
+    def __init__(self, message_queue: Optional[asyncio.Queue] = None):
+        self.message_queue = message_queue
+        self.jobs: dict[str, MediaJob] = {}
+
+    def _publish(self, job: MediaJob) -> None:
+        job.updated_at = time.time()
+        if self.message_queue is not None:
+            self.message_queue.put_nowait(
+                RealtimeEvent(type=EventType.MEDIA_JOB, content=job.to_dict())
+            )
+
+    def update(
+        self,
+        job: MediaJob,
+        message: str,
+        progress: Optional[float] = None,
+    ) -> None:
+        """Report the progress of a running job."""
+        job.message = message
+        if progress is not None:
+            job.progress = max(0.0, min(1.0, progress))
+        self._publish(job)
+
+    async def run(
+        self,
+        kind: str,
+        tool_name: str,
+        description: str,
+        work: Callable[[MediaJob], Awaitable[Any]],
+    ) -> Any:
+        """Run the work of a tool as a job and return what it returns.
+
+        The job succeeds if the work returns a ToolImplOutput whose auxiliary
+        data reports success, and fails if it reports an error or raises.
+
+        Args:
+            kind: Kind of media generated, e.g. "video" or "speech"
+            tool_name: Name of the tool running the job
+            description: What is generated, shown to the user
+            work: Coroutine function doing the generation, given the job to
+                report progress on
+        """
+        job = MediaJob(kind=kind, tool_name=tool_name, description=description)
+        self.jobs[job.job_id] = job
+        job.status = RUNNING
+        self._publish(job)
+        try:
+            output = await work(job)
+        except BaseException as e:
+            job.status = FAILED
+            job.error = str(e) or type(e).__name__
+            self._publish(job)
+            raise
+        data = getattr(output, "auxiliary_data", None) or {}
+        if data.get("success", True):
+            job.status = SUCCEEDED
+            job.progress = 1.0
+            job.result = data
+        else:
+            job.status = FAILED
+            job.error = str(data.get("error", "Unknown error"))
+        self._publish(job)
+        return output
+
+
+async def poll_operation(
+    operation: T,
+    refresh: Callable[[T], T],
+    interval_seconds: float,
+    timeout_seconds: float,
+    on_poll: Optional[Callable[[float], None]] = None,
+) -> T:
+    """Wait for a long-running operation of a provider SDK to be done.
+
+    Args:
+        operation: The operation, with a `done` attribute
+        refresh: Blocking call fetching the current state of the operation;
+            it runs on a thread
+        interval_seconds: Pause between two polls
+        timeout_seconds: Time after which to give up
+        on_poll: Called with the seconds waited so far after each poll
+
+    Raises:
+        TimeoutError: If the operation is not done in time
+    """
+    started = time.monotonic()
+    while not operation.done:
+        elapsed = time.monotonic() - started
+        if elapsed >= timeout_seconds:
+            raise TimeoutError(f"Operation timed out after {timeout_seconds:g} seconds")
+        await asyncio.sleep(min(interval_seconds, timeout_seconds - elapsed))
+        operation = await asyncio.to_thread(refresh, operation)
+        if on_poll is not None:
+            on_poll(time.monotonic() - started)
+    return operation
+
+
+async def run_command(cmd: list[str]) -> bytes:
+    """Run an external command without blocking the event loop.
+
+    Returns:
+        The standard output of the command
+
+    Raises:
+        FileNotFoundError: If the command does not exist
+        subprocess.CalledProcessError: If the command exits with an error,
+            like subprocess.run with check=True
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    if process.returncode != 0:
+        logger.debug(f"{cmd[0]} failed: {stderr.decode(errors='replace')[-2000:]}")
+        raise subprocess.CalledProcessError(
+            process.returncode, cmd, output=stdout, stderr=stderr
+        )
+    return stdout
+
+
+def reconstruct_media_jobs(
+    events: Iterable[RealtimeEvent],
+) -> dict[str, dict[str, Any]]:
+    """Rebuild the latest state of every job from the MEDIA_JOB events.
+
+    Returns:
+        The content of the last event of each job, with its `seq`, by job ID
+        in the order the jobs started
+    """
+    jobs: dict[str, dict[str, Any]] = {}
+    for event in events:
+        if event.type != EventType.MEDIA_JOB:
+            continue
+        job_id = event.content.get("job_id")
+        if job_id is None:
+            continue
+        jobs[job_id] = {**event.content, "seq": event.seq}
+    return jobs
@@ -0,0 +1,211 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+# USD per million tokens: (input, output, cache write, cache read).
+# Matched against the start of the model name, without any provider path, as
+# a whole name or followed by "-" (e.g. a date); the longest matching name
+# wins, so "gpt-4.1-nano" is not priced as "gpt-4.1".
+MODEL_PRICING: list[tuple[str, tuple[float, float, float, float]]] = [
+    ("claude-opus-4", (15.0, 75.0, 18.75, 1.5)),
+    ("claude-sonnet-4", (3.0, 15.0, 3.75, 0.3)),
+    ("claude-3-7-sonnet", (3.0, 15.0, 3.75, 0.3)),
+    ("claude-3-5-sonnet", (3.0, 15.0, 3.75, 0.3)),
+    ("claude-3-5-haiku", (0.8, 4.0, 1.0, 0.08)),
+    ("gpt-4.1-mini", (0.4, 1.6, 0.0, 0.1)),
+    ("gpt-4.1-nano", (0.1, 0.4, 0.0, 0.025)),
+    ("gpt-4.1", (2.0, 8.0, 0.0, 0.5)),
+    ("gpt-4o-mini", (0.15, 0.6, 0.0, 0.075)),
+    ("gpt-4o", (2.5, 10.0, 0.0, 1.25)),
+    ("o3-mini", (1.1, 4.4, 0.0, 0.55)),
+    ("o3", (2.0, 8.0, 0.0, 0.5)),
+    ("gemini-2.5-pro", (1.25, 10.0, 0.0, 0.31)),
+    ("gemini-2.5-flash", (0.3, 2.5, 0.0, 0.075)),
+]
+
+# Keep the persisted per-turn breakdown bounded on very long sessions.
+MAX_STORED_TURNS = 200
+
+
+def get_model_pricing(
+    model_name: Optional[str],
+) -> Optional[tuple[float, float, float, float]]:
+    """Return per-million-token prices for a model, or None if unknown."""
+    if not model_name:
+        return None
+    normalized = model_name.lower().replace("@", "-").rsplit("/", 1)[-1]
+    matches = [
+        (name, pricing)
+        for name, pricing in MODEL_PRICING
+        if normalized == name or normalized.startswith(f"{name}-")
+    ]
+    if not matches:
+        return None
+    return max(matches, key=lambda match: len(match[0]))[1]
+
+
+def _usage_count(metadata: dict[str, Any], key: str) -> int:
+    # Clients report -1 (or nothing) when a counter is unavailable.
+    value = metadata.get(key) or 0
+    return max(int(value), 0)
+
+
+@dataclass
+class UsageMetrics:
+    """Token, cost and latency counters for a turn or a whole session."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cost_usd: float = 0.0
+    unpriced_llm_calls: int = 0
+    llm_calls: int = 0
+    llm_latency_ms: float = 0.0
+    tool_calls: int = 0
+    tool_latency_ms: float = 0.0
+    tool_latency_ms_by_name: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        """Share of prompt tokens served from the prompt cache."""
+        prompt_tokens = (
+            self.input_tokens
+            + self.cache_read_input_tokens
+            + self.cache_creation_input_tokens
+        )
+        if prompt_tokens == 0:
+            return None
+        return self.cache_read_input_tokens / prompt_tokens
+
+    def add_llm_call(
+        self, metadata: dict[str, Any], latency_ms: float, model_name: Optional[str]
+    ) -> None:
+        input_tokens = _usage_count(metadata, "input_tokens")
+        output_tokens = _usage_count(metadata, "output_tokens")
+        cache_read = _usage_count(metadata, "cache_read_input_tokens")
+        cache_creation = _usage_count(metadata, "cache_creation_input_tokens")
+
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cache_read_input_tokens += cache_read
+        self.cache_creation_input_tokens += cache_creation
+        self.llm_calls += 1
+        self.llm_latency_ms += latency_ms
+
+        pricing = get_model_pricing(model_name)
+        if pricing is None:
+            self.unpriced_llm_calls += 1
+            return
+        input_price, output_price, cache_write_price, cache_read_price = pricing
+        self.cost_usd += (
+            input_tokens * input_price
+            + output_tokens * output_price
+            + cache_creation * cache_write_price
+            + cache_read * cache_read_price
+        ) / 1_000_000
+
+    def add_tool_call(self, tool_name: str, latency_ms: float) -> None:
+        self.tool_calls += 1
+        self.tool_latency_ms += latency_ms
+        self.tool_latency_ms_by_name[tool_name] = (
+            self.tool_latency_ms_by_name.get(tool_name, 0.0) + latency_ms
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["cost_usd"] = round(self.cost_usd, 6)
+        data["cache_hit_ratio"] = self.cache_hit_ratio
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "UsageMetrics":
+        fields = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in fields})
+
+
+@dataclass
+class TurnMetrics(UsageMetrics):
+    """Usage of a single agent turn (one LLM call plus its tool call)."""
+
+    run_id: int = 0
+    turn_id: int = 0
+    agent: str = "general_agent"
+
+
+class SessionMetrics:
+    """Aggregates usage for a session across runs, turns and agents.
+
+    The general agent and the reviewer share one instance, so session totals
+    include both while every turn is attributed to the agent that ran it.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.totals = UsageMetrics()
+        self.turns: list[TurnMetrics] = []
+        self.runs = 0
+        self.turn_count = 0
+
+    def start_run(self) -> int:
+        self.runs += 1
+        return self.runs
+
+    def start_turn(self, turn_id: int, agent: str = "general_agent") -> TurnMetrics:
+        turn = TurnMetrics(run_id=self.runs, turn_id=turn_id, agent=agent)
+        self.turn_count += 1
+        self.turns.append(turn)
+        if len(self.turns) > MAX_STORED_TURNS:
+            del self.turns[: len(self.turns) - MAX_STORED_TURNS]
+        return turn
+
+    @property
+    def current_turn(self) -> Optional[TurnMetrics]:
+        return self.turns[-1] if self.turns else None
+
+    def record_llm_call(
+        self,
+        metadata: dict[str, Any],
+        latency_ms: float,
+        model_name: Optional[str] = None,
+        turn: Optional[TurnMetrics] = None,
+    ) -> None:
+        self.totals.add_llm_call(metadata, latency_ms, model_name)
+        if turn is not None:
+            turn.add_llm_call(metadata, latency_ms, model_name)
+
+    def record_tool_call(
+        self, tool_name: str, latency_ms: float, turn: Optional[TurnMetrics] = None
+    ) -> None:
+        self.totals.add_tool_call(tool_name, latency_ms)
+        if turn is not None:
+            turn.add_tool_call(tool_name, latency_ms)
+
+    def summary(self) -> dict[str, Any]:
+        """Session totals without the per-turn breakdown."""
+        return {
+            "session_id": self.session_id,
+            "runs": self.runs,
+            "turns": self.turn_count,
+            **self.totals.to_dict(),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **self.summary(),
+            "turn_metrics": [turn.to_dict() for turn in self.turns],
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: Optional[dict[str, Any]], session_id: Optional[str] = None
+    ) -> "SessionMetrics":
+        metrics = cls(session_id=session_id or (data or {}).get("session_id"))
+        if not data:
+            return metrics
+        metrics.runs = data.get("runs", 0)
+        metrics.totals = UsageMetrics.from_dict(data)
+        metrics.turns = [
+            TurnMetrics.from_dict(turn) for turn in data.get("turn_metrics", [])
+        ]
+        metrics.turn_count = data.get("turns", len(metrics.turns))
+        return metrics
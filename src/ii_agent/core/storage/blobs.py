@@ -0,0 +1,272 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+import time
+import uuid
+from abc import abstractmethod
+from typing import Any, Iterator, Optional
+
+from ii_agent.core.logger import logger
+
+BLOB_URL_PREFIX = "/api/blobs"
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Magic numbers of the image formats tools produce
+_MEDIA_TYPE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def blob_digest(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def is_blob_digest(digest: str) -> bool:
+    return bool(_DIGEST_PATTERN.match(digest))
+
+
+def blob_url(digest: str) -> str:
+    return f"{BLOB_URL_PREFIX}/{digest}"
+
+
+def guess_media_type(contents: bytes) -> str:
+    """Guess the media type of a blob from its leading bytes."""
+    for signature, media_type in _MEDIA_TYPE_SIGNATURES:
+        if contents.startswith(signature):
+            return media_type
+    if contents[:4] == b"RIFF" and contents[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class BlobStore:
+    """Content-addressed store for binary payloads such as screenshots.
+
+    Blobs are keyed by the SHA-256 digest of their contents, so storing the
+    same image twice keeps one copy and a digest never changes meaning.
+    """
+
+    @abstractmethod
+    def put(self, contents: bytes) -> str:
+        """Store contents and return their digest."""
+
+    @abstractmethod
+    def get(self, digest: str) -> bytes:
+        """Read the blob with the given digest.
+
+        Raises:
+            FileNotFoundError: If no such blob is stored
+        """
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, digest: str, stored_before: Optional[float] = None) -> None:
+        """Remove a blob; removing one that is not stored does nothing.
+
+        Args:
+            digest: Digest of the blob
+            stored_before: Only remove the blob if it was last stored before
+                this Unix time
+        """
+
+    @abstractmethod
+    def iter_digests(self, stored_before: Optional[float] = None) -> Iterator[str]:
+        """Iterate over the stored digests.
+
+        Args:
+            stored_before: Only yield blobs last stored before this Unix time,
+                so a sweep never races with a writer that just stored a blob,
+                even one already stored long ago
+        """
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        if root.startswith("~"):
+            root = os.path.expanduser(root)
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def get_full_path(self, digest: str) -> str:
+        if not is_blob_digest(digest):
+            raise FileNotFoundError(digest)
+        # Shard by prefix to keep directories small
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, contents: bytes) -> str:
+        digest = blob_digest(contents)
+        full_path = self.get_full_path(digest)
+        try:
+            # Storing a blob again makes it recent, so a sweep of old blobs
+            # spares it while the event referencing it is written
+            os.utime(full_path)
+            return digest
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Blobs are immutable, so a concurrent writer of the same digest
+        # writes the same bytes; every write has its own temp file and the
+        # rename only has to be atomic
+        tmp_path = f"{full_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(contents)
+            os.replace(tmp_path, full_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            # Another writer stored the same blob meanwhile
+            if not os.path.exists(full_path):
+                raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self.get_full_path(digest), "rb") as f:
+            return f.read()
+
+    def exists(self, digest: str) -> bool:
+        try:
+            return os.path.exists(self.get_full_path(digest))
+        except FileNotFoundError:
+            return False
+
+    def delete(self, digest: str, stored_before: Optional[float] = None) -> None:
+        try:
+            full_path = self.get_full_path(digest)
+            if stored_before is not None and (
+                os.path.getmtime(full_path) >= stored_before
+            ):
+                return
+            os.remove(full_path)
+        except FileNotFoundError:
+            pass
+
+    def iter_digests(self, stored_before: Optional[float] = None) -> Iterator[str]:
+        for shard in sorted(os.listdir(self.root)):
+            shard_path = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for entry in os.scandir(shard_path):
+                if not is_blob_digest(entry.name):
+                    continue
+                if stored_before is not None:
+                    try:
+                        if entry.stat().st_mtime >= stored_before:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                yield entry.name
+
+
+class InMemoryBlobStore(BlobStore):
+    blobs: dict[str, bytes]
+
+    def __init__(self) -> None:
+        self.blobs = {}
+        self.stored_at: dict[str, float] = {}
+
+    def put(self, contents: bytes) -> str:
+        digest = blob_digest(contents)
+        self.blobs.setdefault(digest, contents)
+        self.stored_at[digest] = time.time()
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        if digest not in self.blobs:
+            raise FileNotFoundError(digest)
+        return self.blobs[digest]
+
+    def exists(self, digest: str) -> bool:
+        return digest in self.blobs
+
+    def delete(self, digest: str, stored_before: Optional[float] = None) -> None:
+        if stored_before is not None and self.stored_at.get(digest, 0) >= stored_before:
+            return
+        self.blobs.pop(digest, None)
+        self.stored_at.pop(digest, None)
+
+    def iter_digests(self, stored_before: Optional[float] = None) -> Iterator[str]:
+        for digest, stored_at in list(self.stored_at.items()):
+            if stored_before is None or stored_at < stored_before:
+                yield digest
+
+
+def get_blob_store(
+    file_store_type: str,
+    file_store_path: str | None = None,
+) -> BlobStore:
+    """Get a blob store living next to the file store of the given type."""
+    if file_store_type == "local":
+        if file_store_path is None:
+            raise ValueError("File store path is required for local blob store")
+        return LocalBlobStore(os.path.join(file_store_path, "blobs"))
+    return InMemoryBlobStore()
+
+
+def externalize_images(value: Any, blob_store: Optional[BlobStore]) -> Any:
+    """Replace the base64 image blocks in an event payload by blob references.
+
+    Image blocks have the shape the LLM clients use,
+    `{"type": "image", "source": {"type": "base64", "media_type": ..., "data": ...}}`.
+    Their source becomes `{"type": "blob", "media_type": ..., "digest": ...,
+    "url": ...}`, with the image bytes moved to the blob store. The input is
+    left untouched, since it may be shared with the message history the LLM
+    still needs the inline images from; containers are only copied along
+    the path to an image block.
+
+    Args:
+        value: Event content or any part of it
+        blob_store: Store to move the images to; None returns value as is
+
+    Returns:
+        The payload with image data replaced by references
+    """
+    if blob_store is None:
+        return value
+    if isinstance(value, dict):
+        source = value.get("source")
+        if (
+            value.get("type") == "image"
+            and isinstance(source, dict)
+            and source.get("type") == "base64"
+            and isinstance(source.get("data"), str)
+        ):
+            try:
+                contents = base64.b64decode(source["data"], validate=True)
+            except (binascii.Error, ValueError) as e:
+                logger.debug(f"Keeping undecodable inline image: {e}")
+                return value
+            digest = blob_store.put(contents)
+            return {
+                **value,
+                "source": {
+                    "type": "blob",
+                    "media_type": source.get("media_type")
+                    or guess_media_type(contents),
+                    "digest": digest,
+                    "url": blob_url(digest),
+                },
+            }
+        changed = {}
+        for key, item in value.items():
+            new_item = externalize_images(item, blob_store)
+            if new_item is not item:
+                changed[key] = new_item
+        return {**value, **changed} if changed else value
+    if isinstance(value, list):
+        new_items = [externalize_images(item, blob_store) for item in value]
+        if any(new is not old for new, old in zip(new_items, value)):
+            return new_items
+        return value
+    return value
@@ -1,5 +1,6 @@
 import os
 import shutil
+import uuid
 
 
 from ii_agent.core.logger import logger
@@ -24,8 +25,22 @@ class LocalFileStore(FileStore):
         full_path = self.get_full_path(path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         mode = "w" if isinstance(contents, str) else "wb"
-        with open(full_path, mode) as f:
-            f.write(contents)
+        # Write to a sibling temp file and rename it into place, so a crash
+        # mid-write never leaves a truncated file behind; every write has its
+        # own temp file, as threads may write the same path concurrently
+        tmp_path = f"{full_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, mode) as f:
+                f.write(contents)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
 
     def read(self, path: str) -> str:
         full_path = self.get_full_path(path)
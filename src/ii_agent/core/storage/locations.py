@@ -3,3 +3,7 @@ CONVERSATION_BASE_DIR = "sessions"
 
 def get_conversation_agent_history_filename(sid: str) -> str:
     return f"{CONVERSATION_BASE_DIR}/{sid}/agent_state.pkl"
+
+
+def get_conversation_checkpoint_dir(sid: str) -> str:
+    return f"{CONVERSATION_BASE_DIR}/{sid}/checkpoint"
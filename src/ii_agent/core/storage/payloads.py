@@ -0,0 +1,186 @@
+import zlib
+from typing import Any, Iterator, Optional
+
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+from ii_agent.core.logger import logger
+from ii_agent.core.storage.blobs import (
+    BlobStore,
+    InMemoryBlobStore,
+    LocalBlobStore,
+    is_blob_digest,
+)
+
+# Key of the reference that replaces an offloaded field in an event payload
+PAYLOAD_REF_KEY = "$payload_ref"
+# Strings longer than this many bytes are moved out of the event row
+DEFAULT_OFFLOAD_THRESHOLD = 16 * 1024
+
+ZSTD_LEVEL = 9
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress_payload(contents: bytes) -> bytes:
+    """Compress with zstd, or zlib when zstandard is not installed."""
+    if HAS_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(contents)
+    return zlib.compress(contents, 6)
+
+
+def decompress_payload(contents: bytes) -> bytes:
+    """Decompress data written by compress_payload with either codec."""
+    if contents.startswith(_ZSTD_MAGIC):
+        if not HAS_ZSTD:
+            raise RuntimeError("zstandard is required to read this payload")
+        return zstandard.ZstdDecompressor().decompress(contents)
+    return zlib.decompress(contents)
+
+
+class CompressedBlobStore(BlobStore):
+    """Blob store that compresses blobs before handing them to another store.
+
+    Blobs are addressed by the digest of their compressed bytes, so the
+    store stays content-addressed and identical payloads are kept once.
+    """
+
+    def __init__(self, inner: BlobStore):
+        self.inner = inner
+
+    def put(self, contents: bytes) -> str:
+        return self.inner.put(compress_payload(contents))
+
+    def get(self, digest: str) -> bytes:
+        return decompress_payload(self.inner.get(digest))
+
+    def exists(self, digest: str) -> bool:
+        return self.inner.exists(digest)
+
+    def delete(self, digest: str, stored_before: Optional[float] = None) -> None:
+        self.inner.delete(digest, stored_before)
+
+    def iter_digests(self, stored_before: Optional[float] = None) -> Iterator[str]:
+        return self.inner.iter_digests(stored_before)
+
+
+def get_payload_store(
+    file_store_type: str,
+    file_store_path: str | None = None,
+    name: str = "payloads",
+) -> BlobStore:
+    """Get a compressed blob store living next to the file store.
+
+    Args:
+        file_store_type: Type of the file store
+        file_store_path: Root of a local file store
+        name: Directory of the store, "payloads" for offloaded event payloads
+            or "archives" for the bundles of archived sessions
+    """
+    if file_store_type == "local":
+        if file_store_path is None:
+            raise ValueError("File store path is required for local payload store")
+        return CompressedBlobStore(LocalBlobStore(f"{file_store_path}/{name}"))
+    return CompressedBlobStore(InMemoryBlobStore())
+
+
+def _payload_ref(value: Any) -> Optional[str]:
+    if isinstance(value, dict) and len(value) == 2 and PAYLOAD_REF_KEY in value:
+        digest = value[PAYLOAD_REF_KEY]
+        if isinstance(digest, str) and is_blob_digest(digest):
+            return digest
+    return None
+
+
+def offload_payload(
+    value: Any,
+    payload_store: Optional[BlobStore],
+    threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+) -> Any:
+    """Move the large strings of an event payload to the payload store.
+
+    Every string longer than threshold bytes is replaced by
+    `{"$payload_ref": digest, "size": bytes}`. Like externalize_images, the
+    input is left untouched and containers are only copied along the path
+    to a replaced string.
+
+    Args:
+        value: Event payload or any part of it
+        payload_store: Store to move the strings to; None returns value as is
+        threshold: Size in bytes above which a string is offloaded
+
+    Returns:
+        The payload with large strings replaced by references
+    """
+    if payload_store is None:
+        return value
+    if isinstance(value, str):
+        # Any UTF-8 encoding is at least as long as the string
+        if len(value) <= threshold:
+            return value
+        contents = value.encode("utf-8")
+        if len(contents) <= threshold:
+            return value
+        return {PAYLOAD_REF_KEY: payload_store.put(contents), "size": len(contents)}
+    if isinstance(value, dict):
+        changed = {}
+        for key, item in value.items():
+            new_item = offload_payload(item, payload_store, threshold)
+            if new_item is not item:
+                changed[key] = new_item
+        return {**value, **changed} if changed else value
+    if isinstance(value, list):
+        new_items = [offload_payload(item, payload_store, threshold) for item in value]
+        if any(new is not old for new, old in zip(new_items, value)):
+            return new_items
+        return value
+    return value
+
+
+def collect_payload_refs(value: Any, refs: Optional[set[str]] = None) -> set[str]:
+    """Collect the digests of the offloaded strings a payload references."""
+    if refs is None:
+        refs = set()
+    digest = _payload_ref(value)
+    if digest is not None:
+        refs.add(digest)
+    elif isinstance(value, dict):
+        for item in value.values():
+            collect_payload_refs(item, refs)
+    elif isinstance(value, list):
+        for item in value:
+            collect_payload_refs(item, refs)
+    return refs
+
+
+def rehydrate_payload(value: Any, payload_store: Optional[BlobStore]) -> Any:
+    """Put the strings moved out by offload_payload back into a payload.
+
+    A reference whose payload is missing becomes a placeholder string, so
+    a damaged store never makes a whole session unreadable.
+    """
+    if payload_store is None:
+        return value
+    digest = _payload_ref(value)
+    if digest is not None:
+        try:
+            return payload_store.get(digest).decode("utf-8")
+        except FileNotFoundError:
+            logger.warning(f"Offloaded event payload {digest} is missing")
+            return f"[payload {digest} unavailable]"
+    if isinstance(value, dict):
+        changed = {}
+        for key, item in value.items():
+            new_item = rehydrate_payload(item, payload_store)
+            if new_item is not item:
+                changed[key] = new_item
+        return {**value, **changed} if changed else value
+    if isinstance(value, list):
+        new_items = [rehydrate_payload(item, payload_store) for item in value]
+        if any(new is not old for new, old in zip(new_items, value)):
+            return new_items
+        return value
+    return value
@@ -0,0 +1,393 @@
+import asyncio
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+SERVICE_NAME = "ii-agent"
+SCOPE_NAME = "ii_agent"
+
+# OTLP status codes and span kinds
+STATUS_OK = 1
+STATUS_ERROR = 2
+SPAN_KIND_INTERNAL = 1
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "ii_agent_current_span", default=None
+)
+_bound_attributes: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar(
+    "ii_agent_trace_attributes", default={}
+)
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace.
+
+    Attributes:
+        name: Operation name, e.g. "llm.generate" or "tool.execute"
+        trace_id: 32 hex character id shared by all spans of one agent run
+        span_id: 16 hex character id of this span
+        parent_span_id: Id of the enclosing span, if any
+        start_time_ns: Wall-clock start in nanoseconds since the epoch
+        end_time_ns: Wall-clock end in nanoseconds, set when the span ends
+        attributes: Key/value annotations (session_id, turn_id, tool_name, ...)
+        status_code: STATUS_OK or STATUS_ERROR
+        status_message: Error description when the span failed
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    start_time_ns: int
+    end_time_ns: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_OK
+    status_message: str = ""
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_ns is None:
+            return None
+        return (self.end_time_ns - self.start_time_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Serialize the span in the OTLP/JSON span representation."""
+        otlp_span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            otlp_span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            otlp_span["status"]["message"] = self.status_message
+        return otlp_span
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_request(
+    spans: list[Span], service_name: str = SERVICE_NAME
+) -> dict[str, Any]:
+    """Wrap spans in an OTLP ExportTraceServiceRequest JSON object."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SCOPE_NAME},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter(ABC):
+    """Receives finished spans."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Export a finished span. Must not block the caller on I/O."""
+
+    def shutdown(self) -> None:
+        """Flush pending spans and release resources."""
+
+
+class InMemorySpanCollector(SpanExporter):
+    """Keeps the most recent finished spans in process memory."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_spans(
+        self,
+        name: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> list[Span]:
+        """Return collected spans, optionally filtered."""
+        with self._lock:
+            spans = list(self._spans)
+        return [
+            span
+            for span in spans
+            if (name is None or span.name == name)
+            and (trace_id is None or span.trace_id == trace_id)
+            and (session_id is None or span.attributes.get("session_id") == session_id)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class OTLPJsonFileExporter(SpanExporter):
+    """Appends spans to a file in the OTLP/JSON file exporter format.
+
+    Every line is one ExportTraceServiceRequest. Writes happen on a background
+    thread so instrumented code on the event loop never waits on disk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        service_name: str = SERVICE_NAME,
+        max_batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ):
+        self.path = path
+        self.service_name = service_name
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._worker = threading.Thread(
+            target=self._run, name="otlp-json-exporter", daemon=True
+        )
+        self._worker.start()
+
+    def export(self, span: Span) -> None:
+        if not self._closed:
+            self._queue.put(span)
+
+    def shutdown(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: list[Span] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while True:
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: list[Span]) -> None:
+        line = json.dumps(to_otlp_request(batch, self.service_name))
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            # Tracing must never take the agent down.
+            pass
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured exporters.
+
+    Spans nest through a context variable, so a span opened inside an agent
+    run automatically becomes a child of the run span and inherits its trace.
+    Attributes bound with `bind_attributes` (session_id, turn_id) are copied
+    onto every span created afterwards in the same task.
+    """
+
+    def __init__(self, exporters: Optional[list[SpanExporter]] = None):
+        self._exporters: list[SpanExporter] = list(exporters or [])
+
+    @property
+    def exporters(self) -> list[SpanExporter]:
+        return list(self._exporters)
+
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        self._exporters.append(exporter)
+
+    def shutdown(self) -> None:
+        for exporter in self._exporters:
+            exporter.shutdown()
+        self._exporters = []
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """Start a span as a child of the current span. Call `end_span` when done."""
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            start_time_ns=time.time_ns(),
+        )
+        span.set_attributes(**_bound_attributes.get())
+        span.set_attributes(**attributes)
+        return span
+
+    def end_span(self, span: Span) -> None:
+        span.end_time_ns = time.time_ns()
+        for exporter in self._exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                pass
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a span, marking it failed on exceptions."""
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+
+def bind_attributes(**attributes: Any) -> None:
+    """Attach attributes to every span created later in the current context."""
+    _bound_attributes.set({**_bound_attributes.get(), **attributes})
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def use_context(context: Optional[contextvars.Context]) -> Iterator[None]:
+    """Trace the enclosed block as if it ran in another context.
+
+    Spans opened in the block become children of the span that was current in
+    context and get the attributes bound there. Without a context the block
+    is traced as usual.
+    """
+    if context is None:
+        yield
+        return
+    span_token = _current_span.set(context.get(_current_span))
+    attributes_token = _bound_attributes.set(context.get(_bound_attributes, {}))
+    try:
+        yield
+    finally:
+        _bound_attributes.reset(attributes_token)
+        _current_span.reset(span_token)
+
+
+class TracedQueue(asyncio.Queue):
+    """Queue that keeps a copy of the context each item was put in.
+
+    Items are often handled by a long-lived consumer task started outside of
+    any run, where every span would begin a trace of its own. Take items with
+    `get_traced` and handle them in `use_context` to keep their spans in the
+    trace of the code that produced them.
+    """
+
+    def _put(self, item: Any) -> None:
+        super()._put((contextvars.copy_context(), item))
+
+    def _get(self) -> Any:
+        self._last_context, item = super()._get()
+        return item
+
+
+async def get_traced(
+    queue: asyncio.Queue,
+) -> tuple[Any, Optional[contextvars.Context]]:
+    """Take an item from a queue with the context it was put in, if known."""
+    item = await queue.get()
+    # get() returns right after _get, so no other consumer took an item since
+    return item, getattr(queue, "_last_context", None)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def configure_tracing(exporter: str, traces_path: Optional[str] = None) -> Tracer:
+    """Configure the process-wide tracer.
+
+    Args:
+        exporter: "file" for OTLP/JSON lines at traces_path, "memory" for an
+            in-process collector, "none" to only time spans without exporting
+        traces_path: Destination of the OTLP/JSON file exporter
+
+    Returns:
+        The configured tracer
+    """
+    _tracer.shutdown()
+    if exporter == "file":
+        if not traces_path:
+            raise ValueError("traces_path is required for the file trace exporter")
+        _tracer.add_exporter(OTLPJsonFileExporter(traces_path))
+    elif exporter == "memory":
+        _tracer.add_exporter(InMemorySpanCollector())
+    elif exporter != "none":
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+    return _tracer
+
+
+atexit.register(_tracer.shutdown)
@@ -0,0 +1,576 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, List, Optional
+import uuid
+from pathlib import Path
+from sqlalchemy import asc, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# Importing the sync manager runs the migrations before the first query
+from ii_agent.db.manager import (
+    EVENT_PAGE_ORDER,
+    dump_event_payload,
+    event_page_key,
+    events_after,
+    ii_agent_config,
+    load_event_payload,
+    payload_refs_of,
+)
+from ii_agent.db.engine import create_async_db_engine
+from ii_agent.db.models import Session, Event
+from ii_agent.db.search import (
+    delete_events_since_statement,
+    delete_session_name_statement,
+    delete_session_statement,
+    event_entry,
+    fts5_match_expression,
+    insert_statement,
+    search_result,
+    search_statement,
+    search_terms,
+    session_name_entry,
+    tsquery_expression,
+)
+from ii_agent.core.event import EventType, RealtimeEvent
+
+
+async_engine = create_async_db_engine(ii_agent_config.database_url, ii_agent_config)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+@asynccontextmanager
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get an asyncio database session as a context manager.
+
+    Yields:
+        A database session that will be automatically committed or rolled back
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def _load_events(rows) -> List[RealtimeEvent]:
+    return [
+        RealtimeEvent.model_validate({**load_event_payload(payload), "seq": seq})
+        for seq, payload in rows
+    ]
+
+
+class AsyncSessionsTable:
+    """Asyncio counterpart of SessionsTable for the server process."""
+
+    async def create_session(
+        self,
+        session_uuid: uuid.UUID,
+        workspace_path: Path,
+        device_id: Optional[str] = None,
+        sandbox_id: Optional[str] = None,
+    ) -> tuple[uuid.UUID, Path]:
+        """Create a new session with a UUID-based workspace directory.
+
+        Args:
+            session_uuid: The UUID for the session
+            workspace_path: The path to the workspace directory
+            device_id: Optional device identifier for the session
+            sandbox_id: Optional sandbox identifier for the session
+
+        Returns:
+            A tuple of (session_uuid, workspace_path)
+        """
+        async with get_async_db() as db:
+            db.add(
+                Session(
+                    id=session_uuid,
+                    workspace_dir=str(workspace_path),
+                    device_id=device_id,
+                    sandbox_id=sandbox_id,
+                )
+            )
+            await db.flush()
+
+        return session_uuid, workspace_path
+
+    async def get_session_by_workspace(self, workspace_dir: str) -> Optional[Session]:
+        """Get a session by its workspace directory.
+
+        Args:
+            workspace_dir: The workspace directory path
+
+        Returns:
+            The session if found, None otherwise
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Session).where(Session.workspace_dir == workspace_dir).limit(1)
+            )
+            return result.scalars().first()
+
+    async def get_session_by_id(self, session_id: uuid.UUID) -> Optional[Session]:
+        """Get a session by its UUID.
+
+        Args:
+            session_id: The UUID of the session
+
+        Returns:
+            The session if found, None otherwise
+        """
+        async with get_async_db() as db:
+            return await db.get(Session, str(session_id))
+
+    async def get_session_by_device_id(self, device_id: str) -> Optional[Session]:
+        """Get a session by its device ID.
+
+        Args:
+            device_id: The device identifier
+
+        Returns:
+            The session if found, None otherwise
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Session).where(Session.device_id == device_id).limit(1)
+            )
+            return result.scalars().first()
+
+    async def update_session_name(self, session_id: uuid.UUID, name: str) -> None:
+        """Update the name of a session.
+
+        Args:
+            session_id: The UUID of the session to update
+            name: The new name for the session
+        """
+        async with get_async_db() as db:
+            db_session = await db.get(Session, str(session_id))
+            if db_session:
+                db_session.name = name
+                await db.flush()
+                await db.execute(
+                    delete_session_name_statement(), {"session_id": str(session_id)}
+                )
+                entry = session_name_entry(session_id, name)
+                if entry is not None:
+                    await db.execute(insert_statement(), entry)
+
+    async def get_sandbox_id_by_session_id(
+        self, session_id: uuid.UUID
+    ) -> Optional[str]:
+        """Get the sandbox_id of a session.
+
+        Args:
+            session_id: The UUID of the session to get the sandbox_id for
+
+        Returns:
+            The sandbox_id if found, None otherwise
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Session.sandbox_id).where(Session.id == str(session_id))
+            )
+            return result.scalar()
+
+    async def update_session_sandbox_id(
+        self, session_id: uuid.UUID, sandbox_id: str
+    ) -> None:
+        """Update the sandbox_id of a session.
+
+        Args:
+            session_id: The UUID of the session to update
+            sandbox_id: The new sandbox_id for the session
+        """
+        async with get_async_db() as db:
+            db_session = await db.get(Session, str(session_id))
+            if db_session:
+                db_session.sandbox_id = sandbox_id
+                await db.flush()
+
+    async def update_session_metrics(
+        self, session_id: uuid.UUID, metrics: dict
+    ) -> None:
+        """Update the usage metrics of a session.
+
+        Args:
+            session_id: The UUID of the session to update
+            metrics: The aggregated token, cost and latency metrics
+        """
+        async with get_async_db() as db:
+            db_session = await db.get(Session, str(session_id))
+            if db_session:
+                db_session.metrics = metrics
+                await db.flush()
+
+    async def get_session_metrics(self, session_id: uuid.UUID) -> Optional[dict]:
+        """Get the usage metrics of a session.
+
+        Args:
+            session_id: The UUID of the session
+
+        Returns:
+            The metrics dictionary if recorded, None otherwise
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Session.metrics).where(Session.id == str(session_id))
+            )
+            return result.scalar()
+
+    async def get_sessions_by_device_id(self, device_id: str) -> List[dict]:
+        """Get all sessions for a specific device ID, sorted by creation time descending.
+
+        Args:
+            device_id: The device identifier to look up sessions for
+
+        Returns:
+            A list of session dictionaries with their details, sorted by creation time descending
+        """
+        async with get_async_db() as db:
+            query = text("""
+            SELECT
+                session.id,
+                session.workspace_dir,
+                session.created_at,
+                session.device_id,
+                session.name,
+                session.sandbox_id,
+                session.archived_at
+            FROM session
+            WHERE session.device_id = :device_id
+            ORDER BY session.created_at DESC
+            """)
+            result = await db.execute(query, {"device_id": device_id})
+
+            return [
+                {
+                    "id": row.id,
+                    "workspace_dir": row.workspace_dir,
+                    "created_at": row.created_at,
+                    "device_id": row.device_id,
+                    "name": row.name or "",
+                    "sandbox_id": row.sandbox_id,
+                    "archived_at": row.archived_at,
+                }
+                for row in result
+            ]
+
+    async def search_sessions(
+        self,
+        query: str,
+        device_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[dict]:
+        """Search the names and messages of sessions, best match first.
+
+        Args:
+            query: Free text; every word must match, the last one as a prefix
+            device_id: Only search the sessions of this device, if set
+            limit: Maximum number of sessions to return
+            offset: Number of sessions to skip, for paging
+
+        Returns:
+            A list of session dictionaries, each with the score, snippet,
+            kind and event id of its best match
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        dialect_name = async_engine.dialect.name
+        match = (
+            tsquery_expression(terms)
+            if dialect_name == "postgresql"
+            else fts5_match_expression(terms)
+        )
+        async with get_async_db() as db:
+            result = await db.execute(
+                search_statement(dialect_name, device_id is not None),
+                {
+                    "match": match,
+                    "device_id": device_id,
+                    "limit": limit,
+                    "offset": offset,
+                },
+            )
+            return [search_result(row) for row in result]
+
+
+class AsyncEventsTable:
+    """Asyncio counterpart of EventsTable for the server process."""
+
+    async def save_event(
+        self, session_id: uuid.UUID, event: RealtimeEvent
+    ) -> uuid.UUID:
+        """Save an event to the database.
+
+        Args:
+            session_id: The UUID of the session this event belongs to
+            event: The event to save
+
+        Returns:
+            The UUID of the created event
+        """
+        # Offloading compresses and writes large payloads, off the event loop
+        event_payload = await asyncio.to_thread(dump_event_payload, event)
+        async with get_async_db() as db:
+            db_event = Event(
+                session_id=session_id,
+                event_type=event.type.value,
+                event_payload=event_payload,
+                seq=event.seq,
+            )
+            db.add(db_event)
+            await db.flush()
+            db.add_all(payload_refs_of(db_event.id, event_payload))
+            entry = event_entry(
+                session_id, db_event.id, event.type.value, event.content
+            )
+            if entry is not None:
+                await db.execute(insert_statement(), entry)
+            return uuid.UUID(db_event.id)
+
+    async def get_session_events(self, session_id: uuid.UUID) -> list[Event]:
+        """Get all events for a session.
+
+        Args:
+            session_id: The UUID of the session
+
+        Returns:
+            A list of events for the session
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Event).where(Event.session_id == str(session_id))
+            )
+            return list(result.scalars().all())
+
+    async def get_last_seq(self, session_id: uuid.UUID) -> int:
+        """Get the highest event sequence number of a session.
+
+        Args:
+            session_id: The UUID of the session
+
+        Returns:
+            The highest sequence number, or 0 if no numbered event exists
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(func.max(Event.seq)).where(Event.session_id == str(session_id))
+            )
+            return result.scalar() or 0
+
+    async def get_events_after_seq(
+        self, session_id: uuid.UUID, after_seq: int, limit: Optional[int] = None
+    ) -> List[RealtimeEvent]:
+        """Get the events of a session with a sequence number above after_seq.
+
+        Args:
+            session_id: The UUID of the session
+            after_seq: Only events numbered strictly above this are returned
+            limit: Optional maximum number of events to return
+
+        Returns:
+            The events in sequence order
+        """
+        query = (
+            select(Event.seq, Event.event_payload)
+            .where(Event.session_id == str(session_id), Event.seq > after_seq)
+            .order_by(asc(Event.seq))
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        async with get_async_db() as db:
+            rows = (await db.execute(query)).all()
+        return await asyncio.to_thread(_load_events, rows)
+
+    async def get_session_events_by_type(
+        self,
+        session_id: uuid.UUID,
+        event_type: str,
+        until_seq: Optional[int] = None,
+    ) -> List[RealtimeEvent]:
+        """Get the events of one type of a session in the order they were emitted.
+
+        Args:
+            session_id: The UUID of the session
+            event_type: The event type to return
+            until_seq: Optional highest sequence number to include
+
+        Returns:
+            The events ordered by timestamp
+        """
+        query = select(Event.seq, Event.event_payload).where(
+            Event.session_id == str(session_id), Event.event_type == event_type
+        )
+        if until_seq is not None:
+            query = query.where(Event.seq <= until_seq)
+        query = query.order_by(asc(Event.timestamp), asc(Event.seq))
+        async with get_async_db() as db:
+            rows = (await db.execute(query)).all()
+        return await asyncio.to_thread(_load_events, rows)
+
+    async def delete_session_events(self, session_id: uuid.UUID) -> None:
+        """Delete all events for a session.
+
+        Args:
+            session_id: The UUID of the session to delete events for
+        """
+        async with get_async_db() as db:
+            await db.execute(
+                delete_session_statement(keep_name=True),
+                {"session_id": str(session_id)},
+            )
+            await db.execute(delete(Event).where(Event.session_id == str(session_id)))
+
+    async def delete_events_from_last_to_user_message(
+        self, session_id: uuid.UUID
+    ) -> None:
+        """Delete events from the most recent event backwards to the last user message (inclusive).
+        This preserves the conversation history before the last user message.
+
+        Args:
+            session_id: The UUID of the session to delete events for
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Event.timestamp)
+                .where(
+                    Event.session_id == str(session_id),
+                    Event.event_type == EventType.USER_MESSAGE.value,
+                )
+                .order_by(Event.timestamp.desc())
+                .limit(1)
+            )
+            last_user_timestamp = result.scalar()
+
+            query = delete(Event).where(Event.session_id == str(session_id))
+            if last_user_timestamp is not None:
+                await db.execute(
+                    delete_events_since_statement(),
+                    {"session_id": str(session_id), "since": last_user_timestamp},
+                )
+                # Delete all events after the last user message (inclusive)
+                query = query.where(Event.timestamp >= last_user_timestamp)
+            else:
+                await db.execute(
+                    delete_session_statement(keep_name=True),
+                    {"session_id": str(session_id)},
+                )
+            await db.execute(query)
+
+    async def get_session_events_with_details(self, session_id: str) -> List[dict]:
+        """Get all events for a specific session ID with session details, sorted by timestamp ascending.
+
+        Args:
+            session_id: The session identifier to look up events for
+
+        Returns:
+            A list of event dictionaries with their details, sorted by timestamp ascending
+        """
+        return [
+            event async for event in self.iter_session_events_with_details(session_id)
+        ]
+
+    async def get_session_events_page(
+        self,
+        session_id: str,
+        after: Optional[tuple[datetime, int, str]] = None,
+        limit: Optional[int] = None,
+        event_types: Optional[List[str]] = None,
+        workspace_dir: Optional[str] = None,
+    ) -> List[dict]:
+        """Get a page of the events of a session with session details.
+
+        Args:
+            session_id: The session identifier to look up events for
+            after: (timestamp, seq, id) of the last event of the previous page
+            limit: Optional maximum number of events to return
+            event_types: Optional event types to restrict the page to
+            workspace_dir: Workspace of the session, looked up if not given
+
+        Returns:
+            A list of event dictionaries with their details
+        """
+        query = select(
+            Event.id,
+            Event.session_id,
+            Event.timestamp,
+            Event.seq,
+            Event.event_type,
+            Event.event_payload,
+        ).where(Event.session_id == session_id)
+        if event_types:
+            query = query.where(Event.event_type.in_(event_types))
+        if after is not None:
+            query = query.where(events_after(after))
+        query = query.order_by(*EVENT_PAGE_ORDER)
+        if limit is not None:
+            query = query.limit(limit)
+
+        async with get_async_db() as db:
+            if workspace_dir is None:
+                result = await db.execute(
+                    select(Session.workspace_dir).where(Session.id == session_id)
+                )
+                workspace_dir = result.scalar()
+            rows = (await db.execute(query)).all()
+
+        return await asyncio.to_thread(
+            lambda: [
+                {
+                    "id": row.id,
+                    "session_id": row.session_id,
+                    "timestamp": row.timestamp.isoformat(),
+                    "seq": row.seq,
+                    "event_type": row.event_type,
+                    "event_payload": load_event_payload(row.event_payload),
+                    "workspace_dir": workspace_dir,
+                }
+                for row in rows
+            ]
+        )
+
+    async def iter_session_events_with_details(
+        self,
+        session_id: str,
+        after: Optional[tuple[datetime, int, str]] = None,
+        event_types: Optional[List[str]] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        """Iterate over the events of a session page by page.
+
+        Args:
+            session_id: The session identifier to look up events for
+            after: (timestamp, seq, id) of the event to start after
+            event_types: Optional event types to restrict the events to
+            batch_size: Number of events fetched per query
+
+        Yields:
+            Event dictionaries with their details, sorted by timestamp ascending
+        """
+        workspace_dir = None
+        while True:
+            page = await self.get_session_events_page(
+                session_id,
+                after=after,
+                limit=batch_size,
+                event_types=event_types,
+                workspace_dir=workspace_dir,
+            )
+            for event in page:
+                yield event
+            if len(page) < batch_size:
+                return
+            last = page[-1]
+            workspace_dir = last["workspace_dir"]
+            after = event_page_key(last)
+
+
+# Create singleton instances following Open WebUI pattern
+AsyncSessions = AsyncSessionsTable()
+AsyncEvents = AsyncEventsTable()
@@ -0,0 +1,126 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from ii_agent.core.config.ii_agent_config import IIAgentConfig
+
+
+def normalize_database_url(database_url: str) -> str:
+    """Map the postgres:// scheme used by most hosting providers to SQLAlchemy's."""
+    if database_url.startswith("postgres://"):
+        return "postgresql://" + database_url[len("postgres://") :]
+    return database_url
+
+
+def is_sqlite_url(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def to_async_database_url(database_url: str) -> str:
+    """Swap the driver of a database URL for its asyncio counterpart."""
+    url = make_url(normalize_database_url(database_url))
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(
+            hide_password=False
+        )
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").render_as_string(
+            hide_password=False
+        )
+    return url.render_as_string(hide_password=False)
+
+
+def _pool_options(config: IIAgentConfig) -> dict:
+    return {
+        "pool_size": config.database_pool_size,
+        "max_overflow": config.database_max_overflow,
+        "pool_recycle": config.database_pool_recycle,
+    }
+
+
+def _is_in_memory(database_url: str) -> bool:
+    return make_url(database_url).database in (None, "", ":memory:")
+
+
+def _configure_sqlite_on_connect(
+    engine: Engine, config: IIAgentConfig, in_memory: bool
+) -> None:
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(
+                f"PRAGMA busy_timeout={int(config.database_busy_timeout_ms)}"
+            )
+        finally:
+            cursor.close()
+
+
+def create_db_engine(database_url: str, config: IIAgentConfig) -> Engine:
+    """Create the engine of the session database, tuned for its backend.
+
+    SQLite runs in WAL mode with synchronous=NORMAL, so readers never block
+    the event writer and commits skip the per-transaction fsync of the WAL,
+    and waits on locks instead of failing with "database is locked".
+    Postgres gets a pre-pinged pool of long-lived connections.
+
+    Args:
+        database_url: SQLAlchemy URL of the database
+        config: Agent configuration holding the pool settings
+
+    Returns:
+        The engine
+    """
+    database_url = normalize_database_url(database_url)
+    pool_options = _pool_options(config)
+
+    if not is_sqlite_url(database_url):
+        return create_engine(database_url, pool_pre_ping=True, **pool_options)
+
+    in_memory = _is_in_memory(database_url)
+    engine = create_engine(
+        database_url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": config.database_busy_timeout_ms / 1000,
+        },
+        # An in-memory database only lives as long as its connection
+        **({} if in_memory else pool_options),
+    )
+    _configure_sqlite_on_connect(engine, config, in_memory)
+    return engine
+
+
+def create_async_db_engine(database_url: str, config: IIAgentConfig) -> AsyncEngine:
+    """Create an asyncio engine on the session database.
+
+    The engine talks to the same database as create_db_engine through the
+    asyncio driver of the backend, aiosqlite or asyncpg, with the same pool
+    settings and SQLite pragmas.
+
+    Args:
+        database_url: SQLAlchemy URL of the database, with or without an
+            asyncio driver
+        config: Agent configuration holding the pool settings
+
+    Returns:
+        The asyncio engine
+    """
+    database_url = to_async_database_url(database_url)
+    pool_options = _pool_options(config)
+
+    if not is_sqlite_url(database_url):
+        return create_async_engine(database_url, pool_pre_ping=True, **pool_options)
+
+    in_memory = _is_in_memory(database_url)
+    engine = create_async_engine(
+        database_url,
+        connect_args={"timeout": config.database_busy_timeout_ms / 1000},
+        **({} if in_memory else pool_options),
+    )
+    _configure_sqlite_on_connect(engine.sync_engine, config, in_memory)
+    return engine
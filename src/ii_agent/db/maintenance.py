@@ -0,0 +1,394 @@
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from ii_agent.core.checkpoint import CheckpointStore
+from ii_agent.core.config.ii_agent_config import IIAgentConfig
+from ii_agent.core.logger import logger
+from ii_agent.core.storage.blobs import BlobStore
+from ii_agent.core.storage.files import FileStore
+from ii_agent.core.storage.locations import CONVERSATION_BASE_DIR
+from ii_agent.db.engine import is_sqlite_url
+from ii_agent.db.manager import Events, Sessions, engine, event_page_key
+
+# Offloaded payloads younger than this are never swept, since their event
+# may not be committed yet
+PAYLOAD_SWEEP_GRACE_SECONDS = 3600
+# Offloaded payloads checked against the stored events per query
+PAYLOAD_SWEEP_BATCH_SIZE = 500
+# Pages handed back to the file system per incremental vacuum
+VACUUM_PAGES = 2000
+
+
+@dataclass
+class MaintenanceReport:
+    """What one maintenance pass did."""
+
+    archived_sessions: int = 0
+    deleted_sessions: int = 0
+    purged_workspaces: int = 0
+    swept_payloads: int = 0
+
+
+def _list_files(file_store: FileStore, path: str) -> list[str]:
+    try:
+        entries = file_store.list(path)
+    except FileNotFoundError:
+        return []
+    files = []
+    for entry in entries:
+        if entry.endswith("/"):
+            files.extend(_list_files(file_store, entry.rstrip("/")))
+        else:
+            files.append(entry)
+    return files
+
+
+class MaintenanceService:
+    """Background retention, archival and compaction of sessions.
+
+    Each pass applies the retention policies of the configuration, each
+    disabled while set to 0:
+
+    - Sessions without events for `archive_sessions_after_days` are archived:
+      their events, with offloaded payloads put back in, and their files in
+      the file store are written to a compressed bundle in the archive store,
+      then removed. The session row stays, so the session is still listed
+      and can be restored, which a chat attaching to it does first.
+    - Sessions archived for `delete_archived_sessions_after_days`, and not
+      used since, are deleted together with their bundle and workspace.
+    - Workspace directories without a session that were not modified for
+      `purge_orphaned_workspaces_after_hours` are removed.
+
+    After deleting rows, offloaded payloads no event references anymore are
+    swept and the database gives the freed pages back to the file system.
+
+    A pass handles at most `maintenance_batch_size` sessions per policy and
+    pauses `maintenance_pause_seconds` between sessions and between batches
+    of deleted events, so it never competes with live traffic. Sessions that
+    are running or have an in-flight run are left alone.
+    """
+
+    def __init__(
+        self,
+        config: IIAgentConfig,
+        file_store: FileStore,
+        payload_store: BlobStore,
+        archive_store: BlobStore,
+        is_active: Optional[Callable[[str], bool]] = None,
+    ):
+        """Initialize the service.
+
+        Args:
+            config: Agent configuration holding the retention policies
+            file_store: Store of the session files, such as agent state
+            payload_store: Store of the offloaded event payloads
+            archive_store: Store the session bundles are archived to
+            is_active: Tells whether a session is running on a worker; it
+                is called from a worker thread
+        """
+        self.config = config
+        self.file_store = file_store
+        self.payload_store = payload_store
+        self.archive_store = archive_store
+        self.is_active = is_active or (lambda session_id: False)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.maintenance_interval_seconds > 0 and (
+            self.config.archive_sessions_after_days > 0
+            or self.config.delete_archived_sessions_after_days > 0
+            or self.config.purge_orphaned_workspaces_after_hours > 0
+        )
+
+    def start(self) -> None:
+        """Run maintenance passes in the background, if any policy is enabled."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_loop())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.maintenance_interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Error running maintenance: {e}")
+
+    async def run_once(self) -> MaintenanceReport:
+        """Run one maintenance pass."""
+        report = MaintenanceReport()
+        now = datetime.utcnow()
+        batch_size = self.config.maintenance_batch_size
+
+        if self.config.archive_sessions_after_days > 0:
+            cutoff = now - timedelta(days=self.config.archive_sessions_after_days)
+            session_ids = await asyncio.to_thread(
+                Sessions.get_cold_session_ids, cutoff, batch_size
+            )
+            for session_id in session_ids:
+                if await self._archive_if_idle(session_id):
+                    report.archived_sessions += 1
+                await self._pause()
+
+        if self.config.delete_archived_sessions_after_days > 0:
+            cutoff = now - timedelta(
+                days=self.config.delete_archived_sessions_after_days
+            )
+            sessions = await asyncio.to_thread(
+                Sessions.get_archived_sessions, cutoff, batch_size
+            )
+            for session in sessions:
+                if await asyncio.to_thread(
+                    self._delete_archived_session,
+                    session.id,
+                    session.archive_digest,
+                    session.workspace_dir,
+                ):
+                    report.deleted_sessions += 1
+                await self._pause()
+
+        if self.config.purge_orphaned_workspaces_after_hours > 0:
+            report.purged_workspaces = await self._purge_orphaned_workspaces(
+                time.time() - self.config.purge_orphaned_workspaces_after_hours * 3600
+            )
+
+        if report.archived_sessions or report.deleted_sessions:
+            report.swept_payloads = await self._sweep_payloads()
+            await asyncio.to_thread(self._compact)
+
+        logger.info(f"Maintenance pass finished: {report}")
+        return report
+
+    async def _pause(self) -> None:
+        await asyncio.sleep(self.config.maintenance_pause_seconds)
+
+    async def _archive_if_idle(self, session_id: str) -> bool:
+        if await asyncio.to_thread(self.is_active, session_id):
+            return False
+        checkpoint_store = CheckpointStore(self.file_store, session_id)
+        if await asyncio.to_thread(checkpoint_store.load_in_flight) is not None:
+            return False
+        await self.archive_session(session_id)
+        return True
+
+    async def archive_session(self, session_id: str) -> str:
+        """Move the events and files of a session to a compressed bundle.
+
+        Only the events written to the bundle are removed. If the session
+        started running again meanwhile, it is restored right away.
+
+        Returns:
+            Digest of the bundle in the archive store
+        """
+        digest, last_event = await asyncio.to_thread(self._write_bundle, session_id)
+        # Only remove anything once the bundle is safely stored
+        await asyncio.to_thread(
+            Sessions.mark_session_archived, uuid.UUID(session_id), digest
+        )
+        if last_event is not None:
+            await self._delete_events(session_id, last_event)
+        await asyncio.to_thread(
+            self.file_store.delete, f"{CONVERSATION_BASE_DIR}/{session_id}"
+        )
+        logger.info(f"Archived session {session_id} to bundle {digest}")
+        if await asyncio.to_thread(self.is_active, session_id):
+            await asyncio.to_thread(self.restore_session, session_id)
+        return digest
+
+    def restore_session(self, session_id: str) -> None:
+        """Put the events and files of an archived session back in place.
+
+        Raises:
+            ValueError: If the session is not archived
+        """
+        session = Sessions.get_session_by_id(uuid.UUID(session_id))
+        if session is None or session.archive_digest is None:
+            raise ValueError(f"Session {session_id} is not archived")
+        bundle = self.archive_store.get(session.archive_digest)
+        events = []
+        for line in bundle.decode("utf-8").splitlines():
+            record = json.loads(line)
+            if record["type"] == "event":
+                events.append(record)
+            elif record["type"] == "file":
+                self.file_store.write(record["path"], record["content"])
+        for start in range(0, len(events), 500):
+            Events.restore_session_events(
+                uuid.UUID(session_id), events[start : start + 500]
+            )
+        Sessions.mark_session_archived(uuid.UUID(session_id), None)
+        self.archive_store.delete(session.archive_digest)
+        logger.info(f"Restored session {session_id} from its archive")
+
+    def restore_if_archived(self, session_id: str) -> bool:
+        """Restore a session if it is archived.
+
+        Returns:
+            Whether the session was archived
+        """
+        session = Sessions.get_session_by_id(uuid.UUID(session_id))
+        if session is None or session.archive_digest is None:
+            return False
+        self.restore_session(session_id)
+        return True
+
+    def _write_bundle(
+        self, session_id: str
+    ) -> tuple[str, Optional[tuple[datetime, int, str]]]:
+        """Write the events and files of a session to a bundle.
+
+        Returns:
+            Digest of the bundle and (timestamp, seq, id) of its last event
+        """
+        session = Sessions.get_session_by_id(uuid.UUID(session_id))
+        lines = [
+            json.dumps(
+                {
+                    "type": "session",
+                    "id": session.id,
+                    "workspace_dir": session.workspace_dir,
+                    "created_at": session.created_at.isoformat()
+                    if session.created_at
+                    else None,
+                    "device_id": session.device_id,
+                    "name": session.name,
+                    "sandbox_id": session.sandbox_id,
+                    "metrics": session.metrics,
+                }
+            )
+        ]
+        last_event = None
+        for event in Events.iter_session_events_with_details(session_id):
+            last_event = event_page_key(event)
+            lines.append(
+                json.dumps(
+                    {
+                        "type": "event",
+                        "id": event["id"],
+                        "timestamp": event["timestamp"],
+                        "event_type": event["event_type"],
+                        "seq": event["seq"],
+                        "event_payload": event["event_payload"],
+                    }
+                )
+            )
+        session_dir = f"{CONVERSATION_BASE_DIR}/{session_id}"
+        for path in _list_files(self.file_store, session_dir):
+            content = self.file_store.read(path)
+            lines.append(json.dumps({"type": "file", "path": path, "content": content}))
+        return self.archive_store.put("\n".join(lines).encode("utf-8")), last_event
+
+    async def _delete_events(
+        self, session_id: str, up_to: tuple[datetime, int, str]
+    ) -> None:
+        while await asyncio.to_thread(
+            Events.delete_session_events_batch, uuid.UUID(session_id), 500, up_to
+        ):
+            await self._pause()
+
+    def _delete_archived_session(
+        self, session_id: str, archive_digest: Optional[str], workspace_dir: str
+    ) -> bool:
+        if self.is_active(session_id):
+            return False
+        Sessions.delete_session(uuid.UUID(session_id))
+        if archive_digest is not None:
+            self.archive_store.delete(archive_digest)
+        self.file_store.delete(f"{CONVERSATION_BASE_DIR}/{session_id}")
+        workspace = self._workspace_path(session_id)
+        if workspace is not None:
+            shutil.rmtree(workspace, ignore_errors=True)
+        logger.info(f"Deleted archived session {session_id} ({workspace_dir})")
+        return True
+
+    def _workspace_path(self, session_id: str) -> Optional[Path]:
+        root = Path(self.config.workspace_root).resolve()
+        workspace = (root / session_id).resolve()
+        # Never follow a session id out of the workspace root
+        if workspace.parent != root or not workspace.is_dir():
+            return None
+        return workspace
+
+    async def _purge_orphaned_workspaces(self, modified_before: float) -> int:
+        root = Path(self.config.workspace_root)
+        if not root.is_dir():
+            return 0
+        candidates = []
+        for entry in os.scandir(root):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                uuid.UUID(entry.name)
+            except ValueError:
+                continue
+            if entry.stat(follow_symlinks=False).st_mtime < modified_before:
+                candidates.append(entry.name)
+            if len(candidates) >= self.config.maintenance_batch_size:
+                break
+
+        existing = await asyncio.to_thread(
+            Sessions.get_existing_session_ids, candidates
+        )
+        purged = 0
+        for session_id in candidates:
+            if session_id in existing or await asyncio.to_thread(
+                self.is_active, session_id
+            ):
+                continue
+            await asyncio.to_thread(shutil.rmtree, root / session_id, True)
+            logger.info(f"Purged orphaned workspace {session_id}")
+            purged += 1
+            await self._pause()
+        return purged
+
+    async def _sweep_payloads(self) -> int:
+        """Delete the offloaded payloads no stored event references.
+
+        Payloads are checked batch by batch against the payload references
+        of the events. Those stored, or stored again, during the grace
+        period are kept, since the event referencing them may not be
+        committed yet.
+        """
+        stored_before = time.time() - PAYLOAD_SWEEP_GRACE_SECONDS
+        digests = self.payload_store.iter_digests(stored_before)
+        swept = 0
+        while True:
+            batch = await asyncio.to_thread(
+                list, itertools.islice(digests, PAYLOAD_SWEEP_BATCH_SIZE)
+            )
+            if not batch:
+                return swept
+            referenced = await asyncio.to_thread(Events.get_referenced_payloads, batch)
+            unreferenced = [digest for digest in batch if digest not in referenced]
+            for digest in unreferenced:
+                await asyncio.to_thread(
+                    self.payload_store.delete, digest, stored_before
+                )
+            await asyncio.to_thread(Events.delete_payload_refs, unreferenced)
+            swept += len(unreferenced)
+            await self._pause()
+
+    def _compact(self) -> None:
+        if not is_sqlite_url(str(engine.url)):
+            # Postgres reclaims the space of deleted rows with autovacuum
+            return
+        with engine.connect() as connection:
+            connection.execute(text(f"PRAGMA incremental_vacuum({VACUUM_PAGES})"))
+            connection.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
+            connection.execute(text("PRAGMA optimize"))
@@ -1,13 +1,35 @@
 from contextlib import contextmanager
-from typing import Optional, Generator, List
+from datetime import datetime, timedelta
+from typing import Optional, Generator, Iterator, List
 import uuid
 from pathlib import Path
-from sqlalchemy import asc, create_engine, text
+from sqlalchemy import and_, asc, func, or_, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session as DBSession, sessionmaker
 from ii_agent.core.config.utils import load_ii_agent_config
-from ii_agent.db.models import Session, Event
+from ii_agent.db.engine import create_db_engine
+from ii_agent.db.models import Session, Event, EventPayloadRef, SessionOwner
+from ii_agent.db.search import (
+    delete_events_since_statement,
+    delete_session_name_statement,
+    delete_session_statement,
+    event_entry,
+    fts5_match_expression,
+    insert_statement,
+    search_result,
+    search_statement,
+    search_terms,
+    session_name_entry,
+    tsquery_expression,
+)
 from ii_agent.core.event import EventType, RealtimeEvent
 from ii_agent.core.config.ii_agent_config import II_AGENT_DIR
+from ii_agent.core.storage.payloads import (
+    collect_payload_refs,
+    get_payload_store,
+    offload_payload,
+    rehydrate_payload,
+)
 from ii_agent.core.logger import logger
 
 
@@ -29,12 +51,15 @@ def run_migrations():
 
 run_migrations()
 
-engine = create_engine(
-    load_ii_agent_config().database_url, connect_args={"check_same_thread": False}
-)
+ii_agent_config = load_ii_agent_config()
+engine = create_db_engine(ii_agent_config.database_url, ii_agent_config)
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
 )
+# Large strings of event payloads are kept compressed outside the event table
+payload_store = get_payload_store(
+    ii_agent_config.file_store, ii_agent_config.file_store_path
+)
 
 
 @contextmanager
@@ -55,6 +80,57 @@ def get_db() -> Generator[DBSession, None, None]:
         db.close()
 
 
+def dump_event_payload(event: RealtimeEvent) -> dict:
+    """Build the stored payload of an event, offloading its large strings."""
+    return store_event_payload(event.model_dump())
+
+
+def store_event_payload(payload: dict) -> dict:
+    """Offload the large strings of an event payload about to be stored."""
+    threshold = ii_agent_config.event_payload_offload_bytes
+    if threshold <= 0:
+        return payload
+    return offload_payload(payload, payload_store, threshold)
+
+
+def load_event_payload(payload: dict) -> dict:
+    """Restore the offloaded strings of a stored event payload."""
+    return rehydrate_payload(payload, payload_store)
+
+
+def payload_refs_of(event_id: str, payload: dict) -> List[EventPayloadRef]:
+    """Get the payload references to store with an event."""
+    return [
+        EventPayloadRef(event_id, digest) for digest in collect_payload_refs(payload)
+    ]
+
+
+# Events saved before sequence numbers were recorded sort first among the
+# events of their timestamp
+_EVENT_SEQ = func.coalesce(Event.seq, -1)
+EVENT_PAGE_ORDER = (asc(Event.timestamp), asc(_EVENT_SEQ), asc(Event.id))
+
+
+def event_page_key(event: dict) -> tuple[datetime, int, str]:
+    """Get the (timestamp, seq, id) paging key of an event dictionary."""
+    seq = event.get("seq")
+    return (
+        datetime.fromisoformat(event["timestamp"]),
+        -1 if seq is None else seq,
+        event["id"],
+    )
+
+
+def events_after(after: tuple[datetime, int, str]):
+    """Filter the events that come after a paging key in page order."""
+    timestamp, seq, event_id = after
+    return or_(
+        Event.timestamp > timestamp,
+        and_(Event.timestamp == timestamp, _EVENT_SEQ > seq),
+        and_(Event.timestamp == timestamp, _EVENT_SEQ == seq, Event.id > event_id),
+    )
+
+
 class SessionsTable:
     """Table class for session operations following Open WebUI pattern."""
 
@@ -139,6 +215,12 @@ class SessionsTable:
             if db_session:
                 db_session.name = name
                 db.flush()
+                db.execute(
+                    delete_session_name_statement(), {"session_id": str(session_id)}
+                )
+                entry = session_name_entry(session_id, name)
+                if entry is not None:
+                    db.execute(insert_statement(), entry)
 
     def get_sandbox_id_by_session_id(self, session_id: uuid.UUID) -> Optional[str]:
         """Get the sandbox_id of a session.
@@ -170,6 +252,32 @@ class SessionsTable:
                 db_session.sandbox_id = sandbox_id
                 db.flush()
 
+    def update_session_metrics(self, session_id: uuid.UUID, metrics: dict) -> None:
+        """Update the usage metrics of a session.
+
+        Args:
+            session_id: The UUID of the session to update
+            metrics: The aggregated token, cost and latency metrics
+        """
+        with get_db() as db:
+            db_session = db.query(Session).filter(Session.id == str(session_id)).first()
+            if db_session:
+                db_session.metrics = metrics
+                db.flush()
+
+    def get_session_metrics(self, session_id: uuid.UUID) -> Optional[dict]:
+        """Get the usage metrics of a session.
+
+        Args:
+            session_id: The UUID of the session
+
+        Returns:
+            The metrics dictionary if recorded, None otherwise
+        """
+        with get_db() as db:
+            db_session = db.query(Session).filter(Session.id == str(session_id)).first()
+            return db_session.metrics if db_session else None
+
     def get_sessions_by_device_id(self, device_id: str) -> List[dict]:
         """Get all sessions for a specific device ID, sorted by creation time descending.
 
@@ -188,7 +296,8 @@ class SessionsTable:
                 session.created_at,
                 session.device_id,
                 session.name,
-                session.sandbox_id
+                session.sandbox_id,
+                session.archived_at
             FROM session
             WHERE session.device_id = :device_id
             ORDER BY session.created_at DESC
@@ -207,11 +316,172 @@ class SessionsTable:
                     "device_id": row.device_id,
                     "name": row.name or "",
                     "sandbox_id": row.sandbox_id,
+                    "archived_at": row.archived_at,
                 }
                 sessions.append(session_data)
 
             return sessions
 
+    def search_sessions(
+        self,
+        query: str,
+        device_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[dict]:
+        """Search the names and messages of sessions, best match first.
+
+        Archived sessions are searched too, since their rows in the search
+        index are kept.
+
+        Args:
+            query: Free text; every word must match, the last one as a prefix
+            device_id: Only search the sessions of this device, if set
+            limit: Maximum number of sessions to return
+            offset: Number of sessions to skip, for paging
+
+        Returns:
+            A list of session dictionaries, each with the score, snippet,
+            kind and event id of its best match
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        dialect_name = engine.dialect.name
+        match = (
+            tsquery_expression(terms)
+            if dialect_name == "postgresql"
+            else fts5_match_expression(terms)
+        )
+        with get_db() as db:
+            result = db.execute(
+                search_statement(dialect_name, device_id is not None),
+                {
+                    "match": match,
+                    "device_id": device_id,
+                    "limit": limit,
+                    "offset": offset,
+                },
+            )
+            return [search_result(row) for row in result]
+
+    def get_cold_session_ids(self, inactive_since: datetime, limit: int) -> List[str]:
+        """Get sessions that are not archived and saw no event since a time.
+
+        Sessions are visited in creation order through an index, each with
+        an index lookup of its recent events, so the event table is never
+        scanned as a whole.
+
+        Args:
+            inactive_since: Sessions created before this whose last event, if
+                any, is older than this are returned
+            limit: Maximum number of sessions to return
+
+        Returns:
+            The session ids, oldest session first
+        """
+        with get_db() as db:
+            recent_events = (
+                db.query(Event.id)
+                .filter(
+                    Event.session_id == Session.id,
+                    Event.timestamp >= inactive_since,
+                )
+                .exists()
+            )
+            rows = (
+                db.query(Session.id)
+                .filter(
+                    Session.archived_at.is_(None),
+                    Session.created_at < inactive_since,
+                    ~recent_events,
+                )
+                .order_by(asc(Session.created_at))
+                .limit(limit)
+                .all()
+            )
+            return [row.id for row in rows]
+
+    def get_archived_sessions(
+        self, archived_before: datetime, limit: int
+    ) -> List[Session]:
+        """Get sessions archived before a time.
+
+        Sessions that saw events since they were archived are in use again
+        and are left out.
+
+        Args:
+            archived_before: Sessions archived before this are returned
+            limit: Maximum number of sessions to return
+
+        Returns:
+            The sessions, oldest archive first
+        """
+        with get_db() as db:
+            newer_events = (
+                db.query(Event.id)
+                .filter(
+                    Event.session_id == Session.id,
+                    Event.timestamp >= Session.archived_at,
+                )
+                .exists()
+            )
+            return (
+                db.query(Session)
+                .filter(Session.archived_at < archived_before, ~newer_events)
+                .order_by(asc(Session.archived_at))
+                .limit(limit)
+                .all()
+            )
+
+    def mark_session_archived(
+        self, session_id: uuid.UUID, archive_digest: Optional[str]
+    ) -> None:
+        """Record that the events and files of a session were archived.
+
+        Args:
+            session_id: The UUID of the session
+            archive_digest: Digest of the archive bundle, None to mark the
+                session as restored
+        """
+        with get_db() as db:
+            db_session = db.query(Session).filter(Session.id == str(session_id)).first()
+            if db_session:
+                db_session.archive_digest = archive_digest
+                db_session.archived_at = (
+                    datetime.utcnow() if archive_digest is not None else None
+                )
+                db.flush()
+
+    def delete_session(self, session_id: uuid.UUID) -> None:
+        """Delete a session together with its events and ownership record.
+
+        Args:
+            session_id: The UUID of the session to delete
+        """
+        with get_db() as db:
+            db.execute(delete_session_statement(), {"session_id": str(session_id)})
+            db.query(Event).filter(Event.session_id == str(session_id)).delete()
+            db.query(SessionOwner).filter(
+                SessionOwner.session_id == str(session_id)
+            ).delete()
+            db.query(Session).filter(Session.id == str(session_id)).delete()
+
+    def get_existing_session_ids(self, session_ids: List[str]) -> set[str]:
+        """Get which of the given session ids exist.
+
+        Args:
+            session_ids: The session ids to look up
+
+        Returns:
+            The ids that belong to a session
+        """
+        if not session_ids:
+            return set()
+        with get_db() as db:
+            rows = db.query(Session.id).filter(Session.id.in_(session_ids)).all()
+            return {row.id for row in rows}
+
 
 class EventsTable:
     """Table class for event operations following Open WebUI pattern."""
@@ -230,10 +500,17 @@ class EventsTable:
             db_event = Event(
                 session_id=session_id,
                 event_type=event.type.value,
-                event_payload=event.model_dump(),
+                event_payload=dump_event_payload(event),
+                seq=event.seq,
             )
             db.add(db_event)
             db.flush()  # This will populate the id field
+            db.add_all(payload_refs_of(db_event.id, db_event.event_payload))
+            entry = event_entry(
+                session_id, db_event.id, event.type.value, event.content
+            )
+            if entry is not None:
+                db.execute(insert_statement(), entry)
             return uuid.UUID(db_event.id)
 
     def get_session_events(self, session_id: uuid.UUID) -> list[Event]:
@@ -248,6 +525,171 @@ class EventsTable:
         with get_db() as db:
             return db.query(Event).filter(Event.session_id == str(session_id)).all()
 
+    def get_last_seq(self, session_id: uuid.UUID) -> int:
+        """Get the highest event sequence number of a session.
+
+        Args:
+            session_id: The UUID of the session
+
+        Returns:
+            The highest sequence number, or 0 if no numbered event exists
+        """
+        with get_db() as db:
+            last_seq = (
+                db.query(func.max(Event.seq))
+                .filter(Event.session_id == str(session_id))
+                .scalar()
+            )
+            return last_seq or 0
+
+    def get_events_after_seq(
+        self, session_id: uuid.UUID, after_seq: int, limit: Optional[int] = None
+    ) -> List[RealtimeEvent]:
+        """Get the events of a session with a sequence number above after_seq.
+
+        Args:
+            session_id: The UUID of the session
+            after_seq: Only events numbered strictly above this are returned
+            limit: Optional maximum number of events to return
+
+        Returns:
+            The events in sequence order
+        """
+        with get_db() as db:
+            query = (
+                db.query(Event.seq, Event.event_payload)
+                .filter(Event.session_id == str(session_id), Event.seq > after_seq)
+                .order_by(asc(Event.seq))
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            return [
+                RealtimeEvent.model_validate(
+                    {**load_event_payload(payload), "seq": seq}
+                )
+                for seq, payload in query.all()
+            ]
+
+    def get_session_events_by_type(
+        self,
+        session_id: uuid.UUID,
+        event_type: str,
+        until_seq: Optional[int] = None,
+    ) -> List[RealtimeEvent]:
+        """Get the events of one type of a session in the order they were emitted.
+
+        Args:
+            session_id: The UUID of the session
+            event_type: The event type to return
+            until_seq: Optional highest sequence number to include
+
+        Returns:
+            The events ordered by timestamp
+        """
+        with get_db() as db:
+            query = db.query(Event.seq, Event.event_payload).filter(
+                Event.session_id == str(session_id), Event.event_type == event_type
+            )
+            if until_seq is not None:
+                query = query.filter(Event.seq <= until_seq)
+            query = query.order_by(asc(Event.timestamp), asc(Event.seq))
+            return [
+                RealtimeEvent.model_validate(
+                    {**load_event_payload(payload), "seq": seq}
+                )
+                for seq, payload in query.all()
+            ]
+
+    def delete_session_events_batch(
+        self,
+        session_id: uuid.UUID,
+        batch_size: int = 500,
+        up_to: Optional[tuple[datetime, int, str]] = None,
+    ) -> int:
+        """Delete up to batch_size events of a session.
+
+        Deleting a large session in batches keeps every write transaction,
+        and the time it holds the database lock, short.
+
+        Args:
+            session_id: The UUID of the session to delete events for
+            batch_size: Maximum number of events to delete
+            up_to: (timestamp, seq, id) of the last event to delete in page
+                order; later events are kept
+
+        Returns:
+            The number of events deleted
+        """
+        with get_db() as db:
+            query = db.query(Event.id).filter(Event.session_id == str(session_id))
+            if up_to is not None:
+                query = query.filter(~events_after(up_to))
+            event_ids = [row.id for row in query.limit(batch_size).all()]
+            if not event_ids:
+                return 0
+            db.query(EventPayloadRef).filter(
+                EventPayloadRef.event_id.in_(event_ids)
+            ).delete(synchronize_session=False)
+            db.query(Event).filter(Event.id.in_(event_ids)).delete(
+                synchronize_session=False
+            )
+            return len(event_ids)
+
+    def restore_session_events(self, session_id: uuid.UUID, events: List[dict]) -> None:
+        """Insert archived events of a session back into the event table.
+
+        Args:
+            session_id: The UUID of the session
+            events: Event dictionaries as written to an archive bundle, with
+                id, timestamp, event_type, seq and the full event_payload
+        """
+        with get_db() as db:
+            for event in events:
+                db_event = Event(
+                    session_id=session_id,
+                    event_type=event["event_type"],
+                    event_payload=store_event_payload(event["event_payload"]),
+                    seq=event.get("seq"),
+                )
+                db_event.id = event["id"]
+                db_event.timestamp = datetime.fromisoformat(event["timestamp"])
+                db.add(db_event)
+                db.add_all(payload_refs_of(db_event.id, db_event.event_payload))
+
+    def get_referenced_payloads(self, digests: List[str]) -> set[str]:
+        """Get which of the given offloaded payloads stored events reference.
+
+        Args:
+            digests: Digests of payloads in the payload store
+
+        Returns:
+            The digests referenced by an event that still exists
+        """
+        if not digests:
+            return set()
+        with get_db() as db:
+            rows = (
+                db.query(EventPayloadRef.digest)
+                .join(Event, Event.id == EventPayloadRef.event_id)
+                .filter(EventPayloadRef.digest.in_(digests))
+                .distinct()
+                .all()
+            )
+            return {row.digest for row in rows}
+
+    def delete_payload_refs(self, digests: List[str]) -> None:
+        """Forget the references to payloads that were deleted.
+
+        Args:
+            digests: Digests of payloads no existing event references
+        """
+        if not digests:
+            return
+        with get_db() as db:
+            db.query(EventPayloadRef).filter(
+                EventPayloadRef.digest.in_(digests)
+            ).delete(synchronize_session=False)
+
     def delete_session_events(self, session_id: uuid.UUID) -> None:
         """Delete all events for a session.
 
@@ -255,6 +697,10 @@ class EventsTable:
             session_id: The UUID of the session to delete events for
         """
         with get_db() as db:
+            db.execute(
+                delete_session_statement(keep_name=True),
+                {"session_id": str(session_id)},
+            )
             db.query(Event).filter(Event.session_id == str(session_id)).delete()
 
     def delete_events_from_last_to_user_message(self, session_id: uuid.UUID) -> None:
@@ -277,6 +723,13 @@ class EventsTable:
             )
 
             if last_user_event:
+                db.execute(
+                    delete_events_since_statement(),
+                    {
+                        "session_id": str(session_id),
+                        "since": last_user_event.timestamp,
+                    },
+                )
                 # Delete all events after the last user message (inclusive)
                 db.query(Event).filter(
                     Event.session_id == str(session_id),
@@ -284,6 +737,10 @@ class EventsTable:
                 ).delete()
             else:
                 # If no user message found, delete all events
+                db.execute(
+                    delete_session_statement(keep_name=True),
+                    {"session_id": str(session_id)},
+                )
                 db.query(Event).filter(Event.session_id == str(session_id)).delete()
 
     def get_session_events_with_details(self, session_id: str) -> List[dict]:
@@ -295,30 +752,248 @@ class EventsTable:
         Returns:
             A list of event dictionaries with their details, sorted by timestamp ascending
         """
+        return list(self.iter_session_events_with_details(session_id))
+
+    def get_session_events_page(
+        self,
+        session_id: str,
+        after: Optional[tuple[datetime, int, str]] = None,
+        limit: Optional[int] = None,
+        event_types: Optional[List[str]] = None,
+        workspace_dir: Optional[str] = None,
+    ) -> List[dict]:
+        """Get a page of the events of a session with session details.
+
+        Events are ordered by timestamp, sequence number and id, and paged by
+        keyset, so a page costs the same wherever it is in the session.
+
+        Args:
+            session_id: The session identifier to look up events for
+            after: (timestamp, seq, id) of the last event of the previous page
+            limit: Optional maximum number of events to return
+            event_types: Optional event types to restrict the page to
+            workspace_dir: Workspace of the session, looked up if not given
+
+        Returns:
+            A list of event dictionaries with their details
+        """
         with get_db() as db:
-            events = (
-                db.query(Event)
-                .filter(Event.session_id == session_id)
-                .order_by(asc(Event.timestamp))
-                .all()
+            if workspace_dir is None:
+                workspace_dir = (
+                    db.query(Session.workspace_dir)
+                    .filter(Session.id == session_id)
+                    .scalar()
+                )
+            query = db.query(
+                Event.id,
+                Event.session_id,
+                Event.timestamp,
+                Event.seq,
+                Event.event_type,
+                Event.event_payload,
+            ).filter(Event.session_id == session_id)
+            if event_types:
+                query = query.filter(Event.event_type.in_(event_types))
+            if after is not None:
+                query = query.filter(events_after(after))
+            query = query.order_by(*EVENT_PAGE_ORDER)
+            if limit is not None:
+                query = query.limit(limit)
+
+            return [
+                {
+                    "id": row.id,
+                    "session_id": row.session_id,
+                    "timestamp": row.timestamp.isoformat(),
+                    "seq": row.seq,
+                    "event_type": row.event_type,
+                    "event_payload": load_event_payload(row.event_payload),
+                    "workspace_dir": workspace_dir,
+                }
+                for row in query.all()
+            ]
+
+    def iter_session_events_with_details(
+        self,
+        session_id: str,
+        after: Optional[tuple[datetime, int, str]] = None,
+        event_types: Optional[List[str]] = None,
+        batch_size: int = 500,
+    ) -> Iterator[dict]:
+        """Iterate over the events of a session page by page.
+
+        Only one page is held in memory at a time, and no database session
+        stays open between pages.
+
+        Args:
+            session_id: The session identifier to look up events for
+            after: (timestamp, seq, id) of the event to start after
+            event_types: Optional event types to restrict the events to
+            batch_size: Number of events fetched per query
+
+        Yields:
+            Event dictionaries with their details, sorted by timestamp ascending
+        """
+        workspace_dir = None
+        while True:
+            page = self.get_session_events_page(
+                session_id,
+                after=after,
+                limit=batch_size,
+                event_types=event_types,
+                workspace_dir=workspace_dir,
             )
+            yield from page
+            if len(page) < batch_size:
+                return
+            last = page[-1]
+            workspace_dir = last["workspace_dir"]
+            after = event_page_key(last)
+
+
+class SessionOwnersTable:
+    """Table class for session ownership operations following Open WebUI pattern."""
+
+    def claim_session(
+        self,
+        session_id: str,
+        worker_id: str,
+        lease_seconds: float,
+        worker_url: Optional[str] = None,
+    ) -> SessionOwner:
+        """Claim a session for a worker unless another worker holds a live lease.
 
-            # Convert events to a list of dictionaries
-            event_list = []
-            for e in events:
-                event_data = {
-                    "id": e.id,
-                    "session_id": e.session_id,
-                    "timestamp": e.timestamp.isoformat(),
-                    "event_type": e.event_type,
-                    "event_payload": e.event_payload,
-                    "workspace_dir": e.session.workspace_dir,
+        Args:
+            session_id: The session identifier
+            worker_id: Identifier of the claiming worker
+            lease_seconds: How long the claim lasts unless renewed
+            worker_url: Optional websocket URL of the claiming worker
+
+        Returns:
+            The owner of the session after the claim, which is another worker
+            if that worker's lease has not expired yet
+        """
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=lease_seconds)
+        try:
+            with get_db() as db:
+                owner = (
+                    db.query(SessionOwner)
+                    .filter(SessionOwner.session_id == str(session_id))
+                    .first()
+                )
+                if owner is None:
+                    owner = SessionOwner(
+                        session_id=session_id,
+                        worker_id=worker_id,
+                        lease_expires_at=lease_expires_at,
+                        worker_url=worker_url,
+                    )
+                    db.add(owner)
+                    db.flush()
+                    return owner
+                if owner.worker_id != worker_id and owner.lease_expires_at > now:
+                    return owner
+
+                # Take the claim over with a conditional update rather than
+                # writing what was read: SQLite ignores FOR UPDATE, so two
+                # workers may both have read the expired claim, and only the
+                # first update still matches it
+                values = {
+                    SessionOwner.worker_id: worker_id,
+                    SessionOwner.worker_url: worker_url,
+                    SessionOwner.lease_expires_at: lease_expires_at,
                 }
-                event_list.append(event_data)
+                conditions = [
+                    SessionOwner.session_id == str(session_id),
+                    SessionOwner.worker_id == owner.worker_id,
+                ]
+                if owner.worker_id != worker_id:
+                    values[SessionOwner.claimed_at] = now
+                    conditions.append(SessionOwner.lease_expires_at <= now)
+                updated = (
+                    db.query(SessionOwner)
+                    .filter(*conditions)
+                    .update(values, synchronize_session=False)
+                )
+                if updated:
+                    db.refresh(owner)
+                    return owner
+        except IntegrityError:
+            # Another worker inserted the claim first
+            pass
+        # Another worker inserted or took over the claim since it was read
+        return self.get_session_owner(session_id)
+
+    def renew_leases(
+        self, worker_id: str, session_ids: List[str], lease_seconds: float
+    ) -> set[str]:
+        """Extend the leases a worker holds on its sessions.
 
-            return event_list
+        Args:
+            worker_id: Identifier of the owning worker
+            session_ids: The sessions the worker is running
+            lease_seconds: New lease duration from now
+
+        Returns:
+            The session ids the worker still owns
+        """
+        if not session_ids:
+            return set()
+        with get_db() as db:
+            owned = (
+                db.query(SessionOwner)
+                .filter(
+                    SessionOwner.session_id.in_([str(sid) for sid in session_ids]),
+                    SessionOwner.worker_id == worker_id,
+                )
+                .all()
+            )
+            lease_expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds)
+            for owner in owned:
+                owner.lease_expires_at = lease_expires_at
+            return {owner.session_id for owner in owned}
+
+    def get_session_owner(self, session_id: str) -> Optional[SessionOwner]:
+        """Get the ownership record of a session.
+
+        Args:
+            session_id: The session identifier
+
+        Returns:
+            The ownership record if the session was claimed, None otherwise
+        """
+        with get_db() as db:
+            return (
+                db.query(SessionOwner)
+                .filter(SessionOwner.session_id == str(session_id))
+                .first()
+            )
+
+    def release_session(self, session_id: str, worker_id: str) -> None:
+        """Release a worker's claim on a session.
+
+        Args:
+            session_id: The session identifier
+            worker_id: Identifier of the worker releasing the session
+        """
+        with get_db() as db:
+            db.query(SessionOwner).filter(
+                SessionOwner.session_id == str(session_id),
+                SessionOwner.worker_id == worker_id,
+            ).delete()
+
+    def release_worker(self, worker_id: str) -> None:
+        """Release every session claimed by a worker.
+
+        Args:
+            worker_id: Identifier of the worker
+        """
+        with get_db() as db:
+            db.query(SessionOwner).filter(SessionOwner.worker_id == worker_id).delete()
 
 
 # Create singleton instances following Open WebUI pattern
 Sessions = SessionsTable()
 Events = EventsTable()
+SessionOwners = SessionOwnersTable()
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
 from typing import Optional
@@ -20,12 +20,22 @@ class Session(Base):
     device_id = Column(String, nullable=True)  # Add device_id column
     name = Column(String, nullable=True)  # Add name column
     sandbox_id = Column(String, nullable=True)  # Add sandbox_id column
+    metrics = Column(SQLiteJSON, nullable=True)  # Token, cost and latency totals
+    # Set once the events and files of the session were moved to an archive
+    archived_at = Column(DateTime, nullable=True)
+    archive_digest = Column(String, nullable=True)
 
     # Relationship with events
     events = relationship(
         "Event", back_populates="session", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_session_device_id_created_at", "device_id", "created_at"),
+        Index("ix_session_archived_at", "archived_at"),
+        Index("ix_session_archived_at_created_at", "archived_at", "created_at"),
+    )
+
     def __init__(
         self,
         id: uuid.UUID,
@@ -63,18 +73,96 @@ class Event(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     event_type = Column(String, nullable=False)
     event_payload = Column(SQLiteJSON, nullable=False)  # Use SQLite's JSON type
+    seq = Column(Integer, nullable=True)  # Monotonic per-session sequence number
 
     # Relationship with session
     session = relationship("Session", back_populates="events")
 
-    def __init__(self, session_id: uuid.UUID, event_type: str, event_payload: dict):
+    __table_args__ = (
+        Index("ix_event_session_id_seq", "session_id", "seq"),
+        Index("ix_event_session_id_timestamp", "session_id", "timestamp"),
+        Index(
+            "ix_event_session_id_event_type_timestamp",
+            "session_id",
+            "event_type",
+            "timestamp",
+        ),
+    )
+
+    def __init__(
+        self,
+        session_id: uuid.UUID,
+        event_type: str,
+        event_payload: dict,
+        seq: Optional[int] = None,
+    ):
         """Initialize an event.
 
         Args:
             session_id: The UUID of the session this event belongs to
             event_type: The type of event
             event_payload: The event payload as a dictionary
+            seq: Optional sequence number of the event within its session
         """
         self.session_id = str(session_id)  # Convert UUID to string for storage
         self.event_type = event_type
         self.event_payload = event_payload
+        self.seq = seq
+
+
+class EventPayloadRef(Base):
+    """Database model of an offloaded payload referenced by an event.
+
+    Rows are written in the transaction of their event, so the payloads
+    still in use are found by an index lookup instead of a scan of the
+    event payloads. Rows of deleted events are pruned by the payload sweep.
+    """
+
+    __tablename__ = "event_payload_ref"
+
+    event_id = Column(String(36), primary_key=True)
+    digest = Column(String(64), primary_key=True)
+
+    __table_args__ = (Index("ix_event_payload_ref_digest", "digest"),)
+
+    def __init__(self, event_id: str, digest: str):
+        """Initialize a payload reference.
+
+        Args:
+            event_id: The event referencing the payload
+            digest: Digest of the payload in the payload store
+        """
+        self.event_id = str(event_id)
+        self.digest = digest
+
+
+class SessionOwner(Base):
+    """Database model recording which server worker runs a session."""
+
+    __tablename__ = "session_owner"
+
+    session_id = Column(String(36), primary_key=True)
+    worker_id = Column(String, nullable=False, index=True)
+    worker_url = Column(String, nullable=True)  # Where clients reach the worker
+    claimed_at = Column(DateTime, default=datetime.utcnow)
+    lease_expires_at = Column(DateTime, nullable=False)
+
+    def __init__(
+        self,
+        session_id: str,
+        worker_id: str,
+        lease_expires_at: datetime,
+        worker_url: Optional[str] = None,
+    ):
+        """Initialize a session ownership record.
+
+        Args:
+            session_id: The session identifier
+            worker_id: Identifier of the owning worker
+            lease_expires_at: When the ownership lapses unless renewed
+            worker_url: Optional websocket URL of the owning worker
+        """
+        self.session_id = str(session_id)
+        self.worker_id = worker_id
+        self.lease_expires_at = lease_expires_at
+        self.worker_url = worker_url
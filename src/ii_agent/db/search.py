@@ -0,0 +1,184 @@
+"""Full-text search index over the history of sessions.
+
+The `session_search` table holds one row per indexed text: every user
+message, every agent response and the name of each session. On SQLite it
+is an FTS5 table, on Postgres a table with a generated tsvector column and
+a GIN index; both are created by migration b5d17e0c93a2. The rows are
+written in the same transaction as the events they index, so the index
+never lags behind the event table.
+"""
+
+import re
+from typing import Any, Optional
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.sql.elements import TextClause
+
+from ii_agent.core.event import EventType
+
+# Event types whose text is indexed, and the kind recorded for their rows
+SEARCHABLE_EVENT_TYPES = {
+    EventType.USER_MESSAGE.value: "user_message",
+    EventType.AGENT_RESPONSE.value: "agent_response",
+}
+SESSION_NAME_KIND = "session_name"
+
+# Marks the matched terms in snippets; clients render them as markdown bold
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+SNIPPET_ELLIPSIS = "…"
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def searchable_text(event_type: str, content: Any) -> Optional[str]:
+    """Get the text of an event the index holds, if it is indexed at all."""
+    if event_type not in SEARCHABLE_EVENT_TYPES or not isinstance(content, dict):
+        return None
+    value = content.get("text")
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value
+
+
+def search_terms(query: str) -> list[str]:
+    """Split a user query into the terms it must match."""
+    return _TERM_PATTERN.findall(query)
+
+
+def fts5_match_expression(terms: list[str]) -> str:
+    """Build an FTS5 query matching all terms, the last one as a prefix.
+
+    Every term is quoted, so operators and punctuation in the user's query
+    are never parsed as FTS5 syntax.
+    """
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def tsquery_expression(terms: list[str]) -> str:
+    """Build a to_tsquery expression matching all terms, the last as a prefix."""
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+
+def insert_statement() -> TextClause:
+    return text(
+        "INSERT INTO session_search (session_id, event_id, kind, content) "
+        "VALUES (:session_id, :event_id, :kind, :content)"
+    )
+
+
+def delete_session_name_statement() -> TextClause:
+    return text(
+        "DELETE FROM session_search "
+        f"WHERE session_id = :session_id AND kind = '{SESSION_NAME_KIND}'"
+    )
+
+
+def delete_session_statement(keep_name: bool = False) -> TextClause:
+    """Delete the rows of a session, or only those of its events."""
+    condition = f" AND kind != '{SESSION_NAME_KIND}'" if keep_name else ""
+    return text(f"DELETE FROM session_search WHERE session_id = :session_id{condition}")
+
+
+def delete_events_since_statement() -> TextClause:
+    """Delete the rows of the events of a session from a timestamp on."""
+    return text(
+        "DELETE FROM session_search WHERE event_id IN ("
+        "SELECT id FROM event "
+        "WHERE session_id = :session_id AND timestamp >= :since)"
+    ).bindparams(bindparam("since", type_=DateTime()))
+
+
+def search_statement(dialect_name: str, by_device: bool) -> TextClause:
+    """Build the ranked search over sessions for a database dialect.
+
+    The statement takes `match`, built by fts5_match_expression or
+    tsquery_expression, `limit`, `offset` and, when by_device is set,
+    `device_id`. It returns one row per session, for its best match, with
+    a higher score for a better match.
+    """
+    device_filter = "AND s.device_id = :device_id" if by_device else ""
+    if dialect_name == "postgresql":
+        hits = f"""
+            SELECT session_id, event_id, kind,
+                ts_rank(search_vector, to_tsquery('english', :match)) AS score,
+                ts_headline('english', content, to_tsquery('english', :match),
+                    'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, '
+                    'MaxWords=24, MinWords=8, FragmentDelimiter={SNIPPET_ELLIPSIS}'
+                ) AS snippet
+            FROM session_search
+            WHERE search_vector @@ to_tsquery('english', :match)
+        """
+    else:
+        # bm25 is lower for better matches, hence the negation. FTS5 only
+        # allows it in the query over its own table, so the hits are
+        # materialized before they are ranked per session
+        hits = f"""
+            SELECT session_id, event_id, kind,
+                -bm25(session_search) AS score,
+                snippet(session_search, 3, '{SNIPPET_START}', '{SNIPPET_END}',
+                    '{SNIPPET_ELLIPSIS}', 16) AS snippet
+            FROM session_search
+            WHERE session_search MATCH :match
+        """
+    return text(f"""
+        WITH hits AS MATERIALIZED ({hits}),
+        ranked AS (
+            SELECT hits.*, ROW_NUMBER() OVER (
+                PARTITION BY session_id ORDER BY score DESC
+            ) AS position
+            FROM hits
+        )
+        SELECT s.id, s.workspace_dir, s.created_at, s.device_id, s.name,
+            s.archived_at, ranked.score, ranked.snippet, ranked.kind,
+            ranked.event_id
+        FROM ranked
+        JOIN session s ON s.id = ranked.session_id
+        WHERE ranked.position = 1 {device_filter}
+        ORDER BY ranked.score DESC, s.created_at DESC
+        LIMIT :limit OFFSET :offset
+    """)
+
+
+def search_result(row: Any) -> dict:
+    return {
+        "id": row.id,
+        "workspace_dir": row.workspace_dir,
+        "created_at": row.created_at,
+        "device_id": row.device_id,
+        "name": row.name or "",
+        "archived_at": row.archived_at,
+        "score": float(row.score),
+        "snippet": row.snippet,
+        "matched": row.kind,
+        "event_id": row.event_id,
+    }
+
+
+def event_entry(
+    session_id: str, event_id: str, event_type: str, content: Any
+) -> Optional[dict]:
+    """Build the parameters of insert_statement for an event, if it is indexed."""
+    value = searchable_text(event_type, content)
+    if value is None:
+        return None
+    return {
+        "session_id": str(session_id),
+        "event_id": event_id,
+        "kind": SEARCHABLE_EVENT_TYPES[event_type],
+        "content": value,
+    }
+
+
+def session_name_entry(session_id: str, name: str) -> Optional[dict]:
+    """Build the parameters of insert_statement for a session name."""
+    if not name or not name.strip():
+        return None
+    return {
+        "session_id": str(session_id),
+        "event_id": None,
+        "kind": SESSION_NAME_KIND,
+        "content": name,
+    }
@@ -57,6 +57,8 @@ from ii_agent.llm.base import (
 
 class AnthropicDirectClient(LLMClient):
     """Use Anthropic models via first party API."""
+
+    api_type = "anthropic"
  
     def __init__(self, llm_config: LLMConfig):
         """Initialize the Anthropic first party client."""
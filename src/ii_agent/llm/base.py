@@ -125,6 +125,10 @@ LLMMessages = list[list[GeneralContentBlock]]
 class LLMClient(ABC):
     """A client for LLM APIs for the use in agents."""
 
+    # Provider of the models, e.g. "anthropic", which sets the size of the
+    # images sent to them
+    api_type: str | None = None
+
     @abstractmethod
     def generate(
         self,
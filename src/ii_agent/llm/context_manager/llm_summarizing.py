@@ -1,4 +1,5 @@
 import logging
+from ii_agent.core.tracing import get_tracer
 from ii_agent.llm.base import (
     GeneralContentBlock,
     TextPrompt,
@@ -305,11 +306,14 @@ When you are using compact - please focus on test output and code changes. Inclu
         # Generate summary using LLM
         try:
             summary_messages = [[TextPrompt(text=prompt)]]
-            model_response, _ = self.client.generate(
-                messages=summary_messages,
-                max_tokens=SUMMARY_MAX_TOKENS,
-                thinking_tokens=0,
-            )
+            with get_tracer().span(
+                "context.summarize", forgotten_events=len(forgotten_events)
+            ):
+                model_response, _ = self.client.generate(
+                    messages=summary_messages,
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                    thinking_tokens=0,
+                )
             summary = ""
             for message in model_response:
                 if isinstance(message, TextResult):
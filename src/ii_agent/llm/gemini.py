@@ -32,6 +32,8 @@ def generate_tool_call_id() -> str:
 class GeminiDirectClient(LLMClient):
     """Use Gemini models via first party API."""
 
+    api_type = "gemini"
+
     def __init__(self, llm_config: LLMConfig):
         self.model_name = llm_config.model
 
@@ -5,6 +5,7 @@ import json
 from typing import Optional, cast, Any
 
 from ii_agent.core.storage.files import FileStore
+from ii_agent.core.tracing import get_tracer
 from ii_agent.core.storage.locations import get_conversation_agent_history_filename
 from ii_agent.llm.base import (
     AssistantContentBlock,
@@ -29,6 +30,18 @@ class MessageHistory:
         self._last_user_prompt_index: int | None = (
             None  # Track the last user prompt index
         )
+        # Bumped whenever existing turns are rewritten or dropped, so that
+        # checkpoints know when appended turns alone no longer describe the change
+        self._revision = 0
+
+    @property
+    def revision(self) -> int:
+        """Counter of non-append modifications to the history."""
+        return self._revision
+
+    @property
+    def last_user_prompt_index(self) -> int | None:
+        return self._last_user_prompt_index
 
     @classmethod
     def _ensure_tool_call_integrity(
@@ -224,6 +237,7 @@ class MessageHistory:
         """Removes all messages."""
         self._message_lists = []
         self._last_user_prompt_index = None
+        self._revision += 1
 
     def clear_from_last_to_user_message(self):
         """Clears messages from the last turn backwards to the last user prompt (inclusive).
@@ -236,6 +250,7 @@ class MessageHistory:
         self._message_lists = self._message_lists[: self._last_user_prompt_index]
         # Reset the last user prompt index since we've cleared after it
         self._last_user_prompt_index = None
+        self._revision += 1
 
     def __len__(self) -> int:
         """Returns the number of turns."""
@@ -277,7 +292,20 @@ class MessageHistory:
 
     def set_message_list(self, message_list: list[list[GeneralContentBlock]]):
         """Sets the message list and ensures tool call integrity."""
-        self._message_lists = MessageHistory._ensure_tool_call_integrity(message_list)
+        cleaned = MessageHistory._ensure_tool_call_integrity(message_list)
+        if cleaned != self._message_lists:
+            self._revision += 1
+        self._message_lists = cleaned
+
+    def restore_message_list(
+        self,
+        message_list: list[list[GeneralContentBlock]],
+        last_user_prompt_index: int | None = None,
+    ):
+        """Replaces the history with previously saved turns, e.g. from a checkpoint."""
+        self._message_lists = list(message_list)
+        self._last_user_prompt_index = last_user_prompt_index
+        self._revision += 1
 
     def count_tokens(self):
         """Counts the tokens in the message list."""
@@ -285,8 +313,14 @@ class MessageHistory:
 
     def truncate(self) -> None:
         """Remove oldest messages when context window limit is exceeded."""
-        truncated_messages_for_llm = self._context_manager.apply_truncation_if_needed(
-            self.get_messages_for_llm()
-        )
+        with get_tracer().span(
+            "history.truncate", turns_before=len(self._message_lists)
+        ) as span:
+            truncated_messages_for_llm = (
+                self._context_manager.apply_truncation_if_needed(
+                    self.get_messages_for_llm()
+                )
+            )
 
-        self.set_message_list(truncated_messages_for_llm)
+            self.set_message_list(truncated_messages_for_llm)
+            span.set_attribute("turns_after", len(self._message_lists))
@@ -42,6 +42,8 @@ logger = logging.getLogger(__name__)
 class OpenAIDirectClient(LLMClient):
     """Use OpenAI models via first party API."""
 
+    api_type = "openai"
+
     def __init__(self, llm_config: LLMConfig):
         """Initialize the OpenAI first party client."""
         if llm_config.azure_endpoint is not None:
@@ -331,10 +333,14 @@ class OpenAIDirectClient(LLMClient):
             internal_messages.append(TextResult(text=""))
 
         assert response.usage is not None
+        # prompt_tokens includes the tokens read from the prompt cache
+        details = getattr(response.usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
         message_metadata = {
             "raw_response": response,
-            "input_tokens": response.usage.prompt_tokens,
+            "input_tokens": response.usage.prompt_tokens - cached_tokens,
             "output_tokens": response.usage.completion_tokens,
+            "cache_read_input_tokens": cached_tokens,
         }
 
         return internal_messages, message_metadata
@@ -7,6 +7,7 @@ from alembic import context
 
 # Import your models here
 from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.db.engine import normalize_database_url
 from ii_agent.db.models import Base
 
 # this is the Alembic Config object, which provides
@@ -30,7 +31,10 @@ target_metadata = Base.metadata
 ii_agent_config = load_ii_agent_config()
 
 if ii_agent_config.database_url:
-    config.set_main_option("sqlalchemy.url", ii_agent_config.database_url.replace("%", "%%"))
+    config.set_main_option(
+        "sqlalchemy.url",
+        normalize_database_url(ii_agent_config.database_url).replace("%", "%%"),
+    )
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -70,6 +74,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # Only takes effect while the database is still empty; it lets
+            # the maintenance job hand the pages of deleted rows back
+            connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.commit()
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
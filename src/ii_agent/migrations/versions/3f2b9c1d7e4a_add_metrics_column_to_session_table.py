@@ -0,0 +1,29 @@
+"""Add metrics column to session table
+
+Revision ID: 3f2b9c1d7e4a
+Revises: d6e272e1eb0d
+Create Date: 2026-10-18 10:12:05.311842
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2b9c1d7e4a"
+down_revision: Union[str, None] = "d6e272e1eb0d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("session", sa.Column("metrics", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("session", "metrics")
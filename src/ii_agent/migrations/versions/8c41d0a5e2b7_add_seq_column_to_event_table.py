@@ -0,0 +1,31 @@
+"""Add seq column to event table
+
+Revision ID: 8c41d0a5e2b7
+Revises: 3f2b9c1d7e4a
+Create Date: 2026-10-18 13:40:27.904113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41d0a5e2b7"
+down_revision: Union[str, None] = "3f2b9c1d7e4a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("event", sa.Column("seq", sa.Integer(), nullable=True))
+    op.create_index("ix_event_session_id_seq", "event", ["session_id", "seq"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_event_session_id_seq", table_name="event")
+    op.drop_column("event", "seq")
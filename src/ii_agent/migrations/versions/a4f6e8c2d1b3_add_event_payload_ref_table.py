@@ -0,0 +1,80 @@
+"""Add event_payload_ref table
+
+Revision ID: a4f6e8c2d1b3
+Revises: b5d17e0c93a2
+Create Date: 2026-10-18 21:12:40.583106
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from ii_agent.core.storage.payloads import PAYLOAD_REF_KEY, collect_payload_refs
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4f6e8c2d1b3"
+down_revision: Union[str, None] = "b5d17e0c93a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "event_payload_ref",
+        sa.Column("event_id", sa.String(length=36), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint("event_id", "digest"),
+    )
+    op.create_index("ix_event_payload_ref_digest", "event_payload_ref", ["digest"])
+    op.create_index(
+        "ix_session_archived_at_created_at", "session", ["archived_at", "created_at"]
+    )
+    _backfill(op.get_bind())
+
+
+def _backfill(connection) -> None:
+    insert = sa.text(
+        "INSERT INTO event_payload_ref (event_id, digest) VALUES (:event_id, :digest)"
+    )
+    after_id = ""
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, event_payload FROM event "
+                "WHERE id > :after_id AND CAST(event_payload AS TEXT) LIKE :pattern "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {
+                "after_id": after_id,
+                "pattern": f"%{PAYLOAD_REF_KEY}%",
+                "limit": BACKFILL_BATCH_SIZE,
+            },
+        ).all()
+        if not rows:
+            return
+        entries = []
+        for row in rows:
+            payload = row.event_payload
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            entries.extend(
+                {"event_id": row.id, "digest": digest}
+                for digest in collect_payload_refs(payload)
+            )
+        if entries:
+            connection.execute(insert, entries)
+        after_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_session_archived_at_created_at", table_name="session")
+    op.drop_index("ix_event_payload_ref_digest", table_name="event_payload_ref")
+    op.drop_table("event_payload_ref")
@@ -0,0 +1,113 @@
+"""Add session search index
+
+Revision ID: b5d17e0c93a2
+Revises: f3a8c2d9b614
+Create Date: 2026-10-18 19:47:03.208554
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from ii_agent.db.search import (
+    SEARCHABLE_EVENT_TYPES,
+    event_entry,
+    insert_statement,
+    session_name_entry,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d17e0c93a2"
+down_revision: Union[str, None] = "f3a8c2d9b614"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        op.execute(
+            """
+            CREATE TABLE session_search (
+                id BIGSERIAL PRIMARY KEY,
+                session_id VARCHAR(36) NOT NULL,
+                event_id VARCHAR(36),
+                kind VARCHAR NOT NULL,
+                content TEXT NOT NULL,
+                search_vector TSVECTOR GENERATED ALWAYS AS
+                    (to_tsvector('english', content)) STORED
+            )
+            """
+        )
+        op.create_index(
+            "ix_session_search_vector",
+            "session_search",
+            ["search_vector"],
+            postgresql_using="gin",
+        )
+        op.create_index(
+            "ix_session_search_session_id", "session_search", ["session_id"]
+        )
+        op.create_index("ix_session_search_event_id", "session_search", ["event_id"])
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE session_search USING fts5("
+            "session_id UNINDEXED, event_id UNINDEXED, kind UNINDEXED, content, "
+            "tokenize = 'porter unicode61')"
+        )
+    _backfill(connection)
+
+
+def _backfill(connection) -> None:
+    insert = insert_statement()
+    sessions = connection.execute(
+        sa.text("SELECT id, name FROM session WHERE name IS NOT NULL")
+    ).all()
+    sessions = [row for row in sessions if session_name_entry(row.id, row.name)]
+    for start in range(0, len(sessions), BACKFILL_BATCH_SIZE):
+        connection.execute(
+            insert,
+            [
+                session_name_entry(row.id, row.name)
+                for row in sessions[start : start + BACKFILL_BATCH_SIZE]
+            ],
+        )
+
+    event_types = ", ".join(f"'{event_type}'" for event_type in SEARCHABLE_EVENT_TYPES)
+    after_id = ""
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, session_id, event_type, event_payload FROM event "
+                f"WHERE event_type IN ({event_types}) AND id > :after_id "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"after_id": after_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        entries = []
+        for row in rows:
+            payload = row.event_payload
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            entry = event_entry(
+                row.session_id, row.id, row.event_type, payload.get("content")
+            )
+            if entry is not None:
+                entries.append(entry)
+        if entries:
+            connection.execute(insert, entries)
+        after_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE session_search")
@@ -0,0 +1,39 @@
+"""Add session_owner table
+
+Revision ID: c7e5a93f1d20
+Revises: 8c41d0a5e2b7
+Create Date: 2026-10-18 15:02:48.117530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e5a93f1d20"
+down_revision: Union[str, None] = "8c41d0a5e2b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "session_owner",
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("worker_id", sa.String(), nullable=False),
+        sa.Column("worker_url", sa.String(), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("session_id"),
+    )
+    op.create_index("ix_session_owner_worker_id", "session_owner", ["worker_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_session_owner_worker_id", table_name="session_owner")
+    op.drop_table("session_owner")
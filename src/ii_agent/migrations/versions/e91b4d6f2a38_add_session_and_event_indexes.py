@@ -0,0 +1,40 @@
+"""Add session and event indexes
+
+Revision ID: e91b4d6f2a38
+Revises: c7e5a93f1d20
+Create Date: 2026-10-18 16:05:12.431870
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e91b4d6f2a38"
+down_revision: Union[str, None] = "c7e5a93f1d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_event_session_id_timestamp", "event", ["session_id", "timestamp"]
+    )
+    op.create_index(
+        "ix_event_session_id_event_type_timestamp",
+        "event",
+        ["session_id", "event_type", "timestamp"],
+    )
+    op.create_index(
+        "ix_session_device_id_created_at", "session", ["device_id", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_session_device_id_created_at", table_name="session")
+    op.drop_index("ix_event_session_id_event_type_timestamp", table_name="event")
+    op.drop_index("ix_event_session_id_timestamp", table_name="event")
@@ -0,0 +1,33 @@
+"""Add archive columns to session table
+
+Revision ID: f3a8c2d9b614
+Revises: e91b4d6f2a38
+Create Date: 2026-10-18 18:21:40.562913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a8c2d9b614"
+down_revision: Union[str, None] = "e91b4d6f2a38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("session", sa.Column("archived_at", sa.DateTime(), nullable=True))
+    op.add_column("session", sa.Column("archive_digest", sa.String(), nullable=True))
+    op.create_index("ix_session_archived_at", "session", ["archived_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_session_archived_at", table_name="session")
+    op.drop_column("session", "archive_digest")
+    op.drop_column("session", "archived_at")
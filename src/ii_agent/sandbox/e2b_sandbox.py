@@ -4,7 +4,7 @@ from ii_agent.core.storage.models.settings import Settings
 from ii_agent.sandbox.base_sandbox import BaseSandbox
 from ii_agent.sandbox.sandbox_registry import SandboxRegistry
 from ii_agent.utils.constants import WorkSpaceMode
-from ii_agent.db.manager import Sessions
+from ii_agent.db.async_manager import AsyncSessions
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +26,9 @@ class E2BSandbox(BaseSandbox):
         self.sandbox_id = self.sandbox.sandbox_id
         import uuid
 
-        Sessions.update_session_sandbox_id(uuid.UUID(self.session_id), self.sandbox_id)
+        await AsyncSessions.update_session_sandbox_id(
+            uuid.UUID(self.session_id), self.sandbox_id
+        )
 
     def expose_port(self, port: int) -> str:
         return "https://" + self.sandbox.get_host(port)
@@ -34,7 +36,9 @@ class E2BSandbox(BaseSandbox):
     async def connect(self):
         import uuid
 
-        sandbox_id = Sessions.get_sandbox_id_by_session_id(uuid.UUID(self.session_id))
+        sandbox_id = await AsyncSessions.get_sandbox_id_by_session_id(
+            uuid.UUID(self.session_id)
+        )
         if sandbox_id is None:
             # Note: Raise error for now, should never happen
             raise ValueError(f"Sandbox ID not found for session {self.session_id}")
@@ -51,7 +55,7 @@ class E2BSandbox(BaseSandbox):
         pass
 
     async def start(self):
-        sandbox_id = Sessions.get_sandbox_id_by_session_id(self.session_id)
+        sandbox_id = await AsyncSessions.get_sandbox_id_by_session_id(self.session_id)
         if sandbox_id is None:
             # Note: Raise error for now, should never happen
             raise ValueError(f"Sandbox ID not found for session {self.session_id}")
@@ -5,5 +5,6 @@ REST API endpoints.
 from .upload import upload_router
 from .sessions import sessions_router
 from .settings import settings_router
+from .blobs import blobs_router
 
-__all__ = ["upload_router", "sessions_router", "settings_router"]
+__all__ = ["upload_router", "sessions_router", "settings_router", "blobs_router"]
@@ -0,0 +1,49 @@
+"""
+Content-addressed blob API endpoints.
+"""
+
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from ii_agent.core.storage.blobs import guess_media_type, is_blob_digest
+from ii_agent.server import shared
+
+logger = logging.getLogger(__name__)
+
+blobs_router = APIRouter(prefix="/api", tags=["blobs"])
+
+# A digest always names the same bytes, so clients may cache blobs forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@blobs_router.get("/blobs/{digest}")
+def get_blob(digest: str, request: Request):
+    """Get a blob, such as a screenshot referenced by an event, by its digest.
+
+    Args:
+        digest: SHA-256 hex digest of the blob contents
+
+    Returns:
+        The blob bytes with immutable caching headers, or 304 if the client
+        already holds the blob
+    """
+    if not is_blob_digest(digest):
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        contents = shared.blob_store.get(digest)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    except Exception as e:
+        logger.error(f"Error retrieving blob: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving blob: {str(e)}")
+
+    return Response(
+        content=contents, media_type=guess_media_type(contents), headers=headers
+    )
@@ -2,19 +2,78 @@
 Session management API endpoints.
 """
 
+import asyncio
+import base64
+import json
 import logging
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from ii_agent.db.manager import Events, Sessions
-from ..models.messages import SessionResponse, EventResponse, SessionInfo, EventInfo
+from ii_agent.core.event import EventType
+from ii_agent.core.file_edits import reconstruct_files
+from ii_agent.core.media_jobs import reconstruct_media_jobs
+from ii_agent.db.async_manager import AsyncEvents, AsyncSessions
+from ii_agent.db.manager import event_page_key
+from ii_agent.server import shared
+from ..models.messages import (
+    SessionResponse,
+    EventResponse,
+    SessionInfo,
+    SessionSearchResponse,
+    SessionSearchResult,
+    EventInfo,
+    SessionMetricsResponse,
+    SessionFilesResponse,
+    FileStateInfo,
+    SessionMediaJobsResponse,
+    MediaJobInfo,
+)
 
 logger = logging.getLogger(__name__)
 
 sessions_router = APIRouter(prefix="/api", tags=["sessions"])
 
+MAX_EVENTS_PAGE_SIZE = 1000
+
+
+# Declared before /sessions/{device_id}, which would otherwise match it
+@sessions_router.get("/sessions/search", response_model=SessionSearchResponse)
+async def search_sessions(
+    q: str = Query(..., min_length=1, description="Words to search for"),
+    device_id: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Search the names and messages of sessions, best match first.
+
+    Args:
+        q: Free text; every word must match, the last one as a prefix
+        device_id: Only search the sessions of this device, if set
+        limit: Maximum number of sessions to return
+        offset: Number of sessions to skip, for paging
+
+    Returns:
+        The matching sessions with a snippet of their best match
+    """
+    try:
+        results_raw = await AsyncSessions.search_sessions(
+            q, device_id=device_id, limit=limit, offset=offset
+        )
+    except Exception as e:
+        logger.error(f"Error searching sessions: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error searching sessions: {str(e)}"
+        )
+    return SessionSearchResponse(
+        results=[SessionSearchResult(**result) for result in results_raw],
+        next_offset=offset + limit if len(results_raw) == limit else None,
+    )
+
 
 @sessions_router.get("/sessions/{device_id}", response_model=SessionResponse)
-def get_sessions_by_device_id(device_id: str):
+async def get_sessions_by_device_id(device_id: str):
     """Get all sessions for a specific device ID, sorted by creation time descending.
     
     Args:
@@ -24,7 +83,7 @@ def get_sessions_by_device_id(device_id: str):
         A list of sessions with their details, sorted by creation time descending
     """
     try:
-        sessions_raw = Sessions.get_sessions_by_device_id(device_id)
+        sessions_raw = await AsyncSessions.get_sessions_by_device_id(device_id)
         sessions = [SessionInfo(**session) for session in sessions_raw]
         return SessionResponse(sessions=sessions)
 
@@ -35,24 +94,213 @@ def get_sessions_by_device_id(device_id: str):
         )
 
 
+def _encode_cursor(event: dict) -> str:
+    timestamp, seq, event_id = event_page_key(event)
+    raw = f"{timestamp.isoformat()}|{seq}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    try:
+        timestamp, seq, event_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(timestamp), int(seq), event_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _ndjson_lines(
+    events: AsyncIterator[dict], limit: Optional[int]
+) -> AsyncIterator[str]:
+    count = 0
+    async for event in events:
+        if limit is not None and count >= limit:
+            return
+        count += 1
+        yield json.dumps(event) + "\n"
+
+
 @sessions_router.get("/sessions/{session_id}/events", response_model=EventResponse)
-def get_session_events(session_id: str):
-    """Get all events for a specific session ID, sorted by timestamp ascending.
+async def get_session_events(
+    session_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_EVENTS_PAGE_SIZE),
+    event_type: Optional[List[str]] = Query(None, alias="type"),
+    format: Literal["json", "ndjson"] = "json",
+):
+    """Get the events for a specific session ID, sorted by timestamp ascending.
 
     Args:
         session_id: The session identifier to look up events for
+        cursor: Cursor returned as next_cursor by the previous page
+        limit: Maximum number of events to return; all events if not given
+        event_type: Event types to return, may be repeated; all if not given
+        format: "json" for one response, or "ndjson" to stream one event per
+            line with flat memory use
 
     Returns:
-        A list of events with their details, sorted by timestamp ascending
+        A list of events with their details, sorted by timestamp ascending,
+        and the cursor of the next page if there may be more events
     """
     try:
-        events_raw = Events.get_session_events_with_details(session_id)
+        after = _decode_cursor(cursor) if cursor else None
+
+        if format == "ndjson":
+            events_iter = AsyncEvents.iter_session_events_with_details(
+                session_id,
+                after=after,
+                event_types=event_type,
+                batch_size=min(limit or 500, 500),
+            )
+            return StreamingResponse(
+                _ndjson_lines(events_iter, limit),
+                media_type="application/x-ndjson",
+            )
+
+        events_raw = await AsyncEvents.get_session_events_page(
+            session_id, after=after, limit=limit, event_types=event_type
+        )
         events = [EventInfo(**event) for event in events_raw]
-        return EventResponse(events=events)
-        
+        next_cursor = (
+            _encode_cursor(events_raw[-1])
+            if limit is not None and len(events_raw) == limit
+            else None
+        )
+        return EventResponse(events=events, next_cursor=next_cursor)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving events: {str(e)}")
         raise HTTPException(
             status_code=500, detail=f"Error retrieving events: {str(e)}"
         )
+
+
+@sessions_router.get(
+    "/sessions/{session_id}/metrics", response_model=SessionMetricsResponse
+)
+async def get_session_metrics(session_id: str):
+    """Get token, cost and latency metrics for a specific session ID.
+
+    Args:
+        session_id: The session identifier to look up metrics for
+
+    Returns:
+        Session totals and the per-turn breakdown
+    """
+    try:
+        if await AsyncSessions.get_session_by_id(session_id) is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        metrics = await AsyncSessions.get_session_metrics(session_id) or {}
+        return SessionMetricsResponse(session_id=session_id, metrics=metrics)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving metrics: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving metrics: {str(e)}"
+        )
+
+
+@sessions_router.get("/sessions/{session_id}/files", response_model=SessionFilesResponse)
+async def get_session_files(
+    session_id: str, path: Optional[str] = None, until_seq: Optional[int] = None
+):
+    """Get the content of the files edited in a session, rebuilt from its edits.
+
+    Args:
+        session_id: The session identifier to look up files for
+        path: Optional path to return only that file
+        until_seq: Optional event sequence number to get the files as they were
+            right after that event
+
+    Returns:
+        The latest known content of each edited file
+    """
+    try:
+        if await AsyncSessions.get_session_by_id(session_id) is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        events = await AsyncEvents.get_session_events_by_type(
+            session_id, EventType.FILE_EDIT.value, until_seq=until_seq
+        )
+        files = [
+            FileStateInfo(
+                path=state.path,
+                version=state.version,
+                content=state.content,
+                total_lines=state.total_lines,
+                seq=state.seq,
+            )
+            for state in reconstruct_files(events).values()
+            if path is None or state.path == path
+        ]
+        return SessionFilesResponse(session_id=session_id, files=files)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving files: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving files: {str(e)}"
+        )
+
+
+@sessions_router.get(
+    "/sessions/{session_id}/media-jobs", response_model=SessionMediaJobsResponse
+)
+async def get_session_media_jobs(session_id: str):
+    """Get the media generation jobs of a session, rebuilt from their events.
+
+    A client reconnecting while a video is being generated polls this to pick
+    up the result once the job is done.
+
+    Args:
+        session_id: The session identifier to look up jobs for
+
+    Returns:
+        The latest known state of each job
+    """
+    try:
+        if await AsyncSessions.get_session_by_id(session_id) is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        events = await AsyncEvents.get_session_events_by_type(
+            session_id, EventType.MEDIA_JOB.value
+        )
+        jobs = [MediaJobInfo(**job) for job in reconstruct_media_jobs(events).values()]
+        return SessionMediaJobsResponse(session_id=session_id, jobs=jobs)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving media jobs: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving media jobs: {str(e)}"
+        )
+
+
+@sessions_router.post("/sessions/{session_id}/restore")
+async def restore_session(session_id: str):
+    """Restore the events and files of an archived session.
+
+    Args:
+        session_id: The session identifier to restore
+
+    Returns:
+        The session identifier once its events are readable again
+    """
+    session = await AsyncSessions.get_session_by_id(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.archive_digest is None:
+        raise HTTPException(status_code=409, detail="Session is not archived")
+    try:
+        await asyncio.to_thread(shared.maintenance_service.restore_session, session_id)
+        return {"session_id": session_id}
+    except Exception as e:
+        logger.error(f"Error restoring session: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error restoring session: {str(e)}"
+        )
@@ -1,15 +1,41 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from fastapi.staticfiles import StaticFiles
 
-from .api import upload_router, sessions_router, settings_router
+from .api import upload_router, sessions_router, settings_router, blobs_router
+from ii_agent.db.async_manager import async_engine
 from ii_agent.server import shared
+from ii_agent.tools.clients.http_sessions import close_http_sessions
+from ii_agent.utils.process_pool import shutdown_process_pool
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Resume interrupted agent runs on startup and checkpoint them on shutdown.
+
+    Pooled resources, the HTTP sessions and worker processes of the tools
+    and the database connections, are closed once the runs are checkpointed.
+    """
+    if shared.config.resume_runs_on_startup:
+        try:
+            await shared.connection_manager.resume_in_flight_runs()
+        except Exception as e:
+            logger.error(f"Error resuming in-flight runs: {e}")
+    shared.connection_manager.start()
+    shared.maintenance_service.start()
+    yield
+    shared.maintenance_service.stop()
+    await shared.connection_manager.shutdown()
+    await close_http_sessions()
+    shutdown_process_pool()
+    await async_engine.dispose()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application.
 
@@ -19,7 +45,7 @@ def create_app() -> FastAPI:
     Returns:
         FastAPI: Configured FastAPI application instance
     """
-    app = FastAPI(title="Agent WebSocket API")
+    app = FastAPI(title="Agent WebSocket API", lifespan=lifespan)
 
     # Add CORS middleware
     app.add_middleware(
@@ -37,6 +63,7 @@ def create_app() -> FastAPI:
     app.include_router(upload_router)
     app.include_router(sessions_router)
     app.include_router(settings_router)
+    app.include_router(blobs_router)
 
     # Setup workspace static files
     setup_workspace(app, shared.config.workspace_root)
@@ -45,7 +72,13 @@ def create_app() -> FastAPI:
     @app.websocket("/ws")
     async def websocket_handler(websocket: WebSocket):
         session = await shared.connection_manager.connect(websocket)
-        await session.start_chat_loop()
+        if session is None:
+            # Redirected to the worker that owns the session
+            return
+        try:
+            await session.start_chat_loop(websocket)
+        finally:
+            shared.connection_manager.disconnect(websocket)
 
     return app
 
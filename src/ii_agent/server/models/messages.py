@@ -1,4 +1,4 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
 
 from ii_agent.core.storage.models.settings import Settings
@@ -33,6 +33,8 @@ class SessionInfo(BaseModel):
     created_at: str
     device_id: str
     name: str = ""
+    # Set while the events of the session are archived; restore it to read them
+    archived_at: Optional[str] = None
 
 
 class SessionResponse(BaseModel):
@@ -41,6 +43,25 @@ class SessionResponse(BaseModel):
     sessions: List[SessionInfo]
 
 
+class SessionSearchResult(SessionInfo):
+    """Model for a session matching a search, with its best match."""
+
+    score: float
+    # Text around the matched terms, which are marked as markdown bold
+    snippet: str
+    # What matched: "session_name", "user_message" or "agent_response"
+    matched: str
+    event_id: Optional[str] = None
+
+
+class SessionSearchResponse(BaseModel):
+    """Response model for a session search."""
+
+    results: List[SessionSearchResult]
+    # Offset of the next page, None on the last page
+    next_offset: Optional[int] = None
+
+
 class EventInfo(BaseModel):
     """Model for event information."""
 
@@ -56,6 +77,56 @@ class EventResponse(BaseModel):
     """Response model for event queries."""
 
     events: List[EventInfo]
+    # Cursor of the next page, None once the last page was returned
+    next_cursor: Optional[str] = None
+
+
+class SessionMetricsResponse(BaseModel):
+    """Response model for session usage metrics."""
+
+    session_id: str
+    metrics: Dict[str, Any]
+
+
+class FileStateInfo(BaseModel):
+    """Model for the content of a file reconstructed from its edits."""
+
+    path: str
+    version: int
+    content: str
+    total_lines: int
+    seq: Optional[int] = None
+
+
+class SessionFilesResponse(BaseModel):
+    """Response model for the files edited in a session."""
+
+    session_id: str
+    files: List[FileStateInfo]
+
+
+class MediaJobInfo(BaseModel):
+    """Model for the latest state of a media generation job."""
+
+    job_id: str
+    kind: str
+    tool_name: str
+    description: str
+    status: str
+    progress: Optional[float] = None
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+    seq: Optional[int] = None
+
+
+class SessionMediaJobsResponse(BaseModel):
+    """Response model for the media generation jobs of a session."""
+
+    session_id: str
+    jobs: List[MediaJobInfo]
 
 
 class QueryContent(BaseModel):
@@ -66,6 +137,12 @@ class QueryContent(BaseModel):
     files: List[str] = []
 
 
+class ResubscribeContent(BaseModel):
+    """Model for replaying the events missed since a sequence number."""
+
+    last_seq: int = 0
+
+
 class InitAgentContent(BaseModel):
     """Model for agent initialization content."""
 
@@ -3,8 +3,14 @@ from ii_agent.core.config.utils import load_ii_agent_config
 from dotenv import load_dotenv
 
 from ii_agent.core.storage import get_file_store
+from ii_agent.core.storage.blobs import get_blob_store
+from ii_agent.core.storage.payloads import get_payload_store
+from ii_agent.core.tracing import configure_tracing
 from ii_agent.core.storage.settings.file_settings_store import FileSettingsStore
+from ii_agent.db.maintenance import MaintenanceService
+from ii_agent.db.manager import payload_store
 from ii_agent.server.websocket.manager import ConnectionManager
+from ii_agent.server.websocket.session_registry import get_session_registry
 
 
 load_dotenv()
@@ -12,11 +18,34 @@ load_dotenv()
 
 config: IIAgentConfig = load_ii_agent_config()
 
+configure_tracing(config.trace_exporter, config.traces_path)
+
 file_store = get_file_store(config.file_store, config.file_store_path)
+blob_store = get_blob_store(config.file_store, config.file_store_path)
+
+session_registry = get_session_registry(
+    config.session_registry,
+    worker_id=config.worker_id,
+    worker_url=config.worker_url,
+    lease_seconds=config.session_lease_seconds,
+)
 
 connection_manager = ConnectionManager(
     file_store=file_store,
     config=config,
+    registry=session_registry,
+    blob_store=blob_store,
+)
+
+maintenance_service = MaintenanceService(
+    config=config,
+    file_store=file_store,
+    payload_store=payload_store,
+    archive_store=get_payload_store(
+        config.file_store, config.file_store_path, name="archives"
+    ),
+    is_active=connection_manager.is_session_active,
 )
+connection_manager.restore_if_archived = maintenance_service.restore_if_archived
 
 SettingsStoreImpl = FileSettingsStore
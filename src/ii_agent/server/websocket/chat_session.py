@@ -3,19 +3,26 @@ import json
 import logging
 from pathlib import Path
 import uuid
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 from fastapi import WebSocket, WebSocketDisconnect
 from pydantic import ValidationError
 
+from ii_agent.core.agent_logging import close_agent_logger, create_agent_logger
+from ii_agent.core.checkpoint import CheckpointStore
 from ii_agent.core.config.client_config import ClientConfig
 from ii_agent.llm.base import ToolCall
 from ii_agent.agents.base import BaseAgent
 from ii_agent.agents.reviewer import ReviewerAgent
 from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.core.event_stream import EventStream, EventSubscriber
+from ii_agent.core.metrics import SessionMetrics
+from ii_agent.core.storage.blobs import BlobStore
 from ii_agent.core.storage.files import FileStore
 from ii_agent.core.storage.models.settings import Settings
 from ii_agent.core.storage.settings.file_settings_store import FileSettingsStore
-from ii_agent.db.manager import Sessions, Events
+from ii_agent.core.tracing import TracedQueue
+from ii_agent.db.async_manager import AsyncEvents, AsyncSessions
+from ii_agent.db.manager import Events
 from ii_agent.llm import get_client
 from ii_agent.utils.prompt_generator import enhance_user_prompt
 from ii_agent.utils.sandbox_manager import SandboxManager
@@ -27,6 +34,7 @@ from ii_agent.server.models.messages import (
     EnhancePromptContent,
     EditQueryContent,
     ReviewResultContent,
+    ResubscribeContent,
 )
 from ii_agent.core.config.ii_agent_config import IIAgentConfig
 from ii_agent.llm.base import LLMClient
@@ -44,18 +52,34 @@ logger = logging.getLogger(__name__)
 
 
 class ChatSession:
-    """Manages a single standalone chat session with its own agent, workspace, and message handling."""
+    """Manages a single standalone chat session with its own agent, workspace, and message handling.
+
+    The session is the runtime of the agent and outlives its connections: a
+    client that drops and reconnects is attached to the same session, and the
+    events it missed are replayed from the event store.
+    """
 
     def __init__(
         self,
-        websocket: WebSocket,
+        websocket: Optional[WebSocket],
         session_uuid: uuid.UUID,
         file_store: FileStore,
         config: IIAgentConfig,
+        blob_store: Optional[BlobStore] = None,
+        last_seq: Optional[int] = None,
     ):
         self.websocket = websocket
         self.session_uuid = session_uuid
         self.file_store = file_store
+        # Images in events are moved here and referenced by digest
+        self.blob_store = blob_store
+        # Events are numbered per session, continuing from the stored ones
+        if last_seq is None:
+            last_seq = Events.get_last_seq(session_uuid)
+        self.event_stream = EventStream(last_seq)
+        self._subscriber: Optional[EventSubscriber] = None
+        # Called when the session has neither a connection nor a running task
+        self.on_idle: Optional[Callable[["ChatSession"], None]] = None
         # Session state
         self.agent: Optional[BaseAgent] = None
         self.reviewer_agent: Optional[ReviewerAgent] = None
@@ -65,21 +89,24 @@ class ChatSession:
         self.first_message = True
         self.enable_reviewer = False
         self.config = config
+        self.logger_for_agent_logs: Optional[logging.Logger] = None
 
     async def send_event(self, event: RealtimeEvent):
-        """Send an event to the client via WebSocket."""
-        if self.websocket:
-            try:
-                await self.websocket.send_json(event.model_dump())
-            except Exception as e:
-                logger.error(f"Error sending event to client: {e}")
-
-    async def start_chat_loop(self):
-        """Start the chat loop for this session."""
-        await self.handshake()
+        """Send an event to the connected client, if any."""
+        await self.event_stream.publish(event)
+
+    async def start_chat_loop(self, websocket: Optional[WebSocket] = None):
+        """Start the chat loop for a connection of this session.
+
+        The connection may pass `last_seq` as a query parameter to receive the
+        events it missed since that sequence number.
+        """
+        websocket = websocket or self.websocket
+        last_seq = websocket.query_params.get("last_seq")
+        await self.attach(websocket, int(last_seq) if last_seq else None)
         try:
             while True:
-                message_text = await self.websocket.receive_text()
+                message_text = await websocket.receive_text()
                 message_data = json.loads(message_text)
                 await self.handle_message(message_data)
         except json.JSONDecodeError:
@@ -90,35 +117,81 @@ class ChatSession:
                 )
             )
         except WebSocketDisconnect:
+            # The agent keeps running without the connection; the connection
+            # manager releases the session once it is idle
             logger.info("Client disconnected")
-            if self.agent:
-                self.agent.cancel()  # NOTE: Now we cancel the agent on disconnect, the background implementation will come later
 
-            # Wait for active task to complete before cleanup
-            if self.active_task and not self.active_task.done():
-                try:
-                    await self.active_task
-                except asyncio.CancelledError:
-                    logger.info("Active task was cancelled")
-                except Exception as e:
-                    logger.error(f"Error waiting for active task completion: {e}")
+    async def attach(self, websocket: WebSocket, last_seq: Optional[int] = None):
+        """Make websocket the connection of this session.
 
-            self.cleanup()
+        Args:
+            websocket: The connection to attach
+            last_seq: Highest event sequence number the client has seen. Stored
+                events above it are replayed before live events; None only
+                subscribes to live events.
+        """
+        if self._subscriber is not None:
+            self.event_stream.unsubscribe(self._subscriber)
+            self._subscriber = None
+        self.websocket = websocket
+        await self.handshake()
+        await self._subscribe(last_seq)
+
+    def detach(self, websocket: WebSocket):
+        """Detach a connection without affecting the running agent."""
+        if self.websocket is not websocket:
+            return
+        if self._subscriber is not None:
+            self.event_stream.unsubscribe(self._subscriber)
+            self._subscriber = None
+        self.websocket = None
+
+    def is_idle(self) -> bool:
+        """Whether the session has neither a connection nor a running task."""
+        return self.websocket is None and not self.has_active_task()
+
+    async def _subscribe(self, last_seq: Optional[int]):
+        send = self.websocket.send_text
+        if last_seq is None:
+            self._subscriber = self.event_stream.subscribe(
+                send, load_missed=self._load_missed_events
+            )
+        else:
+            self._subscriber = await self.event_stream.resubscribe(
+                send, last_seq, self._load_missed_events
+            )
+
+    def _load_missed_events(self, after_seq: int) -> list[RealtimeEvent]:
+        # User messages are never echoed to the live stream, so skip them here too
+        return [
+            event
+            for event in Events.get_events_after_seq(self.session_uuid, after_seq)
+            if event.type != EventType.USER_MESSAGE
+        ]
+
+    def _release_if_idle(self):
+        if self.on_idle is not None and self.is_idle():
+            self.on_idle(self)
 
     async def handshake(self):
         """Handle handshake message."""
-        await self.send_event(
-            RealtimeEvent(
-                type=EventType.CONNECTION_ESTABLISHED,
-                content={
-                    "message": "Connected to Agent WebSocket Server",
-                    "workspace_path": str(
-                        Path(self.config.workspace_root).resolve()
-                        / str(self.session_uuid)
-                    ),
-                },
+        try:
+            await self.websocket.send_json(
+                RealtimeEvent(
+                    type=EventType.CONNECTION_ESTABLISHED,
+                    content={
+                        "message": "Connected to Agent WebSocket Server",
+                        "workspace_path": str(
+                            Path(self.config.workspace_root).resolve()
+                            / str(self.session_uuid)
+                        ),
+                        "last_seq": self.event_stream.last_seq,
+                        "agent_running": self.has_active_task(),
+                    },
+                ).model_dump()
             )
-        )
+        except Exception as e:
+            logger.error(f"Error sending event to client: {e}")
 
     async def handle_message(self, message_data: dict):
         """Handle incoming WebSocket messages for this session."""
@@ -138,6 +211,7 @@ class ChatSession:
                 "edit_query": self._handle_edit_query,
                 "enhance_prompt": self._handle_enhance_prompt,
                 "review_result": self._handle_review_result,
+                "resubscribe": self._handle_resubscribe,
             }
 
             handler = handlers.get(msg_type)
@@ -167,11 +241,46 @@ class ChatSession:
                 )
             )
 
+    async def _handle_resubscribe(self, content: dict):
+        """Handle a request to replay the events missed since a sequence number."""
+        try:
+            resubscribe_content = ResubscribeContent(**content)
+            if self.websocket is None:
+                return
+            if self._subscriber is not None:
+                self.event_stream.unsubscribe(self._subscriber)
+                self._subscriber = None
+            await self._subscribe(resubscribe_content.last_seq)
+        except ValidationError as e:
+            await self.send_event(
+                RealtimeEvent(
+                    type=EventType.ERROR,
+                    content={"message": f"Invalid resubscribe content: {str(e)}"},
+                )
+            )
+
     async def _handle_init_agent(self, content: dict):
         """Handle agent initialization."""
         try:
             init_content = InitAgentContent(**content)
 
+            # A reconnecting client finds its agent still running
+            if self.agent and self.has_active_task():
+                await self.send_event(
+                    RealtimeEvent(
+                        type=EventType.AGENT_INITIALIZED,
+                        content={
+                            "message": "Agent already running",
+                            "agent_running": True,
+                        },
+                    )
+                )
+                return
+            self._stop_message_processors()
+            CheckpointStore(self.file_store, str(self.session_uuid)).save_agent_config(
+                init_content.model_dump()
+            )
+
             # Create LLM client using factory
             user_id = None  # TODO: Support user id
             settings_store = await FileSettingsStore.get_instance(self.config, user_id)
@@ -193,17 +302,18 @@ class ChatSession:
                 settings=settings,
             )
 
-            device_id = self.websocket.query_params.get("device_id")
+            query_params = self.websocket.query_params if self.websocket else {}
+            device_id = query_params.get("device_id")
             session_id = workspace_manager.session_id
             # Check and create database session
-            existing_session = Sessions.get_session_by_id(session_id)
+            existing_session = await AsyncSessions.get_session_by_id(session_id)
             if existing_session:
                 logger.info(
                     f"Found existing session {session_id} with workspace at {existing_session.workspace_dir}"
                 )
             else:
                 # Create new session if it doesn't exist
-                Sessions.create_session(
+                await AsyncSessions.create_session(
                     device_id=device_id,
                     session_uuid=session_id,
                     workspace_path=workspace_manager.root,
@@ -215,7 +325,7 @@ class ChatSession:
             sandbox_manager = SandboxManager(
                 session_id=self.session_uuid, settings=settings
             )
-            if self.websocket.query_params.get("session_uuid") is None:
+            if self.websocket is not None and query_params.get("session_uuid") is None:
                 await sandbox_manager.start_sandbox()
             else:
                 # WIP
@@ -229,7 +339,7 @@ class ChatSession:
             settings.client_config = client_config
 
             # Create agent using internal methods
-            self.agent = self._create_agent(
+            self.agent = await self._create_agent(
                 client,
                 workspace_manager,
                 sandbox_manager,
@@ -273,6 +383,16 @@ class ChatSession:
                     },
                 )
             )
+
+            # Pick up a run that was interrupted by a disconnect or a restart
+            if self.agent.has_resumable_run() and not self.has_active_task():
+                await self.send_event(
+                    RealtimeEvent(
+                        type=EventType.SYSTEM,
+                        content={"message": "Resuming interrupted run..."},
+                    )
+                )
+                self.active_task = asyncio.create_task(self._resume_agent_async())
         except ValidationError as e:
             await self.send_event(
                 RealtimeEvent(
@@ -297,7 +417,7 @@ class ChatSession:
             if self.first_message and query_content.text.strip():
                 # Extract first few words as session name (max 100 characters)
                 session_name = query_content.text.strip()[:100]
-                Sessions.update_session_name(self.session_uuid, session_name)
+                await AsyncSessions.update_session_name(self.session_uuid, session_name)
                 self.first_message = False
 
             # Check for slash commands
@@ -398,7 +518,7 @@ class ChatSession:
             # Delete events from database up to last user message if we have a session ID
             if self.agent.session_id:
                 try:
-                    Events.delete_events_from_last_to_user_message(
+                    await AsyncEvents.delete_events_from_last_to_user_message(
                         self.agent.session_id
                     )
                     await self.send_event(
@@ -759,6 +879,27 @@ class ChatSession:
         finally:
             # Clean up the task reference
             self.active_task = None
+            self._release_if_idle()
+
+    async def _resume_agent_async(self):
+        """Resume the agent's in-flight run from its last checkpoint."""
+        try:
+            await self.agent.resume_run_async()
+            if self.agent.history:
+                self.agent.history.save_to_session(
+                    str(self.session_uuid), self.file_store
+                )
+        except Exception as e:
+            logger.error(f"Error resuming agent: {str(e)}")
+            await self.send_event(
+                RealtimeEvent(
+                    type=EventType.ERROR,
+                    content={"message": f"Error resuming agent: {str(e)}"},
+                )
+            )
+        finally:
+            self.active_task = None
+            self._release_if_idle()
 
     async def _run_reviewer_async(self, user_input: str):
         """Run the reviewer agent to analyze the main agent's output."""
@@ -801,6 +942,9 @@ class ChatSession:
                     Path(self.config.workspace_root).resolve() / str(self.session_uuid)
                 ),
             )
+            await AsyncSessions.update_session_metrics(
+                self.session_uuid, self.reviewer_agent.metrics.to_dict()
+            )
             if reviewer_feedback and reviewer_feedback.strip():
                 # Send feedback to agent for improvement
                 await self.send_event(
@@ -838,12 +982,6 @@ Please review this feedback and implement the suggested improvements to better c
 
     def cleanup(self):
         """Clean up resources associated with this session."""
-        # Set websocket to None in the agent but keep the message processor running
-        if self.agent:
-            self.agent.websocket = (
-                None  # This will prevent sending to websocket but keep processing
-            )
-
         # Clean up reviewer agent
         if self.reviewer_agent:
             self.reviewer_agent.websocket = None
@@ -853,6 +991,22 @@ Please review this feedback and implement the suggested improvements to better c
             self.active_task.cancel()
             self.active_task = None
 
+        # Stop the message processors once they saved the queued events
+        self._stop_message_processors()
+        if self._subscriber is not None:
+            self.event_stream.unsubscribe(self._subscriber)
+            self._subscriber = None
+
+        # Release what the tools hold on to, such as their edit history
+        for agent in (self.agent, self.reviewer_agent):
+            if agent is not None:
+                agent.tool_manager.close()
+
+        # Flush pending log records and release the log file handles, without
+        # blocking the event loop on the writer thread
+        close_agent_logger(self.logger_for_agent_logs, wait=False)
+        self.logger_for_agent_logs = None
+
         # Clean up references
         self.websocket = None
         self.agent = None
@@ -860,7 +1014,19 @@ Please review this feedback and implement the suggested improvements to better c
         self.message_processor = None
         self.reviewer_message_processor = None
 
-    def _create_agent(
+    def _stop_message_processors(self):
+        """Stop the message processors after they drained their queues."""
+        processors = [
+            (self.agent, self.message_processor),
+            (self.reviewer_agent, self.reviewer_message_processor),
+        ]
+        for agent, processor in processors:
+            if agent is not None and processor is not None and not processor.done():
+                asyncio.ensure_future(_drain_and_stop(agent.message_queue, processor))
+        self.message_processor = None
+        self.reviewer_message_processor = None
+
+    async def _create_agent(
         self,
         client: LLMClient,
         workspace_manager: WorkspaceManager,
@@ -883,15 +1049,7 @@ Please review this feedback and implement the suggested improvements to better c
         """
 
         # Setup logging
-        logger_for_agent_logs = logging.getLogger(f"agent_logs_{id(websocket)}")
-        logger_for_agent_logs.setLevel(logging.DEBUG)
-        logger_for_agent_logs.propagate = False
-
-        # Ensure we don't duplicate handlers
-        if not logger_for_agent_logs.handlers:
-            logger_for_agent_logs.addHandler(logging.FileHandler(self.config.logs_path))
-            if not self.config.minimize_stdout_logs:
-                logger_for_agent_logs.addHandler(logging.StreamHandler())
+        logger_for_agent_logs = self._setup_logger(websocket)
 
         # Create context manager
         token_counter = TokenCounter()
@@ -903,7 +1061,7 @@ Please review this feedback and implement the suggested improvements to better c
         )
 
         # Create agent
-        return self._create_agent_instance(
+        return await self._create_agent_instance(
             client,
             workspace_manager,
             sandbox_manager,
@@ -915,7 +1073,7 @@ Please review this feedback and implement the suggested improvements to better c
             settings,
         )
 
-    def _create_agent_instance(
+    async def _create_agent_instance(
         self,
         client: LLMClient,
         workspace_manager: WorkspaceManager,
@@ -930,7 +1088,7 @@ Please review this feedback and implement the suggested improvements to better c
         """Create the actual agent instance."""
         # Initialize agent queue and tools
         session_id = workspace_manager.session_id
-        queue = asyncio.Queue()
+        queue = TracedQueue()
 
         system_prompt_builder = SystemPromptBuilder(
             workspace_manager.workspace_mode,
@@ -946,6 +1104,12 @@ Please review this feedback and implement the suggested improvements to better c
             tool_args=tool_args,
         )
 
+        # Continue aggregating usage on top of what the session already recorded
+        metrics = SessionMetrics.from_dict(
+            await AsyncSessions.get_session_metrics(session_id),
+            session_id=str(session_id),
+        )
+
         # try to get history from file store
         init_history = MessageHistory(context_manager)
         try:
@@ -964,7 +1128,10 @@ Please review this feedback and implement the suggested improvements to better c
             init_history=init_history,
             max_output_tokens_per_turn=self.config.max_output_tokens_per_turn,
             max_turns=self.config.max_turns,
-            websocket=websocket,
+            event_stream=self.event_stream,
+            metrics=metrics,
+            checkpoint_store=CheckpointStore(file_store, str(session_id)),
+            blob_store=self.blob_store,
         )
 
         # Store the session ID in the agent for event tracking
@@ -972,18 +1139,21 @@ Please review this feedback and implement the suggested improvements to better c
         return agent
 
     def _setup_logger(self, websocket: WebSocket) -> logging.Logger:
-        """Setup logger for the agent."""
-        logger_for_agent_logs = logging.getLogger(f"agent_logs_{id(websocket)}")
-        logger_for_agent_logs.setLevel(logging.DEBUG)
-        logger_for_agent_logs.propagate = False
+        """Setup logger for the agent.
 
-        # Ensure we don't duplicate handlers
-        if not logger_for_agent_logs.handlers:
-            logger_for_agent_logs.addHandler(logging.FileHandler(self.config.logs_path))
-            if not self.config.minimize_stdout_logs:
-                logger_for_agent_logs.addHandler(logging.StreamHandler())
-
-        return logger_for_agent_logs
+        Records are written by a background thread, and the logger is shared
+        by the agent and the reviewer until `cleanup` closes it.
+        """
+        if self.logger_for_agent_logs is None:
+            self.logger_for_agent_logs = create_agent_logger(
+                f"agent_logs_{self.session_uuid}_{id(websocket)}",
+                self.config.logs_path,
+                to_stdout=not self.config.minimize_stdout_logs,
+                max_field_length=self.config.agent_log_max_field_length,
+                max_bytes=self.config.agent_log_max_bytes,
+                backup_count=self.config.agent_log_backup_count,
+            )
+        return self.logger_for_agent_logs
 
     def _create_context_manager(self, client: LLMClient, logger: logging.Logger):
         """Create context manager based on configuration."""
@@ -1024,7 +1194,7 @@ Please review this feedback and implement the suggested improvements to better c
         context_manager = self._create_context_manager(client, logger_for_agent_logs)
 
         # Initialize agent queue and tools
-        queue = asyncio.Queue()
+        queue = TracedQueue()
         system_prompt_builder = SystemPromptBuilder(
             workspace_manager.workspace_mode,
             tool_args.get("sequential_thinking", False),
@@ -1048,6 +1218,18 @@ Please review this feedback and implement the suggested improvements to better c
             max_output_tokens_per_turn=self.config.max_output_tokens_per_turn,
             max_turns=self.config.max_turns,
             websocket=websocket,
+            metrics=self.agent.metrics if self.agent else None,
         )
 
         return reviewer_agent
+
+
+async def _drain_and_stop(
+    queue: asyncio.Queue, processor: asyncio.Task, timeout: float = 30.0
+):
+    try:
+        await asyncio.wait_for(queue.join(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Message queue not drained before stopping its processor")
+    finally:
+        processor.cancel()
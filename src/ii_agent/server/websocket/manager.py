@@ -1,32 +1,78 @@
+import asyncio
 import logging
 from pathlib import Path
 import uuid
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from fastapi import WebSocket
 
+from ii_agent.core.checkpoint import CheckpointStore
 from ii_agent.core.config.ii_agent_config import IIAgentConfig
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.storage.blobs import BlobStore
 from ii_agent.core.storage.files import FileStore
+from ii_agent.core.storage.locations import CONVERSATION_BASE_DIR
+from ii_agent.db.async_manager import AsyncEvents
 from ii_agent.server.websocket.chat_session import ChatSession
+from ii_agent.server.websocket.session_registry import (
+    InMemorySessionRegistry,
+    SessionOwnership,
+    SessionRegistry,
+    default_worker_id,
+)
 
 logger = logging.getLogger(__name__)
 
+# Close code telling the client to reconnect to the worker owning its session
+REDIRECT_CLOSE_CODE = 4307
+
 
 class ConnectionManager:
-    """Manages WebSocket connections and their associated chat sessions."""
+    """Manages WebSocket connections and their associated chat sessions.
+
+    Chat sessions are keyed by session UUID and own the agent runs, so a
+    connection that drops can reconnect to the session while its agent keeps
+    running. A session is released once it has neither a connection nor a
+    running task.
+
+    With several workers, each session runs on exactly one of them. A worker
+    claims a session in the registry before running it and keeps renewing
+    the claim; connections reaching another worker are redirected to the
+    owner, and the sessions of a crashed worker are taken over once its
+    claims expire.
+    """
 
     def __init__(
         self,
         file_store: FileStore,
         config: IIAgentConfig,
+        registry: Optional[SessionRegistry] = None,
+        blob_store: Optional[BlobStore] = None,
     ):
-        # Active chat sessions mapped by WebSocket
+        # Chat session of every open WebSocket connection
         self.sessions: Dict[WebSocket, ChatSession] = {}
+        # Live chat sessions mapped by session UUID, with or without a connection
+        self.runtimes: Dict[uuid.UUID, ChatSession] = {}
         self.file_store = file_store
+        self.blob_store = blob_store
         self.config = config
+        self.registry = registry or InMemorySessionRegistry(
+            config.worker_id or default_worker_id(),
+            config.worker_url,
+            config.session_lease_seconds,
+        )
+        self._background_tasks: list[asyncio.Task] = []
+        # Restores a session if it is archived, telling whether it was; run
+        # in a worker thread before a chat attaches to a session
+        self.restore_if_archived: Optional[Callable[[str], bool]] = None
 
-    async def connect(self, websocket: WebSocket) -> ChatSession:
-        """Accept a new WebSocket connection and create a chat session."""
+    async def connect(self, websocket: WebSocket) -> Optional[ChatSession]:
+        """Accept a new WebSocket connection and attach it to its chat session.
+
+        Returns:
+            The chat session, or None if the session runs on another worker
+            and the connection was redirected there
+        """
         await websocket.accept()
 
         # Create workspace for this session if not provided
@@ -36,8 +82,20 @@ class ConnectionManager:
         else:
             session_uuid = uuid.UUID(session_uuid)
 
-        # Create a new chat session for this connection
-        session = ChatSession(websocket, session_uuid, self.file_store, self.config)
+        session = self.runtimes.get(session_uuid)
+        if session is None:
+            owner = await asyncio.to_thread(self.registry.claim, str(session_uuid))
+            if not self.registry.is_local(owner):
+                await self._redirect(websocket, owner)
+                return None
+            if self.restore_if_archived is not None and await asyncio.to_thread(
+                self.restore_if_archived, str(session_uuid)
+            ):
+                logger.info(f"Restored archived session {session_uuid} to attach to it")
+            # Create a new chat session for this connection
+            session = await self._create_session(websocket, session_uuid)
+        else:
+            logger.info(f"Reattaching WebSocket to running session {session_uuid}")
         self.sessions[websocket] = session
 
         # Quick Fix for upload
@@ -50,13 +108,15 @@ class ConnectionManager:
         return session
 
     def disconnect(self, websocket: WebSocket):
-        """Handle WebSocket disconnection and cleanup."""
+        """Handle WebSocket disconnection, keeping running sessions alive."""
         logger.info(f"WebSocket disconnecting: {id(websocket)}")
 
-        if websocket in self.sessions:
-            session = self.sessions[websocket]
-            session.cleanup()
-            del self.sessions[websocket]
+        session = self.sessions.pop(websocket, None)
+        if session is None:
+            return
+        session.detach(websocket)
+        if session.is_idle():
+            self._release(session)
 
     def get_session(self, websocket: WebSocket) -> Optional[ChatSession]:
         """Get the chat session for a WebSocket connection."""
@@ -65,3 +125,193 @@ class ConnectionManager:
     def get_connection_count(self) -> int:
         """Get the number of active connections."""
         return len(self.sessions)
+
+    def is_session_active(self, session_id: str) -> bool:
+        """Whether a session runs here or is claimed by another live worker."""
+        if uuid.UUID(session_id) in self.runtimes:
+            return True
+        owner = self.registry.get_owner(session_id)
+        return owner is not None and not owner.expired
+
+    def start(self):
+        """Start renewing this worker's session claims in the background."""
+        self._background_tasks.append(asyncio.create_task(self._renew_claims_loop()))
+        if self.config.resume_runs_on_startup:
+            self._background_tasks.append(
+                asyncio.create_task(self._take_over_runs_loop())
+            )
+
+    async def resume_in_flight_runs(self):
+        """Resume in-flight runs that no live worker owns.
+
+        These are the runs that were in flight when this server last stopped,
+        or that belonged to a worker whose claims expired.
+        """
+        # Listing the sessions and reading their checkpoints is file I/O on
+        # every session, so it runs in a worker thread
+        in_flight = await asyncio.to_thread(self._find_in_flight_sessions)
+        for session_id, agent_config in in_flight:
+            session_uuid = uuid.UUID(session_id)
+            if session_uuid in self.runtimes:
+                continue
+            owner = await asyncio.to_thread(self.registry.claim, session_id)
+            if not self.registry.is_local(owner) or session_uuid in self.runtimes:
+                continue
+
+            logger.info(f"Resuming in-flight run of session {session_id}")
+            session = await self._create_session(None, session_uuid)
+            # Initializing the agent picks up the in-flight run
+            await session.handle_message(
+                {"type": "init_agent", "content": agent_config}
+            )
+            if session.is_idle():
+                self._release(session)
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Stop all sessions, leaving running agents resumable."""
+        for task in self._background_tasks:
+            task.cancel()
+        self._background_tasks.clear()
+
+        tasks = []
+        for session in self.runtimes.values():
+            if session.agent is not None and session.has_active_task():
+                session.agent.cancel(keep_checkpoint=True)
+                tasks.append(session.active_task)
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+        for session in list(self.runtimes.values()):
+            self._release(session)
+        self.sessions.clear()
+        # Let other workers take the interrupted runs over right away
+        await asyncio.to_thread(self.registry.release_all)
+
+    async def _create_session(
+        self, websocket: Optional[WebSocket], session_uuid: uuid.UUID
+    ) -> ChatSession:
+        last_seq = await AsyncEvents.get_last_seq(session_uuid)
+        if session_uuid in self.runtimes:
+            # Another connection created the session while we were waiting
+            return self.runtimes[session_uuid]
+        session = ChatSession(
+            websocket,
+            session_uuid,
+            self.file_store,
+            self.config,
+            self.blob_store,
+            last_seq=last_seq,
+        )
+        session.on_idle = self._release
+        self.runtimes[session_uuid] = session
+        return session
+
+    def _release(self, session: ChatSession):
+        logger.info(f"Releasing idle chat session {session.session_uuid}")
+        session.cleanup()
+        if self.runtimes.get(session.session_uuid) is session:
+            del self.runtimes[session.session_uuid]
+            try:
+                self.registry.release(str(session.session_uuid))
+            except Exception as e:
+                # The claim expires on its own if it cannot be released
+                logger.error(f"Error releasing claim on {session.session_uuid}: {e}")
+
+    async def _redirect(self, websocket: WebSocket, owner: SessionOwnership):
+        logger.info(
+            f"Session {owner.session_id} is owned by worker {owner.worker_id}, "
+            f"redirecting connection {id(websocket)}"
+        )
+        if owner.worker_url is None:
+            await websocket.send_json(
+                RealtimeEvent(
+                    type=EventType.ERROR,
+                    content={"message": "Session is running on another worker"},
+                ).model_dump()
+            )
+            # Try again later
+            await websocket.close(code=1013)
+            return
+        await websocket.send_json(
+            RealtimeEvent(
+                type=EventType.SESSION_REDIRECT,
+                content={
+                    "session_uuid": owner.session_id,
+                    "worker_id": owner.worker_id,
+                    "url": owner.worker_url,
+                },
+            ).model_dump()
+        )
+        await websocket.close(code=REDIRECT_CLOSE_CODE)
+
+    def _find_in_flight_sessions(self) -> list[tuple[str, dict[str, Any]]]:
+        """List the sessions not running here whose last run is in flight.
+
+        Returns:
+            The session ids with the agent config to resume each run with
+        """
+        try:
+            session_dirs = self.file_store.list(CONVERSATION_BASE_DIR)
+        except FileNotFoundError:
+            return []
+
+        in_flight = []
+        for session_dir in session_dirs:
+            session_id = session_dir.rstrip("/").split("/")[-1]
+            try:
+                session_uuid = uuid.UUID(session_id)
+            except ValueError:
+                continue
+            if session_uuid in self.runtimes:
+                continue
+            checkpoint_store = CheckpointStore(self.file_store, session_id)
+            # Few runs are in flight, so check that before the agent config
+            if checkpoint_store.load_in_flight() is None:
+                continue
+            agent_config = checkpoint_store.load_agent_config()
+            if agent_config is not None:
+                in_flight.append((session_id, agent_config))
+        return in_flight
+
+    async def _renew_claims_loop(self):
+        interval = max(self.registry.lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            session_ids = [str(session_uuid) for session_uuid in self.runtimes]
+            try:
+                owned = await asyncio.to_thread(self.registry.renew, session_ids)
+            except Exception as e:
+                logger.error(f"Error renewing session claims: {e}")
+                continue
+            for session_id in set(session_ids) - owned:
+                session = self.runtimes.get(uuid.UUID(session_id))
+                if session is not None:
+                    await self._evict(session)
+
+    async def _take_over_runs_loop(self):
+        while True:
+            await asyncio.sleep(self.registry.lease_seconds)
+            try:
+                await self.resume_in_flight_runs()
+            except Exception as e:
+                logger.error(f"Error taking over in-flight runs: {e}")
+
+    async def _evict(self, session: ChatSession):
+        """Stop a session whose claim was lost to another worker.
+
+        Its run stays resumable for the new owner, and its connections are
+        closed so that the clients reconnect to the new owner.
+        """
+        logger.warning(f"Lost claim on session {session.session_uuid}, evicting it")
+        if session.agent is not None and session.has_active_task():
+            session.agent.cancel(keep_checkpoint=True)
+            await asyncio.wait([session.active_task], timeout=10.0)
+        for websocket, connected in list(self.sessions.items()):
+            if connected is session:
+                try:
+                    await websocket.close(code=1012)
+                except Exception:
+                    pass
+        session.cleanup()
+        if self.runtimes.get(session.session_uuid) is session:
+            del self.runtimes[session.session_uuid]
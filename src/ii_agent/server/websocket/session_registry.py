@@ -0,0 +1,194 @@
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Dict, Iterable, Optional
+
+from ii_agent.db.manager import SessionOwners
+from ii_agent.db.models import SessionOwner
+
+
+def default_worker_id() -> str:
+    """Identify this server process uniquely across the deployment."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass
+class SessionOwnership:
+    """The worker currently running a session.
+
+    Attributes:
+        session_id: The session identifier
+        worker_id: Identifier of the owning worker
+        worker_url: Websocket URL clients use to reach the owning worker
+        lease_expires_at: Unix time after which other workers may take over
+    """
+
+    session_id: str
+    worker_id: str
+    worker_url: Optional[str]
+    lease_expires_at: float
+
+    @property
+    def expired(self) -> bool:
+        return self.lease_expires_at <= time.time()
+
+
+class SessionRegistry(ABC):
+    """Records which worker owns each running session.
+
+    Every server process that runs sessions claims them here before creating
+    a runtime. Claims are leases that the owner keeps renewing; when a worker
+    crashes its leases run out and another worker may take the sessions over
+    and resume their checkpointed runs.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        worker_url: Optional[str] = None,
+        lease_seconds: float = 30.0,
+    ):
+        self.worker_id = worker_id
+        self.worker_url = worker_url
+        self.lease_seconds = lease_seconds
+
+    def is_local(self, ownership: SessionOwnership) -> bool:
+        return ownership.worker_id == self.worker_id
+
+    @abstractmethod
+    def claim(self, session_id: str) -> SessionOwnership:
+        """Claim a session for this worker.
+
+        Returns:
+            The owner after the claim, which is another worker if that worker
+            still holds a live lease on the session
+        """
+
+    @abstractmethod
+    def renew(self, session_ids: Iterable[str]) -> set[str]:
+        """Renew this worker's leases and return the sessions it still owns."""
+
+    @abstractmethod
+    def release(self, session_id: str) -> None:
+        """Give up this worker's claim on a session."""
+
+    @abstractmethod
+    def release_all(self) -> None:
+        """Give up every claim of this worker, e.g. on shutdown."""
+
+    @abstractmethod
+    def get_owner(self, session_id: str) -> Optional[SessionOwnership]:
+        """Get the current owner of a session, if any."""
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Registry local to one process, for single-worker deployments and tests."""
+
+    def __init__(
+        self,
+        worker_id: str,
+        worker_url: Optional[str] = None,
+        lease_seconds: float = 30.0,
+        owners: Optional[Dict[str, SessionOwnership]] = None,
+    ):
+        super().__init__(worker_id, worker_url, lease_seconds)
+        # Registries sharing the same dict behave like workers sharing a database
+        self.owners = owners if owners is not None else {}
+
+    def claim(self, session_id: str) -> SessionOwnership:
+        session_id = str(session_id)
+        owner = self.owners.get(session_id)
+        if owner is None or self.is_local(owner) or owner.expired:
+            owner = SessionOwnership(
+                session_id=session_id,
+                worker_id=self.worker_id,
+                worker_url=self.worker_url,
+                lease_expires_at=time.time() + self.lease_seconds,
+            )
+            self.owners[session_id] = owner
+        return owner
+
+    def renew(self, session_ids: Iterable[str]) -> set[str]:
+        owned = set()
+        lease_expires_at = time.time() + self.lease_seconds
+        for session_id in map(str, session_ids):
+            owner = self.owners.get(session_id)
+            if owner is not None and self.is_local(owner):
+                owner.lease_expires_at = lease_expires_at
+                owned.add(session_id)
+        return owned
+
+    def release(self, session_id: str) -> None:
+        owner = self.owners.get(str(session_id))
+        if owner is not None and self.is_local(owner):
+            del self.owners[str(session_id)]
+
+    def release_all(self) -> None:
+        for session_id, owner in list(self.owners.items()):
+            if self.is_local(owner):
+                del self.owners[session_id]
+
+    def get_owner(self, session_id: str) -> Optional[SessionOwnership]:
+        return self.owners.get(str(session_id))
+
+
+class DatabaseSessionRegistry(SessionRegistry):
+    """Registry shared by all workers through the session database."""
+
+    def claim(self, session_id: str) -> SessionOwnership:
+        owner = SessionOwners.claim_session(
+            str(session_id), self.worker_id, self.lease_seconds, self.worker_url
+        )
+        return self._to_ownership(owner)
+
+    def renew(self, session_ids: Iterable[str]) -> set[str]:
+        return SessionOwners.renew_leases(
+            self.worker_id, [str(sid) for sid in session_ids], self.lease_seconds
+        )
+
+    def release(self, session_id: str) -> None:
+        SessionOwners.release_session(str(session_id), self.worker_id)
+
+    def release_all(self) -> None:
+        SessionOwners.release_worker(self.worker_id)
+
+    def get_owner(self, session_id: str) -> Optional[SessionOwnership]:
+        owner = SessionOwners.get_session_owner(str(session_id))
+        return self._to_ownership(owner) if owner is not None else None
+
+    @staticmethod
+    def _to_ownership(owner: SessionOwner) -> SessionOwnership:
+        # Leases are stored as naive UTC datetimes
+        lease_expires_at = owner.lease_expires_at
+        return SessionOwnership(
+            session_id=owner.session_id,
+            worker_id=owner.worker_id,
+            worker_url=owner.worker_url,
+            lease_expires_at=lease_expires_at.replace(tzinfo=timezone.utc).timestamp(),
+        )
+
+
+def get_session_registry(
+    kind: str,
+    worker_id: Optional[str] = None,
+    worker_url: Optional[str] = None,
+    lease_seconds: float = 30.0,
+) -> SessionRegistry:
+    """Create the session registry configured for this deployment.
+
+    Args:
+        kind: "memory" for a single worker, "database" to share ownership
+            between workers through the session database
+        worker_id: Identifier of this worker, defaults to host name and pid
+        worker_url: Websocket URL clients use to reach this worker
+        lease_seconds: How long a claim lasts without renewal
+    """
+    worker_id = worker_id or default_worker_id()
+    if kind == "memory":
+        return InMemorySessionRegistry(worker_id, worker_url, lease_seconds)
+    if kind == "database":
+        return DatabaseSessionRegistry(worker_id, worker_url, lease_seconds)
+    raise ValueError(f"Invalid session registry: {kind}")
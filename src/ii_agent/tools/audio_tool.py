@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import hashlib
 import os
@@ -11,6 +12,7 @@ from ii_agent.tools.base import (
     ToolImplOutput,
 )
 
+from ii_agent.core.media_jobs import MediaJob, MediaJobManager, run_command
 from ii_agent.utils.workspace_manager import WorkspaceManager
 from ii_agent.llm.message_history import MessageHistory
 from ii_agent.core.storage.models.settings import Settings
@@ -45,10 +47,14 @@ Supported file formats: {", ".join(SUPPORTED_AUDIO_FORMATS)}"""
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
 
         # Extract configuration from settings
         openai_api_key = None
@@ -84,6 +90,17 @@ Supported file formats: {", ".join(SUPPORTED_AUDIO_FORMATS)}"""
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "audio",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Transcribe the audio file."""
         relative_file_path = tool_input["file_path"]
         full_file_path = self.workspace_manager.workspace_path(Path(relative_file_path))
 
@@ -107,10 +124,7 @@ Supported file formats: {", ".join(SUPPORTED_AUDIO_FORMATS)}"""
             )
 
         try:
-            with open(full_file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="gpt-4o-transcribe", file=audio_file
-                )
+            transcript = await asyncio.to_thread(self._transcribe, full_file_path)
 
             transcribed_text = transcript.text if transcript else ""
 
@@ -132,6 +146,12 @@ Supported file formats: {", ".join(SUPPORTED_AUDIO_FORMATS)}"""
                 {"success": False, "error": str(e)},
             )
 
+    def _transcribe(self, full_file_path: Path) -> Any:
+        with open(full_file_path, "rb") as audio_file:
+            return self.client.audio.transcriptions.create(
+                model="gpt-4o-transcribe", file=audio_file
+            )
+
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
         return f"Transcribing audio file: {tool_input['file_path']}"
 
@@ -175,10 +195,14 @@ Saves the output as an MP3 file in the workspace. Available voices: {", ".join(A
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
 
         # Extract configuration from settings
         openai_api_key = None
@@ -234,6 +258,17 @@ Saves the output as an MP3 file in the workspace. Available voices: {", ".join(A
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "audio",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Generate the audio file."""
         print("Initializing AudioGenerateTool $$$$$")
         text_to_speak = tool_input["text"]
         relative_output_filename = tool_input["output_filename"]
@@ -266,7 +301,8 @@ Saves the output as an MP3 file in the workspace. Available voices: {", ".join(A
         temp_wav_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure uploads exists
 
         try:
-            completion = self.client.chat.completions.create(
+            completion = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model="gpt-4o-audio-preview",
                 modalities=["text", "audio"],
                 audio={"voice": voice, "format": "wav"},  # API gives WAV
@@ -283,12 +319,11 @@ Saves the output as an MP3 file in the workspace. Available voices: {", ".join(A
             wav_bytes = base64.b64decode(completion.choices[0].message.audio.data)
 
             # 1. Save the temporary WAV file
-            with open(temp_wav_path, "wb") as f:
-                f.write(wav_bytes)
+            await asyncio.to_thread(temp_wav_path.write_bytes, wav_bytes)
 
             # 2. Convert WAV to MP3 using ffmpeg
             try:
-                subprocess.run(
+                await run_command(
                     [
                         "ffmpeg",
                         "-y",  # Overwrite output files without asking
@@ -299,10 +334,7 @@ Saves the output as an MP3 file in the workspace. Available voices: {", ".join(A
                         "-b:a",
                         "64k",  # Bitrate for compression
                         str(output_mp3_path),
-                    ],
-                    check=True,  # Raise error if ffmpeg fails
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.STDOUT,
+                    ]
                 )
             except FileNotFoundError:
                 # ffmpeg not found warning already printed in __init__
@@ -1,5 +1,4 @@
 from abc import ABC, abstractmethod
-import asyncio
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
@@ -11,6 +10,7 @@ from ii_agent.llm.base import (
     ToolParam,
 )
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.tools.clients.http_sessions import run_with_http_sessions
 
 ToolInputSchema = dict[str, Any]
 
@@ -46,6 +46,16 @@ class LLMTool(ABC):
         """Whether the tool wants to stop the current agentic run."""
         return False
 
+    def get_state(self) -> Optional[dict[str, Any]]:
+        """JSON-serializable state to checkpoint with the agent run, if any."""
+        return None
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restore state previously returned by get_state."""
+
+    def close(self) -> None:
+        """Release what the tool holds on to, once its session ends."""
+
     # Final is here to indicate that subclasses should override run_impl(), not
     # run(). There may be a reason in the future to override run() itself, and
     # if such a reason comes up, this @final decorator can be removed.
@@ -89,7 +99,7 @@ class LLMTool(ABC):
                 is allowed to modify this object, so the caller should make a copy
                 if that's not desired. The dialog messages should not contain
         """
-        return asyncio.run(self.run_async(tool_input, message_history))
+        return run_with_http_sessions(self.run_async(tool_input, message_history))
 
     def get_tool_start_message(self, tool_input: ToolInputSchema) -> str:
         """Return a user-friendly message to be shown to the model when the tool is called."""
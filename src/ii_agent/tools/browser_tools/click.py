@@ -59,7 +59,7 @@ class BrowserClickTool(BrowserTool):
             state = await self.browser.update_state()
             state = await self.browser.handle_pdf_url_navigation()
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Click operation failed at ({coordinate_x}, {coordinate_y}): {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
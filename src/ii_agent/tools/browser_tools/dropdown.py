@@ -85,7 +85,7 @@ class BrowserGetSelectOptionsTool(BrowserTool):
             msg += "\nIf you decide to use this select element, use the exact option name in select_dropdown_option"
             state = await self.browser.update_state()
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Get select options failed for element {index}: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
@@ -212,7 +212,7 @@ class BrowserSelectDropdownOptionTool(BrowserTool):
             if result.get("success"):
                 msg = f"Selected option '{option}' with value '{result.get('value')}' at index {result.get('index')}"
                 state = await self.browser.update_state()
-                return utils.format_screenshot_tool_output(state.screenshot, msg)
+                return await utils.format_screenshot_tool_output(state.screenshot, msg)
             else:
                 error_msg = result.get("error", "Unknown error")
                 if "availableOptions" in result:
@@ -50,7 +50,7 @@ class BrowserEnterTextTool(BrowserTool):
             msg = f'Entered "{text}" on the keyboard. Make sure to double check that the text was entered to where you intended.'
             state = await self.browser.update_state()
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Enter text operation failed: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
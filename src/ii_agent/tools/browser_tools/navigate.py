@@ -49,7 +49,7 @@ class BrowserNavigationTool(BrowserTool):
 
             msg = f"Navigated to {url}"
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Navigation operation failed: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
@@ -97,7 +97,7 @@ class BrowserRestartTool(BrowserTool):
 
             msg = f"Navigated to {url}"
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Browser restart and navigation failed: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
@@ -45,7 +45,7 @@ class BrowserPressKeyTool(BrowserTool):
             msg = f'Pressed "{key}" on the keyboard.'
             state = await self.browser.update_state()
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             return ToolImplOutput(
                 f"Failed to press key: {type(e).__name__}: {str(e)}",
@@ -37,7 +37,7 @@ class BrowserScrollDownTool(BrowserTool):
             state = await self.browser.update_state()
 
             msg = "Scrolled page down"
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Scroll down operation failed: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
@@ -72,7 +72,7 @@ class BrowserScrollUpTool(BrowserTool):
             state = await self.browser.update_state()
 
             msg = "Scrolled page up"
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Scroll up operation failed: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
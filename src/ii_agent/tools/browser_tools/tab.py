@@ -36,7 +36,7 @@ class BrowserSwitchTabTool(BrowserTool):
             msg = f"Switched to tab {index}"
             state = await self.browser.update_state()
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Switch tab operation failed for tab {index}: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
@@ -61,7 +61,7 @@ class BrowserOpenNewTabTool(BrowserTool):
             msg = "Opened a new tab"
             state = await self.browser.update_state()
 
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return await utils.format_screenshot_tool_output(state.screenshot, msg)
         except Exception as e:
             error_msg = f"Open new tab operation failed: {type(e).__name__}: {str(e)}"
             return ToolImplOutput(tool_output=error_msg, tool_result_message=error_msg)
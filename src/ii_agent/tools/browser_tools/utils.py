@@ -1,17 +1,17 @@
+import base64
+
 from ii_agent.tools.base import ToolImplOutput
+from ii_agent.utils.image_prep import prepare_image
 
 
-def format_screenshot_tool_output(screenshot: str, msg: str) -> ToolImplOutput:
+async def format_screenshot_tool_output(screenshot: str, msg: str) -> ToolImplOutput:
+    # Screenshots keep their size, the model clicks at their coordinates
+    image = await prepare_image(
+        base64.b64decode(screenshot), resize=False, use_cache=False
+    )
     return ToolImplOutput(
         tool_output=[
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": screenshot,
-                },
-            },
+            {"type": "image", "source": image.to_source()},
             {"type": "text", "text": msg},
         ],
         tool_result_message=msg,
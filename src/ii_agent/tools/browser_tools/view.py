@@ -41,7 +41,7 @@ class BrowserViewTool(BrowserTool):
 Current viewport information:
 {highlighted_elements}"""
 
-            return utils.format_screenshot_tool_output(
+            return await utils.format_screenshot_tool_output(
                 state.screenshot_with_highlights, msg
             )
         except Exception as e:
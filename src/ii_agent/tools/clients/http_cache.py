@@ -0,0 +1,59 @@
+"""Process-wide, disk-backed cache of webpage visits and web searches.
+
+The tools of every session share one cache, so a page or a query one
+session fetched is served to the next from disk until its TTL runs out,
+instead of paying the latency and the API cost again. Direct fetches keep
+the ETag and Last-Modified of the response and revalidate a stale copy
+with a conditional request rather than downloading it again. The cache is
+bounded in bytes and evicts the least recently used entries first.
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.utils.result_cache import ResultCache
+
+# Responses are cached like any other result
+HttpCache = ResultCache
+
+
+def parse_cache_control(value: Optional[str]) -> tuple[Optional[int], bool]:
+    """Read the max-age of a Cache-Control header and whether it allows storing.
+
+    Returns:
+        The max-age in seconds, or None if unset, and False if the response
+        must not be stored
+    """
+    max_age = None
+    storable = True
+    for directive in (value or "").lower().split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name in ("no-store", "private"):
+            storable = False
+        elif name == "no-cache":
+            max_age = 0
+        elif name == "max-age" and max_age is None:
+            try:
+                max_age = max(int(argument.strip('"')), 0)
+            except ValueError:
+                pass
+    return max_age, storable
+
+
+@lru_cache(maxsize=None)
+def get_http_cache() -> Optional[HttpCache]:
+    """Get the cache shared by the tools of this process, None if disabled.
+
+    A local file store keeps the cache on disk next to its other data, so
+    it survives restarts and is shared by the workers using the store.
+    """
+    config = load_ii_agent_config()
+    if config.http_cache_max_bytes <= 0:
+        return None
+    if config.file_store == "local":
+        path = os.path.join(config.file_store_path, "cache", "http_cache.db")
+    else:
+        path = ":memory:"
+    return HttpCache(path, config.http_cache_max_bytes)
@@ -0,0 +1,132 @@
+"""Pooled aiohttp sessions shared by the search and visit clients.
+
+Opening a ClientSession per request pays a DNS lookup, a TCP connect and
+a TLS handshake on every call. The pool keeps one session per host with
+keep-alive connections and a DNS cache instead, bounded in connections.
+
+A session is bound to the event loop it was created on, and tools also
+run on short-lived loops, e.g. through BaseVisitClient.forward, so the
+pool keeps the sessions of each loop apart. Sessions hold on to their
+loop, so they must be closed before the loop ends: the server closes the
+sessions of its loop on shutdown, and short-lived loops are run with
+run_with_http_sessions, which closes theirs before returning.
+"""
+
+import asyncio
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Coroutine, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ii_agent.core.config.utils import load_ii_agent_config
+
+T = TypeVar("T")
+
+# Every pool, so that the sessions a short-lived loop opened in any of them
+# can be closed
+_pools: "weakref.WeakSet[HttpSessionPool]" = weakref.WeakSet()
+
+
+class HttpSessionPool:
+    """One keep-alive aiohttp session per host and event loop."""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+    ):
+        """Initialize the pool.
+
+        Args:
+            limit: Maximum number of open connections of a session
+            limit_per_host: Maximum number of open connections to one endpoint
+            keepalive_timeout: Seconds an idle connection is kept open
+            dns_cache_ttl: Seconds a resolved host name is reused
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._lock = threading.Lock()
+        self._sessions: dict[
+            asyncio.AbstractEventLoop, dict[str, aiohttp.ClientSession]
+        ] = {}
+        _pools.add(self)
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """Get the session for the host of a URL on the running event loop.
+
+        The session is shared, so callers must not close it; pass per-request
+        settings such as timeouts to the request instead.
+        """
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            sessions = self._sessions.get(loop)
+            if sessions is None:
+                # Drop what loops that ended without closing their sessions
+                # left behind, so that they can be collected
+                for closed in [key for key in self._sessions if key.is_closed()]:
+                    del self._sessions[closed]
+                sessions = self._sessions[loop] = {}
+            session = sessions.get(host)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=self.limit,
+                        limit_per_host=self.limit_per_host,
+                        keepalive_timeout=self.keepalive_timeout,
+                        ttl_dns_cache=self.dns_cache_ttl,
+                    )
+                )
+                sessions[host] = session
+            return session
+
+    async def close(self) -> None:
+        """Close the sessions of the running event loop."""
+        with self._lock:
+            sessions = self._sessions.pop(asyncio.get_running_loop(), {})
+        for session in sessions.values():
+            await session.close()
+
+
+@lru_cache(maxsize=None)
+def get_http_session_pool() -> HttpSessionPool:
+    """Get the session pool shared by the clients of this process."""
+    config = load_ii_agent_config()
+    return HttpSessionPool(
+        limit=config.http_pool_limit,
+        limit_per_host=config.http_pool_limit_per_host,
+        keepalive_timeout=config.http_keepalive_seconds,
+        dns_cache_ttl=config.http_dns_cache_seconds,
+    )
+
+
+async def close_http_sessions(pool: Optional[HttpSessionPool] = None) -> None:
+    """Close the pooled sessions of the running event loop, e.g. on shutdown.
+
+    Args:
+        pool: Pool to close the sessions of, every pool if unset
+    """
+    for closing in [pool] if pool is not None else list(_pools):
+        await closing.close()
+
+
+def run_with_http_sessions(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on a new event loop, like asyncio.run.
+
+    The pooled sessions opened on the loop are closed before it ends.
+    """
+
+    async def run_and_close() -> T:
+        try:
+            return await main
+        finally:
+            await close_http_sessions()
+
+    return asyncio.run(run_and_close())
@@ -69,6 +69,9 @@ class StrReplaceClientBase(ABC):
         """Check if path is within the specified directory."""
         pass
 
+    def close(self) -> None:
+        """Release the edit history kept for undo_edit."""
+
 
 class LocalStrReplaceClient(StrReplaceClientBase):
     """Local implementation using StrReplaceManager directly."""
@@ -119,6 +122,9 @@ class LocalStrReplaceClient(StrReplaceClientBase):
     def is_path_in_directory(self, directory_str: str, path_str: str) -> bool:
         return self.manager.is_path_in_directory(directory_str, path_str)
 
+    def close(self) -> None:
+        self.manager.close()
+
 
 class RemoteStrReplaceClient(StrReplaceClientBase):
     """Remote implementation using HTTP API calls."""
@@ -294,3 +300,6 @@ class StrReplaceClient:
 
     def is_path_in_directory(self, directory_str: str, path_str: str) -> bool:
         return self._client.is_path_in_directory(directory_str, path_str)
+
+    def close(self) -> None:
+        self._client.close()
@@ -1,11 +1,37 @@
 import asyncio
 import aiohttp
 import os
+from dataclasses import dataclass
+from ii_agent.core.config.ii_agent_config import IIAgentConfig
+from ii_agent.core.config.utils import load_ii_agent_config
 from ii_agent.utils.constants import VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH
+from ii_agent.tools.clients.http_cache import (
+    HttpCache,
+    get_http_cache,
+    parse_cache_control,
+)
+from ii_agent.tools.clients.http_sessions import (
+    HttpSessionPool,
+    get_http_session_pool,
+    run_with_http_sessions,
+)
 from ii_agent.tools.utils import truncate_content
+from ii_agent.utils.page_extract import (
+    html_to_markdown,
+    pdf_to_text,
+    sniff_content_kind,
+)
+from ii_agent.utils.process_pool import run_in_process
+from ii_agent.utils.result_cache import cache_key
 from ii_agent.core.storage.models.settings import Settings
 from typing import Optional
 
+# Directly fetched pages are read up to these sizes by default
+DEFAULT_MAX_HTML_BYTES = 2 * 1024 * 1024
+DEFAULT_MAX_PDF_BYTES = 20 * 1024 * 1024
+# Bytes read before the kind of content is told from them
+SNIFF_BYTES = 64 * 1024
+
 
 class WebpageVisitException(Exception):
     """Base exception for webpage visit errors"""
@@ -25,61 +51,160 @@ class NetworkError(WebpageVisitException):
     pass
 
 
+@dataclass
+class VisitResult:
+    """Content of a visited webpage with what tells how long to cache it."""
+
+    # None when the page did not change since the validators given
+    content: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    max_age: Optional[int] = None
+    storable: bool = True
+
+
 class BaseVisitClient:
     name: str = "Base"
     max_output_length: int
 
     def forward(self, url: str) -> str:
-        return asyncio.run(self.forward_async(url))
+        return run_with_http_sessions(self.forward_async(url))
 
     async def forward_async(self, url: str) -> str:
         raise NotImplementedError("Subclasses must implement this method")
 
+    async def fetch_async(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> VisitResult:
+        """Visit a webpage, conditionally on the validators of a cached copy.
+
+        Clients that do not fetch the page themselves ignore the validators
+        and always return its content.
+        """
+        return VisitResult(content=await self.forward_async(url))
+
 
 class MarkdownifyVisitClient(BaseVisitClient):
+    """Visit client fetching pages itself and converting them to markdown.
+
+    The body is streamed and read up to a size limit, and its first bytes
+    tell how to extract its text: the main content of HTML pages is
+    converted to markdown, PDFs are extracted as text and other binary
+    content is rejected. Extraction runs in the tool process pool.
+    """
+
     name = "Markdownify"
 
-    def __init__(self, max_output_length: int = VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH):
+    def __init__(
+        self,
+        max_output_length: int = VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH,
+        http_sessions: Optional[HttpSessionPool] = None,
+        max_html_bytes: int = DEFAULT_MAX_HTML_BYTES,
+        max_pdf_bytes: int = DEFAULT_MAX_PDF_BYTES,
+    ):
         self.max_output_length = max_output_length
+        self.http_sessions = http_sessions or get_http_session_pool()
+        self.max_html_bytes = max_html_bytes
+        self.max_pdf_bytes = max_pdf_bytes
 
     async def forward_async(self, url: str) -> str:
-        try:
-            import re
-            from markdownify import markdownify
-
-        except ImportError:
-            raise WebpageVisitException(
-                "Required package 'markdownify' is not installed"
+        return (await self.fetch_async(url)).content
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> tuple[str, bytes]:
+        """Read a response body up to the size limit of its kind of content.
+
+        Returns:
+            The kind of content, as told by sniff_content_kind, and the body
+        """
+        content_type = response.headers.get("Content-Type", "")
+        kind = None
+        limit = self.max_html_bytes
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(SNIFF_BYTES):
+            chunks.append(chunk)
+            size += len(chunk)
+            if kind is None and size >= SNIFF_BYTES:
+                kind = sniff_content_kind(content_type, b"".join(chunks))
+                if kind == "binary":
+                    break
+                if kind == "pdf":
+                    limit = self.max_pdf_bytes
+            # Parsers cope with a cut-off page, but not with a cut-off PDF
+            if size > limit:
+                break
+        body = b"".join(chunks)
+        if kind is None:
+            kind = sniff_content_kind(content_type, body)
+        if kind == "binary":
+            raise ContentExtractionError(
+                f"Unsupported content type {content_type or 'unknown'}"
             )
+        if kind == "pdf":
+            if len(body) > self.max_pdf_bytes:
+                raise ContentExtractionError(
+                    f"The PDF is larger than {self.max_pdf_bytes} bytes"
+                )
+            return kind, body
+        return kind, body[: self.max_html_bytes]
 
+    async def fetch_async(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> VisitResult:
         try:
             # Send a GET request to the URL with a 20-second timeout
             timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    html_content = await response.text()
-
-            # Convert the HTML content to Markdown (run in executor since markdownify is not async)
-            loop = asyncio.get_event_loop()
-            markdown_content = await loop.run_in_executor(
-                None, markdownify, html_content
-            )
-            markdown_content = markdown_content.strip()
-
-            # Remove multiple line breaks
-            markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
-
-            if not markdown_content:
-                raise ContentExtractionError("No content found in the webpage")
-
-            return truncate_content(markdown_content, self.max_output_length)
-
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            session = self.http_sessions.session_for(url)
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                max_age, storable = parse_cache_control(
+                    response.headers.get("Cache-Control")
+                )
+                result = VisitResult(
+                    content=None,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    max_age=max_age,
+                    storable=storable,
+                )
+                if response.status == 304 and headers:
+                    return result
+                response.raise_for_status()
+                kind, body = await self._read_body(response)
+                charset = response.charset
         except asyncio.TimeoutError:
             raise NetworkError("The request timed out")
         except aiohttp.ClientError as e:
             raise NetworkError(f"Error fetching the webpage: {str(e)}")
 
+        try:
+            if kind == "pdf":
+                content = await run_in_process(
+                    pdf_to_text, body, self.max_output_length
+                )
+            elif kind == "html":
+                content = await run_in_process(html_to_markdown, body, charset)
+            else:
+                content = body.decode(charset or "utf-8", errors="replace").strip()
+        except Exception as e:
+            raise ContentExtractionError(f"Error extracting the content: {e}")
+
+        if not content:
+            raise ContentExtractionError("No content found in the webpage")
+
+        result.content = truncate_content(content, self.max_output_length)
+        return result
+
 
 class TavilyVisitClient(BaseVisitClient):
     name = "Tavily"
@@ -141,9 +266,11 @@ class FireCrawlVisitClient(BaseVisitClient):
         self,
         max_output_length: int = VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH,
         api_key: Optional[str] = None,
+        http_sessions: Optional[HttpSessionPool] = None,
     ):
         self.max_output_length = max_output_length
         self.api_key = api_key or ""
+        self.http_sessions = http_sessions or get_http_session_pool()
         if not self.api_key:
             raise WebpageVisitException("FireCrawl API key not provided")
 
@@ -156,12 +283,12 @@ class FireCrawlVisitClient(BaseVisitClient):
         payload = {"url": url, "onlyMainContent": False, "formats": ["markdown"]}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    base_url, headers=headers, json=payload
-                ) as response:
-                    response.raise_for_status()
-                    response_data = await response.json()
+            session = self.http_sessions.session_for(base_url)
+            async with session.post(
+                base_url, headers=headers, json=payload
+            ) as response:
+                response.raise_for_status()
+                response_data = await response.json()
 
             data = response_data.get("data", {}).get("markdown")
             if not data:
@@ -182,9 +309,11 @@ class JinaVisitClient(BaseVisitClient):
         self,
         max_output_length: int = VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH,
         api_key: Optional[str] = None,
+        http_sessions: Optional[HttpSessionPool] = None,
     ):
         self.max_output_length = max_output_length
         self.api_key = api_key or ""
+        self.http_sessions = http_sessions or get_http_session_pool()
         if not self.api_key:
             raise WebpageVisitException("Jina API key not provided")
 
@@ -199,10 +328,10 @@ class JinaVisitClient(BaseVisitClient):
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(jina_url, headers=headers) as response:
-                    response.raise_for_status()
-                    json_response = await response.json()
+            session = self.http_sessions.session_for(jina_url)
+            async with session.get(jina_url, headers=headers) as response:
+                response.raise_for_status()
+                json_response = await response.json()
 
             if not json_response or "data" not in json_response:
                 raise ContentExtractionError(
@@ -223,22 +352,95 @@ class JinaVisitClient(BaseVisitClient):
             raise NetworkError(f"Error making request: {str(e)}")
 
 
+class CachedVisitClient(BaseVisitClient):
+    """Visit client serving pages from the shared HTTP cache.
+
+    A fresh copy is returned as is. A stale copy with an ETag or a
+    Last-Modified is revalidated with a conditional request, which only
+    clients fetching the page directly send; any other miss visits the
+    page with the wrapped client and caches the content for the TTL, or
+    for the max-age of the response if that is shorter.
+    """
+
+    def __init__(self, client: BaseVisitClient, cache: HttpCache, ttl: int):
+        self.client = client
+        self.cache = cache
+        self.ttl = ttl
+        self.name = client.name
+        self.max_output_length = client.max_output_length
+
+    def _ttl(self, result: VisitResult) -> int:
+        if result.max_age is None:
+            return self.ttl
+        return min(result.max_age, self.ttl)
+
+    async def forward_async(self, url: str) -> str:
+        metrics = self.cache.metrics_for("visit")
+        key = cache_key("visit", self.name, self.max_output_length, url)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None and entry.fresh:
+            metrics.hits += 1
+            return entry.value
+
+        if entry is not None and entry.revalidatable:
+            result = await self.client.fetch_async(
+                url, etag=entry.etag, last_modified=entry.last_modified
+            )
+            if result.content is None:
+                metrics.revalidations += 1
+                await asyncio.to_thread(self.cache.refresh, key, self._ttl(result))
+                return entry.value
+        else:
+            result = await self.client.fetch_async(url)
+        metrics.misses += 1
+
+        if result.storable:
+            await asyncio.to_thread(
+                self.cache.put,
+                key,
+                result.content,
+                self._ttl(result),
+                result.etag,
+                result.last_modified,
+            )
+        return result.content
+
+
 def create_visit_client(
     settings: Optional[Settings] = None,
     max_output_length: int = VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH,
+    http_sessions: Optional[HttpSessionPool] = None,
 ) -> BaseVisitClient:
     """
     Factory function that creates a visit client based on available API keys.
     Priority order: FireCrawl > Jina > Tavily > Markdownify
 
+    Visits go through the HTTP cache shared by all sessions, unless it is
+    disabled.
+
     Args:
         settings: Settings object containing API keys
         max_output_length (int): Maximum length of the output text
+        http_sessions: Pool of the HTTP sessions to use, the process-wide
+            one by default
 
     Returns:
         BaseVisitClient: An instance of a visit client
     """
-
+    config = load_ii_agent_config()
+    client = _select_visit_client(settings, max_output_length, http_sessions, config)
+    cache = get_http_cache()
+    if cache is None:
+        return client
+    return CachedVisitClient(client, cache, ttl=config.http_cache_visit_ttl_seconds)
+
+
+def _select_visit_client(
+    settings: Optional[Settings],
+    max_output_length: int,
+    http_sessions: Optional[HttpSessionPool],
+    config: IIAgentConfig,
+) -> BaseVisitClient:
     # Extract API keys from settings if available, otherwise fall back to environment
     firecrawl_key = None
     jina_key = None
@@ -272,12 +474,18 @@ def create_visit_client(
     if firecrawl_key:
         print("Using FireCrawl to visit webpage")
         return FireCrawlVisitClient(
-            max_output_length=max_output_length, api_key=firecrawl_key
+            max_output_length=max_output_length,
+            api_key=firecrawl_key,
+            http_sessions=http_sessions,
         )
 
     if jina_key:
         print("Using Jina to visit webpage")
-        return JinaVisitClient(max_output_length=max_output_length, api_key=jina_key)
+        return JinaVisitClient(
+            max_output_length=max_output_length,
+            api_key=jina_key,
+            http_sessions=http_sessions,
+        )
 
     if tavily_key:
         print("Using Tavily to visit webpage")
@@ -286,4 +494,9 @@ def create_visit_client(
         )
 
     print("Using Markdownify to visit webpage")
-    return MarkdownifyVisitClient(max_output_length=max_output_length)
+    return MarkdownifyVisitClient(
+        max_output_length=max_output_length,
+        http_sessions=http_sessions,
+        max_html_bytes=config.visit_max_html_bytes,
+        max_pdf_bytes=config.visit_max_pdf_bytes,
+    )
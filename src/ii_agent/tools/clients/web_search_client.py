@@ -1,12 +1,31 @@
 import json
 import os
 import asyncio
-import aiohttp
 import urllib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.logger import logger
+from ii_agent.tools.clients.http_cache import HttpCache, get_http_cache
+from ii_agent.tools.clients.http_sessions import (
+    HttpSessionPool,
+    get_http_session_pool,
+    run_with_http_sessions,
+)
 from ii_agent.tools.utils import truncate_content
+from ii_agent.utils.result_cache import cache_key
 from ii_agent.core.storage.models.settings import Settings
 from typing import Optional
 
+# Weight of the rank of a result with each provider when merging results
+PROVIDER_WEIGHTS = {
+    "SerpAPI": 1.0,
+    "Tavily": 1.0,
+    "Jina": 0.8,
+    "DuckDuckGo": 0.6,
+}
+# Query parameters that only track where a visitor came from, besides utm_*
+_TRACKING_PARAMS = {"gclid", "fbclid", "ref", "ref_src"}
+
 
 class BaseSearchClient:
     """
@@ -17,11 +36,49 @@ class BaseSearchClient:
     name: str
 
     def forward(self, query: str) -> str:
-        return asyncio.run(self.forward_async(query))
+        return run_with_http_sessions(self.forward_async(query))
 
     async def forward_async(self, query: str) -> str:
         raise NotImplementedError("Subclasses must implement this method.")
 
+    async def search_async(self, query: str) -> list[dict]:
+        """Search and return the results as dicts with a title, url and content."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def is_cacheable(self, output: str) -> bool:
+        """Tell whether an output holds results worth caching.
+
+        Most clients report failures as their output instead of raising, and
+        an empty result may just be a failed request.
+        """
+        return not output.startswith("Error") and output.strip() not in ("", "[]")
+
+
+class CachedSearchClient(BaseSearchClient):
+    """Search client serving repeated queries from the shared HTTP cache."""
+
+    def __init__(self, client: BaseSearchClient, cache: HttpCache, ttl: int):
+        self.client = client
+        self.cache = cache
+        self.ttl = ttl
+        self.name = client.name
+        self.max_results = client.max_results
+
+    async def forward_async(self, query: str) -> str:
+        metrics = self.cache.metrics_for("search")
+        # Queries differing only in whitespace get the same results
+        key = cache_key("search", self.name, self.max_results, " ".join(query.split()))
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None and entry.fresh:
+            metrics.hits += 1
+            return entry.value
+
+        metrics.misses += 1
+        output = await self.client.forward_async(query)
+        if self.client.is_cacheable(output):
+            await asyncio.to_thread(self.cache.put, key, output, self.ttl)
+        return output
+
 
 class JinaSearchClient(BaseSearchClient):
     """
@@ -30,9 +87,16 @@ class JinaSearchClient(BaseSearchClient):
 
     name = "Jina"
 
-    def __init__(self, max_results=10, api_key: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        max_results=10,
+        api_key: Optional[str] = None,
+        http_sessions: Optional[HttpSessionPool] = None,
+        **kwargs,
+    ):
         self.max_results = max_results
         self.api_key = api_key or ""
+        self.http_sessions = http_sessions or get_http_session_pool()
 
     async def _search_query_by_jina(self, query, max_results=10):
         """Searches the query using Jina AI search API."""
@@ -53,27 +117,30 @@ class JinaSearchClient(BaseSearchClient):
 
         search_response = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(encoded_url, headers=headers) as response:
-                    if response.status == 200:
-                        search_results_data = await response.json()
-                        search_results = search_results_data["data"]
-                        if search_results:
-                            for result in search_results:
-                                search_response.append(
-                                    {
-                                        "title": result.get("title", ""),
-                                        "url": result.get("url", ""),
-                                        "content": result.get("description", ""),
-                                    }
-                                )
-                        return search_response
+            session = self.http_sessions.session_for(url)
+            async with session.get(encoded_url, headers=headers) as response:
+                if response.status == 200:
+                    search_results_data = await response.json()
+                    search_results = search_results_data["data"]
+                    if search_results:
+                        for result in search_results:
+                            search_response.append(
+                                {
+                                    "title": result.get("title", ""),
+                                    "url": result.get("url", ""),
+                                    "content": result.get("description", ""),
+                                }
+                            )
+                    return search_response
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
 
         return search_response
 
+    async def search_async(self, query: str) -> list[dict]:
+        return await self._search_query_by_jina(query, self.max_results)
+
     async def forward_async(self, query: str) -> str:
         try:
             response = await self._search_query_by_jina(query, self.max_results)
@@ -90,9 +157,16 @@ class SerpAPISearchClient(BaseSearchClient):
 
     name = "SerpAPI"
 
-    def __init__(self, max_results=10, api_key: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        max_results=10,
+        api_key: Optional[str] = None,
+        http_sessions: Optional[HttpSessionPool] = None,
+        **kwargs,
+    ):
         self.max_results = max_results
         self.api_key = api_key or ""
+        self.http_sessions = http_sessions or get_http_session_pool()
 
     async def _search_query_by_serp_api(self, query, max_results=10):
         """Searches the query using SerpAPI."""
@@ -104,30 +178,33 @@ class SerpAPISearchClient(BaseSearchClient):
         encoded_url = url + "?" + urllib.parse.urlencode(params)
         search_response = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(encoded_url) as response:
-                    if response.status == 200:
-                        search_results = await response.json()
-                        if search_results:
-                            results = search_results["organic_results"]
-                            results_processed = 0
-                            for result in results:
-                                if results_processed >= max_results:
-                                    break
-                                search_response.append(
-                                    {
-                                        "title": result["title"],
-                                        "url": result["link"],
-                                        "content": result["snippet"],
-                                    }
-                                )
-                                results_processed += 1
+            session = self.http_sessions.session_for(url)
+            async with session.get(encoded_url) as response:
+                if response.status == 200:
+                    search_results = await response.json()
+                    if search_results:
+                        results = search_results["organic_results"]
+                        results_processed = 0
+                        for result in results:
+                            if results_processed >= max_results:
+                                break
+                            search_response.append(
+                                {
+                                    "title": result["title"],
+                                    "url": result["link"],
+                                    "content": result["snippet"],
+                                }
+                            )
+                            results_processed += 1
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
 
         return search_response
 
+    async def search_async(self, query: str) -> list[dict]:
+        return await self._search_query_by_serp_api(query, self.max_results)
+
     async def forward_async(self, query: str) -> str:
         try:
             response = await self._search_query_by_serp_api(query, self.max_results)
@@ -154,12 +231,19 @@ class DuckDuckGoSearchClient(BaseSearchClient):
             ) from e
         self.ddgs = DDGS(**kwargs)
 
-    async def forward_async(self, query: str) -> str:
+    async def _text(self, query: str) -> list[dict]:
         # Note: duckduckgo_search doesn't have async support, so we run it in a thread pool
         loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            None, self.ddgs.text, query, self.max_results
-        )
+        return await loop.run_in_executor(None, self.ddgs.text, query, self.max_results)
+
+    async def search_async(self, query: str) -> list[dict]:
+        return [
+            {"title": result["title"], "url": result["href"], "content": result["body"]}
+            for result in await self._text(query)
+        ]
+
+    async def forward_async(self, query: str) -> str:
+        results = await self._text(query)
         if len(results) == 0:
             raise Exception("No results found! Try a less restrictive/shorter query.")
         postprocessed_results = [
@@ -186,7 +270,7 @@ class TavilySearchClient(BaseSearchClient):
                 "Warning: Tavily API key not provided. Tool may not function correctly."
             )
 
-    async def forward_async(self, query: str) -> str:
+    async def _search(self, query: str) -> dict:
         try:
             from tavily import AsyncTavilyClient
         except ImportError as e:
@@ -194,11 +278,24 @@ class TavilySearchClient(BaseSearchClient):
                 "You must install package `tavily` to run this tool: for instance run `pip install tavily-python`."
             ) from e
 
-        try:
-            # Initialize Tavily client
-            tavily_client = AsyncTavilyClient(api_key=self.api_key)
+        # Initialize Tavily client
+        tavily_client = AsyncTavilyClient(api_key=self.api_key)
+        return await tavily_client.search(query, max_results=self.max_results)
+
+    async def search_async(self, query: str) -> list[dict]:
+        response = await self._search(query)
+        return [
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "content": result.get("content", ""),
+            }
+            for result in (response or {}).get("results") or []
+        ]
 
-            response = await tavily_client.search(query, max_results=self.max_results)
+    async def forward_async(self, query: str) -> str:
+        try:
+            response = await self._search(query)
 
             # Check if response contains results
             if not response or "results" not in response or not response["results"]:
@@ -212,6 +309,130 @@ class TavilySearchClient(BaseSearchClient):
             return f"Error searching with Tavily: {str(e)}"
 
 
+def normalize_result_url(url: str) -> str:
+    """Reduce a result URL to what tells pages apart, to find duplicates.
+
+    The scheme, a leading "www.", the fragment, a trailing slash and
+    tracking parameters are dropped, and the host is lowercased.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_")
+            and key.lower() not in _TRACKING_PARAMS
+        ]
+    )
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+
+def merge_search_results(
+    results_by_provider: dict[str, list[dict]],
+    weights: Optional[dict[str, float]] = None,
+) -> list[dict]:
+    """Merge the results of several providers, deduplicated by URL.
+
+    A result scores the weight of each provider that returned it divided by
+    its rank there, so pages several providers rank high come first. Each
+    merged result keeps the title and content of the best-weighted provider
+    returning it, with the content of another where that one had none.
+
+    Args:
+        results_by_provider: Results of each provider, best first
+        weights: Weight of each provider, PROVIDER_WEIGHTS by default
+
+    Returns:
+        The merged results, best first
+    """
+    weights = weights or PROVIDER_WEIGHTS
+    providers = sorted(
+        results_by_provider, key=lambda name: weights.get(name, 0.5), reverse=True
+    )
+    merged: dict[str, dict] = {}
+    scores: dict[str, float] = {}
+    for provider in providers:
+        for rank, result in enumerate(results_by_provider[provider], start=1):
+            if not result.get("url"):
+                continue
+            key = normalize_result_url(result["url"])
+            scores[key] = scores.get(key, 0.0) + weights.get(provider, 0.5) / rank
+            if key not in merged:
+                merged[key] = {
+                    "title": result.get("title", ""),
+                    "url": result["url"],
+                    "content": result.get("content", ""),
+                }
+            elif not merged[key]["content"] and result.get("content"):
+                merged[key]["content"] = result["content"]
+    # Sorting is stable, so ties keep the order of the best provider
+    return [merged[key] for key in sorted(merged, key=lambda key: -scores[key])]
+
+
+class FanOutSearchClient(BaseSearchClient):
+    """Search client querying several providers concurrently.
+
+    Results are merged as they arrive. The search returns as soon as
+    max_results distinct pages are in, or at the deadline with whatever
+    arrived by then, and cancels the providers still running; a failing
+    provider counts as one without results.
+    """
+
+    def __init__(
+        self,
+        clients: list[BaseSearchClient],
+        max_results: int = 10,
+        deadline_seconds: float = 8.0,
+        weights: Optional[dict[str, float]] = None,
+    ):
+        self.clients = clients
+        self.max_results = max_results
+        self.deadline_seconds = deadline_seconds
+        self.weights = weights or PROVIDER_WEIGHTS
+        self.name = "+".join(client.name for client in clients)
+
+    async def _search_with(self, client: BaseSearchClient, query: str) -> list[dict]:
+        try:
+            return await client.search_async(query)
+        except Exception as e:
+            logger.info(f"Search with {client.name} failed: {e}")
+            return []
+
+    async def search_async(self, query: str) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        tasks = {
+            asyncio.create_task(self._search_with(client, query)): client.name
+            for client in self.clients
+        }
+        pending = set(tasks)
+        results_by_provider: dict[str, list[dict]] = {}
+        merged: list[dict] = []
+        try:
+            while pending and loop.time() < deadline:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=deadline - loop.time(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    results_by_provider[tasks[task]] = task.result()
+                merged = merge_search_results(results_by_provider, self.weights)
+                if len(merged) >= self.max_results:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        return merged[: self.max_results]
+
+    async def forward_async(self, query: str) -> str:
+        results = await self.search_async(query)
+        return truncate_content(json.dumps(results, indent=4))
+
+
 class ImageSearchClient:
     """
     A client for the SerpAPI search engine.
@@ -219,9 +440,16 @@ class ImageSearchClient:
 
     name = "ImageSerpAPI"
 
-    def __init__(self, max_results=10, api_key: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        max_results=10,
+        api_key: Optional[str] = None,
+        http_sessions: Optional[HttpSessionPool] = None,
+        **kwargs,
+    ):
         self.max_results = max_results
         self.api_key = api_key or ""
+        self.http_sessions = http_sessions or get_http_session_pool()
 
     async def _search_query_by_serp_api(self, query, max_results=10):
         """Searches the query using SerpAPI."""
@@ -233,25 +461,25 @@ class ImageSearchClient:
         encoded_url = url + "?" + urllib.parse.urlencode(params)
         search_response = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(encoded_url) as response:
-                    if response.status == 200:
-                        search_results = await response.json()
-                        if search_results:
-                            results = search_results["images_results"]
-                            results_processed = 0
-                            for result in results:
-                                if results_processed >= max_results:
-                                    break
-                                search_response.append(
-                                    {
-                                        "title": result["title"],
-                                        "image_url": result["original"],
-                                        "width": result["original_width"],
-                                        "height": result["original_height"],
-                                    }
-                                )
-                                results_processed += 1
+            session = self.http_sessions.session_for(url)
+            async with session.get(encoded_url) as response:
+                if response.status == 200:
+                    search_results = await response.json()
+                    if search_results:
+                        results = search_results["images_results"]
+                        results_processed = 0
+                        for result in results:
+                            if results_processed >= max_results:
+                                break
+                            search_response.append(
+                                {
+                                    "title": result["title"],
+                                    "image_url": result["original"],
+                                    "width": result["original_width"],
+                                    "height": result["original_height"],
+                                }
+                            )
+                            results_processed += 1
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
@@ -268,19 +496,62 @@ class ImageSearchClient:
 
 
 def create_search_client(
-    settings: Optional[Settings] = None, max_results=10, **kwargs
+    settings: Optional[Settings] = None,
+    max_results=10,
+    http_sessions: Optional[HttpSessionPool] = None,
+    **kwargs,
 ) -> BaseSearchClient:
     """
     A search client that selects from available search APIs in the following order:
     SerpAPI > Jina > Tavily > DuckDuckGo
 
     It defaults to DuckDuckGo if no API keys are found for the other services.
+    With web_search_fan_out set in the agent config, every available provider
+    is queried concurrently instead, DuckDuckGo included if it is installed,
+    and their results are merged. Searches go through the HTTP cache shared
+    by all sessions, unless it is disabled.
 
     Args:
         settings: Settings object containing API keys
         max_results: Maximum number of results to return
+        http_sessions: Pool of the HTTP sessions to use, the process-wide
+            one by default
         **kwargs: Additional arguments
     """
+    config = load_ii_agent_config()
+    clients = _keyed_search_clients(settings, max_results, http_sessions, **kwargs)
+    if config.web_search_fan_out:
+        try:
+            clients.append(DuckDuckGoSearchClient(max_results=max_results, **kwargs))
+        except ImportError:
+            pass
+    if config.web_search_fan_out and len(clients) > 1:
+        client = FanOutSearchClient(
+            clients,
+            max_results=max_results,
+            deadline_seconds=config.web_search_fan_out_deadline_seconds,
+        )
+        print(f"Using {', '.join(c.name for c in clients)} concurrently to search")
+    elif clients:
+        client = clients[0]
+        print(f"Using {client.name} to search")
+    else:
+        print("Using DuckDuckGo to search")
+        client = DuckDuckGoSearchClient(max_results=max_results, **kwargs)
+
+    cache = get_http_cache()
+    if cache is None:
+        return client
+    return CachedSearchClient(client, cache, ttl=config.http_cache_search_ttl_seconds)
+
+
+def _keyed_search_clients(
+    settings: Optional[Settings],
+    max_results: int,
+    http_sessions: Optional[HttpSessionPool],
+    **kwargs,
+) -> list[BaseSearchClient]:
+    """Create a client for every search API with a key, in order of preference."""
 
     # Extract API keys from settings if available, otherwise fall back to environment
     serpapi_key = None
@@ -312,22 +583,30 @@ def create_search_client(
     if not tavily_key:
         tavily_key = os.environ.get("TAVILY_API_KEY", "")
 
+    clients: list[BaseSearchClient] = []
     if serpapi_key:
-        print("Using SerpAPI to search")
-        return SerpAPISearchClient(
-            max_results=max_results, api_key=serpapi_key, **kwargs
+        clients.append(
+            SerpAPISearchClient(
+                max_results=max_results,
+                api_key=serpapi_key,
+                http_sessions=http_sessions,
+                **kwargs,
+            )
         )
-
     if jina_key:
-        print("Using Jina to search")
-        return JinaSearchClient(max_results=max_results, api_key=jina_key, **kwargs)
-
+        clients.append(
+            JinaSearchClient(
+                max_results=max_results,
+                api_key=jina_key,
+                http_sessions=http_sessions,
+                **kwargs,
+            )
+        )
     if tavily_key:
-        print("Using Tavily to search")
-        return TavilySearchClient(max_results=max_results, api_key=tavily_key, **kwargs)
-
-    print("Using DuckDuckGo to search")
-    return DuckDuckGoSearchClient(max_results=max_results, **kwargs)
+        clients.append(
+            TavilySearchClient(max_results=max_results, api_key=tavily_key, **kwargs)
+        )
+    return clients
 
 
 def create_image_search_client(
@@ -1,5 +1,6 @@
 # src/ii_agent/tools/image_generate_tool.py
 
+import asyncio
 from pathlib import Path
 from typing import Any, Optional, Union
 from io import BytesIO
@@ -23,6 +24,7 @@ except ImportError:
 from PIL import Image
 
 from ii_agent.tools.base import MessageHistory, LLMTool, ToolImplOutput
+from ii_agent.core.media_jobs import MediaJob, MediaJobManager
 from ii_agent.utils.workspace_manager import WorkspaceManager
 from ii_agent.core.storage.models.settings import Settings
 
@@ -123,10 +125,14 @@ The generated image will be saved to the specified local path in the workspace a
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
         self.api_type: Optional[APIType] = None
         self.genai_client: Optional[Any] = None
         self.vertex_model: Optional[Any] = None
@@ -278,6 +284,16 @@ The generated image will be saved to the specified local path in the workspace a
         self,
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
+    ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "image",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
     ) -> ToolImplOutput:
         """Generate an image based on the provided text prompt."""
         try:
@@ -292,11 +308,19 @@ The generated image will be saved to the specified local path in the workspace a
 
             # Generate image based on API type
             if self.api_type == APIType.GENAI:
-                image = self._generate_with_genai(prompt, tool_input)
-                self._save_image(image, local_output_path, is_pil_image=True)
+                image = await asyncio.to_thread(
+                    self._generate_with_genai, prompt, tool_input
+                )
+                await asyncio.to_thread(
+                    self._save_image, image, local_output_path, is_pil_image=True
+                )
             elif self.api_type == APIType.VERTEX:
-                image = self._generate_with_vertex(prompt, tool_input)
-                self._save_image(image, local_output_path, is_pil_image=False)
+                image = await asyncio.to_thread(
+                    self._generate_with_vertex, prompt, tool_input
+                )
+                await asyncio.to_thread(
+                    self._save_image, image, local_output_path, is_pil_image=False
+                )
             else:
                 raise ImageGenerationError("No image generation API is configured")
 
@@ -14,7 +14,8 @@ import sys
 import tempfile
 import traceback
 import zipfile
-from typing import Any
+from functools import lru_cache
+from typing import Any, Optional
 from urllib.parse import parse_qs, quote, unquote, urlparse, urlunparse
 
 import mammoth
@@ -33,6 +34,25 @@ from bs4 import BeautifulSoup
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import SRTFormatter
 
+try:
+    import openpyxl
+
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+
+def _truncation_note(max_chars: int) -> str:
+    return f"\n\n<!-- Truncated: the document is longer than {max_chars} characters -->"
+
+
+def _markdown_table_row(values: list[Any]) -> str:
+    cells = [
+        "" if value is None else str(value).replace("|", "\\|").replace("\n", " ")
+        for value in values
+    ]
+    return "| " + " | ".join(cells) + " |\n"
+
 
 class _CustomMarkdownify(markdownify.MarkdownConverter):
     """
@@ -411,6 +431,9 @@ class DocxConverter(HtmlConverter):
 class XlsxConverter(HtmlConverter):
     """
     Converts XLSX files to Markdown, with each sheet presented as a separate Markdown table.
+
+    With openpyxl installed, XLSX workbooks are read row by row instead of
+    loaded whole, and reading stops once the output exceeds max_chars.
     """
 
     def convert(self, local_path, **kwargs) -> None | DocumentConverterResult:
@@ -419,6 +442,9 @@ class XlsxConverter(HtmlConverter):
         if extension.lower() not in [".xlsx", ".xls"]:
             return None
 
+        if extension.lower() == ".xlsx" and HAS_OPENPYXL:
+            return self._convert_streaming(local_path, kwargs.get("max_chars"))
+
         sheets = pd.read_excel(local_path, sheet_name=None)
         md_content = ""
         for s in sheets:
@@ -431,6 +457,47 @@ class XlsxConverter(HtmlConverter):
             text_content=md_content.strip(),
         )
 
+    def _convert_streaming(
+        self, local_path: str, max_chars: Optional[int]
+    ) -> DocumentConverterResult:
+        parts = []
+        size = 0
+        workbook = openpyxl.load_workbook(local_path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                parts.append(f"## {sheet.title}\n")
+                width = None
+                for row in sheet.iter_rows(values_only=True):
+                    values = list(row)
+                    while values and values[-1] is None:
+                        values.pop()
+                    if not values:
+                        continue
+                    if width is None:
+                        # The first row holds the column names
+                        width = len(values)
+                        line = _markdown_table_row(values) + _markdown_table_row(
+                            ["---"] * width
+                        )
+                    else:
+                        values = values[:width] + [None] * (width - len(values))
+                        line = _markdown_table_row(values)
+                    parts.append(line)
+                    size += len(line)
+                    if max_chars and size > max_chars:
+                        parts.append(_truncation_note(max_chars))
+                        return DocumentConverterResult(
+                            title=None, text_content="".join(parts).strip()
+                        )
+                parts.append("\n")
+        finally:
+            workbook.close()
+
+        return DocumentConverterResult(
+            title=None,
+            text_content="".join(parts).strip(),
+        )
+
 
 class PptxConverter(HtmlConverter):
     """
@@ -443,14 +510,16 @@ class PptxConverter(HtmlConverter):
         if extension.lower() != ".pptx":
             return None
 
-        md_content = ""
+        max_chars = kwargs.get("max_chars")
+        slides = []
+        size = 0
 
         presentation = pptx.Presentation(local_path)
         slide_num = 0
         for slide in presentation.slides:
             slide_num += 1
 
-            md_content += f"\n\n<!-- Slide number: {slide_num} -->\n"
+            md_content = f"<!-- Slide number: {slide_num} -->\n"
 
             title = slide.shapes.title
             for shape in slide.shapes:
@@ -507,9 +576,17 @@ class PptxConverter(HtmlConverter):
                     md_content += notes_frame.text
                 md_content = md_content.strip()
 
+            # Slides are joined once at the end, rather than each appended
+            # to the text of all the slides before it
+            slides.append(md_content)
+            size += len(md_content)
+            if max_chars and size > max_chars:
+                slides.append(_truncation_note(max_chars).strip())
+                break
+
         return DocumentConverterResult(
             title=None,
-            text_content=md_content.strip(),
+            text_content="\n\n".join(slides).strip(),
         )
 
     def _is_picture(self, shape):
@@ -1058,3 +1135,16 @@ class MarkdownConverter:
     def register_page_converter(self, converter: DocumentConverter) -> None:
         """Register a page text converter."""
         self._page_converters.insert(0, converter)
+
+
+@lru_cache(maxsize=1)
+def _process_converter() -> MarkdownConverter:
+    return MarkdownConverter()
+
+
+def convert_local_file(path: str, max_chars: Optional[int] = None) -> str:
+    """Convert a local file to Markdown with a converter kept per process.
+
+    Module-level so it can run in the tool process pool.
+    """
+    return _process_converter().convert_local(path, max_chars=max_chars).text_content
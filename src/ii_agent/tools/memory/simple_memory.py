@@ -62,6 +62,12 @@ class SimpleMemoryTool(LLMTool):
         self.full_memory = ""
         self.compressed_memory = ""  # not doing anything with this for now
 
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        return {"full_memory": self.full_memory}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.full_memory = state.get("full_memory", "")
+
     def _read_memory(self) -> str:
         """Read the current memory contents."""
         return self.full_memory
@@ -1,14 +1,29 @@
+import asyncio
 from pathlib import Path
 from typing import Any, Optional
-import pymupdf
 
+from ii_agent.core.config.utils import load_ii_agent_config
 from ii_agent.llm.message_history import MessageHistory
 from ii_agent.tools.base import (
     LLMTool,
     ToolImplOutput,
 )
+from ii_agent.utils.page_extract import pdf_page_count, pdf_page_texts
+from ii_agent.utils.process_pool import run_in_process
+from ii_agent.utils.result_cache import (
+    ResultCache,
+    cache_key,
+    file_digest,
+    get_conversion_cache,
+)
 from ii_agent.utils.workspace_manager import WorkspaceManager
 
+# Pages one task of the process pool extracts
+PAGES_PER_TASK = 8
+# Bump when a change to the extraction changes its output, so pages cached
+# by an older version are not served
+EXTRACTION_VERSION = 1
+
 
 class PdfTextExtractTool(LLMTool):
     name = "pdf_text_extract"
@@ -19,17 +34,142 @@ class PdfTextExtractTool(LLMTool):
             "file_path": {
                 "type": "string",
                 "description": "The relative path to the PDF file within the workspace (e.g., 'uploads/my_resume.pdf').",
-            }
+            },
+            "start_page": {
+                "type": "integer",
+                "description": "The first page to extract, counted from 1. Defaults to 1.",
+            },
+            "end_page": {
+                "type": "integer",
+                "description": "The last page to extract, inclusive. Defaults to the last page of the document.",
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Number of characters of the first page to skip, to continue where a truncated extraction stopped. Defaults to 0.",
+            },
         },
         "required": ["file_path"],
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, max_output_length: int = 15000
+        self,
+        workspace_manager: WorkspaceManager,
+        max_output_length: int = 15000,
+        cache: Optional[ResultCache] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
         self.max_output_length = max_output_length
+        self.cache = cache if cache is not None else get_conversion_cache()
+
+    def _cached(self, keys: list[str]) -> dict[str, str]:
+        if self.cache is None:
+            return {}
+        found = {}
+        for key in keys:
+            entry = self.cache.get(key)
+            if entry is not None and entry.fresh:
+                found[key] = entry.value
+        return found
+
+    def _store(self, values: dict[str, str]) -> None:
+        if self.cache is None:
+            return
+        ttl = load_ii_agent_config().conversion_cache_ttl_seconds
+        for key, value in values.items():
+            self.cache.put(key, value, ttl)
+
+    async def _page_count(self, path: str, digest: str) -> int:
+        key = cache_key("pdf_page_count", digest)
+        cached = await asyncio.to_thread(self._cached, [key])
+        if key in cached:
+            return int(cached[key])
+        count = await run_in_process(pdf_page_count, path)
+        await asyncio.to_thread(self._store, {key: str(count)})
+        return count
+
+    async def _page_texts(
+        self, path: str, digest: str, first: int, last: int
+    ) -> list[str]:
+        """Get the text of the pages first to last, counted from 0.
+
+        Pages extracted before are served from the cache; the others are
+        extracted by parallel tasks of the process pool.
+        """
+        keys = {
+            number: cache_key("pdf_page", digest, EXTRACTION_VERSION, number)
+            for number in range(first, last + 1)
+        }
+        cached = await asyncio.to_thread(self._cached, list(keys.values()))
+        texts = {number: cached[key] for number, key in keys.items() if key in cached}
+        missing = [number for number in keys if number not in texts]
+        if self.cache is not None:
+            metrics = self.cache.metrics_for("pdf")
+            metrics.hits += len(texts)
+            metrics.misses += len(missing)
+
+        chunks = [
+            missing[i : i + PAGES_PER_TASK]
+            for i in range(0, len(missing), PAGES_PER_TASK)
+        ]
+        results = await asyncio.gather(
+            *(run_in_process(pdf_page_texts, path, chunk) for chunk in chunks)
+        )
+        extracted = {}
+        for chunk, chunk_texts in zip(chunks, results):
+            for number, text in zip(chunk, chunk_texts):
+                texts[number] = text
+                extracted[keys[number]] = text
+        if extracted:
+            await asyncio.to_thread(self._store, extracted)
+        return [texts[number] for number in range(first, last + 1)]
+
+    async def _extract(
+        self, path: str, start_page: int, end_page: Optional[int], offset: int
+    ) -> tuple[str, int, Optional[tuple[int, int]]]:
+        """Extract the text of a page range up to the output budget.
+
+        Returns:
+            The text, the page count of the document, and the page and
+            offset to continue from if the text was cut off
+        """
+        digest = await asyncio.to_thread(file_digest, path)
+        page_count = await self._page_count(path, digest)
+        if end_page is None or end_page > page_count:
+            end_page = page_count
+        if not 1 <= start_page <= end_page:
+            raise ValueError(
+                f"Invalid page range {start_page}-{end_page}, "
+                f"the document has {page_count} pages"
+            )
+
+        # Pages are extracted in batches, sized after the first to what is
+        # left of the budget at the average page length so far, so a range
+        # is never extracted much beyond the point where the output stops
+        workers = max(1, load_ii_agent_config().tool_worker_processes)
+        max_batch = PAGES_PER_TASK * workers
+        parts = []
+        length = 0
+        page = start_page - 1
+        batch = PAGES_PER_TASK
+        while page < end_page:
+            last = min(end_page, page + batch) - 1
+            texts = await self._page_texts(path, digest, page, last)
+            for number, text in enumerate(texts, start=page):
+                skip = offset if number == start_page - 1 else 0
+                text = text[skip:]
+                room = self.max_output_length - length
+                if len(text) > room:
+                    parts.append(text[:room])
+                    return "".join(parts), page_count, (number + 1, skip + room)
+                parts.append(text)
+                length += len(text)
+            page = last + 1
+            average = max(1, length // (page - start_page + 1))
+            batch = min(
+                max_batch, max(1, -(-(self.max_output_length - length) // average))
+            )
+        return "".join(parts), page_count, None
 
     async def run_impl(
         self,
@@ -60,23 +200,30 @@ class PdfTextExtractTool(LLMTool):
             )
 
         try:
-            doc = pymupdf.open(full_file_path)
-            text = ""
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text("text")
-            doc.close()
-
-            if len(text) > self.max_output_length:
-                text = (
-                    text[: self.max_output_length]
-                    + "\n... (content truncated due to length)"
+            text, page_count, resume = await self._extract(
+                str(full_file_path),
+                tool_input.get("start_page", 1),
+                tool_input.get("end_page"),
+                tool_input.get("offset", 0),
+            )
+
+            auxiliary_data = {
+                "success": True,
+                "extracted_chars": len(text),
+                "page_count": page_count,
+            }
+            if resume is not None:
+                next_page, next_offset = resume
+                text += (
+                    "\n... (content truncated due to length; continue with "
+                    f"start_page={next_page} and offset={next_offset})"
                 )
+                auxiliary_data.update(next_page=next_page, next_offset=next_offset)
 
             return ToolImplOutput(
                 text,
                 f"Successfully extracted text from {relative_file_path}",
-                {"success": True, "extracted_chars": len(text)},
+                auxiliary_data,
             )
         except Exception as e:
             return ToolImplOutput(
@@ -1,5 +1,6 @@
 # src/ii_agent/tools/speech_gen_tool.py
 
+import asyncio
 import os
 from pathlib import Path
 from typing import Any, Optional
@@ -13,6 +14,7 @@ from ii_agent.tools.base import (
     LLMTool,
     ToolImplOutput,
 )
+from ii_agent.core.media_jobs import MediaJob, MediaJobManager
 from ii_agent.utils.workspace_manager import WorkspaceManager
 from ii_agent.core.storage.models.settings import Settings
 
@@ -187,9 +189,15 @@ Automatic language detection from input text."""
         "required": ["text", "output_filename"],
     }
 
-    def __init__(self, workspace_manager: WorkspaceManager, settings: Settings):
+    def __init__(
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Settings,
+        media_jobs: Optional[MediaJobManager] = None,
+    ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
         self.settings = settings
 
         if settings and settings.media_config:
@@ -213,6 +221,17 @@ Automatic language detection from input text."""
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "speech",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Generate the speech file."""
         text = tool_input["text"]
         relative_output_filename = tool_input["output_filename"]
         voice = tool_input.get("voice", "kore")
@@ -232,7 +251,8 @@ Automatic language detection from input text."""
 
         try:
             # Generate speech without streaming
-            response = self.client.models.generate_content(
+            response = await asyncio.to_thread(
+                self.client.models.generate_content,
                 model=model,
                 contents=text,
                 config=types.GenerateContentConfig(
@@ -276,7 +296,7 @@ Automatic language detection from input text."""
                 response.candidates[0].content.parts[0].inline_data.mime_type,
             )
 
-            save_binary_file(relative_output_filename, data)
+            await asyncio.to_thread(save_binary_file, str(local_output_path), data)
 
             output_url = (
                 f"http://localhost:{self.workspace_manager.file_server_port}/workspace/{relative_output_filename}"
@@ -12,6 +12,8 @@ from ii_agent.tools.base import (
     ToolImplOutput,
 )
 from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.file_edits import FileEditTracker
+import asyncio
 from asyncio import Queue
 from typing import Any, Literal, Optional, get_args
 import logging
@@ -109,13 +111,28 @@ Notes for using the `str_replace` command:\n
         super().__init__()
         self.workspace_manager = workspace_manager
         self.message_queue = message_queue
+        # Versions the edited files so updates only carry a patch
+        self.file_edits = FileEditTracker()
+        # File updates of the running command, sent once it is done
+        self._pending_file_updates: list[tuple[str, str]] = []
+        self._file_update_lock = asyncio.Lock()
         self.str_replace_client = str_replace_client
 
+    def close(self) -> None:
+        if self.str_replace_client is not None:
+            self.str_replace_client.close()
+
     async def run_impl(
         self,
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ExtendedToolImplOutput:
+        try:
+            return await self._run_command(tool_input)
+        finally:
+            await self._flush_file_updates()
+
+    async def _run_command(self, tool_input: dict[str, Any]) -> ExtendedToolImplOutput:
         command = tool_input["command"]
         path = tool_input["path"]
         file_text = tool_input.get("file_text")
@@ -292,15 +309,27 @@ Notes for using the `str_replace` command:\n
         return f"Editing file {tool_input['path']}"
 
     def _send_file_update(self, path: str, content: str):
-        """Send file content update through message queue if available."""
+        """Queue a file update to send through message queue if available.
+
+        The update is a patch against the previous version of the file, or
+        the full content for the first edit and periodic snapshots. It is
+        sent by _flush_file_updates once the command is done.
+        """
         if self.message_queue:
-            self.message_queue.put_nowait(
-                RealtimeEvent(
-                    type=EventType.FILE_EDIT,
-                    content={
-                        "path": str(path),
-                        "content": content,
-                        "total_lines": len(content.splitlines()),
-                    },
+            self._pending_file_updates.append((path, content))
+
+    async def _flush_file_updates(self):
+        """Send the queued file updates in order.
+
+        Diffing a large file can take a while, so the patches are built in
+        a worker thread rather than on the event loop.
+        """
+        async with self._file_update_lock:
+            while self._pending_file_updates:
+                path, content = self._pending_file_updates.pop(0)
+                event_content = await asyncio.to_thread(
+                    self.file_edits.build_event_content, path, content
+                )
+                self.message_queue.put_nowait(
+                    RealtimeEvent(type=EventType.FILE_EDIT, content=event_content)
                 )
-            )
@@ -1,12 +1,26 @@
+import asyncio
+import os
 from typing import Any, Optional
+from ii_agent.core.config.utils import load_ii_agent_config
 from ii_agent.llm.message_history import MessageHistory
 from ii_agent.tools.base import (
     LLMTool,
     ToolImplOutput,
 )
-from .markdown_converter import MarkdownConverter
+from .markdown_converter import MarkdownConverter, convert_local_file
+from ii_agent.utils.process_pool import run_in_process
+from ii_agent.utils.result_cache import (
+    ResultCache,
+    cache_key,
+    file_digest,
+    get_conversion_cache,
+)
 from ii_agent.utils.workspace_manager import WorkspaceManager
 
+# Bump when a change to the converters changes their output, so results
+# cached by an older version are not served
+CONVERTER_VERSION = 2
+
 
 class TextInspectorTool(LLMTool):
     name = "get_text_from_local_file"
@@ -27,10 +41,16 @@ Note:
         "required": ["file_path"],
     }
 
-    def __init__(self, workspace_manager: WorkspaceManager, text_limit: int = 100000):
+    def __init__(
+        self,
+        workspace_manager: WorkspaceManager,
+        text_limit: int = 100000,
+        cache: Optional[ResultCache] = None,
+    ):
         self.text_limit = text_limit
         self.md_converter = MarkdownConverter()
         self.workspace_manager = workspace_manager
+        self.cache = cache if cache is not None else get_conversion_cache()
 
     def forward(self, file_path: str) -> str:
         # Convert relative path to absolute path using workspace_manager
@@ -47,6 +67,41 @@ Note:
 
         return result.text_content
 
+    async def forward_async(self, file_path: str) -> str:
+        """Convert a file in the tool process pool, reusing earlier results.
+
+        Results are cached by the content of the file and the options of the
+        conversion, so inspecting an unchanged file again skips the
+        conversion, even under another path. ZIP files are converted every
+        time, since converting them extracts the archive.
+        """
+        if file_path[-4:] in [".png", ".jpg"]:
+            raise Exception(
+                "Cannot use this tool with images: use display_image instead!"
+            )
+        abs_path = str(self.workspace_manager.workspace_path(file_path))
+        if self.cache is None or ".zip" in file_path:
+            return await run_in_process(convert_local_file, abs_path, self.text_limit)
+
+        metrics = self.cache.metrics_for("convert")
+        key = cache_key(
+            "convert",
+            await asyncio.to_thread(file_digest, abs_path),
+            os.path.splitext(abs_path)[1].lower(),
+            CONVERTER_VERSION,
+            {"max_chars": self.text_limit},
+        )
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None and entry.fresh:
+            metrics.hits += 1
+            return entry.value
+
+        metrics.misses += 1
+        text = await run_in_process(convert_local_file, abs_path, self.text_limit)
+        ttl = load_ii_agent_config().conversion_cache_ttl_seconds
+        await asyncio.to_thread(self.cache.put, key, text, ttl)
+        return text
+
     async def run_impl(
         self,
         tool_input: dict[str, Any],
@@ -55,7 +110,7 @@ Note:
         file_path = tool_input["file_path"]
 
         try:
-            output = self.forward(file_path)
+            output = await self.forward_async(file_path)
             return ToolImplOutput(
                 output,
                 f"Successfully inspected file {file_path}",
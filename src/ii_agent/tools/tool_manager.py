@@ -1,8 +1,9 @@
 import asyncio
 import logging
-from copy import deepcopy
 from typing import List, Dict, Any
 
+from ii_agent.core.agent_logging import LazyLogValue
+from ii_agent.core.tracing import get_tracer
 from ii_agent.llm.base import LLMClient
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
 from ii_agent.llm.token_counter import TokenCounter
@@ -60,6 +61,7 @@ from ii_agent.tools.browser_tools import (
     BrowserSelectDropdownOptionTool,
 )
 from ii_agent.tools.visualizer import DisplayImageTool
+from ii_agent.utils.image_prep import image_spec_for
 from ii_agent.tools.audio_tool import (
     AudioTranscribeTool,
     AudioGenerateTool,
@@ -77,8 +79,11 @@ from ii_agent.tools.deep_research_tool import DeepResearchTool
 from ii_agent.tools.list_html_links_tool import ListHtmlLinksTool
 from ii_agent.utils.constants import TOKEN_BUDGET
 from ii_agent.core.storage.models.settings import Settings
+from ii_agent.core.media_jobs import MediaJobManager
 from ii_agent.utils.sandbox_manager import SandboxManager
 
+tracer = get_tracer()
+
 
 def get_system_tools(
     client: LLMClient,
@@ -170,7 +175,10 @@ def get_system_tools(
                 workspace_manager=workspace_manager,
                 str_replace_client=str_replace_client,
             ),
-            DisplayImageTool(workspace_manager=workspace_manager),
+            DisplayImageTool(
+                workspace_manager=workspace_manager,
+                image_spec=image_spec_for(client.api_type),
+            ),
         ]
     )
 
@@ -186,6 +194,8 @@ def get_system_tools(
             tools.append(DeepResearchTool())
         if tool_args.get("pdf", False):
             tools.append(PdfTextExtractTool(workspace_manager=workspace_manager))
+        # Media generations report their progress to the session as jobs
+        media_jobs = MediaJobManager(message_queue)
         if tool_args.get("media_generation", False):
             # Check if media config is available in settings
             has_media_config = False
@@ -199,30 +209,42 @@ def get_system_tools(
             if has_media_config:
                 tools.append(
                     ImageGenerateTool(
-                        workspace_manager=workspace_manager, settings=settings
+                        workspace_manager=workspace_manager,
+                        settings=settings,
+                        media_jobs=media_jobs,
                     )
                 )
                 if tool_args.get("video_generation", True):
                     tools.extend(
                         [
                             VideoGenerateFromTextTool(
-                                workspace_manager=workspace_manager, settings=settings
+                                workspace_manager=workspace_manager,
+                                settings=settings,
+                                media_jobs=media_jobs,
                             ),
                             VideoGenerateFromImageTool(
-                                workspace_manager=workspace_manager, settings=settings
+                                workspace_manager=workspace_manager,
+                                settings=settings,
+                                media_jobs=media_jobs,
                             ),
                             LongVideoGenerateFromTextTool(
-                                workspace_manager=workspace_manager, settings=settings
+                                workspace_manager=workspace_manager,
+                                settings=settings,
+                                media_jobs=media_jobs,
                             ),
                             LongVideoGenerateFromImageTool(
-                                workspace_manager=workspace_manager, settings=settings
+                                workspace_manager=workspace_manager,
+                                settings=settings,
+                                media_jobs=media_jobs,
                             ),
                         ]
                     )
                 if settings.media_config.google_ai_studio_api_key:
                     tools.append(
                         SingleSpeakerSpeechGenerationTool(
-                            workspace_manager=workspace_manager, settings=settings
+                            workspace_manager=workspace_manager,
+                            settings=settings,
+                            media_jobs=media_jobs,
                         )
                     )
             else:
@@ -246,10 +268,14 @@ def get_system_tools(
                 tools.extend(
                     [
                         AudioTranscribeTool(
-                            workspace_manager=workspace_manager, settings=settings
+                            workspace_manager=workspace_manager,
+                            settings=settings,
+                            media_jobs=media_jobs,
                         ),
                         AudioGenerateTool(
-                            workspace_manager=workspace_manager, settings=settings
+                            workspace_manager=workspace_manager,
+                            settings=settings,
+                            media_jobs=media_jobs,
                         ),
                     ]
                 )
@@ -358,23 +384,22 @@ class AgentToolManager:
         llm_tool = self.get_tool(tool_params.tool_name)
         tool_name = tool_params.tool_name
         tool_input = tool_params.tool_input
-        self.logger_for_agent_logs.info(f"Running tool: {tool_name}")
-        self.logger_for_agent_logs.info(f"Tool input: {tool_input}")
-        result = await llm_tool.run_async(tool_input, history)
-
-        tool_input_str = "\n".join([f" - {k}: {v}" for k, v in tool_input.items()])
-
-        log_message = f"Calling tool {tool_name} with input:\n{tool_input_str}"
-        if isinstance(result, str):
-            log_message += f"\nTool output: \n{result}\n\n"
-        else:
-            result_to_log = deepcopy(result)
-            for i in range(len(result_to_log)):
-                if result_to_log[i].get("type") == "image":
-                    result_to_log[i]["source"]["data"] = "[REDACTED]"
-            log_message += f"\nTool output: \n{result_to_log}\n\n"
-
-        self.logger_for_agent_logs.info(log_message)
+        self.logger_for_agent_logs.info(
+            "Running tool: %s",
+            tool_name,
+            extra={"event": "tool_start", "tool_name": tool_name},
+        )
+        with tracer.span("tool.execute", tool_name=tool_name):
+            result = await llm_tool.run_async(tool_input, history)
+
+        # Rendering (and image redaction) is deferred to the log writer thread.
+        self.logger_for_agent_logs.info(
+            "Calling tool %s with input:\n%s\nTool output: \n%s\n\n",
+            tool_name,
+            LazyLogValue(tool_input),
+            LazyLogValue(result),
+            extra={"event": "tool_result", "tool_name": tool_name},
+        )
 
         # Handle both ToolResult objects and tuples
         if isinstance(result, tuple):
@@ -408,6 +433,45 @@ class AgentToolManager:
         """
         self.complete_tool.reset()
 
+    def get_state(self) -> dict[str, Any]:
+        """
+        Collects the state that has to survive a restart of the agent run.
+
+        Returns:
+            dict: The completion tool answer and the state of stateful tools.
+        """
+        tool_states = {}
+        for tool in self.tools:
+            state = tool.get_state()
+            if state is not None:
+                tool_states[tool.name] = state
+        return {"final_answer": self.complete_tool.answer, "tools": tool_states}
+
+    def restore_state(self, state: dict[str, Any]):
+        """
+        Restores state collected by get_state.
+
+        Args:
+            state (dict): The state to restore.
+        """
+        self.complete_tool.answer = state.get("final_answer", "")
+        tool_states = state.get("tools", {})
+        for tool in self.tools:
+            if tool.name in tool_states:
+                tool.restore_state(tool_states[tool.name])
+
+    def close(self):
+        """
+        Releases the resources of the tools, once the session ends.
+        """
+        for tool in self.tools:
+            try:
+                tool.close()
+            except Exception as e:
+                logging.getLogger("tool_manager").warning(
+                    f"Error closing tool {tool.name}: {e}"
+                )
+
     def get_tools(self) -> list[LLMTool]:
         """
         Retrieves a list of all available tools.
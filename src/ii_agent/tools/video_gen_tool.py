@@ -1,10 +1,11 @@
 # src/ii_agent/tools/video_generate_from_text_tool.py
-import time
+import asyncio
+import json
+import subprocess
 import uuid
 import shutil
-import subprocess
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from google import genai
 from google.genai import types
@@ -22,11 +23,22 @@ from ii_agent.tools.base import (
     LLMTool,
     ToolImplOutput,
 )
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.media_jobs import (
+    MediaJob,
+    MediaJobManager,
+    poll_operation,
+    run_command,
+)
 from ii_agent.utils.workspace_manager import WorkspaceManager
 from ii_agent.core.storage.models.settings import Settings
 
 DEFAULT_MODEL = "veo-2.0-generate-001"
 
+# Polling of the long-running generation operations of Veo
+POLLING_INTERVAL_SECONDS = 15
+MAX_WAIT_TIME_SECONDS = 600
+
 # Google AI Studio person generation mapping
 GENAI_PERSON_GENERATION_MAP = {
     "allow_adult": "allow_adult",
@@ -112,6 +124,125 @@ def delete_gcs_blob(gcs_uri: str) -> None:
         print(f"Error deleting GCS blob {gcs_uri}: {e}")
 
 
+class SceneGenerationError(Exception):
+    """A scene of a long video could not be generated."""
+
+    def __init__(self, scene: int, error: str):
+        super().__init__(f"Scene {scene} generation failed: {error}")
+        self.scene = scene
+        self.error = error
+
+
+async def generate_scenes_concurrently(
+    scenes: list[tuple[Any, dict[str, Any]]],
+    limit: int,
+    on_done: Optional[Callable[[int], None]] = None,
+) -> None:
+    """Generate independent scenes, at most limit of them at a time.
+
+    Args:
+        scenes: The tool generating each scene and its input
+        limit: Maximum number of generations running at once
+        on_done: Called with the number of scenes done after each one
+
+    Raises:
+        SceneGenerationError: For the first scene that fails, once the
+            generations still running are cancelled
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def generate(tool: Any, scene_input: dict[str, Any]) -> ToolImplOutput:
+        async with semaphore:
+            return await tool.generate(scene_input)
+
+    tasks = [asyncio.create_task(generate(*scene)) for scene in scenes]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                data = task.result().auxiliary_data
+                if not data.get("success", False):
+                    raise SceneGenerationError(
+                        tasks.index(task), data.get("error", "Unknown error")
+                    )
+            if on_done is not None:
+                on_done(len(tasks) - len(pending))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Parameters of a video stream that must be the same in every file for
+# ffmpeg to join the files by copying their streams
+_CONCAT_STREAM_ENTRIES = [
+    "codec_name",
+    "profile",
+    "width",
+    "height",
+    "pix_fmt",
+    "r_frame_rate",
+]
+
+
+async def _probe_video_stream(path: Path) -> Optional[tuple]:
+    try:
+        output = await run_command(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "stream=" + ",".join(_CONCAT_STREAM_ENTRIES),
+                "-of",
+                "json",
+                str(path),
+            ]
+        )
+        streams = json.loads(output).get("streams") or []
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+    if not streams:
+        return None
+    return tuple(streams[0].get(entry) for entry in _CONCAT_STREAM_ENTRIES)
+
+
+async def concat_videos(paths: list[Path], output_path: Path, work_dir: Path) -> None:
+    """Join videos one after the other with ffmpeg.
+
+    The streams are copied, which takes seconds, unless probing the videos
+    shows they were encoded differently; they are then re-encoded to the
+    size and frame rate of the first.
+    """
+    concat_file = work_dir / "concat_list.txt"
+    await asyncio.to_thread(
+        concat_file.write_text,
+        "".join(f"file '{path.absolute()}'\n" for path in paths),
+    )
+    streams = await asyncio.gather(*(_probe_video_stream(path) for path in paths))
+    cmd = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(concat_file)]
+    if streams[0] is None or len(set(streams)) == 1:
+        cmd += ["-c", "copy"]
+    else:
+        stream = dict(zip(_CONCAT_STREAM_ENTRIES, streams[0]))
+        cmd += [
+            "-vf",
+            f"scale={stream['width']}:{stream['height']},fps={stream['r_frame_rate']}",
+            "-c:v",
+            "libx264",
+            "-pix_fmt",
+            stream["pix_fmt"] or "yuv420p",
+            "-c:a",
+            "aac",
+        ]
+    await run_command(cmd + [str(output_path), "-y"])
+
+
 class VideoGenerateFromTextTool(LLMTool):
     name = "generate_video_from_text"
     description = """Generates a short video based on a text prompt using Google's Veo 2 model via Vertex AI or Google AI Studio.
@@ -155,10 +286,14 @@ Uses Google AI Studio if GEMINI_API_KEY is set, otherwise falls back to Vertex A
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
 
         # Extract configuration from settings
         gcp_project_id = None
@@ -199,6 +334,17 @@ Uses Google AI Studio if GEMINI_API_KEY is set, otherwise falls back to Vertex A
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "video",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Generate the video, reporting the progress on job if given."""
         prompt = tool_input["prompt"]
         relative_output_filename = tool_input["output_filename"]
         aspect_ratio = tool_input.get("aspect_ratio", "16:9")
@@ -229,7 +375,8 @@ Uses Google AI Studio if GEMINI_API_KEY is set, otherwise falls back to Vertex A
                     duration_seconds=duration_seconds,
                     person_generation=person_generation_setting,
                 )
-                operation = self.client.models.generate_videos(
+                operation = await asyncio.to_thread(
+                    self.client.models.generate_videos,
                     model=self.video_model,
                     prompt=prompt,
                     config=video_config,
@@ -247,24 +394,26 @@ Uses Google AI Studio if GEMINI_API_KEY is set, otherwise falls back to Vertex A
                     duration_seconds=duration_seconds,
                     person_generation=person_generation_setting,
                 )
-                operation = self.client.models.generate_videos(
+                operation = await asyncio.to_thread(
+                    self.client.models.generate_videos,
                     model=self.video_model,
                     prompt=prompt,
                     config=video_config,
                 )
-            polling_interval_seconds = 15
-            max_wait_time_seconds = 600
-            elapsed_time = 0
-            while not operation.done:
-                if elapsed_time >= max_wait_time_seconds:
-                    return ToolImplOutput(
-                        f"Error: Video generation timed out after {max_wait_time_seconds} seconds for prompt: {prompt}",
-                        "Video generation timed out.",
-                        {"success": False, "error": "Timeout"},
-                    )
-                time.sleep(polling_interval_seconds)
-                elapsed_time += polling_interval_seconds
-                operation = self.client.operations.get(operation)
+            try:
+                operation = await poll_operation(
+                    operation,
+                    self.client.operations.get,
+                    POLLING_INTERVAL_SECONDS,
+                    MAX_WAIT_TIME_SECONDS,
+                    on_poll=lambda elapsed: self._report_wait(job, elapsed),
+                )
+            except TimeoutError:
+                return ToolImplOutput(
+                    f"Error: Video generation timed out after {MAX_WAIT_TIME_SECONDS} seconds for prompt: {prompt}",
+                    "Video generation timed out.",
+                    {"success": False, "error": "Timeout"},
+                )
             if operation.error:
                 return ToolImplOutput(
                     f"Error generating video: {str(operation.error)}",
@@ -280,12 +429,18 @@ Uses Google AI Studio if GEMINI_API_KEY is set, otherwise falls back to Vertex A
 
             if self.api_type == "genai":
                 generated_video = operation.result.generated_videos[0]
-                self.client.files.download(file=generated_video.video)
-                generated_video.video.save(str(local_output_path))
+                await asyncio.to_thread(
+                    self.client.files.download, file=generated_video.video
+                )
+                await asyncio.to_thread(
+                    generated_video.video.save, str(local_output_path)
+                )
             else:  # vertex AI
                 generated_video_gcs_uri = operation.result.generated_videos[0].video.uri
-                download_gcs_file(generated_video_gcs_uri, local_output_path)
-                delete_gcs_blob(generated_video_gcs_uri)
+                await asyncio.to_thread(
+                    download_gcs_file, generated_video_gcs_uri, local_output_path
+                )
+                await asyncio.to_thread(delete_gcs_blob, generated_video_gcs_uri)
 
             return ToolImplOutput(
                 f"Successfully generated video from text and saved to '{relative_output_filename}'",
@@ -302,6 +457,12 @@ Uses Google AI Studio if GEMINI_API_KEY is set, otherwise falls back to Vertex A
                 {"success": False, "error": str(e)},
             )
 
+    def _report_wait(self, job: Optional[MediaJob], elapsed: float) -> None:
+        if job is not None:
+            self.media_jobs.update(
+                job, f"Waiting for the video ({int(elapsed)}s elapsed)"
+            )
+
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
         return f"Generating video from text prompt for file: {tool_input['output_filename']}"
 
@@ -357,10 +518,14 @@ The generated video will be saved to the specified local path in the workspace."
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
 
         # Extract configuration from settings
         gcp_project_id = None
@@ -402,6 +567,17 @@ The generated video will be saved to the specified local path in the workspace."
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "video",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Generate the video, reporting the progress on job if given."""
         relative_image_path = tool_input["image_file_path"]
         relative_output_filename = tool_input["output_filename"]
         prompt = tool_input.get("prompt")
@@ -445,8 +621,7 @@ The generated video will be saved to the specified local path in the workspace."
         try:
             if self.api_type == "genai":
                 # Google AI Studio - use image bytes directly
-                with open(local_input_image_path, "rb") as f:
-                    image_bytes = f.read()
+                image_bytes = await asyncio.to_thread(local_input_image_path.read_bytes)
 
                 generate_videos_kwargs = {
                     "model": self.video_model,
@@ -465,7 +640,9 @@ The generated video will be saved to the specified local path in the workspace."
                 temp_gcs_image_uri = (
                     f"{self.gcs_output_bucket.rstrip('/')}/{temp_gcs_image_filename}"
                 )
-                upload_to_gcs(local_input_image_path, temp_gcs_image_uri)
+                await asyncio.to_thread(
+                    upload_to_gcs, local_input_image_path, temp_gcs_image_uri
+                )
                 unique_gcs_video_filename = f"veo_temp_output_{uuid.uuid4().hex}.mp4"
                 gcs_output_video_uri = (
                     f"{self.gcs_output_bucket.rstrip('/')}/{unique_gcs_video_filename}"
@@ -489,28 +666,23 @@ The generated video will be saved to the specified local path in the workspace."
             if prompt:
                 generate_videos_kwargs["prompt"] = prompt
 
-            if self.api_type == "genai":
-                operation = self.genai_client.models.generate_videos(
-                    **generate_videos_kwargs
-                )
-            else:
-                operation = self.client.models.generate_videos(**generate_videos_kwargs)
-
-            polling_interval_seconds = 15
-            max_wait_time_seconds = 600
-            elapsed_time = 0
+            client = self.genai_client if self.api_type == "genai" else self.client
+            operation = await asyncio.to_thread(
+                client.models.generate_videos, **generate_videos_kwargs
+            )
 
-            while not operation.done:
-                if elapsed_time >= max_wait_time_seconds:
-                    raise TimeoutError(
-                        f"Video generation timed out after {max_wait_time_seconds} seconds."
-                    )
-                time.sleep(polling_interval_seconds)
-                elapsed_time += polling_interval_seconds
-                if self.api_type == "genai":
-                    operation = self.genai_client.operations.get(operation)
-                else:
-                    operation = self.client.operations.get(operation)
+            try:
+                operation = await poll_operation(
+                    operation,
+                    client.operations.get,
+                    POLLING_INTERVAL_SECONDS,
+                    MAX_WAIT_TIME_SECONDS,
+                    on_poll=lambda elapsed: self._report_wait(job, elapsed),
+                )
+            except TimeoutError:
+                raise TimeoutError(
+                    f"Video generation timed out after {MAX_WAIT_TIME_SECONDS} seconds."
+                )
 
             if operation.error:
                 raise Exception(
@@ -522,15 +694,21 @@ The generated video will be saved to the specified local path in the workspace."
 
             if self.api_type == "genai":
                 generated_video = operation.result.generated_videos[0]
-                self.genai_client.files.download(file=generated_video.video)
-                generated_video.video.save(str(local_output_video_path))
+                await asyncio.to_thread(
+                    self.genai_client.files.download, file=generated_video.video
+                )
+                await asyncio.to_thread(
+                    generated_video.video.save, str(local_output_video_path)
+                )
             else:  # vertex AI
                 actual_generated_video_gcs_uri = operation.result.generated_videos[
                     0
                 ].video.uri
                 generated_video_gcs_uri_for_cleanup = actual_generated_video_gcs_uri
-                download_gcs_file(
-                    actual_generated_video_gcs_uri, local_output_video_path
+                await asyncio.to_thread(
+                    download_gcs_file,
+                    actual_generated_video_gcs_uri,
+                    local_output_video_path,
                 )
 
             return ToolImplOutput(
@@ -552,7 +730,7 @@ The generated video will be saved to the specified local path in the workspace."
             # Clean up temporary files
             if self.api_type == "vertex" and temp_gcs_image_uri:
                 try:
-                    delete_gcs_blob(temp_gcs_image_uri)
+                    await asyncio.to_thread(delete_gcs_blob, temp_gcs_image_uri)
                 except Exception as e_cleanup_img:
                     print(
                         f"Warning: Failed to clean up GCS input image {temp_gcs_image_uri}: {e_cleanup_img}"
@@ -561,12 +739,20 @@ The generated video will be saved to the specified local path in the workspace."
             if self.api_type == "vertex" and generated_video_gcs_uri_for_cleanup:
                 # This will be the actual output URI from Veo
                 try:
-                    delete_gcs_blob(generated_video_gcs_uri_for_cleanup)
+                    await asyncio.to_thread(
+                        delete_gcs_blob, generated_video_gcs_uri_for_cleanup
+                    )
                 except Exception as e_cleanup_vid:
                     print(
                         f"Warning: Failed to clean up GCS output video {generated_video_gcs_uri_for_cleanup}: {e_cleanup_vid}"
                     )
 
+    def _report_wait(self, job: Optional[MediaJob], elapsed: float) -> None:
+        if job is not None:
+            self.media_jobs.update(
+                job, f"Waiting for the video ({int(elapsed)}s elapsed)"
+            )
+
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
         return f"Generating video from image for file: {tool_input['output_filename']}"
 
@@ -605,15 +791,24 @@ The generated video will be saved to the specified local path in the workspace."
                 "default": True,
                 "description": "Whether to enhance the provided prompt for better results.",
             },
+            "independent_scenes": {
+                "type": "boolean",
+                "default": False,
+                "description": "Set to true to generate all scenes at the same time, each from its own prompt, instead of continuing each scene from the last frame of the previous one. Much faster, but the scenes do not flow into each other.",
+            },
         },
         "required": ["prompts", "output_filename", "duration_seconds"],
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
         self.settings = settings
 
     async def run_impl(
@@ -621,6 +816,17 @@ The generated video will be saved to the specified local path in the workspace."
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "video",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Generate the video, reporting the progress on job if given."""
         prompts = tool_input["prompts"]
         relative_output_filename = tool_input["output_filename"]
         aspect_ratio = tool_input.get("aspect_ratio", "16:9")
@@ -658,138 +864,152 @@ The generated video will be saved to the specified local path in the workspace."
             if duration_per_scene > 8:
                 duration_per_scene = 8
 
-            # Generate first scene from text
-            first_scene_filename = "scene_0.mp4"
-            first_scene_path = temp_dir / first_scene_filename
-
-            text_tool = VideoGenerateFromTextTool(self.workspace_manager, self.settings)
-            first_scene_result = await text_tool.run_impl(
-                {
-                    "prompt": prompts[0],
-                    "output_filename": str(
-                        first_scene_path.relative_to(
-                            self.workspace_manager.workspace_path(Path())
-                        )
-                    ),
-                    "aspect_ratio": aspect_ratio,
-                    "duration_seconds": str(duration_per_scene),
-                    "enhance_prompt": enhance_prompt,
-                    "allow_person_generation": True,
-                }
-            )
-
-            if not first_scene_result.auxiliary_data.get("success", False):
-                return ToolImplOutput(
-                    f"Error generating first scene: {first_scene_result.auxiliary_data.get('error', 'Unknown error')}",
-                    "Failed to generate first scene.",
-                    {"success": False, "error": "First scene generation failed"},
+            if tool_input.get("independent_scenes", False):
+                text_tool = VideoGenerateFromTextTool(
+                    self.workspace_manager, self.settings, self.media_jobs
                 )
-
-            scene_video_paths.append(first_scene_path)
-
-            # Generate subsequent scenes from last frame + prompt
-            image_tool = VideoGenerateFromImageTool(
-                self.workspace_manager, self.settings
-            )
-
-            for i, prompt in enumerate(prompts[1:], 1):
-                # Extract last frame from previous scene
-                prev_video_path = scene_video_paths[-1]
-                last_frame_path = temp_dir / f"last_frame_{i - 1}.png"
-
-                # Use ffmpeg to extract last frame
-                extract_cmd = [
-                    "ffmpeg",
-                    "-i",
-                    str(prev_video_path),
-                    "-vf",
-                    "select=eq(n\\,0)",
-                    "-q:v",
-                    "3",
-                    "-vframes",
-                    "1",
-                    "-f",
-                    "image2",
-                    str(last_frame_path),
-                    "-y",
-                ]
-
-                # Actually extract the very last frame
-                extract_cmd = [
-                    "ffmpeg",
-                    "-sseof",
-                    "-1",
-                    "-i",
-                    str(prev_video_path),
-                    "-update",
-                    "1",
-                    "-q:v",
-                    "1",
-                    str(last_frame_path),
-                    "-y",
-                ]
-
-                subprocess.run(extract_cmd, check=True, capture_output=True)
-
-                # Generate next scene from last frame + prompt
-                scene_filename = f"scene_{i}.mp4"
-                scene_path = temp_dir / scene_filename
-
-                scene_result = await image_tool.run_impl(
-                    {
-                        "image_file_path": str(
-                            last_frame_path.relative_to(
+                scenes = []
+                for i, prompt in enumerate(prompts):
+                    scene_path = temp_dir / f"scene_{i}.mp4"
+                    scene_input = {
+                        "prompt": prompt,
+                        "output_filename": str(
+                            scene_path.relative_to(
                                 self.workspace_manager.workspace_path(Path())
                             )
                         ),
+                        "aspect_ratio": aspect_ratio,
+                        "duration_seconds": str(duration_per_scene),
+                        "enhance_prompt": enhance_prompt,
+                        "allow_person_generation": True,
+                    }
+                    scenes.append((text_tool, scene_input))
+                    scene_video_paths.append(scene_path)
+                await generate_scenes_concurrently(
+                    scenes,
+                    load_ii_agent_config().long_video_parallel_scenes,
+                    on_done=lambda done: self._report_done(job, done, len(prompts)),
+                )
+            else:
+                # Generate first scene from text
+                first_scene_filename = "scene_0.mp4"
+                first_scene_path = temp_dir / first_scene_filename
+
+                text_tool = VideoGenerateFromTextTool(
+                    self.workspace_manager, self.settings, self.media_jobs
+                )
+                self._report_scene(job, 0, len(prompts))
+                first_scene_result = await text_tool.generate(
+                    {
+                        "prompt": prompts[0],
                         "output_filename": str(
-                            scene_path.relative_to(
+                            first_scene_path.relative_to(
                                 self.workspace_manager.workspace_path(Path())
                             )
                         ),
-                        "prompt": prompt,
                         "aspect_ratio": aspect_ratio,
                         "duration_seconds": str(duration_per_scene),
+                        "enhance_prompt": enhance_prompt,
                         "allow_person_generation": True,
                     }
                 )
 
-                if not scene_result.auxiliary_data.get("success", False):
+                if not first_scene_result.auxiliary_data.get("success", False):
                     return ToolImplOutput(
-                        f"Error generating scene {i}: {scene_result.auxiliary_data.get('error', 'Unknown error')}",
-                        f"Failed to generate scene {i}.",
-                        {"success": False, "error": f"Scene {i} generation failed"},
+                        f"Error generating first scene: {first_scene_result.auxiliary_data.get('error', 'Unknown error')}",
+                        "Failed to generate first scene.",
+                        {"success": False, "error": "First scene generation failed"},
+                    )
+
+                scene_video_paths.append(first_scene_path)
+
+                # Generate subsequent scenes from last frame + prompt
+                image_tool = VideoGenerateFromImageTool(
+                    self.workspace_manager, self.settings, self.media_jobs
+                )
+
+                for i, prompt in enumerate(prompts[1:], 1):
+                    # Extract last frame from previous scene
+                    prev_video_path = scene_video_paths[-1]
+                    last_frame_path = temp_dir / f"last_frame_{i - 1}.png"
+
+                    # Use ffmpeg to extract last frame
+                    extract_cmd = [
+                        "ffmpeg",
+                        "-i",
+                        str(prev_video_path),
+                        "-vf",
+                        "select=eq(n\\,0)",
+                        "-q:v",
+                        "3",
+                        "-vframes",
+                        "1",
+                        "-f",
+                        "image2",
+                        str(last_frame_path),
+                        "-y",
+                    ]
+
+                    # Actually extract the very last frame
+                    extract_cmd = [
+                        "ffmpeg",
+                        "-sseof",
+                        "-1",
+                        "-i",
+                        str(prev_video_path),
+                        "-update",
+                        "1",
+                        "-q:v",
+                        "1",
+                        str(last_frame_path),
+                        "-y",
+                    ]
+
+                    await run_command(extract_cmd)
+
+                    # Generate next scene from last frame + prompt
+                    scene_filename = f"scene_{i}.mp4"
+                    scene_path = temp_dir / scene_filename
+
+                    self._report_scene(job, i, len(prompts))
+                    scene_result = await image_tool.generate(
+                        {
+                            "image_file_path": str(
+                                last_frame_path.relative_to(
+                                    self.workspace_manager.workspace_path(Path())
+                                )
+                            ),
+                            "output_filename": str(
+                                scene_path.relative_to(
+                                    self.workspace_manager.workspace_path(Path())
+                                )
+                            ),
+                            "prompt": prompt,
+                            "aspect_ratio": aspect_ratio,
+                            "duration_seconds": str(duration_per_scene),
+                            "allow_person_generation": True,
+                        }
                     )
 
-                scene_video_paths.append(scene_path)
+                    if not scene_result.auxiliary_data.get("success", False):
+                        return ToolImplOutput(
+                            f"Error generating scene {i}: {scene_result.auxiliary_data.get('error', 'Unknown error')}",
+                            f"Failed to generate scene {i}.",
+                            {"success": False, "error": f"Scene {i} generation failed"},
+                        )
+
+                    scene_video_paths.append(scene_path)
 
             # Combine all scenes into final video
             if len(scene_video_paths) == 1:
                 # Only one scene, just copy it
-                shutil.copy2(scene_video_paths[0], local_output_path)
+                await asyncio.to_thread(
+                    shutil.copy2, scene_video_paths[0], local_output_path
+                )
             else:
-                # Create file list for ffmpeg concat
-                concat_file = temp_dir / "concat_list.txt"
-                with open(concat_file, "w") as f:
-                    for video_path in scene_video_paths:
-                        f.write(f"file '{video_path.absolute()}'\n")
-
-                # Concatenate videos
-                concat_cmd = [
-                    "ffmpeg",
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    str(concat_file),
-                    "-c",
-                    "copy",
-                    str(local_output_path),
-                    "-y",
-                ]
-
-                subprocess.run(concat_cmd, check=True, capture_output=True)
+                if job is not None:
+                    self.media_jobs.update(job, "Joining the scenes")
+                await concat_videos(scene_video_paths, local_output_path, temp_dir)
 
             return ToolImplOutput(
                 f"Successfully generated long video with {len(prompts)} scenes and saved to '{relative_output_filename}'",
@@ -801,6 +1021,12 @@ The generated video will be saved to the specified local path in the workspace."
                 },
             )
 
+        except SceneGenerationError as e:
+            return ToolImplOutput(
+                f"Error generating scene {e.scene}: {e.error}",
+                f"Failed to generate scene {e.scene}.",
+                {"success": False, "error": f"Scene {e.scene} generation failed"},
+            )
         except Exception as e:
             return ToolImplOutput(
                 f"Error generating long video: {str(e)}",
@@ -817,6 +1043,18 @@ The generated video will be saved to the specified local path in the workspace."
                         f"Warning: Failed to clean up temporary directory {temp_dir}: {e_cleanup}"
                     )
 
+    def _report_scene(self, job: Optional[MediaJob], scene: int, total: int) -> None:
+        if job is not None:
+            self.media_jobs.update(
+                job, f"Generating scene {scene + 1} of {total}", scene / total
+            )
+
+    def _report_done(self, job: Optional[MediaJob], done: int, total: int) -> None:
+        if job is not None:
+            self.media_jobs.update(
+                job, f"Generated {done} of {total} scenes", done / total
+            )
+
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
         num_scenes = len(tool_input.get("prompts", []))
         return f"Generating long video with {num_scenes} scenes for file: {tool_input['output_filename']}"
@@ -860,6 +1098,11 @@ The generated video will be saved to the specified local path in the workspace."
                 "default": True,
                 "description": "Whether to enhance the provided prompt for better results.",
             },
+            "independent_scenes": {
+                "type": "boolean",
+                "default": False,
+                "description": "Set to true to generate all scenes at the same time, each from its own prompt, instead of continuing each scene from the last frame of the previous one. Much faster, but the scenes do not flow into each other.",
+            },
         },
         "required": [
             "image_file_path",
@@ -870,10 +1113,14 @@ The generated video will be saved to the specified local path in the workspace."
     }
 
     def __init__(
-        self, workspace_manager: WorkspaceManager, settings: Optional[Settings] = None
+        self,
+        workspace_manager: WorkspaceManager,
+        settings: Optional[Settings] = None,
+        media_jobs: Optional[MediaJobManager] = None,
     ):
         super().__init__()
         self.workspace_manager = workspace_manager
+        self.media_jobs = media_jobs or MediaJobManager()
         self.settings = settings
 
     async def run_impl(
@@ -881,6 +1128,17 @@ The generated video will be saved to the specified local path in the workspace."
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
+        return await self.media_jobs.run(
+            "video",
+            self.name,
+            self.get_tool_start_message(tool_input),
+            lambda job: self.generate(tool_input, job),
+        )
+
+    async def generate(
+        self, tool_input: dict[str, Any], job: Optional[MediaJob] = None
+    ) -> ToolImplOutput:
+        """Generate the video, reporting the progress on job if given."""
         image_file_path = tool_input["image_file_path"]
         prompts = tool_input["prompts"]
         relative_output_filename = tool_input["output_filename"]
@@ -919,136 +1177,157 @@ The generated video will be saved to the specified local path in the workspace."
             if duration_per_scene > 8:
                 duration_per_scene = 8
 
-            # Generate first scene from text
-            first_scene_filename = "scene_0.mp4"
-            first_scene_path = temp_dir / first_scene_filename
-
-            image_tool = VideoGenerateFromImageTool(
-                self.workspace_manager, self.settings
-            )
-            first_scene_result = await image_tool.run_impl(
-                {
-                    "image_file_path": image_file_path,
-                    "prompt": prompts[0],
-                    "output_filename": str(
-                        first_scene_path.relative_to(
-                            self.workspace_manager.workspace_path(Path())
-                        )
-                    ),
-                    "aspect_ratio": aspect_ratio,
-                    "duration_seconds": str(duration_per_scene),
-                    "enhance_prompt": enhance_prompt,
-                    "allow_person_generation": True,
-                }
-            )
-
-            if not first_scene_result.auxiliary_data.get("success", False):
-                return ToolImplOutput(
-                    f"Error generating first scene: {first_scene_result.auxiliary_data.get('error', 'Unknown error')}",
-                    "Failed to generate first scene.",
-                    {"success": False, "error": "First scene generation failed"},
+            if tool_input.get("independent_scenes", False):
+                # Only the first scene starts from the image, the others
+                # from their prompt alone
+                image_tool = VideoGenerateFromImageTool(
+                    self.workspace_manager, self.settings, self.media_jobs
                 )
-
-            scene_video_paths.append(first_scene_path)
-
-            for i, prompt in enumerate(prompts[1:], 1):
-                # Extract last frame from previous scene
-                prev_video_path = scene_video_paths[-1]
-                last_frame_path = temp_dir / f"last_frame_{i - 1}.png"
-
-                # Use ffmpeg to extract last frame
-                extract_cmd = [
-                    "ffmpeg",
-                    "-i",
-                    str(prev_video_path),
-                    "-vf",
-                    "select=eq(n\\,0)",
-                    "-q:v",
-                    "3",
-                    "-vframes",
-                    "1",
-                    "-f",
-                    "image2",
-                    str(last_frame_path),
-                    "-y",
-                ]
-
-                # Actually extract the very last frame
-                extract_cmd = [
-                    "ffmpeg",
-                    "-sseof",
-                    "-1",
-                    "-i",
-                    str(prev_video_path),
-                    "-update",
-                    "1",
-                    "-q:v",
-                    "1",
-                    str(last_frame_path),
-                    "-y",
-                ]
-
-                subprocess.run(extract_cmd, check=True, capture_output=True)
-
-                # Generate next scene from last frame + prompt
-                scene_filename = f"scene_{i}.mp4"
-                scene_path = temp_dir / scene_filename
-
-                scene_result = await image_tool.run_impl(
-                    {
-                        "image_file_path": str(
-                            last_frame_path.relative_to(
+                text_tool = VideoGenerateFromTextTool(
+                    self.workspace_manager, self.settings, self.media_jobs
+                )
+                scenes = []
+                for i, prompt in enumerate(prompts):
+                    scene_path = temp_dir / f"scene_{i}.mp4"
+                    scene_input = {
+                        "prompt": prompt,
+                        "output_filename": str(
+                            scene_path.relative_to(
                                 self.workspace_manager.workspace_path(Path())
                             )
                         ),
+                        "aspect_ratio": aspect_ratio,
+                        "duration_seconds": str(duration_per_scene),
+                        "allow_person_generation": True,
+                    }
+                    if i == 0:
+                        scene_input["image_file_path"] = image_file_path
+                        scenes.append((image_tool, scene_input))
+                    else:
+                        scene_input["enhance_prompt"] = enhance_prompt
+                        scenes.append((text_tool, scene_input))
+                    scene_video_paths.append(scene_path)
+                await generate_scenes_concurrently(
+                    scenes,
+                    load_ii_agent_config().long_video_parallel_scenes,
+                    on_done=lambda done: self._report_done(job, done, len(prompts)),
+                )
+            else:
+                # Generate first scene from text
+                first_scene_filename = "scene_0.mp4"
+                first_scene_path = temp_dir / first_scene_filename
+
+                image_tool = VideoGenerateFromImageTool(
+                    self.workspace_manager, self.settings, self.media_jobs
+                )
+                self._report_scene(job, 0, len(prompts))
+                first_scene_result = await image_tool.generate(
+                    {
+                        "image_file_path": image_file_path,
+                        "prompt": prompts[0],
                         "output_filename": str(
-                            scene_path.relative_to(
+                            first_scene_path.relative_to(
                                 self.workspace_manager.workspace_path(Path())
                             )
                         ),
-                        "prompt": prompt,
                         "aspect_ratio": aspect_ratio,
                         "duration_seconds": str(duration_per_scene),
+                        "enhance_prompt": enhance_prompt,
                         "allow_person_generation": True,
                     }
                 )
 
-                if not scene_result.auxiliary_data.get("success", False):
+                if not first_scene_result.auxiliary_data.get("success", False):
                     return ToolImplOutput(
-                        f"Error generating scene {i}: {scene_result.auxiliary_data.get('error', 'Unknown error')}",
-                        f"Failed to generate scene {i}.",
-                        {"success": False, "error": f"Scene {i} generation failed"},
+                        f"Error generating first scene: {first_scene_result.auxiliary_data.get('error', 'Unknown error')}",
+                        "Failed to generate first scene.",
+                        {"success": False, "error": "First scene generation failed"},
+                    )
+
+                scene_video_paths.append(first_scene_path)
+
+                for i, prompt in enumerate(prompts[1:], 1):
+                    # Extract last frame from previous scene
+                    prev_video_path = scene_video_paths[-1]
+                    last_frame_path = temp_dir / f"last_frame_{i - 1}.png"
+
+                    # Use ffmpeg to extract last frame
+                    extract_cmd = [
+                        "ffmpeg",
+                        "-i",
+                        str(prev_video_path),
+                        "-vf",
+                        "select=eq(n\\,0)",
+                        "-q:v",
+                        "3",
+                        "-vframes",
+                        "1",
+                        "-f",
+                        "image2",
+                        str(last_frame_path),
+                        "-y",
+                    ]
+
+                    # Actually extract the very last frame
+                    extract_cmd = [
+                        "ffmpeg",
+                        "-sseof",
+                        "-1",
+                        "-i",
+                        str(prev_video_path),
+                        "-update",
+                        "1",
+                        "-q:v",
+                        "1",
+                        str(last_frame_path),
+                        "-y",
+                    ]
+
+                    await run_command(extract_cmd)
+
+                    # Generate next scene from last frame + prompt
+                    scene_filename = f"scene_{i}.mp4"
+                    scene_path = temp_dir / scene_filename
+
+                    self._report_scene(job, i, len(prompts))
+                    scene_result = await image_tool.generate(
+                        {
+                            "image_file_path": str(
+                                last_frame_path.relative_to(
+                                    self.workspace_manager.workspace_path(Path())
+                                )
+                            ),
+                            "output_filename": str(
+                                scene_path.relative_to(
+                                    self.workspace_manager.workspace_path(Path())
+                                )
+                            ),
+                            "prompt": prompt,
+                            "aspect_ratio": aspect_ratio,
+                            "duration_seconds": str(duration_per_scene),
+                            "allow_person_generation": True,
+                        }
                     )
 
-                scene_video_paths.append(scene_path)
+                    if not scene_result.auxiliary_data.get("success", False):
+                        return ToolImplOutput(
+                            f"Error generating scene {i}: {scene_result.auxiliary_data.get('error', 'Unknown error')}",
+                            f"Failed to generate scene {i}.",
+                            {"success": False, "error": f"Scene {i} generation failed"},
+                        )
+
+                    scene_video_paths.append(scene_path)
 
             # Combine all scenes into final video
             if len(scene_video_paths) == 1:
                 # Only one scene, just copy it
-                shutil.copy2(scene_video_paths[0], local_output_path)
+                await asyncio.to_thread(
+                    shutil.copy2, scene_video_paths[0], local_output_path
+                )
             else:
-                # Create file list for ffmpeg concat
-                concat_file = temp_dir / "concat_list.txt"
-                with open(concat_file, "w") as f:
-                    for video_path in scene_video_paths:
-                        f.write(f"file '{video_path.absolute()}'\n")
-
-                # Concatenate videos
-                concat_cmd = [
-                    "ffmpeg",
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    str(concat_file),
-                    "-c",
-                    "copy",
-                    str(local_output_path),
-                    "-y",
-                ]
-
-                subprocess.run(concat_cmd, check=True, capture_output=True)
+                if job is not None:
+                    self.media_jobs.update(job, "Joining the scenes")
+                await concat_videos(scene_video_paths, local_output_path, temp_dir)
 
             return ToolImplOutput(
                 f"Successfully generated long video with {len(prompts)} scenes and saved to '{relative_output_filename}'",
@@ -1060,6 +1339,12 @@ The generated video will be saved to the specified local path in the workspace."
                 },
             )
 
+        except SceneGenerationError as e:
+            return ToolImplOutput(
+                f"Error generating scene {e.scene}: {e.error}",
+                f"Failed to generate scene {e.scene}.",
+                {"success": False, "error": f"Scene {e.scene} generation failed"},
+            )
         except Exception as e:
             return ToolImplOutput(
                 f"Error generating long video: {str(e)}",
@@ -1076,6 +1361,18 @@ The generated video will be saved to the specified local path in the workspace."
                         f"Warning: Failed to clean up temporary directory {temp_dir}: {e_cleanup}"
                     )
 
+    def _report_scene(self, job: Optional[MediaJob], scene: int, total: int) -> None:
+        if job is not None:
+            self.media_jobs.update(
+                job, f"Generating scene {scene + 1} of {total}", scene / total
+            )
+
+    def _report_done(self, job: Optional[MediaJob], done: int, total: int) -> None:
+        if job is not None:
+            self.media_jobs.update(
+                job, f"Generated {done} of {total} scenes", done / total
+            )
+
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
         num_scenes = len(tool_input.get("prompts", []))
         return f"Generating long video with {num_scenes} scenes for file: {tool_input['output_filename']}"
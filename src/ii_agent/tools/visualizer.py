@@ -1,4 +1,3 @@
-import mimetypes
 from typing import Any, Optional
 
 from ii_agent.tools.base import (
@@ -6,7 +5,7 @@ from ii_agent.tools.base import (
     ToolImplOutput,
 )
 from ii_agent.llm.message_history import MessageHistory
-from .utils import encode_image
+from ii_agent.utils.image_prep import ImageSpec, prepare_image
 from ii_agent.utils.workspace_manager import WorkspaceManager
 
 
@@ -24,8 +23,13 @@ class DisplayImageTool(LLMTool):
         "required": ["image_path"],
     }
 
-    def __init__(self, workspace_manager: WorkspaceManager):
+    def __init__(
+        self,
+        workspace_manager: WorkspaceManager,
+        image_spec: Optional[ImageSpec] = None,
+    ):
         self.workspace_manager = workspace_manager
+        self.image_spec = image_spec
 
     async def run_impl(
         self,
@@ -44,23 +48,9 @@ class DisplayImageTool(LLMTool):
             # Convert relative path to absolute path using workspace_manager
             abs_path = str(self.workspace_manager.workspace_path(image_path))
 
-            # Get mime type and encode image
-            mime_type, _ = mimetypes.guess_type(abs_path)
-            if not mime_type:
-                mime_type = "image/png"  # Default to PNG if type cannot be determined
-
-            base64_image = encode_image(abs_path)
+            image = await prepare_image(abs_path, self.image_spec)
 
-            tool_output = [
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": base64_image,
-                    },
-                }
-            ]
+            tool_output = [{"type": "image", "source": image.to_source()}]
 
             return ToolImplOutput(
                 tool_output=tool_output,
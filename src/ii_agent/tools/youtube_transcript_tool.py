@@ -4,8 +4,11 @@ from ii_agent.tools.base import (
 )
 from typing import Any, Optional
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.tools.clients.http_sessions import (
+    HttpSessionPool,
+    get_http_session_pool,
+)
 import yt_dlp
-import aiohttp
 import asyncio
 
 
@@ -27,8 +30,9 @@ class YoutubeTranscriptTool(LLMTool):
     }
     output_type = "string"
 
-    def __init__(self):
+    def __init__(self, http_sessions: Optional[HttpSessionPool] = None):
         super().__init__()
+        self.http_sessions = http_sessions or get_http_session_pool()
 
     async def run_impl(
         self,
@@ -70,10 +74,10 @@ class YoutubeTranscriptTool(LLMTool):
             subtitle_url = subtitle_list[0]["url"]
 
             # Download subtitle text using aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(subtitle_url) as response:
-                    response.raise_for_status()
-                    subtitle_data = await response.json()
+            session = self.http_sessions.session_for(subtitle_url)
+            async with session.get(subtitle_url) as response:
+                response.raise_for_status()
+                subtitle_data = await response.json()
                     
             events = subtitle_data.get("events", [])
             subtitle_text = ""
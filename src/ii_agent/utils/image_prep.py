@@ -0,0 +1,282 @@
+"""Preparation of the images sent to the model.
+
+Attachments, displayed images and browser screenshots used to be sent as
+they were on disk, often full-resolution PNGs. Providers downscale large
+images anyway, so the extra pixels only cost upload time and tokens. The
+images are instead loaded without blocking the event loop, resized to the
+largest size the provider of the model uses and re-encoded as JPEG, or as
+WebP if they are transparent, unless they must stay lossless. Results are
+cached by the content of the source and the target, so an image sent again
+is not processed again.
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+from dataclasses import asdict, dataclass, replace
+from typing import Optional, Union
+
+import aiohttp
+from PIL import Image, ImageOps
+
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.logger import logger
+from ii_agent.utils.process_pool import run_in_process
+from ii_agent.utils.result_cache import cache_key, get_conversion_cache
+
+# Bump when a change here changes the prepared images, so images cached by
+# an older version are not served
+PREPARATION_VERSION = 1
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36 Edg/119.0.0.0"
+)
+
+IMAGE_EXTENSIONS = {".png", ".gif", ".jpg", ".jpeg", ".webp"}
+
+_FORMAT_MEDIA_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+
+def is_image_path(path: str) -> bool:
+    """Tell whether a path names an image the models accept."""
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """Target of the preparation of an image.
+
+    Limits set to None are not applied.
+    """
+
+    max_long_side: Optional[int] = None
+    max_short_side: Optional[int] = None
+    max_pixels: Optional[int] = None
+    quality: int = 85
+
+
+# Largest images the providers use as they are; larger ones are downscaled
+# by the provider before the model sees them
+PROVIDER_IMAGE_SPECS = {
+    "anthropic": ImageSpec(max_long_side=1568, max_pixels=1_150_000),
+    "openai": ImageSpec(max_long_side=2048, max_short_side=768),
+    "gemini": ImageSpec(max_long_side=3072),
+}
+
+
+def image_spec_for(api_type: Optional[str] = None) -> ImageSpec:
+    """Get the target of the images sent to a provider.
+
+    Args:
+        api_type: API type of the LLM client, e.g. "anthropic"; the most
+            restrictive target is used if it is unknown
+    """
+    spec = PROVIDER_IMAGE_SPECS.get(api_type or "", PROVIDER_IMAGE_SPECS["anthropic"])
+    return replace(spec, quality=load_ii_agent_config().image_quality)
+
+
+@dataclass
+class PreparedImage:
+    data: str
+    media_type: str
+    width: int
+    height: int
+
+    def to_source(self) -> dict[str, str]:
+        """Get the source of an image content block showing the image."""
+        return {"type": "base64", "media_type": self.media_type, "data": self.data}
+
+
+def target_size(width: int, height: int, spec: ImageSpec) -> tuple[int, int]:
+    """Get the size of an image fitted in the limits of a target."""
+    scale = 1.0
+    if spec.max_long_side:
+        scale = min(scale, spec.max_long_side / max(width, height))
+    if spec.max_short_side:
+        scale = min(scale, spec.max_short_side / min(width, height))
+    if spec.max_pixels:
+        scale = min(scale, (spec.max_pixels / (width * height)) ** 0.5)
+    if scale >= 1.0:
+        return width, height
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    if image.mode in ("RGBA", "LA", "PA"):
+        return image.getextrema()[-1][0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+
+def prepare_image_bytes(
+    data: bytes,
+    spec: ImageSpec,
+    resize: bool = True,
+    lossless: bool = False,
+) -> PreparedImage:
+    """Resize and re-encode an image for the model.
+
+    The original is kept if it fits the target and re-encoding would not
+    make it smaller. Animated images keep their first frame only when they
+    must be resized.
+
+    Args:
+        data: Content of the image file
+        spec: Target of the preparation
+        resize: Whether to fit the image in the limits of the target; off
+            for screenshots, whose pixels are clicked at by coordinates
+        lossless: Whether the image must be encoded losslessly, as PNG
+
+    Raises:
+        PIL.UnidentifiedImageError: If the data is not an image
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        original_format = image.format
+        width, height = image.size
+        size = target_size(width, height, spec) if resize else (width, height)
+        image.load()
+        alpha = _has_alpha(image)
+        # Re-encoding drops the EXIF orientation, so apply it to the pixels
+        oriented = ImageOps.exif_transpose(image)
+        if oriented.size != image.size:
+            width, height = oriented.size
+            size = target_size(width, height, spec) if resize else (width, height)
+
+        if size == (width, height) and original_format in _FORMAT_MEDIA_TYPES:
+            animated = getattr(image, "is_animated", False)
+            if lossless or animated:
+                return PreparedImage(
+                    base64.b64encode(data).decode("utf-8"),
+                    _FORMAT_MEDIA_TYPES[original_format],
+                    width,
+                    height,
+                )
+
+        if lossless:
+            output_format = "PNG"
+            converted = oriented.convert("RGBA" if alpha else "RGB")
+        elif alpha:
+            output_format = "WEBP"
+            converted = oriented.convert("RGBA")
+        else:
+            output_format = "JPEG"
+            converted = oriented.convert("RGB")
+        if size != (width, height):
+            converted = converted.resize(size, Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if output_format == "PNG":
+            converted.save(buffer, format="PNG", optimize=True)
+        else:
+            converted.save(buffer, format=output_format, quality=spec.quality)
+        encoded = buffer.getvalue()
+
+    if (
+        size == (width, height)
+        and original_format in _FORMAT_MEDIA_TYPES
+        and len(data) <= len(encoded)
+    ):
+        encoded, output_format = data, original_format
+    return PreparedImage(
+        base64.b64encode(encoded).decode("utf-8"),
+        _FORMAT_MEDIA_TYPES[output_format],
+        size[0],
+        size[1],
+    )
+
+
+async def load_image_source(source: str) -> bytes:
+    """Read an image from a local path or an http(s) URL.
+
+    Raises:
+        ValueError: If the image is larger than the image_max_source_bytes
+            setting
+    """
+    max_bytes = load_ii_agent_config().image_max_source_bytes
+    if not source.startswith(("http://", "https://")):
+        return await asyncio.to_thread(_read_file, source, max_bytes)
+
+    # Imported here, importing the tools package imports every tool, some
+    # of which use this module
+    from ii_agent.tools.clients.http_sessions import get_http_session_pool
+
+    session = get_http_session_pool().session_for(source)
+    data = bytearray()
+    async with session.get(
+        source,
+        headers={"User-Agent": _USER_AGENT},
+        timeout=aiohttp.ClientTimeout(total=60),
+    ) as response:
+        response.raise_for_status()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            data.extend(chunk)
+            if len(data) > max_bytes:
+                raise ValueError(f"Image {source} is larger than {max_bytes} bytes")
+    return bytes(data)
+
+
+def _read_file(path: str, max_bytes: int) -> bytes:
+    if os.path.getsize(path) > max_bytes:
+        raise ValueError(f"Image {path} is larger than {max_bytes} bytes")
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def prepare_image(
+    source: Union[str, bytes],
+    spec: Optional[ImageSpec] = None,
+    resize: bool = True,
+    lossless: bool = False,
+    use_cache: bool = True,
+) -> PreparedImage:
+    """Load an image and prepare it for the model, reusing earlier results.
+
+    The work runs in the tool process pool. Results are cached by the
+    content of the image and the target, so an unchanged file or URL is
+    only loaded again, not processed again.
+
+    Args:
+        source: Local path or http(s) URL of the image, or its content
+        spec: Target of the preparation, that of the default provider if
+            unset
+        resize: Whether to fit the image in the limits of the target
+        lossless: Whether the image must be encoded losslessly
+        use_cache: Whether to look up and store the result in the cache;
+            off for images never sent twice, such as screenshots
+    """
+    spec = spec or image_spec_for()
+    data = source if isinstance(source, bytes) else await load_image_source(source)
+    cache = get_conversion_cache() if use_cache else None
+    if cache is None:
+        return await run_in_process(prepare_image_bytes, data, spec, resize, lossless)
+
+    metrics = cache.metrics_for("image")
+    key = cache_key(
+        "image",
+        hashlib.sha256(data).hexdigest(),
+        PREPARATION_VERSION,
+        asdict(spec),
+        {"resize": resize, "lossless": lossless},
+    )
+    entry = await asyncio.to_thread(cache.get, key)
+    if entry is not None and entry.fresh:
+        try:
+            prepared = PreparedImage(**json.loads(entry.value))
+            metrics.hits += 1
+            return prepared
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable prepared image {key}: {e}")
+
+    metrics.misses += 1
+    prepared = await run_in_process(prepare_image_bytes, data, spec, resize, lossless)
+    ttl = load_ii_agent_config().conversion_cache_ttl_seconds
+    await asyncio.to_thread(cache.put, key, json.dumps(asdict(prepared)), ttl)
+    return prepared
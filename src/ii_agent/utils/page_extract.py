@@ -0,0 +1,149 @@
+"""Text extraction of fetched webpages and PDFs.
+
+The functions run in the tool process pool, so this module only imports
+what they need.
+"""
+
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup
+from markdownify import MarkdownConverter
+
+try:
+    import lxml  # noqa: F401
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Never part of the text of a page
+_NOISE_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "iframe",
+    "svg",
+    "canvas",
+    "object",
+    "embed",
+]
+# Page chrome around the main content
+_CHROME_TAGS = ["nav", "aside", "footer", "form", "button", "select", "dialog"]
+_CHROME_SELECTOR = (
+    '[role="navigation"], [role="banner"], [role="contentinfo"], '
+    '[role="complementary"], [role="search"], [aria-hidden="true"], [hidden]'
+)
+# A main or article element is taken as the content of the page only if it
+# holds at least this share of the text of the body, so a page listing
+# article teasers is not reduced to its first teaser
+_MAIN_CONTENT_MIN_SHARE = 0.25
+
+
+def sniff_content_kind(content_type: str, head: bytes) -> str:
+    """Tell how to extract the text of a response from its type and first bytes.
+
+    Returns:
+        "pdf", "html", "text" or "binary"
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if head.startswith(b"%PDF-") or media_type == "application/pdf":
+        return "pdf"
+    start = head[:512].lstrip().lower()
+    if (
+        media_type in ("text/html", "application/xhtml+xml")
+        or start.startswith((b"<!doctype html", b"<html"))
+        or b"<html" in start
+    ):
+        return "html"
+    if media_type.startswith("text/") or media_type in (
+        "application/json",
+        "application/xml",
+        "application/javascript",
+        "",
+    ):
+        return "text"
+    return "binary"
+
+
+def _text_length(element) -> int:
+    return len(element.get_text(" ", strip=True))
+
+
+def _main_content(soup: BeautifulSoup):
+    body = soup.body or soup
+    for element in body.select(_CHROME_SELECTOR):
+        element.decompose()
+    for element in body.find_all(_CHROME_TAGS):
+        element.decompose()
+
+    body_length = _text_length(body)
+    candidates = body.find_all(["main", "article"]) + body.select('[role="main"]')
+    if candidates:
+        best = max(candidates, key=_text_length)
+        if body_length and _text_length(best) >= body_length * _MAIN_CONTENT_MIN_SHARE:
+            return best
+    # Without a main element, the header is page chrome too
+    for element in body.find_all("header"):
+        element.decompose()
+    return body
+
+
+def html_to_markdown(html: bytes, encoding: Optional[str] = None) -> str:
+    """Convert the main content of an HTML page to markdown.
+
+    Scripts, styles, navigation, sidebars, footers and forms are dropped
+    before the conversion, and the main or article element is converted
+    alone when the page has one.
+
+    Args:
+        html: The page, possibly cut off at a size limit
+        encoding: Encoding from the Content-Type header; otherwise it is
+            detected from the page
+    """
+    soup = BeautifulSoup(
+        html, "lxml" if HAS_LXML else "html.parser", from_encoding=encoding
+    )
+    for element in soup.find_all(_NOISE_TAGS):
+        element.decompose()
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    content = _main_content(soup)
+
+    markdown = MarkdownConverter().convert_soup(content).strip()
+    markdown = re.sub(r"[ \t]+\n", "\n", markdown)
+    markdown = re.sub(r"\n{3,}", "\n\n", markdown)
+    if title and not content.find("h1"):
+        markdown = f"# {title}\n\n{markdown}"
+    return markdown
+
+
+def pdf_to_text(data: bytes, max_chars: int) -> str:
+    """Extract the text of a PDF, stopping once max_chars are extracted."""
+    import pymupdf
+
+    parts = []
+    length = 0
+    with pymupdf.open(stream=data, filetype="pdf") as document:
+        for page in document:
+            text = page.get_text("text")
+            parts.append(text)
+            length += len(text)
+            if length >= max_chars:
+                break
+    return "".join(parts).strip()
+
+
+def pdf_page_count(path: str) -> int:
+    import pymupdf
+
+    with pymupdf.open(path) as document:
+        return document.page_count
+
+
+def pdf_page_texts(path: str, numbers: list[int]) -> list[str]:
+    """Extract the text of the given pages, counted from 0, of a PDF file."""
+    import pymupdf
+
+    with pymupdf.open(path) as document:
+        return [document.load_page(number).get_text("text") for number in numbers]
@@ -0,0 +1,66 @@
+"""Process pool for the CPU-bound work of tools, such as parsing pages.
+
+Parsing a large page holds the GIL for seconds, which would stall every
+session served by the event loop if it ran on a thread. Functions run
+here must be importable at module level and their arguments picklable.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.logger import logger
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process pool of the tools, None if it is disabled."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = load_ii_agent_config().tool_worker_processes
+            if workers <= 0:
+                return None
+            # Forking a process running threads may copy locks held by them
+            method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method)
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_process(func: Callable[..., T], *args: Any) -> T:
+    """Run a function in the process pool, or in a thread if it is disabled.
+
+    A pool whose worker died is replaced and the call retried in a thread,
+    so one crashing input does not fail every later call.
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        logger.warning(f"Tool process pool broke running {func.__name__}")
+        shutdown_process_pool()
+        return await asyncio.to_thread(func, *args)
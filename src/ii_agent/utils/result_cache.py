@@ -0,0 +1,250 @@
+"""Disk-backed cache of results that are costly to compute or fetch.
+
+Entries are keyed by everything their value depends on, stored compressed
+in a SQLite file and evicted least recently used first once the cache
+outgrows its limit. The HTTP clients cache their responses in one, and
+the file conversions of the tools, such as text extraction and image
+preparation, in another.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.logger import logger
+from ii_agent.core.storage.payloads import compress_payload, decompress_payload
+
+# Eviction frees space down to this share of the limit, so a full cache
+# does not evict on every store
+EVICT_TO_RATIO = 0.9
+# No single entry may take more than this share of the limit
+MAX_ENTRY_RATIO = 0.125
+
+# The table keeps the name of the first cache, the HTTP one, so existing
+# cache files stay readable
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS http_cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        expires_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_http_cache_accessed_at ON http_cache (accessed_at)",
+]
+
+
+def cache_key(*parts: Any) -> str:
+    """Build the key of an entry from everything its value depends on."""
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """Hash the content of a file without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    value: str
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+@dataclass
+class CacheMetrics:
+    """Lookup counters of one kind of cached request."""
+
+    hits: int = 0
+    misses: int = 0
+    # Stale entries the origin confirmed unchanged with a 304
+    revalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        lookups = self.hits + self.misses + self.revalidations
+        if lookups == 0:
+            return None
+        return (self.hits + self.revalidations) / lookups
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["hit_ratio"] = self.hit_ratio
+        return data
+
+
+class ResultCache:
+    """Size-bounded LRU cache of text results in a SQLite file.
+
+    Values are stored compressed. The file may be shared by several
+    processes; the metrics count the lookups of this process only. All
+    methods block on the database and are safe to call from any thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            path: Path of the database file, ":memory:" for a private cache
+            max_bytes: Limit of the total compressed size of the values
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.metrics: dict[str, CacheMetrics] = {}
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA busy_timeout = 5000")
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def metrics_for(self, namespace: str) -> CacheMetrics:
+        return self.metrics.setdefault(namespace, CacheMetrics())
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry, fresh or stale, and mark it as recently used."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, etag, last_modified, expires_at FROM http_cache "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE http_cache SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        value, etag, last_modified, expires_at = row
+        try:
+            text = decompress_payload(value).decode("utf-8")
+        except Exception as e:
+            logger.debug(f"Dropping unreadable cache entry {key}: {e}")
+            self.delete(key)
+            return None
+        return CacheEntry(text, expires_at, etag, last_modified)
+
+    def put(
+        self,
+        key: str,
+        value: str,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> bool:
+        """Store a value for ttl seconds, evicting old entries to make room.
+
+        An entry with validators is kept after it expires, so it can be
+        revalidated; one without is only stored while it is fresh.
+
+        Returns:
+            Whether the value was stored
+        """
+        if ttl <= 0 and not (etag or last_modified):
+            return False
+        data = compress_payload(value.encode("utf-8"))
+        if len(data) > self.max_bytes * MAX_ENTRY_RATIO:
+            return False
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(key, value, size, etag, last_modified, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), etag, last_modified, now + ttl, now),
+            )
+            self._evict()
+        return True
+
+    def refresh(self, key: str, ttl: float) -> None:
+        """Make an entry fresh for ttl more seconds, once revalidated."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE http_cache SET expires_at = ? WHERE key = ?",
+                (time.time() + ttl, key),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            **{
+                namespace: metrics.to_dict()
+                for namespace, metrics in self.metrics.items()
+            },
+        }
+
+    def _evict(self) -> None:
+        (total,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM http_cache"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO_RATIO
+        # Expired entries that cannot be revalidated go first, then the
+        # least recently used
+        rows = self._connection.execute(
+            "SELECT key, size FROM http_cache ORDER BY "
+            "(expires_at < ? AND etag IS NULL AND last_modified IS NULL) DESC, "
+            "accessed_at",
+            (time.time(),),
+        ).fetchall()
+        for key, size in rows:
+            if total <= target:
+                break
+            self._connection.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+
+@lru_cache(maxsize=None)
+def get_conversion_cache() -> Optional[ResultCache]:
+    """Get the cache of file conversions of this process, None if disabled."""
+    config = load_ii_agent_config()
+    if config.conversion_cache_max_bytes <= 0:
+        return None
+    if config.file_store == "local":
+        path = os.path.join(config.file_store_path, "cache", "conversions.db")
+    else:
+        path = ":memory:"
+    return ResultCache(path, config.conversion_cache_max_bytes)
@@ -1,10 +1,10 @@
 import asyncio
-from collections import defaultdict
 from pathlib import Path
 from typing import Optional, Any
 from ..helper.indent_utils import match_indent, match_indent_by_first_line
 import subprocess
 from .model import StrReplaceResponse, StrReplaceToolError
+from .undo_store import UndoConflictError, UndoStore
 
 SNIPPET_LINES: int = 4
 
@@ -76,7 +76,6 @@ def maybe_truncate(content: str, truncate_after: int | None = MAX_RESPONSE_LEN):
 
 
 class StrReplaceManager:
-    _file_history = defaultdict(list)
     HOME_DIR = ".WORKING_DIR"  # TODO: Refactor to use constant
 
     def __init__(
@@ -85,8 +84,10 @@ class StrReplaceManager:
         expand_tabs: bool = False,
         use_relative_path: bool = False,
         cwd: str = None,
+        undo_store: Optional[UndoStore] = None,
     ):
-        self._file_history = defaultdict(list)
+        # Undo history of this manager only, so of a single session
+        self._undo_store = undo_store if undo_store is not None else UndoStore()
         self.ignore_indentation_for_str_replace = ignore_indentation_for_str_replace
         self.expand_tabs = expand_tabs
         self.use_relative_path = use_relative_path
@@ -336,8 +337,8 @@ class StrReplaceManager:
             ]
             new_content_str = "\n".join(new_content)
 
-            self._file_history[path].append(content)  # Save old content for undo
             self._write_file(path, new_content_str, display_path)
+            self._undo_store.record(str(path), content, new_content_str)
 
             # Create a snippet of the edited section
             start_line = max(0, match_start - SNIPPET_LINES)
@@ -381,10 +382,8 @@ class StrReplaceManager:
                 else:
                     # replace the whole file with new_str
                     new_content = new_str
-                    self._file_history[path].append(
-                        content
-                    )  # Save old content for undo
                     self._write_file(path, new_content, display_path)
+                    self._undo_store.record(str(path), content, new_content)
                     success_msg = f"The file {display_path} has been edited. Here's the new content:\n{new_content}"
                     success_msg += self._make_output(
                         file_content=new_content,
@@ -415,8 +414,8 @@ class StrReplaceManager:
                 )
 
             new_content = content.replace(old_str, new_str)
-            self._file_history[path].append(content)  # Save old content for undo
             self._write_file(path, new_content, display_path)
+            self._undo_store.record(str(path), content, new_content)
 
             # Create a snippet of the edited section
             replacement_line = content.split(old_str)[0].count("\n")
@@ -474,8 +473,8 @@ class StrReplaceManager:
             new_file_text = "\n".join(new_file_text_lines)
             snippet = "\n".join(snippet_lines)
 
-            self._file_history[path].append(file_text)
             self._write_file(path, new_file_text, display_path)
+            self._undo_store.record(str(path), file_text, new_file_text)
 
             success_msg = f"The file {display_path} has been edited. "
             success_msg += self._make_output(
@@ -498,10 +497,16 @@ class StrReplaceManager:
             display_path = path_str
         try:
             path = Path(path_str)
-            if not self._file_history[path]:
+            if not self._undo_store.has_history(str(path)):
                 raise StrReplaceToolError(f"No edit history found for {display_path}.")
 
-            old_text = self._file_history[path].pop()
+            current = self._read_file(path, display_path)
+            try:
+                old_text = self._undo_store.undo(str(path), current)
+            except UndoConflictError as e:
+                raise StrReplaceToolError(
+                    f"Cannot undo the last edit to {display_path}: {e}."
+                ) from None
             self._write_file(path, old_text, display_path)
             success_msg = f"Last edit to {display_path} undone successfully.\n"
             success_msg += self._make_output(
@@ -523,10 +528,12 @@ class StrReplaceManager:
         try:
             path = Path(path_str)
             # Save old content before writing new content
+            old_content = None
             if path.exists():
                 old_content = self._read_file(path, display_path)
-                self._file_history[path].append(old_content)
             self._write_file(path, file, display_path)
+            if old_content is not None:
+                self._undo_store.record(str(path), old_content, file)
             return StrReplaceResponse(
                 success=True,
                 file_content=file,
@@ -544,6 +551,10 @@ class StrReplaceManager:
                 f"Ran into {e} while trying to write to {display_path}"
             ) from None
 
+    def close(self):
+        """Release the undo history, e.g. when the session ends."""
+        self._undo_store.close()
+
     def is_path_in_directory(self, directory_str: str, path_str: str) -> bool:
         directory = Path(directory_str).resolve()
         path = Path(path_str).resolve()
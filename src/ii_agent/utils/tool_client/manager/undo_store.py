@@ -0,0 +1,232 @@
+"""Bounded undo history of the file edits of StrReplaceManager.
+
+Keeping a full copy of a file before every edit made memory grow with each
+edit of a large file. The store keeps a reverse patch per edit instead: the
+span of the file the edit changed and the text it replaced there, found
+from the common prefix and suffix of the contents before and after, which
+for a str_replace or an insert is a few lines.
+
+Patches beyond a memory budget are spilled to a temporary directory, and
+the oldest patches are dropped beyond a limit per file and for the whole
+store. A store belongs to one manager, so to one session, and its spill
+directory is removed when it is closed or garbage collected.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_MAX_FILE_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MEMORY_BYTES = 4 * 1024 * 1024
+# Bookkeeping of a patch, counted in its size so that many small edits are
+# bounded too
+PATCH_OVERHEAD_BYTES = 128
+
+_SPILL_FILE_ARGS = {"encoding": "utf-8", "errors": "surrogatepass", "newline": ""}
+
+
+class UndoConflictError(Exception):
+    """The file changed since its last recorded edit, so it cannot be undone."""
+
+
+@dataclass
+class ReversePatch:
+    """Turns the content of a file after an edit back into the one before."""
+
+    seq: int
+    # Span of the content after the edit to replace by the text
+    start: int
+    end: int
+    # Digest of the content after the edit, to check the patch applies
+    digest: str
+    size: int
+    text: Optional[str] = None
+    spill_path: Optional[str] = None
+
+
+def _digest(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    # Binary search on slice comparisons, which run in C
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix_length(a: str, b: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class UndoStore:
+    """Undo history of the edits of the files of one session."""
+
+    def __init__(
+        self,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        spill_dir: Optional[str] = None,
+    ):
+        """Initialize the store.
+
+        Args:
+            max_file_bytes: Limit of the size of the history of one file
+            max_bytes: Limit of the size of the history of all files
+            memory_bytes: Size of the history kept in memory; older patches
+                are spilled to disk
+            spill_dir: Directory in which to create the spill directory, the
+                system temporary directory if unset
+        """
+        self.max_file_bytes = max_file_bytes
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._spill_parent = spill_dir
+        self._spill_dir: Optional[str] = None
+        self._finalizer: Optional[weakref.finalize] = None
+        self._seq = 0
+        self._patches: dict[str, deque[ReversePatch]] = {}
+        self._file_sizes: dict[str, int] = {}
+        # Paths of the patches and the patches held in memory, oldest first
+        self._order: OrderedDict[int, str] = OrderedDict()
+        self._in_memory: OrderedDict[int, ReversePatch] = OrderedDict()
+        self.total_bytes = 0
+        self.in_memory_bytes = 0
+
+    def record(self, path: str, old: str, new: str) -> None:
+        """Record an edit of a file from the old content to the new one."""
+        start = _common_prefix_length(old, new)
+        suffix = _common_suffix_length(old, new, min(len(old), len(new)) - start)
+        text = old[start : len(old) - suffix]
+        size = len(text.encode("utf-8", "surrogatepass")) + PATCH_OVERHEAD_BYTES
+        if size > min(self.max_file_bytes, self.max_bytes):
+            # Earlier patches only apply on top of this edit
+            self.clear(path)
+            return
+
+        self._seq += 1
+        patch = ReversePatch(
+            seq=self._seq,
+            start=start,
+            end=len(new) - suffix,
+            digest=_digest(new),
+            size=size,
+            text=text,
+        )
+        self._patches.setdefault(path, deque()).append(patch)
+        self._file_sizes[path] = self._file_sizes.get(path, 0) + size
+        self._order[patch.seq] = path
+        self._in_memory[patch.seq] = patch
+        self.total_bytes += size
+        self.in_memory_bytes += size
+
+        while self._file_sizes[path] > self.max_file_bytes:
+            self._drop_oldest(path)
+        while self.total_bytes > self.max_bytes:
+            self._drop_oldest(next(iter(self._order.values())))
+        while self.in_memory_bytes > self.memory_bytes and self._in_memory:
+            self._spill(self._in_memory.popitem(last=False)[1])
+
+    def has_history(self, path: str) -> bool:
+        return bool(self._patches.get(path))
+
+    def undo(self, path: str, current: str) -> str:
+        """Undo the last edit of a file.
+
+        Args:
+            path: Path of the file
+            current: Current content of the file
+
+        Returns:
+            The content of the file before its last edit
+
+        Raises:
+            KeyError: If the file has no history
+            UndoConflictError: If the file changed since its last edit; its
+                history is dropped
+        """
+        patches = self._patches.get(path)
+        if not patches:
+            raise KeyError(path)
+        patch = patches[-1]
+        if _digest(current) != patch.digest:
+            self.clear(path)
+            raise UndoConflictError(
+                "the file was changed by other means since its last edit"
+            )
+        text = self._load(patch)
+        self._remove(path, patches.pop())
+        return current[: patch.start] + text + current[patch.end :]
+
+    def clear(self, path: Optional[str] = None) -> None:
+        """Drop the history of a file, or of every file if no path is given."""
+        for key in [path] if path is not None else list(self._patches):
+            patches = self._patches.get(key)
+            while patches:
+                self._remove(key, patches.pop())
+
+    def close(self) -> None:
+        """Drop the whole history and remove the spill directory."""
+        self.clear()
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+            self._spill_dir = None
+
+    def _drop_oldest(self, path: str) -> None:
+        self._remove(path, self._patches[path].popleft())
+
+    def _remove(self, path: str, patch: ReversePatch) -> None:
+        """Forget a patch already taken out of the history of its file."""
+        self._order.pop(patch.seq, None)
+        if self._in_memory.pop(patch.seq, None) is not None:
+            self.in_memory_bytes -= patch.size
+        self.total_bytes -= patch.size
+        self._file_sizes[path] -= patch.size
+        if not self._patches[path]:
+            del self._patches[path]
+            del self._file_sizes[path]
+        if patch.spill_path is not None:
+            try:
+                os.remove(patch.spill_path)
+            except OSError:
+                pass
+
+    def _spill(self, patch: ReversePatch) -> None:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(
+                prefix="ii_agent_undo_", dir=self._spill_parent
+            )
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, self._spill_dir, True
+            )
+        patch.spill_path = os.path.join(self._spill_dir, f"{patch.seq}.txt")
+        with open(patch.spill_path, "w", **_SPILL_FILE_ARGS) as f:
+            f.write(patch.text)
+        patch.text = None
+        self.in_memory_bytes -= patch.size
+
+    def _load(self, patch: ReversePatch) -> str:
+        if patch.text is not None:
+            return patch.text
+        with open(patch.spill_path, **_SPILL_FILE_ARGS) as f:
+            return f.read()
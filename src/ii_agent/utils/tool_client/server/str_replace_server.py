@@ -1,6 +1,7 @@
 """FastAPI server for string replacement operations using StrReplaceManager."""
 
 import logging
+from contextlib import asynccontextmanager
 from typing import Optional, List
 
 from fastapi import FastAPI, HTTPException, Request
@@ -94,6 +95,7 @@ class StrReplaceServer:
             title="String Replace Server",
             description="HTTP API for file editing operations using StrReplaceManager",
             version="1.0.0",
+            lifespan=self._lifespan,
         )
 
         # Initialize the StrReplaceManager
@@ -120,6 +122,12 @@ class StrReplaceServer:
         # Setup exception handlers
         self._setup_exception_handlers()
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Drop the edit history kept for undo_edit once the server stops."""
+        yield
+        self.str_replace_manager.close()
+
     def _setup_routes(self):
         """Setup all API routes."""
 
@@ -0,0 +1,104 @@
+import json
+import threading
+
+from ii_agent.core.agent_logging import (
+    LazyLogValue,
+    cap_text,
+    close_agent_logger,
+    create_agent_logger,
+    to_loggable,
+)
+
+
+def test_cap_text_truncates_long_strings():
+    assert cap_text("short", 10) == "short"
+    capped = cap_text("x" * 25, 10)
+    assert capped.startswith("x" * 10)
+    assert "truncated 15 chars" in capped
+
+
+def test_to_loggable_redacts_images_without_mutating_input():
+    result = [
+        {"type": "text", "text": "hello"},
+        {
+            "type": "image",
+            "source": {"type": "base64", "media_type": "image/png", "data": "AAAA"},
+        },
+    ]
+
+    loggable = to_loggable(result)
+
+    assert loggable[1] == {
+        "type": "image",
+        "media_type": "image/png",
+        "source": "[REDACTED]",
+    }
+    assert result[1]["source"]["data"] == "AAAA"
+
+
+def test_lazy_log_value_defers_rendering():
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("rendered eagerly")
+
+    # Creating the wrapper must not render the value
+    LazyLogValue(Exploding())
+    assert str(LazyLogValue({"a": "b" * 50}, max_length=20)).endswith("chars]")
+
+
+def test_agent_logger_writes_structured_records(tmp_path):
+    log_path = tmp_path / "logs" / "agent.log"
+    agent_logger = create_agent_logger(
+        "agent_logs_test", str(log_path), to_stdout=False, max_field_length=50
+    )
+
+    agent_logger.info(
+        "Tool output: %s",
+        LazyLogValue("y" * 200, max_length=50),
+        extra={"event": "tool_result", "tool_name": "web_search"},
+    )
+    close_agent_logger(agent_logger)
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["event"] == "tool_result"
+    assert records[0]["tool_name"] == "web_search"
+    assert records[0]["logger"] == "agent_logs_test"
+    assert len(records[0]["message"]) < 120
+    assert agent_logger.handlers == []
+
+
+def test_agent_loggers_of_one_file_share_a_writer(tmp_path):
+    log_path = str(tmp_path / "agent.log")
+    first = create_agent_logger("session_a", log_path, to_stdout=False)
+    second = create_agent_logger("session_b", log_path, to_stdout=False)
+    assert first.handlers[0].sink is second.handlers[0].sink
+    listener_thread = first.handlers[0].sink.listener._thread
+
+    first.info("from a")
+    close_agent_logger(first)
+    # The other session keeps writing through the same thread
+    assert listener_thread.is_alive()
+    second.info("from b")
+    close_agent_logger(second)
+    assert not listener_thread.is_alive()
+
+    records = [json.loads(line) for line in open(log_path).read().splitlines()]
+    assert [record["logger"] for record in records] == ["session_a", "session_b"]
+
+
+def test_lazy_log_value_snapshots_containers(tmp_path):
+    log_path = tmp_path / "agent.log"
+    agent_logger = create_agent_logger("snapshot", str(log_path), to_stdout=False)
+    tool_input = {"path": "a.py", "lines": [1]}
+
+    agent_logger.info("Input: %s", LazyLogValue(tool_input))
+    # The owner changing the value afterwards does not change the record
+    tool_input["lines"].append(2)
+    close_agent_logger(agent_logger, wait=False)
+    for thread in threading.enumerate():
+        if thread.name == "agent-log-release":
+            thread.join()
+
+    record = json.loads(log_path.read_text())
+    assert record["message"] == 'Input: {"path": "a.py", "lines": [1]}'
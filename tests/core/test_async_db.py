@@ -0,0 +1,51 @@
+import uuid
+from pathlib import Path
+
+import pytest
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db.async_manager import AsyncEvents, AsyncSessions
+from ii_agent.db.engine import to_async_database_url
+from ii_agent.db.manager import Events, Sessions
+
+
+def test_database_urls_map_to_asyncio_drivers():
+    assert to_async_database_url("sqlite:////tmp/events.db") == (
+        "sqlite+aiosqlite:////tmp/events.db"
+    )
+    assert to_async_database_url("postgres://user:secret@db/agent") == (
+        "postgresql+asyncpg://user:secret@db/agent"
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_tables_share_the_database_with_the_sync_ones():
+    session_id = uuid.uuid4()
+    await AsyncSessions.create_session(
+        session_id, Path("/tmp/workspaces") / str(session_id), device_id="device"
+    )
+    for text in "abc":
+        event = RealtimeEvent(type=EventType.AGENT_THINKING, content={"text": text})
+        event.seq = await AsyncEvents.get_last_seq(session_id) + 1
+        await AsyncEvents.save_event(session_id, event)
+    await AsyncSessions.update_session_metrics(session_id, {"total_tokens": 3})
+
+    # Written through the async layer, read back through the sync one used
+    # by run_gaia
+    assert Sessions.get_session_by_id(session_id).device_id == "device"
+    assert Sessions.get_session_metrics(session_id) == {"total_tokens": 3}
+    assert Events.get_last_seq(session_id) == 3
+
+    missed = await AsyncEvents.get_events_after_seq(session_id, 1)
+    assert [event.content["text"] for event in missed] == ["b", "c"]
+    details = [
+        event
+        async for event in AsyncEvents.iter_session_events_with_details(
+            str(session_id), batch_size=2
+        )
+    ]
+    assert [event["event_payload"]["content"]["text"] for event in details] == [
+        "a",
+        "b",
+        "c",
+    ]
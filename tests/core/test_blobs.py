@@ -0,0 +1,75 @@
+import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ii_agent.core.storage.blobs import (
+    InMemoryBlobStore,
+    LocalBlobStore,
+    blob_url,
+    externalize_images,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def _image_block(contents: bytes) -> dict:
+    return {
+        "type": "image",
+        "source": {
+            "type": "base64",
+            "media_type": "image/png",
+            "data": base64.b64encode(contents).decode(),
+        },
+    }
+
+
+def test_images_are_replaced_by_blob_references():
+    store = InMemoryBlobStore()
+    result = [_image_block(PNG), {"type": "text", "text": "Navigated"}]
+    content = {"tool_name": "browser_navigation", "result": result}
+
+    externalized = externalize_images(content, store)
+
+    source = externalized["result"][0]["source"]
+    assert source["type"] == "blob"
+    assert source["url"] == blob_url(source["digest"])
+    assert store.get(source["digest"]) == PNG
+    # The text block is shared, the original payload left untouched
+    assert externalized["result"][1] is result[1]
+    assert content["result"][0]["source"]["type"] == "base64"
+
+
+def test_payload_without_images_is_returned_as_is():
+    content = {"text": "thinking", "items": [1, {"type": "text"}]}
+
+    assert externalize_images(content, InMemoryBlobStore()) is content
+
+
+def test_local_store_keeps_one_copy_per_digest(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+
+    digest = store.put(PNG)
+
+    assert store.put(PNG) == digest
+    assert store.get(digest) == PNG
+    assert store.exists(digest)
+    assert not store.exists("../" + digest)
+    assert len(list(tmp_path.rglob("*"))) == 2  # shard directory and blob
+
+
+def test_local_store_puts_from_threads_and_refreshes_stored_blobs(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    contents = PNG + b"\x01" * 1_000_000
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        digests = set(executor.map(lambda _: store.put(contents), range(64)))
+
+    (digest,) = digests
+    assert store.get(digest) == contents
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    os.utime(store.get_full_path(digest), (0, 0))
+    assert list(store.iter_digests(stored_before=time.time() - 60)) == [digest]
+    store.put(contents)
+    assert list(store.iter_digests(stored_before=time.time() - 60)) == []
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ii_agent.core.checkpoint import RUN_COMPLETED, CheckpointStore
+from ii_agent.core.storage.local import LocalFileStore
+from ii_agent.core.storage.memory import InMemoryFileStore
+from ii_agent.llm.base import TextPrompt, TextResult, ToolCall, ToolCallParameters
+from ii_agent.llm.message_history import MessageHistory
+
+
+def _run_tool_turn(history: MessageHistory, call_id: str):
+    history.add_assistant_turn(
+        [ToolCall(tool_call_id=call_id, tool_name="ls", tool_input={})]
+    )
+    history.add_tool_call_result(
+        ToolCallParameters(tool_call_id=call_id, tool_name="ls", tool_input={}),
+        f"output {call_id}",
+    )
+
+
+def test_turns_are_written_as_deltas_and_restored():
+    file_store = InMemoryFileStore()
+    store = CheckpointStore(file_store, "session-1")
+    history = MessageHistory(context_manager=None)
+    history.add_user_prompt("list files")
+
+    store.begin_run(history, {"final_answer": ""})
+    _run_tool_turn(history, "1")
+    store.save_turn(1, history, {"final_answer": ""})
+    _run_tool_turn(history, "2")
+    checkpoint = store.save_turn(2, history, {"final_answer": "", "tools": {}})
+
+    assert checkpoint.delta_count == 2
+    assert checkpoint.history_length == 5
+
+    # A new process only sees what reached the file store
+    restored_store = CheckpointStore(file_store, "session-1")
+    in_flight = restored_store.load_in_flight()
+    restored = MessageHistory(context_manager=None)
+    restored_store.restore_history(in_flight, restored)
+
+    assert in_flight.turn == 2
+    assert restored.get_messages_for_llm() == history.get_messages_for_llm()
+    assert restored.last_user_prompt_index == 0
+
+
+def test_rewritten_history_takes_a_new_snapshot():
+    file_store = InMemoryFileStore()
+    store = CheckpointStore(file_store, "session-1")
+    history = MessageHistory(context_manager=None)
+    history.add_user_prompt("summarize")
+    first = store.begin_run(history, {})
+
+    history.set_message_list([[TextPrompt(text="summary")]])
+    history.add_assistant_turn([TextResult(text="done")])
+    checkpoint = store.save_turn(1, history, {})
+
+    assert checkpoint.snapshot_id == first.snapshot_id + 1
+    assert checkpoint.delta_count == 0
+    old_snapshot = f"{store.base_dir}/snapshot_{first.snapshot_id:06d}.pkl"
+    assert old_snapshot not in file_store.files
+
+    restored = MessageHistory(context_manager=None)
+    store.restore_history(store.load_in_flight(), restored)
+    assert len(restored) == 2
+
+
+def test_finished_run_is_not_resumable():
+    file_store = InMemoryFileStore()
+    store = CheckpointStore(file_store, "session-1")
+    history = MessageHistory(context_manager=None)
+    history.add_user_prompt("hello")
+    store.begin_run(history, {})
+
+    store.finish_run()
+
+    assert store.load().status == RUN_COMPLETED
+    assert store.load_in_flight() is None
+    assert list(file_store.files) == [store.manifest_path]
+
+
+def test_concurrent_writes_of_one_path_never_mix(tmp_path):
+    file_store = LocalFileStore(str(tmp_path))
+    contents = [str(i) * 200_000 for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda text: file_store.write("run.json", text), contents))
+
+    assert file_store.read("run.json") in contents
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run.json"]
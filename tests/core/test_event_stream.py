@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.event_stream import EventStream
+
+
+def _event(
+    stream: EventStream, text: str, event_type: EventType = EventType.AGENT_THINKING
+) -> RealtimeEvent:
+    event = RealtimeEvent(type=event_type, content={"text": text})
+    stream.assign_seq(event)
+    return event
+
+
+def _payloads(frame: str) -> list[dict]:
+    payload = json.loads(frame)
+    return payload if isinstance(payload, list) else [payload]
+
+
+@pytest.mark.asyncio
+async def test_failed_send_only_drops_the_subscriber():
+    stream = EventStream(flush_interval=0.01)
+    received = []
+
+    async def broken(frame):
+        raise ConnectionError("gone")
+
+    async def healthy(frame):
+        received.extend(payload["seq"] for payload in _payloads(frame))
+
+    stream.subscribe(broken)
+    stream.subscribe(healthy)
+
+    await stream.publish(_event(stream, "a"))
+    await stream.publish(_event(stream, "b"))
+    await stream.drain(timeout=1)
+
+    assert received == [1, 2]
+    assert stream.subscriber_count == 1
+
+
+@pytest.mark.asyncio
+async def test_resubscribe_replays_missed_events_once_and_in_order():
+    stream = EventStream(last_seq=10, flush_interval=0.01)
+    stored = [_event(stream, text) for text in "abc"]  # seq 11, 12, 13
+    received = []
+    replay_started = asyncio.Event()
+    release_replay = asyncio.Event()
+
+    async def send(frame):
+        if not replay_started.is_set():
+            replay_started.set()
+            await release_replay.wait()
+        received.extend(payload["seq"] for payload in _payloads(frame))
+
+    def load_missed(after_seq):
+        return [event for event in stored if event.seq > after_seq]
+
+    resubscribe = asyncio.create_task(stream.resubscribe(send, 11, load_missed))
+    await replay_started.wait()
+    # Published while the replay is still sending: held back, then delivered
+    await stream.publish(stored[2])
+    await stream.publish(_event(stream, "d"))
+    release_replay.set()
+    await resubscribe
+
+    await stream.publish(_event(stream, "e"))
+    await stream.drain(timeout=1)
+
+    assert received == [12, 13, 14, 15]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_never_blocks_publish_and_gets_batches():
+    stream = EventStream(flush_interval=0.01)
+    frames = []
+    unblock = asyncio.Event()
+
+    async def slow(frame):
+        await unblock.wait()
+        frames.append(_payloads(frame))
+
+    stream.subscribe(slow)
+    await stream.publish(_event(stream, "a"))
+    await asyncio.sleep(0.05)  # the first frame is now stuck in send
+    for text in "bcd":
+        await stream.publish(_event(stream, text))
+    # Only the latest screenshot of a burst is worth sending
+    await stream.publish(_event(stream, "shot 1", EventType.BROWSER_USE))
+    await stream.publish(_event(stream, "shot 2", EventType.BROWSER_USE))
+    unblock.set()
+    await stream.drain(timeout=1)
+
+    assert [[payload["seq"] for payload in frame] for frame in frames] == [
+        [1],
+        [2, 3, 4, 6],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_overflowing_subscriber_catches_up_from_the_store():
+    stream = EventStream(max_buffer_bytes=300, flush_interval=0.01)
+    stored = []
+    received = []
+    unblock = asyncio.Event()
+
+    async def slow(frame):
+        await unblock.wait()
+        received.extend(payload["seq"] for payload in _payloads(frame))
+
+    def load_missed(after_seq):
+        return [event for event in stored if event.seq > after_seq]
+
+    stream.subscribe(slow, load_missed=load_missed)
+    for index in range(10):
+        event = _event(stream, f"thought {index}")
+        stored.append(event)
+        await stream.publish(event)
+    assert stream.subscriber_count == 1
+
+    unblock.set()
+    await stream.drain(timeout=1)
+
+    assert received == list(range(1, 11))
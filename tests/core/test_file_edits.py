@@ -0,0 +1,75 @@
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.file_edits import (
+    FileEditTracker,
+    apply_file_patch,
+    make_file_patch,
+    reconstruct_files,
+)
+
+
+def _file_edit(content: dict, seq: int) -> RealtimeEvent:
+    return RealtimeEvent(type=EventType.FILE_EDIT, content=content, seq=seq)
+
+
+def test_patch_round_trips_line_endings():
+    old = "a\nb\r\nc\nd"
+    new = "a\nB\r\nc\nd\ne\n"
+
+    assert apply_file_patch(old, make_file_patch(old, new)) == new
+
+
+def test_small_edits_send_patches_between_snapshots():
+    tracker = FileEditTracker(snapshot_every=3)
+    body = "".join(f"line {i}\n" for i in range(100))
+
+    first = tracker.build_event_content("/w/a.py", body)
+    second = tracker.build_event_content("/w/a.py", body + "x\n")
+    third = tracker.build_event_content("/w/a.py", body + "x\ny\n")
+    fourth = tracker.build_event_content("/w/a.py", body + "x\ny\nz\n")
+
+    assert "content" in first and first["version"] == 1
+    assert second["base_version"] == 1
+    assert second["patch"] == [{"start": 100, "end": 100, "lines": ["x\n"]}]
+    assert "patch" in third
+    assert "content" in fourth and fourth["version"] == 4
+
+
+def test_reconstruct_files_applies_patches_in_order():
+    tracker = FileEditTracker()
+    versions = ["one\ntwo\n" * 20, "one\n2\n" + "one\ntwo\n" * 19]
+    versions.append(versions[-1] + "three\n")
+    events = [
+        _file_edit(tracker.build_event_content("a.txt", content), seq)
+        for seq, content in enumerate(versions, start=1)
+    ]
+
+    state = reconstruct_files(events)["a.txt"]
+    assert (state.content, state.version, state.seq) == (versions[-1], 3, 3)
+
+    # Without the base version the patch after it cannot be applied
+    state = reconstruct_files([events[0], events[2]])["a.txt"]
+    assert (state.content, state.version) == (versions[0], 1)
+
+
+def test_patch_only_diffs_the_changed_lines():
+    body = "same\n" * 20000
+
+    assert make_file_patch(body, body) == []
+    edited = body[:50000] + "changed\n" + body[50000:]
+    patch = make_file_patch(body, edited)
+    assert patch == [{"start": 10000, "end": 10000, "lines": ["changed\n"]}]
+    assert apply_file_patch(body, patch) == edited
+
+
+def test_tracker_drops_old_bases_beyond_byte_limit():
+    tracker = FileEditTracker(max_tracked_bytes=150)
+    a, b = "a\n" * 50, "b\n" * 50
+
+    tracker.build_event_content("a.txt", a)
+    tracker.build_event_content("b.txt", b)
+    assert tracker.tracked_bytes == 100
+
+    # a.txt lost its base, so it is sent whole but keeps counting versions
+    event = tracker.build_event_content("a.txt", a + "x\n")
+    assert "content" in event and event["version"] == 2
+    assert "patch" in tracker.build_event_content("a.txt", a + "x\ny\n")
@@ -0,0 +1,189 @@
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.storage.blobs import InMemoryBlobStore
+from ii_agent.core.storage.memory import InMemoryFileStore
+from ii_agent.core.storage.payloads import CompressedBlobStore, collect_payload_refs
+from ii_agent.db.maintenance import MaintenanceService
+from ii_agent.db.manager import Events, Sessions, get_db, payload_store
+from ii_agent.db.models import Event, Session
+
+
+def _old_session(file_store: InMemoryFileStore) -> uuid.UUID:
+    session_id = uuid.uuid4()
+    Sessions.create_session(session_id, Path("/tmp/workspaces") / str(session_id))
+    for seq, text in enumerate(["short", "long line\n" * 5000], start=1):
+        event = RealtimeEvent(type=EventType.TOOL_RESULT, content={"result": text})
+        event.seq = seq
+        Events.save_event(session_id, event)
+    long_ago = datetime(2000, 1, 1)
+    with get_db() as db:
+        db.query(Session).filter(Session.id == str(session_id)).update(
+            {"created_at": long_ago}
+        )
+        db.query(Event).filter(Event.session_id == str(session_id)).update(
+            {"timestamp": long_ago}
+        )
+    file_store.write(f"sessions/{session_id}/agent_state.pkl", "history")
+    return session_id
+
+
+@pytest.mark.asyncio
+async def test_cold_sessions_are_archived_and_can_be_restored(tmp_path):
+    config = load_ii_agent_config().model_copy(
+        update={
+            "file_store_path": str(tmp_path),
+            "archive_sessions_after_days": 7,
+            "maintenance_pause_seconds": 0,
+        }
+    )
+    file_store = InMemoryFileStore()
+    archive_store = CompressedBlobStore(InMemoryBlobStore())
+    session_id = _old_session(file_store)
+    active_id = _old_session(file_store)
+    service = MaintenanceService(
+        config,
+        file_store,
+        payload_store=CompressedBlobStore(InMemoryBlobStore()),
+        archive_store=archive_store,
+        is_active=lambda sid: sid == str(active_id),
+    )
+
+    report = await service.run_once()
+
+    assert report.archived_sessions >= 1
+    archive_digest = Sessions.get_session_by_id(session_id).archive_digest
+    assert archive_digest is not None
+    assert Events.get_events_after_seq(session_id, 0) == []
+    assert list(file_store.files) == [f"sessions/{active_id}/agent_state.pkl"]
+    # A running session is left alone
+    assert Sessions.get_session_by_id(active_id).archive_digest is None
+    assert len(Events.get_events_after_seq(active_id, 0)) == 2
+
+    service.restore_session(str(session_id))
+
+    restored = Events.get_events_after_seq(session_id, 0)
+    assert [event.content["result"] for event in restored] == [
+        "short",
+        "long line\n" * 5000,
+    ]
+    assert file_store.read(f"sessions/{session_id}/agent_state.pkl") == "history"
+    assert Sessions.get_session_by_id(session_id).archive_digest is None
+    assert not archive_store.exists(archive_digest)
+
+    for old_id in (session_id, active_id):
+        Sessions.delete_session(old_id)
+
+
+@pytest.mark.asyncio
+async def test_archived_sessions_in_use_again_are_not_deleted(tmp_path):
+    config = load_ii_agent_config().model_copy(
+        update={
+            "file_store_path": str(tmp_path),
+            "delete_archived_sessions_after_days": 7,
+            "maintenance_pause_seconds": 0,
+        }
+    )
+    file_store = InMemoryFileStore()
+    reused_id, running_id, unused_id = (_old_session(file_store) for _ in range(3))
+    active = set()
+    service = MaintenanceService(
+        config,
+        file_store,
+        payload_store=CompressedBlobStore(InMemoryBlobStore()),
+        archive_store=CompressedBlobStore(InMemoryBlobStore()),
+        is_active=lambda sid: sid in active,
+    )
+    for session_id in (reused_id, running_id, unused_id):
+        await service.archive_session(str(session_id))
+    with get_db() as db:
+        db.query(Session).filter(
+            Session.id.in_([str(reused_id), str(running_id), str(unused_id)])
+        ).update({"archived_at": datetime(2000, 1, 2)}, synchronize_session=False)
+    Events.save_event(
+        reused_id,
+        RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": "hi"}, seq=3),
+    )
+    active.add(str(running_id))
+
+    await service.run_once()
+
+    assert Sessions.get_session_by_id(unused_id) is None
+    assert Sessions.get_session_by_id(running_id) is not None
+    assert [event.type for event in Events.get_events_after_seq(reused_id, -1)] == [
+        EventType.USER_MESSAGE
+    ]
+
+    assert service.restore_if_archived(str(reused_id))
+    assert len(Events.get_events_after_seq(reused_id, -1)) == 3
+    assert not service.restore_if_archived(str(reused_id))
+
+    for session_id in (reused_id, running_id):
+        Sessions.delete_session(session_id)
+
+
+@pytest.mark.asyncio
+async def test_only_stale_orphaned_workspaces_are_purged(tmp_path):
+    config = load_ii_agent_config().model_copy(
+        update={
+            "file_store_path": str(tmp_path),
+            "purge_orphaned_workspaces_after_hours": 1,
+            "maintenance_pause_seconds": 0,
+        }
+    )
+    workspace_root = Path(config.workspace_root)
+    owned_id = uuid.uuid4()
+    Sessions.create_session(owned_id, workspace_root / str(owned_id))
+    stale = time.time() - 2 * 3600
+    for name in [str(owned_id), str(uuid.uuid4()), "not-a-session"]:
+        (workspace_root / name).mkdir(parents=True)
+        os.utime(workspace_root / name, (stale, stale))
+    fresh_orphan = workspace_root / str(uuid.uuid4())
+    fresh_orphan.mkdir()
+
+    service = MaintenanceService(
+        config,
+        InMemoryFileStore(),
+        payload_store=CompressedBlobStore(InMemoryBlobStore()),
+        archive_store=CompressedBlobStore(InMemoryBlobStore()),
+    )
+    report = await service.run_once()
+
+    assert report.purged_workspaces == 1
+    assert sorted(path.name for path in workspace_root.iterdir()) == sorted(
+        [str(owned_id), "not-a-session", fresh_orphan.name]
+    )
+
+
+@pytest.mark.asyncio
+async def test_payload_sweep_keeps_payloads_events_reference(tmp_path):
+    config = load_ii_agent_config().model_copy(
+        update={"file_store_path": str(tmp_path), "maintenance_pause_seconds": 0}
+    )
+    session_id = _old_session(InMemoryFileStore())
+    (referenced,) = collect_payload_refs(
+        Events.get_session_events(session_id)[1].event_payload
+    )
+    orphan = payload_store.put(b"orphan " * 10_000)
+    for digest in (referenced, orphan):
+        os.utime(payload_store.inner.get_full_path(digest), (0, 0))
+    service = MaintenanceService(
+        config,
+        InMemoryFileStore(),
+        payload_store=payload_store,
+        archive_store=CompressedBlobStore(InMemoryBlobStore()),
+    )
+
+    assert await service._sweep_payloads() >= 1
+
+    assert payload_store.exists(referenced)
+    assert not payload_store.exists(orphan)
+
+    Sessions.delete_session(session_id)
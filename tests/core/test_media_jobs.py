@@ -0,0 +1,109 @@
+import asyncio
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ii_agent.core.event import EventType
+from ii_agent.core.media_jobs import (
+    FAILED,
+    SUCCEEDED,
+    MediaJobManager,
+    poll_operation,
+    reconstruct_media_jobs,
+    run_command,
+)
+from ii_agent.tools.base import ToolImplOutput
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_jobs_report_progress_and_results_as_events():
+    queue = asyncio.Queue()
+    manager = MediaJobManager(queue)
+
+    # A blocking SDK refresh, which must not stall the event loop
+    def refresh(operation):
+        time.sleep(0.05)
+        return SimpleNamespace(done=operation.polls >= 2, polls=operation.polls + 1)
+
+    async def work(job):
+        operation = await poll_operation(
+            SimpleNamespace(done=False, polls=0),
+            refresh,
+            interval_seconds=0.01,
+            timeout_seconds=5,
+            on_poll=lambda elapsed: manager.update(job, "waiting", 0.5),
+        )
+        data = {"success": True, "polls": operation.polls}
+        return ToolImplOutput("done", "done", data)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    output = await manager.run("video", "generate_video", "a video", work)
+    ticking.cancel()
+
+    assert output.auxiliary_data["polls"] == 3
+    assert ticks > 10
+    events = _drain(queue)
+    assert {event.type for event in events} == {EventType.MEDIA_JOB}
+    assert [event.content["status"] for event in events] == [
+        "running",
+        "running",
+        "running",
+        "running",
+        SUCCEEDED,
+    ]
+
+    for seq, event in enumerate(events, start=1):
+        event.seq = seq
+    jobs = reconstruct_media_jobs(events)
+    (job,) = jobs.values()
+    assert job["status"] == SUCCEEDED and job["seq"] == 5
+    assert job["result"] == {"success": True, "polls": 3}
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_and_timeouts():
+    queue = asyncio.Queue()
+    manager = MediaJobManager(queue)
+
+    async def rejected(job):
+        return ToolImplOutput("no", "no", {"success": False, "error": "quota"})
+
+    async def stuck(job):
+        return await poll_operation(
+            SimpleNamespace(done=False), lambda op: op, 0.01, timeout_seconds=0.05
+        )
+
+    await manager.run("image", "generate_image", "an image", rejected)
+    with pytest.raises(TimeoutError):
+        await manager.run("video", "generate_video", "a video", stuck)
+
+    jobs = reconstruct_media_jobs(_drain(queue))
+    assert [(job["status"], job["error"]) for job in jobs.values()] == [
+        (FAILED, "quota"),
+        (FAILED, "Operation timed out after 0.05 seconds"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_commands_run_as_async_subprocesses():
+    assert await run_command([sys.executable, "-c", "print('ok')"]) == b"ok\n"
+    with pytest.raises(subprocess.CalledProcessError):
+        await run_command([sys.executable, "-c", "raise SystemExit(3)"])
@@ -0,0 +1,75 @@
+import pytest
+
+from ii_agent.core.metrics import SessionMetrics, get_model_pricing
+
+
+def test_session_metrics_aggregate_turns_and_agents():
+    metrics = SessionMetrics(session_id="s1")
+    metrics.start_run()
+
+    turn = metrics.start_turn(1)
+    metrics.record_llm_call(
+        {
+            "input_tokens": 1000,
+            "output_tokens": 200,
+            "cache_read_input_tokens": 3000,
+            "cache_creation_input_tokens": -1,
+        },
+        latency_ms=120.0,
+        model_name="claude-sonnet-4@20250514",
+        turn=turn,
+    )
+    metrics.record_tool_call("web_search", 50.0, turn=turn)
+
+    review = metrics.start_turn(1, agent="reviewer_agent")
+    metrics.record_llm_call(
+        {"input_tokens": 500, "output_tokens": 100}, 80.0, "unknown-model", review
+    )
+
+    summary = metrics.summary()
+    assert summary["turns"] == 2
+    assert summary["llm_calls"] == 2
+    assert summary["input_tokens"] == 1500
+    assert summary["cache_creation_input_tokens"] == 0
+    assert summary["unpriced_llm_calls"] == 1
+    assert summary["tool_latency_ms_by_name"] == {"web_search": 50.0}
+    assert turn.cache_hit_ratio == pytest.approx(0.75)
+    # 1000 * $3 + 200 * $15 + 3000 * $0.3 per million tokens
+    assert turn.cost_usd == pytest.approx(0.0069)
+    assert review.agent == "reviewer_agent"
+    assert review.cost_usd == 0
+
+
+def test_session_metrics_round_trip():
+    metrics = SessionMetrics(session_id="s1")
+    metrics.start_run()
+    turn = metrics.start_turn(1)
+    metrics.record_llm_call(
+        {"input_tokens": 10, "output_tokens": 5}, 1.0, "gpt-4o", turn
+    )
+
+    restored = SessionMetrics.from_dict(metrics.to_dict())
+    restored.start_run()
+    restored.record_llm_call({"input_tokens": 10}, 1.0, "gpt-4o")
+
+    assert restored.session_id == "s1"
+    assert restored.runs == 2
+    assert restored.totals.input_tokens == 20
+    assert restored.turns[0].output_tokens == 5
+    assert SessionMetrics.from_dict(None, session_id="s2").summary()["llm_calls"] == 0
+
+
+def test_model_pricing_prefers_specific_prefix():
+    assert get_model_pricing("gpt-4o-mini") == get_model_pricing("openai/gpt-4o-mini")
+    assert get_model_pricing("gpt-4o-mini") != get_model_pricing("gpt-4o")
+    assert get_model_pricing(None) is None
+
+
+def test_model_pricing_matches_whole_names():
+    assert get_model_pricing("o3-mini") != get_model_pricing("o3")
+    assert get_model_pricing("o3-2025-04-16") == get_model_pricing("o3")
+    assert get_model_pricing("claude-sonnet-4@20250514") is not None
+    assert get_model_pricing("gpt-4.1-mini-2025-04-14") == (0.4, 1.6, 0.0, 0.1)
+    assert get_model_pricing("gpt-4.1-nano") == (0.1, 0.4, 0.0, 0.025)
+    # A name merely containing a priced one is not priced like it
+    assert get_model_pricing("turbo-o3") is None
@@ -0,0 +1,49 @@
+import uuid
+from pathlib import Path
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.storage.blobs import InMemoryBlobStore
+from ii_agent.core.storage.payloads import (
+    PAYLOAD_REF_KEY,
+    CompressedBlobStore,
+    offload_payload,
+    rehydrate_payload,
+)
+from ii_agent.db.manager import Events, Sessions, get_db
+from ii_agent.db.models import Event
+
+
+def test_large_strings_are_offloaded_compressed_and_restored():
+    inner = InMemoryBlobStore()
+    store = CompressedBlobStore(inner)
+    page = "<p>lorem ipsum</p>\n" * 2000
+    payload = {"type": "tool_result", "content": {"result": page, "tool_name": "x"}}
+
+    offloaded = offload_payload(payload, store, threshold=1024)
+
+    ref = offloaded["content"]["result"]
+    assert set(ref) == {PAYLOAD_REF_KEY, "size"}
+    assert ref["size"] == len(page.encode())
+    assert len(inner.get(ref[PAYLOAD_REF_KEY])) < len(page) // 10
+    # Small fields and the input itself are left alone
+    assert offloaded["content"]["tool_name"] == "x"
+    assert payload["content"]["result"] == page
+    assert rehydrate_payload(offloaded, store) == payload
+
+
+def test_events_store_references_and_read_back_full_payloads():
+    session_id = uuid.uuid4()
+    Sessions.create_session(session_id, Path("/tmp/workspaces") / str(session_id))
+    contents = "x = 1\n" * 10_000
+    event = RealtimeEvent(type=EventType.TOOL_RESULT, content={"result": contents})
+    event.seq = 1
+    Events.save_event(session_id, event)
+
+    with get_db() as db:
+        row = db.query(Event).filter(Event.session_id == str(session_id)).one()
+        assert PAYLOAD_REF_KEY in row.event_payload["content"]["result"]
+
+    [details] = Events.get_session_events_with_details(str(session_id))
+    assert details["event_payload"]["content"]["result"] == contents
+    [replayed] = Events.get_events_after_seq(session_id, 0)
+    assert replayed.content["result"] == contents
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+
+from ii_agent.core.tracing import (
+    STATUS_ERROR,
+    InMemorySpanCollector,
+    OTLPJsonFileExporter,
+    TracedQueue,
+    Tracer,
+    bind_attributes,
+    get_traced,
+    use_context,
+)
+
+
+def test_spans_nest_and_share_trace():
+    collector = InMemorySpanCollector()
+    tracer = Tracer([collector])
+
+    with tracer.span("agent.run") as run_span:
+        with tracer.span("tool.execute", tool_name="web_search") as tool_span:
+            pass
+
+    assert tool_span.trace_id == run_span.trace_id
+    assert tool_span.parent_span_id == run_span.span_id
+    assert [s.name for s in collector.get_spans()] == ["tool.execute", "agent.run"]
+    assert collector.get_spans(name="tool.execute")[0].duration_ms >= 0
+
+
+def test_span_records_errors():
+    collector = InMemorySpanCollector()
+    tracer = Tracer([collector])
+
+    with pytest.raises(ValueError):
+        with tracer.span("llm.generate"):
+            raise ValueError("boom")
+
+    span = collector.get_spans()[0]
+    assert span.status_code == STATUS_ERROR
+    assert "boom" in span.status_message
+
+
+@pytest.mark.asyncio
+async def test_bound_attributes_stay_within_task():
+    collector = InMemorySpanCollector()
+    tracer = Tracer([collector])
+
+    async def run(session_id: str):
+        bind_attributes(session_id=session_id, turn_id=1)
+        with tracer.span("history.truncate"):
+            await asyncio.sleep(0)
+
+    await asyncio.gather(asyncio.create_task(run("a")), asyncio.create_task(run("b")))
+
+    assert len(collector.get_spans(session_id="a")) == 1
+    assert len(collector.get_spans(session_id="b")) == 1
+    assert collector.get_spans(session_id="a")[0].attributes["turn_id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_consumer_spans_join_the_producer_trace():
+    collector = InMemorySpanCollector()
+    tracer = Tracer([collector])
+    queue = TracedQueue()
+
+    async def consume():
+        event, context = await get_traced(queue)
+        with use_context(context):
+            with tracer.span("events.persist", event_type=event):
+                pass
+
+    # The consumer starts before the run, like a session's message processor
+    consumer = asyncio.create_task(consume())
+    bind_attributes(session_id="s1")
+    with tracer.span("agent.run") as run_span:
+        queue.put_nowait("tool_result")
+    await consumer
+
+    persist_span = collector.get_spans(name="events.persist")[0]
+    assert persist_span.trace_id == run_span.trace_id
+    assert persist_span.parent_span_id == run_span.span_id
+    assert persist_span.attributes["session_id"] == "s1"
+
+
+def test_otlp_file_exporter_writes_export_requests(tmp_path):
+    path = tmp_path / "traces" / "spans.otlp.jsonl"
+    exporter = OTLPJsonFileExporter(str(path), flush_interval=0.05)
+    tracer = Tracer([exporter])
+
+    with tracer.span("tool.execute", tool_name="visit_webpage", turn_id=3):
+        pass
+    tracer.shutdown()
+
+    request = json.loads(path.read_text().splitlines()[0])
+    span = request["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "tool.execute"
+    assert len(span["traceId"]) == 32
+    assert {"key": "turn_id", "value": {"intValue": "3"}} in span["attributes"]
@@ -0,0 +1,96 @@
+import json
+import uuid
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db.manager import Events, Sessions, get_db
+from ii_agent.db.models import Event
+from ii_agent.server.api import sessions_router
+
+
+def _create_session_with_events(count: int) -> uuid.UUID:
+    session_id = uuid.uuid4()
+    Sessions.create_session(session_id, Path("/tmp/workspaces") / str(session_id))
+    for index in range(count):
+        event_type = EventType.TOOL_CALL if index % 2 else EventType.AGENT_THINKING
+        Events.save_event(
+            session_id, RealtimeEvent(type=event_type, content={"index": index})
+        )
+    return session_id
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(sessions_router)
+    return TestClient(app)
+
+
+def test_events_are_paged_by_cursor_and_filtered_by_type():
+    session_id = _create_session_with_events(7)
+    client = _client()
+
+    indexes, cursor = [], None
+    while True:
+        params = {"limit": 2, "type": "tool_call"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/sessions/{session_id}/events", params=params).json()
+        indexes.extend(
+            event["event_payload"]["content"]["index"] for event in page["events"]
+        )
+        assert all(
+            event["workspace_dir"].endswith(str(session_id)) for event in page["events"]
+        )
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert indexes == [1, 3, 5]
+
+
+def test_events_with_the_same_timestamp_are_paged_in_sequence_order():
+    session_id = uuid.uuid4()
+    Sessions.create_session(session_id, Path("/tmp/workspaces") / str(session_id))
+    for seq in range(6):
+        Events.save_event(
+            session_id,
+            RealtimeEvent(
+                type=EventType.AGENT_THINKING, content={"index": seq}, seq=seq
+            ),
+        )
+    with get_db() as db:
+        timestamp = (
+            db.query(Event.timestamp).filter_by(session_id=str(session_id)).first()[0]
+        )
+        db.query(Event).filter_by(session_id=str(session_id)).update(
+            {"timestamp": timestamp}
+        )
+    client = _client()
+
+    indexes, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/api/sessions/{session_id}/events", params=params).json()
+        indexes.extend(
+            event["event_payload"]["content"]["index"] for event in page["events"]
+        )
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert indexes == list(range(6))
+
+
+def test_events_stream_as_ndjson():
+    session_id = _create_session_with_events(3)
+
+    response = _client().get(
+        f"/api/sessions/{session_id}/events", params={"format": "ndjson"}
+    )
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["event_payload"]["content"]["index"] for line in lines] == [0, 1, 2]
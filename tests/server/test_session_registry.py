@@ -0,0 +1,82 @@
+import time
+import uuid
+
+from sqlalchemy import event
+
+from ii_agent.db.manager import engine
+from ii_agent.server.websocket.session_registry import (
+    DatabaseSessionRegistry,
+    InMemorySessionRegistry,
+)
+
+
+def test_live_claim_is_not_taken_over():
+    owners = {}
+    worker_a = InMemorySessionRegistry("a", "ws://a", lease_seconds=30, owners=owners)
+    worker_b = InMemorySessionRegistry("b", "ws://b", lease_seconds=30, owners=owners)
+
+    assert worker_a.is_local(worker_a.claim("s1"))
+    owner = worker_b.claim("s1")
+
+    assert owner.worker_id == "a"
+    assert owner.worker_url == "ws://a"
+    assert worker_a.renew(["s1"]) == {"s1"}
+    assert worker_b.renew(["s1"]) == set()
+
+
+def test_expired_claim_is_taken_over():
+    owners = {}
+    worker_a = InMemorySessionRegistry("a", lease_seconds=30, owners=owners)
+    worker_b = InMemorySessionRegistry("b", lease_seconds=30, owners=owners)
+    worker_a.claim("s1")
+    # Worker a crashed and stopped renewing
+    owners["s1"].lease_expires_at = time.time() - 1
+
+    assert worker_b.is_local(worker_b.claim("s1"))
+    # The old owner learns it lost the session on its next renewal
+    assert worker_a.renew(["s1"]) == set()
+    worker_a.release("s1")
+    assert worker_b.get_owner("s1").worker_id == "b"
+
+
+def test_database_registry_shares_claims_between_workers():
+    session_id = str(uuid.uuid4())
+    worker_a = DatabaseSessionRegistry(f"a-{session_id}", "ws://a", lease_seconds=30)
+    worker_b = DatabaseSessionRegistry(f"b-{session_id}", "ws://b", lease_seconds=0)
+
+    assert worker_a.is_local(worker_a.claim(session_id))
+    assert worker_b.claim(session_id).worker_url == "ws://a"
+
+    worker_a.release_all()
+    assert worker_a.get_owner(session_id) is None
+    assert worker_b.is_local(worker_b.claim(session_id))
+    # A zero lease expires immediately, so worker a can take the session back
+    assert worker_a.is_local(worker_a.claim(session_id))
+    worker_a.release(session_id)
+
+
+def test_database_takeover_of_an_expired_claim_has_one_winner():
+    session_id = str(uuid.uuid4())
+    crashed = DatabaseSessionRegistry(f"a-{session_id}", lease_seconds=0)
+    worker_b = DatabaseSessionRegistry(f"b-{session_id}", lease_seconds=30)
+    worker_c = DatabaseSessionRegistry(f"c-{session_id}", lease_seconds=30)
+    crashed.claim(session_id)
+
+    # Worker c takes the session over after worker b read the expired claim
+    # but before b writes its own
+    racing = []
+
+    def take_over_first(conn, cursor, statement, parameters, context, many):
+        if statement.startswith("UPDATE session_owner") and not racing:
+            racing.append(True)
+            assert worker_c.is_local(worker_c.claim(session_id))
+
+    event.listen(engine, "before_cursor_execute", take_over_first)
+    try:
+        owner = worker_b.claim(session_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", take_over_first)
+
+    assert owner.worker_id == worker_c.worker_id
+    assert worker_c.get_owner(session_id).worker_id == worker_c.worker_id
+    worker_c.release(session_id)
@@ -0,0 +1,96 @@
+import uuid
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db.manager import Events, Sessions
+from ii_agent.server.api import sessions_router
+
+
+def _create_session(device_id: str, name: str, messages: list[tuple]) -> str:
+    session_id = uuid.uuid4()
+    Sessions.create_session(
+        session_id, Path("/tmp/workspaces") / str(session_id), device_id=device_id
+    )
+    Sessions.update_session_name(session_id, name)
+    for event_type, text in messages:
+        Events.save_event(
+            session_id, RealtimeEvent(type=event_type, content={"text": text})
+        )
+    return str(session_id)
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(sessions_router)
+    return TestClient(app)
+
+
+def _search(client: TestClient, **params) -> dict:
+    response = client.get("/api/sessions/search", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sessions_are_searched_ranked_filtered_and_paged():
+    device_id = f"device-{uuid.uuid4()}"
+    other_device_id = f"device-{uuid.uuid4()}"
+    # A word unique to this test run, so earlier runs never match
+    marker = f"zq{uuid.uuid4().hex[:10]}"
+    weak = _create_session(
+        device_id,
+        "Quarterly report",
+        [
+            (EventType.USER_MESSAGE, f"Summarize the {marker} data " + "filler " * 50),
+            (EventType.TOOL_RESULT, f"{marker} {marker} {marker}"),
+        ],
+    )
+    strong = _create_session(
+        device_id,
+        "Pipeline",
+        [
+            (EventType.USER_MESSAGE, "Fix the pipeline"),
+            (EventType.AGENT_RESPONSE, f"The {marker} pipeline is fixed"),
+        ],
+    )
+    other = _create_session(
+        other_device_id, f"{marker} notes", [(EventType.USER_MESSAGE, "hello")]
+    )
+    client = _client()
+
+    page = _search(client, q=marker[:-3], device_id=device_id)
+
+    assert [result["id"] for result in page["results"]] == [strong, weak]
+    assert page["results"][0]["matched"] == "agent_response"
+    assert f"**{marker}**" in page["results"][0]["snippet"]
+    assert page["next_offset"] is None
+
+    first = _search(client, q=marker, limit=2)
+    assert len(first["results"]) == 2
+    assert first["next_offset"] == 2
+    rest = _search(client, q=marker, limit=2, offset=2)
+    assert rest["next_offset"] is None
+    results = {result["id"]: result for result in first["results"] + rest["results"]}
+    assert sorted(results) == sorted([weak, strong, other])
+    named = results[other]
+    assert named["matched"] == "session_name"
+    assert named["event_id"] is None
+
+    # Renaming replaces the indexed name and deleting drops the session
+    Sessions.update_session_name(uuid.UUID(other), "renamed")
+    Sessions.delete_session(uuid.UUID(weak))
+    ids = [result["id"] for result in _search(client, q=marker)["results"]]
+    assert ids == [strong]
+
+    Sessions.delete_session(uuid.UUID(strong))
+    Sessions.delete_session(uuid.UUID(other))
+
+
+def test_query_syntax_in_search_terms_is_matched_literally():
+    client = _client()
+
+    assert _search(client, q='foo-"bar OR NEAR(baz*')["results"] == []
+    assert _search(client, q="!!!")["results"] == []
+    assert client.get("/api/sessions/search", params={"q": ""}).status_code == 422
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from ii_agent.tools.clients.http_cache import HttpCache
+from ii_agent.tools.clients.visit_webpage_client import (
+    BaseVisitClient,
+    CachedVisitClient,
+    VisitResult,
+)
+from ii_agent.tools.clients.web_search_client import (
+    BaseSearchClient,
+    CachedSearchClient,
+)
+
+
+class FakeVisitClient(BaseVisitClient):
+    """Origin serving one page with an ETag, counting full and 304 responses."""
+
+    name = "Fake"
+    max_output_length = 1000
+
+    def __init__(self):
+        self.page = "v1"
+        self.full_responses = 0
+        self.not_modified = 0
+
+    async def fetch_async(self, url, etag=None, last_modified=None):
+        if etag == f'"{self.page}"':
+            self.not_modified += 1
+            return VisitResult(content=None, max_age=0)
+        self.full_responses += 1
+        return VisitResult(
+            content=f"{url}: {self.page}", etag=f'"{self.page}"', max_age=0
+        )
+
+
+class FakeSearchClient(BaseSearchClient):
+    name = "FakeSearch"
+    max_results = 5
+
+    def __init__(self, outputs):
+        self.outputs = list(outputs)
+        self.calls = 0
+
+    async def forward_async(self, query):
+        self.calls += 1
+        return self.outputs.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_stale_pages_are_revalidated_with_their_etag(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    origin = FakeVisitClient()
+    client = CachedVisitClient(origin, cache, ttl=3600)
+
+    # max-age=0 keeps the page stale, so every visit asks the origin
+    assert await client.forward_async("https://a.test") == "https://a.test: v1"
+    assert await client.forward_async("https://a.test") == "https://a.test: v1"
+    assert (origin.full_responses, origin.not_modified) == (1, 1)
+
+    origin.page = "v2"
+    assert await client.forward_async("https://a.test") == "https://a.test: v2"
+    assert origin.full_responses == 2
+    stats = cache.stats()
+    assert stats["visit"]["misses"] == 2
+    assert stats["visit"]["revalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_searches_are_shared_between_clients_but_failures_are_not_cached(
+    tmp_path,
+):
+    cache = HttpCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    first = FakeSearchClient(["Error searching with Fake: timeout", '[{"url": "x"}]'])
+    client = CachedSearchClient(first, cache, ttl=3600)
+
+    assert (await client.forward_async("gaia  question")).startswith("Error")
+    assert await client.forward_async("gaia question") == '[{"url": "x"}]'
+    # Another session's client reads the stored result
+    other = CachedSearchClient(FakeSearchClient([]), cache, ttl=3600)
+    assert await other.forward_async(" gaia question ") == '[{"url": "x"}]'
+
+    assert first.calls == 2
+    assert cache.stats()["search"] == {
+        "hits": 1,
+        "misses": 2,
+        "revalidations": 0,
+        "hit_ratio": 1 / 3,
+    }
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.db"), max_bytes=4096)
+    # Random values, so compression does not shrink them away
+    values = {name: os.urandom(200).hex() for name in ["a", "b"]}
+    for name in ["a", "b"]:
+        assert cache.put(name, values[name], ttl=3600)
+
+    while cache.evictions == 0:
+        # Reading "a" keeps it the most recently used
+        assert cache.get("a") is not None
+        cache.put(os.urandom(8).hex(), os.urandom(200).hex(), ttl=3600)
+
+    assert cache.get("b") is None
+    assert cache.get("a").value == values["a"]
+    assert cache.stats()["bytes"] <= 4096
@@ -0,0 +1,55 @@
+import pytest
+from aiohttp import web
+
+from ii_agent.tools.clients.http_sessions import (
+    HttpSessionPool,
+    run_with_http_sessions,
+)
+
+
+@pytest.mark.asyncio
+async def test_requests_to_a_host_reuse_one_keep_alive_connection():
+    peers = []
+
+    async def handler(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    pool = HttpSessionPool(limit_per_host=2)
+    try:
+        url = f"http://127.0.0.1:{port}/"
+        for _ in range(3):
+            session = pool.session_for(url)
+            async with session.get(url) as response:
+                assert (await response.json()) == {"ok": True}
+
+        assert pool.session_for(url) is session
+        assert pool.session_for(f"http://localhost:{port}/") is not session
+        # The client port stays the same, so no new connection was opened
+        assert len(set(peers)) == 1
+    finally:
+        await pool.close()
+        await runner.cleanup()
+
+    assert session.closed
+    assert pool.session_for(url) is not session
+    await pool.close()
+
+
+def test_short_lived_loops_close_their_sessions():
+    pool = HttpSessionPool()
+
+    async def open_session():
+        return pool.session_for("http://127.0.0.1/")
+
+    session = run_with_http_sessions(open_session())
+
+    assert session.closed
+    assert pool._sessions == {}
@@ -0,0 +1,82 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from ii_agent.utils import image_prep
+from ii_agent.utils.image_prep import ImageSpec, image_spec_for, prepare_image
+from ii_agent.utils.result_cache import ResultCache
+
+
+def _png(size, transparent=False) -> bytes:
+    # Noisy like a photo, so it does not compress to nothing as a PNG
+    gradient = Image.linear_gradient("L").resize(size)
+    mirrored = gradient.transpose(Image.FLIP_LEFT_RIGHT)
+    bands = [Image.effect_noise(size, 20), gradient, mirrored]
+    if transparent:
+        bands.append(gradient)
+    buffer = io.BytesIO()
+    Image.merge("RGBA" if transparent else "RGB", bands).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _decode(prepared) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(prepared.data)))
+
+
+@pytest.fixture
+def preparations(monkeypatch):
+    cache = ResultCache(":memory:", 100_000_000)
+    monkeypatch.setattr(image_prep, "get_conversion_cache", lambda: cache)
+    calls = []
+    run_in_process = image_prep.run_in_process
+
+    async def counting_run_in_process(func, *args):
+        calls.append(args[1:])
+        return await run_in_process(func, *args)
+
+    monkeypatch.setattr(image_prep, "run_in_process", counting_run_in_process)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_images_are_fitted_to_the_provider_and_cached(tmp_path, preparations):
+    path = tmp_path / "photo.png"
+    path.write_bytes(_png((2400, 1600)))
+
+    prepared = await prepare_image(str(path), image_spec_for("anthropic"))
+    assert prepared.media_type == "image/jpeg"
+    assert max(prepared.width, prepared.height) <= 1568
+    assert prepared.width * prepared.height <= 1_150_000
+    assert _decode(prepared).size == (prepared.width, prepared.height)
+    assert len(base64.b64decode(prepared.data)) < path.stat().st_size / 4
+
+    # The same content is not processed again, under any path
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(path.read_bytes())
+    assert await prepare_image(str(copy), image_spec_for("anthropic")) == prepared
+    assert len(preparations) == 1
+
+    # Another target is another entry
+    openai = await prepare_image(str(path), image_spec_for("openai"))
+    assert min(openai.width, openai.height) == 768
+    assert len(preparations) == 2
+
+
+@pytest.mark.asyncio
+async def test_format_follows_transparency_and_losslessness(preparations):
+    spec = ImageSpec(max_long_side=100)
+    transparent = _png((200, 200), transparent=True)
+
+    assert (await prepare_image(transparent, spec)).media_type == "image/webp"
+    lossless = await prepare_image(transparent, spec, lossless=True)
+    assert lossless.media_type == "image/png"
+    assert _decode(lossless).size == (100, 100)
+
+    # Screenshots keep their size and are not cached
+    screenshot = await prepare_image(
+        _png((1024, 768)), spec, resize=False, use_cache=False
+    )
+    assert (screenshot.width, screenshot.height) == (1024, 768)
+    assert screenshot.media_type == "image/jpeg"
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ii_agent.tools import video_gen_tool
+from ii_agent.tools.base import ToolImplOutput
+from ii_agent.tools.video_gen_tool import LongVideoGenerateFromTextTool
+
+
+class FakeTextTool:
+    running = 0
+    peak = 0
+    prompts = []
+
+    def __init__(self, *args):
+        pass
+
+    async def generate(self, tool_input, job=None):
+        cls = FakeTextTool
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            cls.running -= 1
+        cls.prompts.append(tool_input["prompt"])
+        if tool_input["prompt"] == "broken":
+            return ToolImplOutput("no", "no", {"success": False, "error": "blocked"})
+        return ToolImplOutput("ok", "ok", {"success": True})
+
+
+@pytest.fixture
+def tool(tmp_path, monkeypatch):
+    joined = []
+
+    async def concat_videos(paths, output_path, work_dir):
+        joined.append([path.name for path in paths])
+
+    FakeTextTool.peak = 0
+    FakeTextTool.prompts = []
+    monkeypatch.setenv("LONG_VIDEO_PARALLEL_SCENES", "2")
+    monkeypatch.setattr(video_gen_tool, "VideoGenerateFromTextTool", FakeTextTool)
+    monkeypatch.setattr(video_gen_tool, "concat_videos", concat_videos)
+    workspace = SimpleNamespace(workspace_path=lambda path: tmp_path / path)
+    return LongVideoGenerateFromTextTool(workspace), joined
+
+
+@pytest.mark.asyncio
+async def test_independent_scenes_are_generated_concurrently(tool):
+    tool, joined = tool
+    started = time.monotonic()
+
+    result = await tool.run_impl(
+        {
+            "prompts": ["a", "b", "c", "d"],
+            "output_filename": "long.mp4",
+            "duration_seconds": "20",
+            "independent_scenes": True,
+        }
+    )
+
+    assert result.auxiliary_data["success"]
+    # Two waves of two scenes instead of four scenes in a row
+    assert time.monotonic() - started < 0.7
+    assert FakeTextTool.peak == 2
+    assert joined == [[f"scene_{i}.mp4" for i in range(4)]]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_scene_cancels_the_others(tool):
+    tool, joined = tool
+
+    result = await tool.run_impl(
+        {
+            "prompts": ["broken", "b", "c", "d"],
+            "output_filename": "long.mp4",
+            "duration_seconds": "20",
+            "independent_scenes": True,
+        }
+    )
+
+    assert not result.auxiliary_data["success"]
+    assert "Error generating scene 0: blocked" in result.tool_output
+    assert sorted(FakeTextTool.prompts) == ["b", "broken"]
+    assert joined == []
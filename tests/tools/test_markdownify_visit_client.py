@@ -0,0 +1,79 @@
+import pymupdf
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from ii_agent.tools.clients.http_sessions import HttpSessionPool
+from ii_agent.tools.clients.visit_webpage_client import (
+    ContentExtractionError,
+    MarkdownifyVisitClient,
+)
+
+ARTICLE_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Site</title><script>var tracking = 1;</script></head>
+<body>
+<nav><a href="/">Home</a><a href="/about">About us</a></nav>
+<main><article><h1>Release notes</h1><p>Version 2 is <b>faster</b>.</p></article></main>
+<footer>Copyright footer</footer>
+</body></html>"""
+
+
+def _pdf() -> bytes:
+    document = pymupdf.open()
+    document.new_page().insert_text((72, 72), "Quarterly revenue grew")
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+@pytest_asyncio.fixture
+async def server():
+    pages = {
+        "/article": (ARTICLE_PAGE, "text/html; charset=utf-8"),
+        # Served with a wrong type, so only its first bytes tell it apart
+        "/report": (_pdf(), "application/octet-stream"),
+        "/huge": (b"<html><body><p>" + b"word " * 400_000, ""),
+        "/image": (b"\x89PNG\r\n\x1a\n" + b"\x00" * 100, "image/png"),
+    }
+
+    async def handler(request):
+        body, content_type = pages[request.path]
+        return web.Response(body=body, headers={"Content-Type": content_type})
+
+    app = web.Application()
+    app.router.add_get("/{page}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    pool = HttpSessionPool()
+    yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}", pool
+    await pool.close()
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_pages_are_sniffed_capped_and_reduced_to_their_main_content(server):
+    base_url, pool = server
+    client = MarkdownifyVisitClient(
+        http_sessions=pool, max_html_bytes=100_000, max_pdf_bytes=100_000
+    )
+
+    article = await client.forward_async(f"{base_url}/article")
+    assert "Release notes" in article and "**faster**" in article
+    for noise in ["tracking", "About us", "Copyright footer"]:
+        assert noise not in article
+
+    assert "Quarterly revenue grew" in await client.forward_async(f"{base_url}/report")
+
+    # Only the first 100 kB of the page are read and converted
+    huge = await client.forward_async(f"{base_url}/huge")
+    assert huge.startswith("word word")
+    assert huge.count("word") <= 100_000 // 5
+
+    with pytest.raises(ContentExtractionError):
+        await client.forward_async(f"{base_url}/image")
+
+    small_pdf_client = MarkdownifyVisitClient(http_sessions=pool, max_pdf_bytes=256)
+    with pytest.raises(ContentExtractionError):
+        await small_pdf_client.forward_async(f"{base_url}/report")
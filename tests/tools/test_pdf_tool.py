@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pymupdf
+import pytest
+
+from ii_agent.tools import pdf_tool
+from ii_agent.utils.result_cache import ResultCache
+from ii_agent.tools.pdf_tool import PdfTextExtractTool
+
+
+@pytest.fixture
+def extracted_pages(monkeypatch):
+    pages = []
+    pdf_page_texts = pdf_tool.pdf_page_texts
+
+    def counting_pdf_page_texts(path, numbers):
+        pages.extend(numbers)
+        return pdf_page_texts(path, numbers)
+
+    async def run_in_process(func, *args):
+        if func is pdf_page_texts:
+            func = counting_pdf_page_texts
+        return func(*args)
+
+    monkeypatch.setattr(pdf_tool, "run_in_process", run_in_process)
+    return pages
+
+
+@pytest.fixture
+def report(tmp_path):
+    document = pymupdf.open()
+    for number in range(1, 101):
+        document.new_page().insert_text((72, 72), f"Page {number} " + "x" * 40)
+    document.save(tmp_path / "report.pdf")
+    document.close()
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_large_pdfs_are_walked_in_cached_increments(report, extracted_pages):
+    workspace = SimpleNamespace(workspace_path=lambda path: report / path)
+    tool = PdfTextExtractTool(
+        workspace, max_output_length=500, cache=ResultCache(":memory:", 10_000_000)
+    )
+
+    first = await tool.run_impl({"file_path": "report.pdf"})
+    data = first.auxiliary_data
+    assert data["success"] and data["page_count"] == 100
+    assert first.tool_output.startswith("Page 1 ")
+    assert "Page 11 " in first.tool_output and "Page 12 " not in first.tool_output
+    assert data["next_page"] == 11
+    # Extraction stopped with the budget instead of running through the document
+    assert len(extracted_pages) < 20
+
+    second = await tool.run_impl(
+        {
+            "file_path": "report.pdf",
+            "start_page": data["next_page"],
+            "offset": data["next_offset"],
+        }
+    )
+    # The second call picks up exactly where the first was cut off
+    cut = first.tool_output.index("\n... (content truncated")
+    assert (first.tool_output[:cut] + second.tool_output).startswith(
+        "".join(f"Page {n} " + "x" * 40 + "\n" for n in range(1, 20))
+    )
+
+    extracted_pages.clear()
+    again = await tool.run_impl({"file_path": "report.pdf"})
+    assert again.tool_output == first.tool_output
+    assert extracted_pages == []
+
+    ranged = await tool.run_impl(
+        {"file_path": "report.pdf", "start_page": 98, "end_page": 99}
+    )
+    assert ranged.tool_output.startswith("Page 98 ")
+    assert "Page 100" not in ranged.tool_output
+    assert "next_page" not in ranged.auxiliary_data
+
+    invalid = await tool.run_impl({"file_path": "report.pdf", "start_page": 101})
+    assert not invalid.auxiliary_data["success"]
@@ -0,0 +1,80 @@
+import logging
+import os
+from types import SimpleNamespace
+
+from ii_agent.core.config.client_config import ClientConfig
+from ii_agent.tools.clients.str_replace_client import LocalStrReplaceClient
+from ii_agent.tools.str_replace_tool_relative import StrReplaceEditorTool
+from ii_agent.tools.tool_manager import AgentToolManager
+from ii_agent.utils.tool_client.manager.str_replace_manager import StrReplaceManager
+from ii_agent.utils.tool_client.manager.undo_store import (
+    PATCH_OVERHEAD_BYTES,
+    UndoStore,
+)
+
+
+def test_edits_of_a_large_file_keep_small_patches_and_undo(tmp_path):
+    store = UndoStore(memory_bytes=2_000, spill_dir=str(tmp_path))
+    manager = StrReplaceManager(undo_store=store)
+    path = tmp_path / "generated.py"
+    original = "".join(f"value_{i} = {i}\n" for i in range(20_000))
+    path.write_text(original)
+
+    for i in range(0, 20_000, 100):
+        response = manager.str_replace(str(path), f"value_{i} = {i}\n", f"v{i} = 0\n")
+        assert response.success
+    assert manager.insert(str(path), 0, "import os").success
+
+    # 201 patches of a few lines each, not 201 copies of a 300 kB file
+    assert store.total_bytes < 201 * 200
+    assert store.in_memory_bytes <= 2_000
+    spill_dirs = [entry for entry in tmp_path.iterdir() if entry.is_dir()]
+    assert len(spill_dirs) == 1 and os.listdir(spill_dirs[0])
+
+    for _ in range(201):
+        assert manager.undo_edit(str(path)).success
+    assert path.read_text() == original
+    assert "No edit history" in manager.undo_edit(str(path)).file_content
+
+    manager.close()
+    assert not spill_dirs[0].exists()
+
+
+def test_history_is_bounded_and_checked_against_the_file(tmp_path):
+    # Each edit replaces one character
+    store = UndoStore(max_file_bytes=3 * (PATCH_OVERHEAD_BYTES + 1))
+    manager = StrReplaceManager(undo_store=store)
+    path = tmp_path / "notes.txt"
+    path.write_text("a")
+
+    for text in ["b", "c", "d", "e"]:
+        manager.write_file(str(path), text)
+    # Only the last three edits fit in the history of the file
+    for expected in ["d", "c", "b"]:
+        assert manager.undo_edit(str(path)).success
+        assert path.read_text() == expected
+    assert not manager.undo_edit(str(path)).success
+
+    manager.write_file(str(path), "edited")
+    path.write_text("changed by a shell command")
+    response = manager.undo_edit(str(path))
+    assert not response.success
+    assert "changed by other means" in response.file_content
+    assert path.read_text() == "changed by a shell command"
+
+
+def test_closing_the_tools_of_a_session_drops_the_edit_history(tmp_path):
+    client = LocalStrReplaceClient(ClientConfig(cwd=str(tmp_path)))
+    client.manager = StrReplaceManager(
+        undo_store=UndoStore(memory_bytes=0, spill_dir=str(tmp_path))
+    )
+    tool = StrReplaceEditorTool(SimpleNamespace(), str_replace_client=client)
+    path = tmp_path / "notes.txt"
+    path.write_text("first\n")
+    assert client.str_replace(str(path), "first", "second").success
+    spill_dirs = [entry for entry in tmp_path.iterdir() if entry.is_dir()]
+
+    AgentToolManager([tool], logging.getLogger("test")).close()
+
+    assert "No edit history" in client.undo_edit(str(path)).file_content
+    assert not spill_dirs[0].exists()
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pptx
+import pytest
+
+from ii_agent.tools import text_inspector_tool
+from ii_agent.utils.result_cache import ResultCache
+from ii_agent.tools.text_inspector_tool import TextInspectorTool
+
+
+def _deck(path, slides):
+    presentation = pptx.Presentation()
+    for title, body in slides:
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = title
+        slide.placeholders[1].text = body
+    presentation.save(path)
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    calls = []
+    run_in_process = text_inspector_tool.run_in_process
+
+    async def counting_run_in_process(func, *args):
+        calls.append(args[0])
+        return await run_in_process(func, *args)
+
+    monkeypatch.setattr(text_inspector_tool, "run_in_process", counting_run_in_process)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_unchanged_files_are_converted_once(tmp_path, conversions):
+    workspace = SimpleNamespace(workspace_path=lambda path: tmp_path / path)
+    tool = TextInspectorTool(workspace, cache=ResultCache(":memory:", 10_000_000))
+    _deck(tmp_path / "deck.pptx", [("Roadmap", "Ship the cache"), ("Risks", "None")])
+
+    first = await tool.run_impl({"file_path": "deck.pptx"})
+    assert first.auxiliary_data["success"]
+    assert "<!-- Slide number: 2 -->\n# Risks" in first.tool_output
+    assert "# Roadmap\nShip the cache" in first.tool_output
+
+    (tmp_path / "copy.pptx").write_bytes((tmp_path / "deck.pptx").read_bytes())
+    second = await tool.run_impl({"file_path": "copy.pptx"})
+    assert second.tool_output == first.tool_output
+    assert len(conversions) == 1
+
+    _deck(tmp_path / "deck.pptx", [("Roadmap", "Ship the pool")])
+    third = await tool.run_impl({"file_path": "deck.pptx"})
+    assert "Ship the pool" in third.tool_output
+    assert len(conversions) == 2
+    assert tool.cache.metrics_for("convert").hits == 1
+
+
+@pytest.mark.asyncio
+async def test_long_decks_stop_at_the_text_limit(tmp_path, conversions):
+    workspace = SimpleNamespace(workspace_path=lambda path: tmp_path / path)
+    tool = TextInspectorTool(
+        workspace, text_limit=200, cache=ResultCache(":memory:", 10_000_000)
+    )
+    _deck(tmp_path / "long.pptx", [(f"Slide {i}", "x" * 50) for i in range(20)])
+
+    result = await tool.run_impl({"file_path": "long.pptx"})
+
+    assert "Slide 2" in result.tool_output
+    assert "Slide 10" not in result.tool_output
+    assert result.tool_output.endswith("longer than 200 characters -->")
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from ii_agent.tools.clients.web_search_client import (
+    BaseSearchClient,
+    FanOutSearchClient,
+    merge_search_results,
+    normalize_result_url,
+)
+
+
+class FakeProvider(BaseSearchClient):
+    def __init__(self, name, urls, delay=0.0, error=None):
+        self.name = name
+        self.urls = urls
+        self.delay = delay
+        self.error = error
+        self.max_results = len(urls)
+        self.cancelled = False
+
+    async def search_async(self, query):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return [
+            {"title": url, "url": url, "content": f"{self.name}: {query}"}
+            for url in self.urls
+        ]
+
+
+def test_results_are_deduplicated_by_normalized_url_and_ranked_by_weight():
+    assert normalize_result_url(
+        "HTTPS://www.Example.com/page/?utm_source=x&id=3#top"
+    ) == normalize_result_url("http://example.com/page?id=3")
+
+    results = {
+        "Weak": ["https://a.test", "https://b.test", "https://c.test"],
+        "Strong": ["https://www.c.test/", "https://b.test"],
+    }
+    merged = merge_search_results(
+        {
+            name: [{"title": url, "url": url, "content": ""} for url in urls]
+            for name, urls in results.items()
+        },
+        weights={"Strong": 1.0, "Weak": 0.5},
+    )
+
+    # c: 1.0 + 0.5/3, b: 1.0/2 + 0.5/2, a: 0.5
+    assert [result["url"] for result in merged] == [
+        "https://www.c.test/",
+        "https://b.test",
+        "https://a.test",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_returns_once_enough_results_arrived():
+    fast = FakeProvider("Fast", ["https://a.test", "https://b.test"])
+    thin = FakeProvider("Thin", ["https://a.test"], delay=0.05)
+    broken = FakeProvider("Broken", [], error=RuntimeError("quota exceeded"))
+    slow = FakeProvider("Slow", ["https://c.test", "https://d.test"], delay=30)
+    client = FanOutSearchClient([fast, thin, broken, slow], max_results=2)
+
+    started = time.monotonic()
+    results = await client.search_async("query")
+
+    assert time.monotonic() - started < 5
+    assert [result["url"] for result in results] == ["https://a.test", "https://b.test"]
+    await asyncio.sleep(0)
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_fan_out_returns_what_arrived_by_the_deadline():
+    thin = FakeProvider("Thin", ["https://a.test"])
+    slow = FakeProvider("Slow", ["https://b.test"], delay=30)
+    client = FanOutSearchClient([thin, slow], max_results=5, deadline_seconds=0.2)
+
+    results = await client.search_async("query")
+
+    assert [result["url"] for result in results] == ["https://a.test"]